@@ -46,6 +46,20 @@ class ObservableConfig(DefaultConfig, Observable):
     def set_config_value(self, key, value):
         super(ObservableConfig, self).set_config_value(key, value)
 
+    def get_optional_config_value(self, key, default=None):
+        """Returns a config value, which can be disabled by setting it to None
+
+        The YAML files and the config editor may store a disabled value as string "None", which is returned as None.
+
+        :param str key: the key of the config value
+        :param default: the value returned, if the key does not exist
+        :return: the config value or None
+        """
+        value = self.get_config_value(key, default)
+        if value == "None":
+            return None
+        return value
+
     def as_dict(self):
         """Returns the configuration as dict
 
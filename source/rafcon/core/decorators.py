@@ -60,3 +60,18 @@ def lock_state_machine(func):
                 global_lock_counter -= 1
         return return_value
     return func_wrapper
+
+
+def lock_state_machine_runtime(func):
+    @wraps_safely(func)
+    def func_wrapper(*args, **kwargs):
+        """ Decorate methods which only change execution related data of a state, like its execution status. The
+        runtime lock of the respective state machine is acquired instead of the modification lock. Thus, the execution
+        is not blocked by structural edits of the state machine and vice versa.
+        """
+        target_state_machine = args[0].get_state_machine()
+        if target_state_machine is None:
+            return func(*args, **kwargs)
+        with target_state_machine.get_runtime_lock():
+            return func(*args, **kwargs)
+    return func_wrapper
@@ -28,6 +28,7 @@ from threading import Lock, RLock
 import sys
 
 from gtkmvc3.observable import Observable
+from rafcon.core.execution.execution_profiler import execution_profiler, WAIT
 from rafcon.core.execution.execution_status import ExecutionStatus
 from rafcon.core.execution.execution_status import StateMachineExecutionStatus
 from rafcon.core.config import global_config
@@ -134,6 +135,9 @@ class ExecutionEngine(Observable):
             if not global_config.get_config_value("SCRIPT_RECOMPILATION_ON_STATE_EXECUTION", True):
                 self.recompile_execution_scripts_recursively()
 
+            execution_profiler.apply_config(global_config.get_config_value("EXECUTION_PROFILING_ENABLED", False),
+                                            global_config.get_config_value("EXECUTION_PROFILING_MAX_RECORDS", 100000))
+
             self.set_execution_mode(StateMachineExecutionStatus.STARTED)
 
             self.start_state_paths = []
@@ -381,7 +385,8 @@ class ExecutionEngine(Observable):
 
         if (self._status.execution_mode is StateMachineExecutionStatus.PAUSED) \
                 or (self._status.execution_mode is StateMachineExecutionStatus.STEP_MODE):
-            self._wait_while_in_pause_or_in_step_mode()
+            with execution_profiler.measure(container_state, WAIT):
+                self._wait_while_in_pause_or_in_step_mode()
             # new command was triggered => execution command has to handled
             container_state.execution_history.new_execution_command_handled = False
             woke_up_from_pause_or_step_mode = True
@@ -401,7 +406,8 @@ class ExecutionEngine(Observable):
 
         else:  # all other step modes
             logger.verbose("before wait")
-            self._wait_if_required(container_state, next_child_state_to_execute, woke_up_from_pause_or_step_mode)
+            with execution_profiler.measure(container_state, WAIT):
+                self._wait_if_required(container_state, next_child_state_to_execute, woke_up_from_pause_or_step_mode)
             logger.verbose("after wait")
 
             # calculate states to which should be run
@@ -23,17 +23,23 @@ from builtins import range
 from builtins import str
 import time
 import copy
+import sys
 from collections import Iterable, Sized
 import json
 from jsonconversion.decoder import JSONObjectDecoder
 from jsonconversion.encoder import JSONObjectEncoder
 
 import shelve
-from threading import Lock
+from collections import deque
+from threading import Lock, Condition, Thread
 from enum import Enum
 from gtkmvc3.observable import Observable
 
+from rafcon.core.execution.execution_profiler import execution_profiler, HISTORY
 from rafcon.core.id_generator import history_item_id_generator
+from rafcon.core.state_elements.data_port import PASS_BY_COPY
+from rafcon.core.state_elements.scope import get_scoped_data_view
+from rafcon.utils.segment_log import SegmentLogWriter
 from rafcon.utils import log
 logger = log.get_logger(__name__)
 import os
@@ -42,19 +48,36 @@ import pickle
 from weakref import ref
 
 
+#: Execution logs are stored as python shelve
+SHELVE_FORMAT = "SHELVE"
+#: Execution logs are stored in the append-only format of :mod:`rafcon.utils.segment_log`
+SEGMENTS_FORMAT = "SEGMENTS"
+
+EXECUTION_LOG_FORMATS = (SHELVE_FORMAT, SEGMENTS_FORMAT)
+
+
 class ExecutionHistoryStorage(object):
-    def __init__(self, filename):
+    def __init__(self, filename, log_format=SHELVE_FORMAT):
+        if log_format not in EXECUTION_LOG_FORMATS:
+            raise ValueError("Unknown execution log format '{0}', use one of {1}".format(log_format,
+                                                                                      EXECUTION_LOG_FORMATS))
         self.filename = filename
+        self.log_format = log_format
         self.store_lock = Lock()
         try:
-            # 'c' for read/write/create
-            # protocol 2 cause of in some cases smaller file size
-            # writeback disabled, cause we don't need caching of entries in memory but continuous writes to the disk
-            self.store = shelve.open(filename, flag='c', protocol=2, writeback=False)
+            self.store = self._open_store()
             logger.debug('Openend log file for writing %s' % self.filename)
         except Exception:
             logger.exception('Exception:')
 
+    def _open_store(self):
+        if self.log_format == SEGMENTS_FORMAT:
+            return SegmentLogWriter(self.filename)
+        # 'c' for read/write/create
+        # protocol 2 cause of in some cases smaller file size
+        # writeback disabled, cause we don't need caching of entries in memory but continuous writes to the disk
+        return shelve.open(self.filename, flag='c', protocol=2, writeback=False)
+
     def store_item(self, key, value):
         with self.store_lock:
             try:
@@ -62,11 +85,22 @@ class ExecutionHistoryStorage(object):
             except Exception:
                 logger.exception('Exception:')
 
+    def store_history_item(self, history_item):
+        """Stores the record of a history item
+
+        :param HistoryItem history_item: the history item to be stored
+        """
+        self.store_item(history_item.history_item_id, history_item.to_dict())
+
     def flush(self):
         with self.store_lock:
             try:
-                self.store.close()
-                self.store = shelve.open(self.filename, flag='c', protocol=2, writeback=False)
+                if self.log_format == SEGMENTS_FORMAT:
+                    # records are only appended, thus the log does not need to be reopened
+                    self.store.sync()
+                else:
+                    self.store.close()
+                    self.store = self._open_store()
                 logger.debug('Flushed log file %s' % self.filename)
             except Exception:
                 if self.destroyed:
@@ -80,7 +114,7 @@ class ExecutionHistoryStorage(object):
                 self.store.close()
                 logger.debug('Closed log file %s' % self.filename)
                 if make_read_and_writable_for_all:
-                    ret = subprocess.call(['chmod', 'a+rw', self.filename])
+                    ret = subprocess.call(['chmod', '-R', 'a+rw', self.filename])
                     if ret:
                         logger.debug('Could not make log file readable for all. chmod a+rw failed on %s.' % self.filename)
                     else:
@@ -98,21 +132,199 @@ class ExecutionHistoryStorage(object):
                 logger.exception('Exception:')
 
 
+#: The executing thread waits until there is space in the queue of the execution log writer
+BLOCK = "BLOCK"
+#: The oldest queued item is discarded in favour of the new one
+DROP_OLDEST = "DROP_OLDEST"
+#: Only every n-th item is queued, while the queue is full
+SAMPLE = "SAMPLE"
+
+BACKPRESSURE_POLICIES = (BLOCK, DROP_OLDEST, SAMPLE)
+
+
+class AsyncExecutionHistoryStorage(ExecutionHistoryStorage):
+    """An execution history storage writing the records of the history items in a background thread
+
+    The record of a history item is created by the executing thread, as it has to capture the data at the time the
+    item is pushed; the values are pickled immediately and cannot be changed afterwards. Storing the records accesses
+    the disk, which is done by a writer thread taking the queued records in batches. Thus, the executing states are
+    not delayed by the disk accesses of the execution log. Queued records are written at latest after
+    ``flush_interval`` seconds, on :meth:`flush` and on :meth:`close`.
+
+    If the queue is full, the ``backpressure_policy`` decides what happens to a new item:
+
+    * ``BLOCK``: the executing thread waits until there is space in the queue, thus no item is lost
+    * ``DROP_OLDEST``: the oldest queued item is discarded
+    * ``SAMPLE``: only every ``sampling_interval``-th item waits for space in the queue, the others are discarded
+
+    :ivar int max_queue_size: the maximum number of items waiting to be written
+    :ivar str backpressure_policy: one of ``BLOCK``, ``DROP_OLDEST`` and ``SAMPLE``
+    :ivar float flush_interval: the maximum time in seconds an item waits in the queue
+    :ivar int sampling_interval: the fraction of items kept with the ``SAMPLE`` policy
+    :ivar int number_of_written_items: the number of records written to the execution log
+    :ivar int number_of_dropped_items: the number of items discarded according to the backpressure policy
+    :ivar int max_queue_depth: the maximum number of items that were waiting in the queue
+    :ivar float max_write_latency: the maximum time in seconds between queuing an item and storing its record
+    :ivar float total_write_latency: the summed latency of all written items
+    """
+
+    def __init__(self, filename, log_format=SHELVE_FORMAT, max_queue_size=1000, backpressure_policy=BLOCK,
+                 flush_interval=1.0, sampling_interval=10):
+        if backpressure_policy not in BACKPRESSURE_POLICIES:
+            raise ValueError("Unknown backpressure policy '{0}', use one of {1}".format(backpressure_policy,
+                                                                                     BACKPRESSURE_POLICIES))
+        super(AsyncExecutionHistoryStorage, self).__init__(filename, log_format)
+        self.max_queue_size = max(1, max_queue_size)
+        self.backpressure_policy = backpressure_policy
+        self.flush_interval = flush_interval
+        self.sampling_interval = max(1, sampling_interval)
+        self.number_of_written_items = 0
+        self.number_of_dropped_items = 0
+        self.max_queue_depth = 0
+        self.max_write_latency = 0.
+        self.total_write_latency = 0.
+
+        self._queue = deque()
+        self._queue_lock = Lock()
+        self._not_empty = Condition(self._queue_lock)
+        self._not_full = Condition(self._queue_lock)
+        self._flushed = Condition(self._queue_lock)
+        self._sampling_counter = 0
+        self._flush_requests = 0
+        self._handled_flush_requests = 0
+        self._closed = False
+        self._writer_thread = Thread(target=self._write_queued_items, name="ExecutionLogWriter")
+        self._writer_thread.daemon = True
+        self._writer_thread.start()
+
+    @property
+    def queue_depth(self):
+        """The number of items currently waiting to be written"""
+        return len(self._queue)
+
+    @property
+    def average_write_latency(self):
+        """The average time in seconds between queuing an item and storing its record"""
+        if not self.number_of_written_items:
+            return 0.
+        return self.total_write_latency / self.number_of_written_items
+
+    def store_history_item(self, history_item):
+        """Creates the record of a history item and queues it to be stored by the writer thread
+
+        :param HistoryItem history_item: the history item to be stored
+        """
+        try:
+            record = history_item.to_dict()
+        except Exception:
+            logger.exception('Exception:')
+            return
+        with self._queue_lock:
+            if self._closed:
+                self.store_item(record['history_item_id'], record)
+                return
+            if len(self._queue) >= self.max_queue_size:
+                if self.backpressure_policy == DROP_OLDEST:
+                    self._queue.popleft()
+                    self.number_of_dropped_items += 1
+                else:
+                    if self.backpressure_policy == SAMPLE:
+                        self._sampling_counter += 1
+                        if self._sampling_counter % self.sampling_interval:
+                            self.number_of_dropped_items += 1
+                            return
+                    while len(self._queue) >= self.max_queue_size and self._writer_thread.is_alive():
+                        self._not_full.wait()
+            self._queue.append((record, time.time()))
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            self._not_empty.notify()
+
+    def flush(self):
+        """Blocks until all queued items are written and flushes the execution log file"""
+        with self._queue_lock:
+            if self._closed:
+                return
+            self._flush_requests += 1
+            flush_request = self._flush_requests
+            self._not_empty.notify()
+            while self._handled_flush_requests < flush_request and self._writer_thread.is_alive():
+                self._flushed.wait()
+
+    def close(self, make_read_and_writable_for_all=False):
+        """Writes all queued items, stops the writer thread and closes the execution log file"""
+        with self._queue_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._not_empty.notify()
+        self._writer_thread.join()
+        super(AsyncExecutionHistoryStorage, self).close(make_read_and_writable_for_all)
+
+    def _write_queued_items(self):
+        while True:
+            with self._queue_lock:
+                if not self._queue and not self._closed and self._handled_flush_requests == self._flush_requests:
+                    self._not_empty.wait(self.flush_interval)
+                batch = list(self._queue)
+                self._queue.clear()
+                flush_request = self._flush_requests
+                closed = self._closed
+                self._not_full.notify_all()
+            if batch:
+                self._write_batch(batch)
+            if flush_request > self._handled_flush_requests:
+                ExecutionHistoryStorage.flush(self)
+                with self._queue_lock:
+                    self._handled_flush_requests = flush_request
+                    self._flushed.notify_all()
+            if closed:
+                return
+
+    def _write_batch(self, batch):
+        with self.store_lock:
+            for record, queuing_time in batch:
+                try:
+                    self.store[native_str(record['history_item_id'])] = record
+                except Exception:
+                    logger.exception('Exception:')
+                    continue
+                latency = time.time() - queuing_time
+                self.number_of_written_items += 1
+                self.total_write_latency += latency
+                self.max_write_latency = max(self.max_write_latency, latency)
+            try:
+                self.store.sync()
+            except Exception:
+                logger.exception('Exception:')
+
+
 class ExecutionHistory(Observable, Iterable, Sized):
     """A class for the history of a state machine execution
 
         It stores all history elements in a stack wise fashion.
 
+        The number of history items kept in memory can be limited by a maximum number of items and/or a maximum age
+        of the items. Older items are then dropped from memory; if an :class:`ExecutionHistoryStorage` is set, they
+        remain available in the execution log file, as every item is written there when it is pushed. Otherwise, they
+        are lost, which is warned about once per history. Backward stepping is possible as long as the required items
+        are retained.
+
         :ivar initial_prev: optional link to a previous element for the first element pushed into this history of
                             type :class:`rafcon.core.execution.execution_history.HistoryItem`
+        :ivar int max_items: the maximum number of history items kept in memory, None for no limit
+        :ivar float max_age: the maximum age in seconds of the history items kept in memory, None for no limit
+        :ivar int number_of_dropped_items: the number of items dropped from memory so far
     """
 
-    def __init__(self, initial_prev=None):
+    def __init__(self, initial_prev=None, max_items=None, max_age=None):
         super(ExecutionHistory, self).__init__()
         self._history_items = []            
         self.initial_prev = initial_prev
         self.execution_history_storage = None
         self.new_execution_command_handled = True
+        self.max_items = max_items
+        self.max_age = max_age
+        self.number_of_dropped_items = 0
 
     def destroy(self):
         # logger.verbose("Destroy execution history!")
@@ -157,7 +369,7 @@ class ExecutionHistory(Observable, Iterable, Sized):
         if last_history_item is not None:
             last_history_item.next = current_item
         if self.execution_history_storage is not None:
-            self.execution_history_storage.store_item(current_item.history_item_id, current_item.to_dict())
+            self.execution_history_storage.store_history_item(current_item)
         try:
             self._history_items.append(current_item)
         except AttributeError:
@@ -165,8 +377,103 @@ class ExecutionHistory(Observable, Iterable, Sized):
                 pass # this is fine
             else:
                 raise
+        if self.max_items or self.max_age:
+            self._drop_old_items()
         return current_item
 
+    def _drop_old_items(self):
+        """Drops the oldest history items exceeding the maximum number or age from memory
+
+        The most recent item is always kept. The link of the oldest retained item to its predecessor is removed, as
+        otherwise all dropped items would stay referenced.
+        """
+        number_of_items_to_drop = 0
+        if self.max_items:
+            number_of_items_to_drop = max(0, len(self._history_items) - self.max_items)
+        if self.max_age:
+            min_timestamp = time.time() - self.max_age
+            while number_of_items_to_drop < len(self._history_items) - 1 and \
+                    self._history_items[number_of_items_to_drop].timestamp < min_timestamp:
+                number_of_items_to_drop += 1
+        if number_of_items_to_drop > 0:
+            if self.execution_history_storage is None and not self.number_of_dropped_items:
+                logger.warning("Execution history items are dropped from memory, but not preserved, as the execution "
+                               "log is disabled (see the config value EXECUTION_LOG_ENABLE)")
+            del self._history_items[:number_of_items_to_drop]
+            self._history_items[0].prev = None
+            self.number_of_dropped_items += number_of_items_to_drop
+
+    def is_backward_step_possible(self):
+        """Checks whether the retained history items suffice for a backward step of the container state
+
+        A backward step over the last executed child state requires all items back to the call item of that child
+        state, including the items of all concurrent branches started in the meantime.
+
+        :return: True, if the backward step can be performed
+        :rtype: bool
+        """
+        if not self._history_items:
+            return False
+        if not self.number_of_dropped_items:
+            return True
+        last_history_item = self._history_items[-1]
+        if not isinstance(last_history_item, ReturnItem):
+            return True
+        for index in range(len(self._history_items) - 1, -1, -1):
+            history_item = self._history_items[index]
+            if isinstance(history_item, ConcurrencyItem):
+                if not all(execution_history.is_complete() for execution_history in history_item.execution_histories):
+                    return False
+            elif isinstance(history_item, CallItem) and history_item.call_type is CallType.EXECUTE and \
+                    history_item.state_reference is last_history_item.state_reference and \
+                    history_item.run_id == last_history_item.run_id:
+                return True
+        return False
+
+    def is_complete(self):
+        """Checks whether no item of this history or its concurrent histories was dropped from memory
+
+        :rtype: bool
+        """
+        if self.number_of_dropped_items:
+            return False
+        for history_item in self._history_items:
+            if isinstance(history_item, ConcurrencyItem):
+                if not all(execution_history.is_complete() for execution_history in history_item.execution_histories):
+                    return False
+        return True
+
+    @property
+    def number_of_items(self):
+        """The number of history items kept in memory, including the items of concurrent histories
+
+        :rtype: int
+        """
+        number_of_items = 0
+        for history_item in list(self._history_items):
+            number_of_items += 1
+            if isinstance(history_item, ConcurrencyItem):
+                number_of_items += sum(execution_history.number_of_items
+                                       for execution_history in history_item.execution_histories)
+        return number_of_items
+
+    @property
+    def bytes_held(self):
+        """An estimate of the memory in bytes held by the history items kept in memory
+
+        The estimate covers the history items and the data stored with them, including the items of concurrent
+        histories. Values are measured shallowly with :func:`sys.getsizeof`.
+
+        :rtype: int
+        """
+        bytes_held = sys.getsizeof(self._history_items)
+        for history_item in list(self._history_items):
+            bytes_held += history_item.estimate_size()
+            if isinstance(history_item, ConcurrencyItem):
+                bytes_held += sum(execution_history.bytes_held
+                                  for execution_history in history_item.execution_histories)
+        return bytes_held
+
     @Observable.observed
     def push_call_history_item(self, state, call_type, state_for_scoped_data, input_data=None):
         """Adds a new call-history-item to the history item list
@@ -180,13 +487,14 @@ class ExecutionHistory(Observable, Iterable, Sized):
         :param state_for_scoped_data: the state of which the scoped data needs to be saved for further usages
             (e.g. backward stepping)
         """
-        last_history_item = self.get_last_history_item()
-        from rafcon.core.states.library_state import LibraryState  # delayed imported on purpose
-        if isinstance(state_for_scoped_data, LibraryState):
-            state_for_scoped_data = state_for_scoped_data.state_copy
-        return_item = CallItem(state, last_history_item, call_type, state_for_scoped_data, input_data,
-                               state.run_id)
-        return self._push_item(last_history_item, return_item)
+        with execution_profiler.measure(state, HISTORY):
+            last_history_item = self.get_last_history_item()
+            from rafcon.core.states.library_state import LibraryState  # delayed imported on purpose
+            if isinstance(state_for_scoped_data, LibraryState):
+                state_for_scoped_data = state_for_scoped_data.state_copy
+            return_item = CallItem(state, last_history_item, call_type, state_for_scoped_data, input_data,
+                                   state.run_id)
+            return self._push_item(last_history_item, return_item)
 
     @Observable.observed
     def push_return_history_item(self, state, call_type, state_for_scoped_data, output_data=None):
@@ -201,13 +509,14 @@ class ExecutionHistory(Observable, Iterable, Sized):
         :param state_for_scoped_data: the state of which the scoped data needs to be saved for further usages (e.g.
             backward stepping)
         """
-        last_history_item = self.get_last_history_item()
-        from rafcon.core.states.library_state import LibraryState  # delayed imported on purpose
-        if isinstance(state_for_scoped_data, LibraryState):
-            state_for_scoped_data = state_for_scoped_data.state_copy
-        return_item = ReturnItem(state, last_history_item, call_type, state_for_scoped_data, output_data,
-                                 state.run_id)
-        return self._push_item(last_history_item, return_item)
+        with execution_profiler.measure(state, HISTORY):
+            last_history_item = self.get_last_history_item()
+            from rafcon.core.states.library_state import LibraryState  # delayed imported on purpose
+            if isinstance(state_for_scoped_data, LibraryState):
+                state_for_scoped_data = state_for_scoped_data.state_copy
+            return_item = ReturnItem(state, last_history_item, call_type, state_for_scoped_data, output_data,
+                                     state.run_id)
+            return self._push_item(last_history_item, return_item)
 
     @Observable.observed
     def push_concurrency_history_item(self, state, number_concurrent_threads):
@@ -223,15 +532,17 @@ class ExecutionHistory(Observable, Iterable, Sized):
         last_history_item = self.get_last_history_item()
         return_item = ConcurrencyItem(state, self.get_last_history_item(),
                                       number_concurrent_threads, state.run_id,
-                                      self.execution_history_storage)
+                                      self.execution_history_storage, self.max_items, self.max_age)
         return self._push_item(last_history_item, return_item)
 
     @Observable.observed
     def push_state_machine_start_history_item(self, state_machine, run_id):
         return_item = StateMachineStartItem(state_machine, run_id)
         if self.execution_history_storage is not None:
-            self.execution_history_storage.store_item(return_item.history_item_id, return_item.to_dict())
+            self.execution_history_storage.store_history_item(return_item)
         self._history_items.append(return_item)
+        if self.max_items or self.max_age:
+            self._drop_old_items()
         return return_item
 
     @Observable.observed
@@ -290,6 +601,13 @@ class HistoryItem(object):
     def __str__(self):
         return "HistoryItem with reference state name %s (time: %s)" % (self.state_reference.name, self.timestamp)
 
+    def estimate_size(self):
+        """Estimates the memory in bytes held by the history item
+
+        :rtype: int
+        """
+        return sys.getsizeof(self) + sys.getsizeof(self.__dict__) + sys.getsizeof(self.path)
+
     def to_dict(self):
         record = dict()
 
@@ -377,8 +695,12 @@ class ScopedDataItem(HistoryItem):
     :ivar call_type: the call type of the execution step, i.e. if it refers to a container state or an execution state
     :ivar state_for_scoped_data: the state of which the scoped data will be stored as the context data that is necessary
         to re-execute the state
+    :ivar dict scoped_data_records: the scoped data of `state_for_scoped_data` as
+        :class:`rafcon.core.state_elements.scope.ScopedDataRecord` objects
     """
 
+    _scoped_data_view = None
+
     def __init__(self, state, prev, call_type, state_for_scoped_data, child_state_input_output_data, run_id):
         HistoryItem.__init__(self, state, prev, run_id)
         if call_type in CallType:
@@ -386,13 +708,42 @@ class ScopedDataItem(HistoryItem):
         else:
             raise Exception('unkown calltype, neither CONTAINER nor EXECUTE')
         self.call_type = call_type
-        self.scoped_data = {} if state_for_scoped_data is None else copy.deepcopy(state_for_scoped_data._scoped_data)
-        self.child_state_input_output_data = copy.deepcopy(child_state_input_output_data)
+        # the records are replaced on each write, thus a copy of the dictionary is a snapshot of the scoped data
+        self.scoped_data_records = {} if state_for_scoped_data is None else dict(state_for_scoped_data._scoped_data)
+        # values of data ports, which do not pass their values by copy, are stored by reference
+        memo = {}
+        if child_state_input_output_data:
+            for data_port in list(state.input_data_ports.values()) + list(state.output_data_ports.values()):
+                if data_port.passing_policy != PASS_BY_COPY and data_port.name in child_state_input_output_data:
+                    value = child_state_input_output_data[data_port.name]
+                    memo[id(value)] = value
+        self.child_state_input_output_data = copy.deepcopy(child_state_input_output_data, memo)
+
+    @property
+    def scoped_data(self):
+        """The scoped data as :class:`rafcon.core.state_elements.scope.ScopedData` objects, created on first access
+
+        :return: the scoped data with the data port id concatenated with the state id as keys
+        :rtype: dict
+        """
+        if self._scoped_data_view is None:
+            self._scoped_data_view = get_scoped_data_view(self.scoped_data_records)
+        return self._scoped_data_view
+
+    def estimate_size(self):
+        size = HistoryItem.estimate_size(self) + sys.getsizeof(self.scoped_data_records)
+        for record in self.scoped_data_records.values():
+            size += sys.getsizeof(record) + sys.getsizeof(record.value)
+        if self.child_state_input_output_data:
+            size += sys.getsizeof(self.child_state_input_output_data)
+            for value in self.child_state_input_output_data.values():
+                size += sys.getsizeof(value)
+        return size
 
     def to_dict(self):
         record = HistoryItem.to_dict(self)
         scoped_data_dict = {}
-        for k, v in self.scoped_data.items():
+        for k, v in self.scoped_data_records.items():
             try:
                 scoped_data_dict[v.name] = pickle.dumps(v.value)
             except Exception as e:
@@ -471,12 +822,13 @@ class ReturnItem(ScopedDataItem):
 class ConcurrencyItem(HistoryItem):
     """A class to hold all the data for an invocation of several concurrent threads.
     """
-    def __init__(self, container_state, prev, number_concurrent_threads, run_id, execution_history_storage):
+    def __init__(self, container_state, prev, number_concurrent_threads, run_id, execution_history_storage,
+                 max_items=None, max_age=None):
         HistoryItem.__init__(self, container_state, prev, run_id)
         self.execution_histories = []
 
         for i in range(number_concurrent_threads):
-            execution_history = ExecutionHistory(initial_prev=self)
+            execution_history = ExecutionHistory(initial_prev=self, max_items=max_items, max_age=max_age)
             execution_history.set_execution_history_storage(execution_history_storage)
             self.execution_histories.append(execution_history)
 
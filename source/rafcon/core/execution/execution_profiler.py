@@ -0,0 +1,285 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: execution_profiler
+   :synopsis: A module to record the time spent in the phases of state executions
+
+In contrast to :mod:`rafcon.utils.profiler`, which profiles the whole process, the execution profiler records for
+each run of a state how much time is spent in which phase of the execution. The records can be queried while the
+state machine is running or exported as trace event file, which can be viewed as flame graph, e.g. with
+``chrome://tracing`` or speedscope.
+
+"""
+
+from builtins import object
+from collections import deque
+import json
+import os
+import threading
+import time
+from timeit import default_timer as timer
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+#: The whole run of a state, from the setup to the finalization, including the runs of its children
+RUN = "run"
+#: The execution of the script of an execution state
+SCRIPT = "script"
+#: The resolution of the input data of a state by its parent
+INPUT = "input"
+#: The writing of the output data of a state to the scoped data of its parent
+OUTPUT = "output"
+#: The logging of history items of a state
+HISTORY = "history"
+#: The time between the start of a state and the begin of its run, e.g. until a worker thread takes it over
+QUEUE = "queue"
+#: The time a container state waits for the execution engine, e.g. in pause or step mode
+WAIT = "wait"
+
+PHASES = (RUN, SCRIPT, INPUT, OUTPUT, HISTORY, QUEUE, WAIT)
+
+if hasattr(time, "thread_time"):
+    _cpu_time = time.thread_time
+else:
+    # Python 2 does not provide the CPU time of the thread, thus the CPU time of the process is used
+    _cpu_time = time.clock
+
+
+class ProfileRecord(object):
+    """The time a state spent in one phase
+
+    :ivar str path: the path of the state
+    :ivar str run_id: the run_id of the state run
+    :ivar str phase: one of :data:`PHASES`
+    :ivar float start: the start time in seconds, as returned by :func:`timeit.default_timer`
+    :ivar float wall_time: the duration in seconds
+    :ivar float cpu_time: the CPU time of the executing thread in seconds
+    :ivar int thread_id: the identifier of the executing thread
+    """
+
+    __slots__ = ('path', 'run_id', 'phase', 'start', 'wall_time', 'cpu_time', 'thread_id')
+
+    def __init__(self, path, run_id, phase, start, wall_time, cpu_time, thread_id):
+        self.path = path
+        self.run_id = run_id
+        self.phase = phase
+        self.start = start
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.thread_id = thread_id
+
+
+class _NullMeasurement(object):
+    """Used while the profiler is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_null_measurement = _NullMeasurement()
+
+
+class _Measurement(object):
+
+    __slots__ = ('profiler', 'state', 'phase', 'start', 'cpu_start')
+
+    def __init__(self, profiler, state, phase):
+        self.profiler = profiler
+        self.state = state
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = timer()
+        self.cpu_start = _cpu_time()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.profiler.add_record(self.state, self.phase, self.start, timer() - self.start,
+                                 _cpu_time() - self.cpu_start)
+        return False
+
+
+class ExecutionProfiler(object):
+    """Records the time spent in the phases of state executions
+
+    Recording is disabled by default. It is enabled by the core config value ``EXECUTION_PROFILING_ENABLED`` on the
+    start of a state machine, see :meth:`apply_config`, or by :meth:`enable`. Only the latest ``max_records`` records
+    are kept.
+
+    :ivar bool enabled: whether records are taken
+    """
+
+    def __init__(self, max_records=100000):
+        self.enabled = False
+        self._enabled_by_config = False
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def enable(self, max_records=None):
+        """Enables recording
+
+        :param int max_records: the maximum number of kept records, None keeps the current maximum
+        """
+        if max_records is not None and max_records != self._records.maxlen:
+            with self._lock:
+                self._records = deque(self._records, maxlen=max_records)
+        self.enabled = True
+        self._enabled_by_config = False
+
+    def disable(self):
+        self.enabled = False
+        self._enabled_by_config = False
+
+    def apply_config(self, enabled, max_records=None):
+        """Enables or disables recording as specified by the core config
+
+        Recording, which was enabled by :meth:`enable`, is kept when the config value is disabled.
+
+        :param bool enabled: the value of ``EXECUTION_PROFILING_ENABLED``
+        :param int max_records: the value of ``EXECUTION_PROFILING_MAX_RECORDS``
+        """
+        if enabled:
+            self.enable(max_records)
+            self._enabled_by_config = True
+        elif self._enabled_by_config:
+            self.disable()
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def measure(self, state, phase):
+        """Returns a context manager recording the time spent in its body
+
+        :param rafcon.core.states.state.State state: the state the time is accounted to
+        :param str phase: one of :data:`PHASES`
+        """
+        if not self.enabled:
+            return _null_measurement
+        return _Measurement(self, state, phase)
+
+    def state_started(self, state):
+        """Marks the start of a state, the time until its run begins is recorded as queue time
+
+        :param rafcon.core.states.state.State state: the started state
+        """
+        state._profiling_start_time = timer() if self.enabled else None
+
+    def run_started(self, state):
+        """Marks the begin of the run of a state
+
+        :param rafcon.core.states.state.State state: the running state
+        """
+        if not self.enabled:
+            state._profiling_run_start = None
+            return
+        now = timer()
+        if state._profiling_start_time is not None:
+            self.add_record(state, QUEUE, state._profiling_start_time, now - state._profiling_start_time)
+            state._profiling_start_time = None
+        state._profiling_run_start = (now, _cpu_time())
+
+    def run_finished(self, state):
+        """Marks the end of the run of a state
+
+        :param rafcon.core.states.state.State state: the finalized state
+        """
+        if state._profiling_run_start is None:
+            return
+        start, cpu_start = state._profiling_run_start
+        state._profiling_run_start = None
+        if self.enabled:
+            self.add_record(state, RUN, start, timer() - start, _cpu_time() - cpu_start)
+
+    def add_record(self, state, phase, start, wall_time, cpu_time=0.):
+        """Adds a record for a state
+
+        :param rafcon.core.states.state.State state: the state the time is accounted to
+        :param str phase: one of :data:`PHASES`
+        :param float start: the start time in seconds, as returned by :func:`timeit.default_timer`
+        :param float wall_time: the duration in seconds
+        :param float cpu_time: the CPU time of the executing thread in seconds
+        """
+        record = ProfileRecord(state.get_path(), state.run_id, phase, start, wall_time, cpu_time,
+                               threading.current_thread().ident)
+        with self._lock:
+            self._records.append(record)
+
+    @property
+    def records(self):
+        """A copy of all kept records
+
+        :rtype: list
+        """
+        with self._lock:
+            return list(self._records)
+
+    def get_statistics(self, path=None, run_id=None):
+        """Aggregates the records per state path and phase
+
+        :param str path: only take into account records of this state path
+        :param str run_id: only take into account records of this state run
+        :return: a dictionary mapping the state paths to dictionaries, which map the phases to dictionaries with the
+            keys `count`, `wall_time` and `cpu_time`
+        :rtype: dict
+        """
+        statistics = {}
+        for record in self.records:
+            if (path is not None and record.path != path) or (run_id is not None and record.run_id != run_id):
+                continue
+            phase_statistics = statistics.setdefault(record.path, {}).setdefault(
+                record.phase, {'count': 0, 'wall_time': 0., 'cpu_time': 0.})
+            phase_statistics['count'] += 1
+            phase_statistics['wall_time'] += record.wall_time
+            phase_statistics['cpu_time'] += record.cpu_time
+        return statistics
+
+    def get_run_statistics(self, run_id):
+        """Aggregates the records of a single state run per phase
+
+        :param str run_id: the run_id of the state run
+        :return: a dictionary mapping the phases to dictionaries with the keys `count`, `wall_time` and `cpu_time`
+        :rtype: dict
+        """
+        statistics = self.get_statistics(run_id=run_id)
+        return next(iter(statistics.values())) if statistics else {}
+
+    def export_trace_events(self, filename):
+        """Writes the records to a file in the trace event format
+
+        Each record becomes a complete event, named after the state and the phase. The file can be opened with
+        ``chrome://tracing`` or converted to a flame graph.
+
+        :param str filename: the path of the JSON file
+        """
+        pid = os.getpid()
+        trace_events = []
+        for record in self.records:
+            trace_events.append({'name': "{0} ({1})".format(record.path.split('/')[-1], record.phase),
+                                 'cat': record.phase,
+                                 'ph': 'X',
+                                 'ts': record.start * 1e6,
+                                 'dur': record.wall_time * 1e6,
+                                 'pid': pid,
+                                 'tid': record.thread_id,
+                                 'args': {'path': record.path, 'run_id': record.run_id,
+                                          'cpu_time': record.cpu_time}})
+        with open(filename, 'w') as trace_file:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, trace_file)
+
+
+#: The profiler used by the states
+execution_profiler = ExecutionProfiler()
@@ -0,0 +1,78 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: execution_status_channel
+   :synopsis: A module holding a coalescing channel for changes of the execution status of states
+
+By default, each change of the execution status of a state is an observable notification, which is handled
+synchronously in the executing thread. If the channel is enabled, e.g. by the GUI, status changes are only recorded in
+the channel and consumers fetch them at their own rate. Only the latest status of each state is kept, thus the cost of
+the consumer is independent of the execution rate. The consumer emits the observable notifications of the drained
+changes, thus observers of the states are notified at the rate of the consumer.
+
+"""
+
+from builtins import object
+
+
+class ExecutionStatusChannel(object):
+    """A coalescing channel for execution status changes
+
+    Writers do not take a lock: publishing is a single dictionary assignment and draining pops single items, which both
+    are atomic operations. A status published while the channel is drained is either part of the current or of the
+    next drain.
+
+    :ivar bool enabled: whether status changes are published to the channel instead of being notified immediately
+    :ivar int number_of_drained_changes: the number of status changes handed to consumers
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._pending = {}
+        self.number_of_drained_changes = 0
+
+    def publish(self, state, state_execution_status):
+        """Records the execution status of a state, replacing a previous, not yet drained status of the state
+
+        :param rafcon.core.states.state.State state: the state whose execution status changed
+        :param rafcon.core.states.state.StateExecutionStatus state_execution_status: the new status
+        """
+        self._pending[id(state)] = (state, state_execution_status)
+
+    def drain(self, notify=False):
+        """Returns and removes the pending status changes
+
+        :param bool notify: whether to emit the observable notification of each drained change in the calling thread
+        :return: a list of (state, state_execution_status) tuples, with at most one entry per state
+        :rtype: list
+        """
+        changes = []
+        # only the items pending at the start are drained, thus a drain ends even if writers are faster
+        for _ in range(len(self._pending)):
+            try:
+                changes.append(self._pending.popitem()[1])
+            except KeyError:
+                break
+        self.number_of_drained_changes += len(changes)
+        if notify:
+            for state, state_execution_status in changes:
+                state.notify_state_execution_status(state_execution_status)
+        return changes
+
+    def clear(self):
+        self._pending.clear()
+
+    def __len__(self):
+        return len(self._pending)
+
+
+#: The channel used by the states
+execution_status_channel = ExecutionStatusChannel()
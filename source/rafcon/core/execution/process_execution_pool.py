@@ -0,0 +1,357 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: process_execution_pool
+   :synopsis: A module providing worker processes for the execution of the scripts of execution states
+
+By default, the scripts of execution states are executed in threads of the RAFCON process. Thus, CPU heavy scripts
+of concurrent branches are serialized by the GIL and a blocked script cannot be interrupted. The process backend
+executes the script in a worker process instead. The backend is enabled for an execution state by setting the
+semantic data key ``execution_backend`` of the state itself or of one of its ancestors, e.g. a concurrency state, to
+``PROCESS``.
+
+Inputs and outputs are transferred as pickled copies of the data port dictionaries. Within the worker, the ``self``
+argument of the script is a :class:`WorkerState` providing the most important attributes of the state and the
+``gvm`` argument forwards all calls to the global variable manager of the RAFCON process.
+
+"""
+
+from builtins import object
+import os
+import time
+import threading
+import traceback
+import multiprocessing
+from types import ModuleType
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+#: The semantic data key selecting the execution backend of a state and its descendants
+EXECUTION_BACKEND_KEY = "execution_backend"
+#: The script is executed in the thread executing the state (default)
+THREAD_BACKEND = "THREAD"
+#: The script is executed in a worker process
+PROCESS_BACKEND = "PROCESS"
+
+EXECUTION_BACKENDS = (THREAD_BACKEND, PROCESS_BACKEND)
+
+_RESULT = "result"
+_ERROR = "error"
+_GVM_CALL = "gvm_call"
+
+
+def get_execution_backend(state):
+    """Returns the execution backend of a state
+
+    The backend is taken from the semantic data of the state or, if not specified there, of the closest ancestor
+    specifying it.
+
+    :param rafcon.core.states.state.State state: the state to get the backend for
+    :return: one of ``THREAD`` and ``PROCESS``
+    :rtype: str
+    """
+    from rafcon.core.states.state import State
+    while isinstance(state, State):
+        backend = state.semantic_data.get(EXECUTION_BACKEND_KEY)
+        if backend in EXECUTION_BACKENDS:
+            return backend
+        elif backend:
+            logger.warning("Unknown execution backend '{0}' of {1}, falling back to '{2}'".format(
+                backend, state, THREAD_BACKEND))
+            return THREAD_BACKEND
+        state = state.parent
+    return THREAD_BACKEND
+
+
+def _sleep(duration):
+    """Sleeps for the given duration in seconds or, if None, until the process is terminated"""
+    if duration is None:
+        while True:
+            time.sleep(1.)
+    time.sleep(duration)
+
+
+class WorkerState(object):
+    """The representation of an execution state within a worker process
+
+    Preemption of the state terminates the worker process, thus the flags `preempted` and `paused` are always False
+    within the worker. Persistent variables only live for a single execution.
+    """
+
+    def __init__(self, name, state_id, path):
+        self.name = name
+        self.state_id = state_id
+        self.path = path
+        self.logger = log.get_logger(name)
+        self.persistent_variables = {}
+        self.preempted = False
+        self.paused = False
+        self.started = True
+
+    def get_path(self):
+        return self.path
+
+    def preemptive_wait(self, time=None):
+        """Waits for the given time, the wait is interrupted by the termination of the worker on preemption
+
+        :param float time: time in seconds to wait, None waits until the worker is terminated
+        :return: False, as the worker is terminated on preemption
+        """
+        _sleep(time)
+        return False
+
+    def wait_for_interruption(self, timeout=None):
+        _sleep(timeout)
+        return False
+
+    def __str__(self):
+        return "WorkerState '{0}' [{1}]".format(self.name, self.state_id)
+
+
+class GlobalVariableManagerProxy(object):
+    """Forwards all method calls to the global variable manager of the RAFCON process"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            self._connection.send((_GVM_CALL, name, args, kwargs))
+            status, value = self._connection.recv()
+            if status == _ERROR:
+                raise value
+            return value
+        return call
+
+
+def _send_error(connection, error, outputs):
+    try:
+        connection.send((_ERROR, (error, traceback.format_exc()), outputs))
+    except Exception:
+        # the exception or the outputs cannot be pickled
+        connection.send((_ERROR, (RuntimeError("{0}: {1}".format(type(error).__name__, error)),
+                                  traceback.format_exc()), {}))
+
+
+def _worker_main(connection):
+    """The main loop of a worker process, executing one script per received message"""
+    gvm = GlobalVariableManagerProxy(connection)
+    code_objects = {}
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if message is None:
+            return
+        script_text, script_name, state_info, inputs, outputs, backward_execution = message
+        try:
+            if script_text not in code_objects:
+                code_objects[script_text] = compile(script_text, script_name, 'exec')
+            # like in the RAFCON process, a new module is created for each execution
+            module = ModuleType(os.path.splitext(os.path.basename(script_name))[0])
+            exec(code_objects[script_text], module.__dict__)
+            state = WorkerState(*state_info)
+            if backward_execution:
+                if hasattr(module, "backward_execute"):
+                    result = module.backward_execute(state, inputs, outputs, gvm)
+                else:
+                    result = None
+            else:
+                result = module.execute(state, inputs, outputs, gvm)
+            connection.send((_RESULT, result, outputs))
+        except Exception as e:
+            _send_error(connection, e, outputs)
+
+
+class _ProcessWorker(object):
+    """A worker process and the connection to it"""
+
+    def __init__(self, context, name):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_connection, ), name=name)
+        self.process.daemon = True
+        self.process.start()
+        # only the worker must hold its end of the pipe, thus the connection notices the termination of the worker
+        child_connection.close()
+        self.terminated = False
+
+    def terminate(self):
+        self.terminated = True
+        self.process.terminate()
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except (IOError, OSError):
+            pass
+        self.process.join(1.)
+        self.connection.close()
+
+
+class ProcessExecutionPool(object):
+    """A pool of worker processes executing the scripts of execution states
+
+    Idle workers are reused for the next script. If all workers are busy, the execution waits for a free worker.
+    Workers are started with the ``spawn`` method (where available), as forking a multi-threaded process is unsafe.
+
+    :ivar int max_workers: the maximum number of worker processes
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers if max_workers else multiprocessing.cpu_count()
+        if hasattr(multiprocessing, "get_context"):
+            self._context = multiprocessing.get_context("spawn")
+        else:
+            self._context = multiprocessing
+        self._idle_workers = []
+        self._busy_workers = {}
+        self._number_of_workers = 0
+        self._worker_counter = 0
+        self._condition = threading.Condition()
+        self.created_workers = 0
+        self.terminated_workers = 0
+
+    def _acquire_worker(self):
+        with self._condition:
+            while not self._idle_workers and self._number_of_workers >= self.max_workers:
+                self._condition.wait()
+            if self._idle_workers:
+                return self._idle_workers.pop()
+            self._number_of_workers += 1
+            self._worker_counter += 1
+            self.created_workers += 1
+            name = "ProcessExecutionWorker-{0}".format(self._worker_counter)
+        try:
+            return _ProcessWorker(self._context, name)
+        except Exception:
+            with self._condition:
+                self._number_of_workers -= 1
+                self._condition.notify()
+            raise
+
+    def _release_worker(self, worker):
+        with self._condition:
+            if worker.terminated or not worker.process.is_alive():
+                self._number_of_workers -= 1
+                self.terminated_workers += 1
+                worker.connection.close()
+            else:
+                self._idle_workers.append(worker)
+            self._condition.notify()
+
+    def execute(self, state, inputs, outputs, backward_execution=False):
+        """Executes the script of an execution state in a worker process
+
+        The outputs are updated with the values set by the script. Calls to the global variable manager are served
+        from the calling thread while the script is running.
+
+        :param rafcon.core.states.execution_state.ExecutionState state: the state whose script is executed
+        :param dict inputs: the input data of the script
+        :param dict outputs: the output data of the script
+        :param bool backward_execution: Flag whether to run the script in backwards mode
+        :return: the return value of the execute function or None, if the worker was terminated
+        """
+        import rafcon.core.singleton
+        script = state.script
+        script_name = os.path.join(script.path, script.filename) if script.path else script.filename
+        message = (script.script, script_name, (state.name, state.state_id, state.get_path()),
+                   inputs, outputs, backward_execution)
+        worker = self._acquire_worker()
+        with self._condition:
+            self._busy_workers[state] = worker
+        try:
+            if state.preempted:
+                return None
+            worker.connection.send(message)
+            while True:
+                try:
+                    response = worker.connection.recv()
+                except (EOFError, IOError, OSError):
+                    if worker.terminated:
+                        return None
+                    worker.terminated = True
+                    raise RuntimeError("Worker process of {0} died unexpectedly".format(state))
+                if response[0] == _GVM_CALL:
+                    _, name, args, kwargs = response
+                    try:
+                        value = getattr(rafcon.core.singleton.global_variable_manager, name)(*args, **kwargs)
+                        worker.connection.send((_RESULT, value))
+                    except Exception as e:
+                        worker.connection.send((_ERROR, e))
+                    continue
+                status, value, new_outputs = response
+                outputs.update(new_outputs)
+                if status == _ERROR:
+                    error, formatted_traceback = value
+                    logger.debug("Traceback of the worker process of {0}:\n{1}".format(state, formatted_traceback))
+                    raise error
+                return value
+        finally:
+            with self._condition:
+                del self._busy_workers[state]
+            self._release_worker(worker)
+
+    def terminate(self, state):
+        """Terminates the worker process executing the script of the given state, if there is one
+
+        :param rafcon.core.states.execution_state.ExecutionState state: the state to be preempted
+        :return: True if a worker was terminated
+        :rtype: bool
+        """
+        with self._condition:
+            worker = self._busy_workers.get(state)
+        if worker is None:
+            return False
+        logger.debug("Terminating the worker process of {0}".format(state))
+        worker.terminate()
+        return True
+
+    def shutdown(self):
+        """Stops all idle workers"""
+        with self._condition:
+            idle_workers = self._idle_workers
+            self._idle_workers = []
+            self._number_of_workers -= len(idle_workers)
+        for worker in idle_workers:
+            worker.stop()
+
+    @property
+    def number_of_idle_workers(self):
+        with self._condition:
+            return len(self._idle_workers)
+
+
+_process_execution_pool = None
+_process_execution_pool_lock = threading.Lock()
+
+
+def get_process_execution_pool():
+    """Returns the process execution pool, which is created on first use
+
+    The number of workers is specified by the core config value ``PROCESS_EXECUTION_POOL_SIZE``, by default the
+    number of CPUs.
+
+    :rtype: ProcessExecutionPool
+    """
+    global _process_execution_pool
+    if _process_execution_pool is None:
+        with _process_execution_pool_lock:
+            if _process_execution_pool is None:
+                from rafcon.core.config import global_config
+                pool_size = global_config.get_optional_config_value("PROCESS_EXECUTION_POOL_SIZE")
+                _process_execution_pool = ProcessExecutionPool(pool_size)
+    return _process_execution_pool
@@ -0,0 +1,188 @@
+# Copyright (C) 2014-2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: state_execution_pool
+   :synopsis: A module providing reusable worker threads for the execution of states
+
+"""
+
+from builtins import object
+import threading
+
+from rafcon.core.config import global_config
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+#: Every state is executed in a newly created thread (legacy behaviour)
+THREAD_MODE = "THREAD"
+#: Children of hierarchy states are executed in the thread of their parent, concurrent branches use pooled workers
+INLINE_MODE = "INLINE"
+#: All states are executed by pooled worker threads
+POOL_MODE = "POOL"
+
+STATE_EXECUTION_MODES = (THREAD_MODE, INLINE_MODE, POOL_MODE)
+
+
+def get_state_execution_mode():
+    """Returns the state execution mode as specified in the core config
+
+    Unknown values fall back to the legacy ``THREAD`` mode.
+
+    :return: one of ``THREAD``, ``INLINE`` and ``POOL``
+    :rtype: str
+    """
+    mode = global_config.get_config_value("STATE_EXECUTION_MODE", THREAD_MODE)
+    if mode not in STATE_EXECUTION_MODES:
+        logger.warning("Unknown STATE_EXECUTION_MODE '{0}', falling back to '{1}'".format(mode, THREAD_MODE))
+        return THREAD_MODE
+    return mode
+
+
+class StateExecutionTask(object):
+    """Handle of a target submitted to the :class:`StateExecutionPool`
+
+    The handle mimics the part of the :class:`threading.Thread` interface that is used for state threads, i.e.
+    :meth:`join` and :meth:`is_alive`.
+
+    :ivar target: the callable to be executed
+    """
+
+    __slots__ = ('target', '_finished')
+
+    def __init__(self, target):
+        self.target = target
+        self._finished = threading.Event()
+
+    def run(self):
+        try:
+            self.target()
+        except Exception:
+            logger.exception("Unhandled exception in state execution worker")
+        finally:
+            self.target = None
+            self._finished.set()
+
+    def join(self, timeout=None):
+        """Waits until the target finished its execution
+
+        :param float timeout: optional maximum time to wait in seconds
+        """
+        self._finished.wait(timeout)
+
+    def is_alive(self):
+        return not self._finished.is_set()
+
+
+class _StateExecutionWorker(threading.Thread):
+    """A daemon thread executing tasks handed over by the :class:`StateExecutionPool`"""
+
+    def __init__(self, pool, task, name):
+        super(_StateExecutionWorker, self).__init__(name=name)
+        self.daemon = True
+        self._pool = pool
+        self._task = task
+        self._task_available = threading.Condition(threading.Lock())
+
+    def assign(self, task):
+        with self._task_available:
+            self._task = task
+            self._task_available.notify()
+
+    def run(self):
+        while True:
+            with self._task_available:
+                while self._task is None:
+                    self._task_available.wait()
+                task = self._task
+                self._task = None
+            task.run()
+            if not self._pool._release_worker(self):
+                return
+
+
+class StateExecutionPool(object):
+    """A pool of reusable worker threads executing states
+
+    Creating a new OS thread for each executed state is comparably expensive. The pool keeps up to
+    ``max_idle_workers`` finished workers alive and hands new tasks to them. If all workers are busy, an additional
+    worker is created instead of queuing the task: states wait for their children, thus queuing could dead-lock
+    nested concurrency states. Thus the bound only limits the number of retained threads.
+
+    :ivar int max_idle_workers: the maximum number of idle workers kept in the pool
+    """
+
+    def __init__(self, max_idle_workers=16):
+        self.max_idle_workers = max_idle_workers
+        self._idle_workers = []
+        self._lock = threading.Lock()
+        self._worker_counter = 0
+        self.created_workers = 0
+        self.reused_workers = 0
+
+    def submit(self, target):
+        """Executes the target in a worker thread
+
+        :param target: the callable to be executed
+        :return: a handle to wait for the end of the execution
+        :rtype: StateExecutionTask
+        """
+        task = StateExecutionTask(target)
+        with self._lock:
+            if self._idle_workers:
+                worker = self._idle_workers.pop()
+                self.reused_workers += 1
+            else:
+                worker = None
+                self._worker_counter += 1
+                self.created_workers += 1
+                name = "StateExecutionWorker-{0}".format(self._worker_counter)
+        if worker is not None:
+            worker.assign(task)
+        else:
+            _StateExecutionWorker(self, task, name).start()
+        return task
+
+    def _release_worker(self, worker):
+        """Puts a worker back into the pool
+
+        :return: False, if the pool is full and the worker should terminate
+        """
+        with self._lock:
+            if len(self._idle_workers) >= self.max_idle_workers:
+                return False
+            self._idle_workers.append(worker)
+            return True
+
+    @property
+    def number_of_idle_workers(self):
+        with self._lock:
+            return len(self._idle_workers)
+
+
+_state_execution_pool = None
+_state_execution_pool_lock = threading.Lock()
+
+
+def get_state_execution_pool():
+    """Returns the state execution pool, which is created on first use
+
+    The size of the pool is specified by the core config value ``STATE_EXECUTION_POOL_SIZE``.
+
+    :rtype: StateExecutionPool
+    """
+    global _state_execution_pool
+    if _state_execution_pool is None:
+        with _state_execution_pool_lock:
+            if _state_execution_pool is None:
+                pool_size = global_config.get_config_value("STATE_EXECUTION_POOL_SIZE", 16)
+                _state_execution_pool = StateExecutionPool(pool_size)
+    return _state_execution_pool
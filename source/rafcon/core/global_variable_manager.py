@@ -21,10 +21,11 @@
 """
 
 from builtins import str
-import time
+from builtins import object
 import copy
+from timeit import default_timer as timer
 from gtkmvc3.observable import Observable
-from threading import Lock, currentThread, RLock
+from threading import Lock, currentThread, RLock, Condition
 from rafcon.core.id_generator import *
 
 from rafcon.utils.type_helpers import type_inherits_of_type
@@ -33,14 +34,127 @@ from rafcon.utils import type_helpers
 logger = log.get_logger(__name__)
 
 
+class VariableLock(object):
+    """A lock for a single global variable
+
+    Threads waiting for the lock are woken up by a condition variable as soon as the lock is released. In addition,
+    the lock records contention metrics.
+
+    :ivar int number_of_acquisitions: how often the lock was acquired
+    :ivar int number_of_contended_acquisitions: how often a thread had to wait for the lock
+    :ivar float total_wait_time: the accumulated time in seconds threads waited for the lock
+    :ivar float max_wait_time: the longest time in seconds a thread waited for the lock
+    :ivar float total_hold_time: the accumulated time in seconds the lock was held
+    :ivar float max_hold_time: the longest time in seconds the lock was held
+    """
+
+    #: interval in seconds in which waiting threads inform about a long locked variable
+    waiting_log_interval = 2.
+
+    def __init__(self, key):
+        self.key = key
+        self._condition = Condition(Lock())
+        self._locked = False
+        self._holder = None
+        self._acquisition_time = None
+        self.number_of_acquisitions = 0
+        self.number_of_contended_acquisitions = 0
+        self.total_wait_time = 0.
+        self.max_wait_time = 0.
+        self.total_hold_time = 0.
+        self.max_hold_time = 0.
+
+    def acquire(self, blocking=True, timeout=None):
+        """Acquires the lock
+
+        :param bool blocking: whether to wait for the lock, if it is held by another thread
+        :param float timeout: the maximum time in seconds to wait for the lock, None waits infinitely
+        :return: True if the lock was acquired, False else
+        :rtype: bool
+        """
+        with self._condition:
+            if self._locked:
+                if not blocking:
+                    return False
+                start = timer()
+                self.number_of_contended_acquisitions += 1
+                last_log_time = start
+                try:
+                    while self._locked:
+                        now = timer()
+                        if timeout is not None and now - start >= timeout:
+                            return False
+                        if now - last_log_time >= self.waiting_log_interval:
+                            # inform the user about long locked variables
+                            logger.verbose("Variable '{2}' is locked and thread {0} waits already {1:.1f} seconds to "
+                                           "access it.".format(currentThread(), now - start, self.key))
+                            last_log_time = now
+                        wait_time = self.waiting_log_interval - (now - last_log_time)
+                        if timeout is not None:
+                            wait_time = min(wait_time, timeout - (now - start))
+                        self._condition.wait(wait_time)
+                finally:
+                    waiting_time = timer() - start
+                    self.total_wait_time += waiting_time
+                    self.max_wait_time = max(self.max_wait_time, waiting_time)
+            self._locked = True
+            self._holder = currentThread().name
+            self._acquisition_time = timer()
+            self.number_of_acquisitions += 1
+            return True
+
+    def release(self):
+        """Releases the lock and wakes up one waiting thread
+
+        :raises exceptions.RuntimeError: if the lock is not locked
+        """
+        with self._condition:
+            if not self._locked:
+                raise RuntimeError("Release of an unlocked lock")
+            hold_time = timer() - self._acquisition_time
+            self.total_hold_time += hold_time
+            self.max_hold_time = max(self.max_hold_time, hold_time)
+            self._locked = False
+            self._holder = None
+            self._acquisition_time = None
+            self._condition.notify()
+
+    def locked(self):
+        return self._locked
+
+    def get_metrics(self):
+        """Returns the contention metrics of the lock
+
+        Besides the counters, the dictionary contains the name of the thread currently holding the lock (`holder`)
+        and for how long it already holds the lock (`hold_duration`).
+
+        :rtype: dict
+        """
+        with self._condition:
+            return {'number_of_acquisitions': self.number_of_acquisitions,
+                    'number_of_contended_acquisitions': self.number_of_contended_acquisitions,
+                    'total_wait_time': self.total_wait_time,
+                    'max_wait_time': self.max_wait_time,
+                    'total_hold_time': self.total_hold_time,
+                    'max_hold_time': self.max_hold_time,
+                    'holder': self._holder,
+                    'hold_duration': timer() - self._acquisition_time if self._locked else 0.}
+
+
 class GlobalVariableManager(Observable):
     """A class for organizing all global variables of the state machine
 
     :ivar __global_variable_dictionary: the dictionary, where all global variables are stored
-    :ivar __variable_locks: a dictionary that holds one mutex for each global variable
+    :ivar __variable_locks: a dictionary that holds one :class:`VariableLock` for each global variable
     :ivar __global_lock: a mutex to prevent that the dictionary is written by two threads simultaneously
     :ivar __access_keys: a dictionary that holds an access key to each locked global variable
     :ivar __variable_references: a dictionary that stores whether a variable can be returned by reference or not
+    :ivar __variable_snapshots: a dictionary that holds the latest published (version, value) pair of each variable
+    :ivar __change_condition: a condition variable notified whenever a new version of a variable is published
+
+    Besides the exclusive access via the variable locks, variables can be read as versioned snapshots (see
+    :meth:`get_variable_snapshot`). Each :meth:`set_variable` publishes a new version. Versions are taken from a
+    counter shared by all variables and are thus increasing even if a variable is deleted and created again.
     """
 
     def __init__(self):
@@ -51,6 +165,9 @@ class GlobalVariableManager(Observable):
         self.__global_lock = RLock()
         self.__access_keys = {}
         self.__variable_references = {}
+        self.__variable_snapshots = {}
+        self.__version_counter = 0
+        self.__change_condition = Condition()
 
     @Observable.observed
     def set_variable(self, key, value, per_reference=False, access_key=None, data_type=None):
@@ -84,7 +201,7 @@ class GlobalVariableManager(Observable):
                 else:  # case not locked
                     access_key = self.lock_variable(key, block=True)
             else:
-                self.__variable_locks[key] = Lock()
+                self.__variable_locks[key] = VariableLock(key)
                 access_key = self.lock_variable(key, block=True)
 
             # --- variable locked
@@ -96,6 +213,7 @@ class GlobalVariableManager(Observable):
                 self.__global_variable_dictionary[key] = copy.deepcopy(value)
                 self.__global_variable_type_dictionary[key] = data_type
                 self.__variable_references[key] = False
+            self.__publish_snapshot(key)
             # --- release variable
 
             if unlock:
@@ -148,6 +266,72 @@ class GlobalVariableManager(Observable):
             # logger.warning("Global variable '{0}' not existing, returning default value".format(key))
             return default
 
+    def __publish_snapshot(self, key):
+        """Publishes the current value of a variable as new version, the variable must be locked"""
+        with self.__change_condition:
+            self.__version_counter += 1
+            # a single assignment, thus readers either see the old or the new version
+            self.__variable_snapshots[key] = (self.__version_counter, self.__global_variable_dictionary[key])
+            self.__change_condition.notify_all()
+
+    def get_variable_snapshot(self, key, default=None):
+        """Fetches the latest published value of a global variable together with its version
+
+        In contrast to :meth:`get_variable`, neither the variable is locked nor the value is copied. Thus, many
+        readers can access large variables concurrently, also while the variable is locked by a writer, in which case
+        the version before the change is returned. The returned value is shared between all readers and must not be
+        modified. Variables set per value are never modified in place by the manager, as each :meth:`set_variable`
+        stores a new copy.
+
+        Snapshots of variables set per reference are shallow: they hold the stored object itself, which is not copied
+        on publishing. An in-place modification of such an object is visible in already returned snapshots and does
+        not publish a new version. To publish a change, the object has to be passed to :meth:`set_variable` again.
+
+        :param key: the key of the global variable to be fetched
+        :param default: a value to be returned if the key does not exist
+        :return: a tuple of the value and its version, the version is None if the key does not exist
+        :rtype: tuple
+        """
+        snapshot = self.__variable_snapshots.get(str(key))
+        if snapshot is None:
+            return default, None
+        version, value = snapshot
+        return value, version
+
+    def get_variable_version(self, key):
+        """Returns the version of the latest published value of a global variable
+
+        :param key: the key of the global variable
+        :return: the version or None if the variable does not exist
+        :rtype: int
+        """
+        snapshot = self.__variable_snapshots.get(str(key))
+        return None if snapshot is None else snapshot[0]
+
+    def wait_for_change(self, key, since_version=None, timeout=None):
+        """Blocks until a version of a global variable newer than `since_version` is published
+
+        :param key: the key of the global variable
+        :param int since_version: the last version known to the caller, None to wait until the variable exists
+        :param float timeout: the maximum time in seconds to wait, None waits infinitely
+        :return: the new version or None if the timeout elapsed
+        :rtype: int
+        """
+        key = str(key)
+        start = timer()
+        with self.__change_condition:
+            while True:
+                snapshot = self.__variable_snapshots.get(key)
+                if snapshot is not None and (since_version is None or snapshot[0] > since_version):
+                    return snapshot[0]
+                if timeout is None:
+                    self.__change_condition.wait()
+                else:
+                    remaining_time = timeout - (timer() - start)
+                    if remaining_time <= 0:
+                        return None
+                    self.__change_condition.wait(remaining_time)
+
     def variable_can_be_referenced(self, key):
         """Checks whether the value of the variable can be returned by reference
 
@@ -175,38 +359,34 @@ class GlobalVariableManager(Observable):
                 self.unlock_variable(key, access_key)
                 del self.__variable_locks[key]
                 del self.__variable_references[key]
+                with self.__change_condition:
+                    del self.__variable_snapshots[key]
             else:
                 raise AttributeError("Global variable %s does not exist!" % str(key))
 
         logger.debug("Global variable %s was deleted!" % str(key))
 
     @Observable.observed
-    def lock_variable(self, key, block=False):
+    def lock_variable(self, key, block=False, timeout=None):
         """Locks a global variable
 
         :param key: the key of the global variable to be locked
         :param block: a flag to specify if to wait for locking the variable in blocking mode
+        :param float timeout: the maximum time in seconds to wait for the lock in blocking mode, None waits infinitely
+        :return: the access key of the locked variable or False, if the variable could not be locked
         """
         key = str(key)
         # watch out for releasing the __dictionary_lock properly
         try:
             if key in self.__variable_locks:
-                # acquire without arguments is blocking
-                lock_successful = self.__variable_locks[key].acquire(False)
-                if lock_successful or block:
-                    if (not lock_successful) and block:  # case: lock could not be acquired => wait for it as block=True
-                        duration = 0.
-                        loop_time = 0.1
-                        while not self.__variable_locks[key].acquire(False):
-                            time.sleep(loop_time)
-                            duration += loop_time
-                            if int(duration*10) % 20 == 0:
-                                # while loops informs the user about long locked variables
-                                logger.verbose("Variable '{2}' is locked and thread {0} waits already {1} seconds to "
-                                               "access it.".format(currentThread(), duration, key))
+                if self.__variable_locks[key].acquire(block, timeout):
                     access_key = global_variable_id_generator()
                     self.__access_keys[key] = access_key
                     return access_key
+                elif block:
+                    logger.warning("Global variable {} could not be locked within {} seconds".format(str(key),
+                                                                                                   timeout))
+                    return False
                 else:
                     logger.warning("Global variable {} already locked".format(str(key)))
                     return False
@@ -288,6 +468,23 @@ class GlobalVariableManager(Observable):
             return self.__variable_locks[key].locked()
         return False
 
+    def get_contention_metrics(self, key=None):
+        """Returns the lock contention metrics of a global variable
+
+        See :meth:`VariableLock.get_metrics` for the content of the metrics.
+
+        :param key: the key of the global variable, if None, the metrics of all variables are returned
+        :return: the metrics of the variable or a dictionary with the metrics of all variables
+        :rtype: dict
+        :raises exceptions.AttributeError: if the global variable does not exist
+        """
+        if key is None:
+            return {key: lock.get_metrics() for key, lock in list(self.__variable_locks.items())}
+        key = str(key)
+        if key not in self.__variable_locks:
+            raise AttributeError("Global variable %s does not exist!" % str(key))
+        return self.__variable_locks[key].get_metrics()
+
     def get_all_keys_starting_with(self, start_key):
         """ Returns all keys, which start with a certain pattern defined in :param start_key.
 
@@ -0,0 +1,227 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: library_index
+   :synopsis: A module holding an index of the library directories, which can be stored in a file
+
+The index caches the content of the directories below the library root paths together with their modification times.
+The content of a directory is only read again, if its modification time changed. In addition, the index caches the
+name, description and interface of libraries, which are only read again, if their state machine file was modified.
+
+The index file can be shared between RAFCON instances, e.g. by placing it next to libraries on a network share. Each
+instance validates the cached entries against the modification times before using them.
+"""
+
+from builtins import object
+from builtins import str
+import json
+import os
+import threading
+import time
+
+from rafcon.core.storage import storage
+from rafcon.utils import storage_utils
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+LIBRARY_INDEX_FORMAT_VERSION = 1
+# modification times closer to the current time are not cached, as further changes within the time resolution of the
+# file system would not change them
+_MODIFICATION_TIME_RESOLUTION = 2.
+
+# os.rename does not replace existing files on Windows
+_replace_file = getattr(os, 'replace', os.rename)
+
+
+def _get_modification_time(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _get_cacheable_modification_time(modification_time):
+    if modification_time is None or time.time() - modification_time < _MODIFICATION_TIME_RESOLUTION:
+        return None
+    return modification_time
+
+
+def _is_library(path):
+    return os.path.exists(os.path.join(path, storage.STATEMACHINE_FILE)) or \
+        os.path.exists(os.path.join(path, storage.STATEMACHINE_FILE_OLD))
+
+
+def _get_type_name(data_type):
+    if isinstance(data_type, dict):
+        data_type = data_type.get("__type__", "")
+    return str(data_type).split('.')[-1]
+
+
+def read_library_info(library_os_path):
+    """Reads the name, description and interface of a library from its root state
+
+    :param str library_os_path: the path of the library
+    :return: a dictionary with the keys `name`, `description`, `input_data_ports`, `output_data_ports` and
+        `outcomes` or None, if the library cannot be read. The data ports are lists of (data_port_id, name, data
+        type name, default value) lists, the outcomes lists of (outcome_id, name) lists, each sorted by id.
+    :rtype: dict
+    """
+    try:
+        state_machine_dict = storage.load_data_file(os.path.join(library_os_path, storage.STATEMACHINE_FILE))
+        root_state_storage_id = state_machine_dict.get('root_state_storage_id', state_machine_dict.get('root_state_id'))
+        state_dict = storage_utils.load_objects_from_json(
+            os.path.join(library_os_path, root_state_storage_id, storage.FILE_NAME_CORE_DATA), as_dict=True)
+    except (IOError, OSError, ValueError, TypeError, AttributeError):
+        return None
+
+    def get_data_ports(data_ports):
+        return sorted([data_port.get('data_port_id'), data_port.get('name'),
+                       _get_type_name(data_port.get('data_type')), data_port.get('default_value')]
+                      for data_port in data_ports.values())
+
+    return {
+        'name': state_dict.get('name'),
+        'description': state_dict.get('description'),
+        'input_data_ports': get_data_ports(state_dict.get('input_data_ports', {})),
+        'output_data_ports': get_data_ports(state_dict.get('output_data_ports', {})),
+        'outcomes': sorted([outcome.get('outcome_id'), outcome.get('name')]
+                           for outcome in state_dict.get('outcomes', {}).values()),
+    }
+
+
+class LibraryIndex(object):
+    """An index of library directories and library interfaces, validated by modification times
+
+    :ivar str path: the path of the index file or None, if the index is not stored
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        # directory path -> [modification time, {sub directory name: [is library, modification time]}]
+        self._directories = {}
+        # library path -> [modification time of the state machine file, library info]
+        self._libraries = {}
+        self._modified = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Loads the index file, if existing
+
+        An invalid file or a file of another format version is ignored.
+        """
+        if self.path is None or not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, 'r') as index_file:
+                index = json.load(index_file)
+            if index.get('version') != LIBRARY_INDEX_FORMAT_VERSION:
+                return
+            directories = index['directories']
+            libraries = index['libraries']
+            if not isinstance(directories, dict) or not isinstance(libraries, dict):
+                return
+        except (IOError, OSError, ValueError, KeyError, AttributeError) as e:
+            logger.warning("The library index {0} could not be read and is rebuilt: {1}".format(self.path, e))
+            return
+        with self._lock:
+            self._directories = directories
+            self._libraries = libraries
+            self._modified = False
+
+    def save(self):
+        """Stores the index in its file, if it was modified
+
+        The index is written to a temporary file, which then replaces the index file. Thus, other RAFCON instances
+        never read a partially written index.
+        """
+        if self.path is None or not self._modified:
+            return
+        with self._lock:
+            content = json.dumps({'version': LIBRARY_INDEX_FORMAT_VERSION,
+                                  'directories': self._directories,
+                                  'libraries': self._libraries})
+            self._modified = False
+        temporary_file_path = "{0}.{1}.tmp".format(self.path, os.getpid())
+        try:
+            if not os.path.isdir(os.path.dirname(self.path)):
+                os.makedirs(os.path.dirname(self.path))
+            with open(temporary_file_path, 'w') as index_file:
+                index_file.write(content)
+            _replace_file(temporary_file_path, self.path)
+        except (IOError, OSError) as e:
+            logger.warning("The library index could not be stored in {0}: {1}".format(self.path, e))
+
+    def get_directory_entries(self, directory_path):
+        """Returns the sub directories of a directory and whether they contain a library
+
+        The directory is only read, if its modification time differs from the cached one. Whether a sub directory is
+        a library is only checked again, if the modification time of the sub directory changed. Directories starting
+        with a dot are skipped.
+
+        :param str directory_path: the path of the directory
+        :return: (name, is library) tuples for all sub directories
+        :rtype: list
+        """
+        modification_time = _get_modification_time(directory_path)
+        with self._lock:
+            entry = self._directories.get(directory_path)
+        if entry is not None and entry[0] is not None and entry[0] == modification_time:
+            sub_directories = dict(entry[1])
+            changed = False
+            for name, (is_library, sub_modification_time) in list(sub_directories.items()):
+                # a directory only becomes a library or stops being one, if its content and thus its modification
+                # time changes, which does not change the modification time of the parent directory
+                current_modification_time = _get_modification_time(os.path.join(directory_path, name))
+                if sub_modification_time is None or current_modification_time != sub_modification_time:
+                    changed = True
+                    if current_modification_time is None:
+                        del sub_directories[name]
+                    else:
+                        sub_directories[name] = [_is_library(os.path.join(directory_path, name)),
+                                                 _get_cacheable_modification_time(current_modification_time)]
+        else:
+            changed = True
+            sub_directories = {}
+            for name in os.listdir(directory_path):
+                path = os.path.join(directory_path, name)
+                if name[0] != '.' and os.path.isdir(path):
+                    sub_directories[name] = [_is_library(path),
+                                             _get_cacheable_modification_time(_get_modification_time(path))]
+        if changed:
+            with self._lock:
+                self._directories[directory_path] = [_get_cacheable_modification_time(modification_time),
+                                                     sub_directories]
+                self._modified = True
+        return [(name, is_library) for name, (is_library, _) in sub_directories.items()]
+
+    def get_library_info(self, library_os_path):
+        """Returns the name, description and interface of a library
+
+        The info is only read from the file system, if the state machine file of the library changed.
+
+        :param str library_os_path: the path of the library
+        :return: the library info, see :func:`read_library_info`, or None
+        :rtype: dict
+        """
+        modification_time = _get_modification_time(os.path.join(library_os_path, storage.STATEMACHINE_FILE))
+        if modification_time is None:
+            return None
+        with self._lock:
+            entry = self._libraries.get(library_os_path)
+        if entry is not None and entry[0] is not None and entry[0] == modification_time:
+            return entry[1]
+        library_info = read_library_info(library_os_path)
+        with self._lock:
+            self._libraries[library_os_path] = [_get_cacheable_modification_time(modification_time), library_info]
+            self._modified = True
+        return library_info
@@ -20,11 +20,13 @@
 import os
 import shutil
 import copy
+import threading
 import warnings
 from collections import OrderedDict
 from gtkmvc3.observable import Observable
 
 from rafcon.core import interface
+from rafcon.core.library_index import LibraryIndex
 from rafcon.core.storage import storage
 from rafcon.core.custom_exceptions import LibraryNotFoundException
 import rafcon.core.config as config
@@ -59,15 +61,29 @@ class LibraryManager(Observable):
         self._skipped_states = []
         self._skipped_library_roots = []
 
-        # loaded libraries
-        self._loaded_libraries = {}
+        # loaded libraries: library os path -> (modification time, state machine), least recently used first
+        self._loaded_libraries = OrderedDict()
+        self._loaded_libraries_lock = threading.Lock()
         self._libraries_instances = {}
+        # cached content of the library directories, see _get_library_index()
+        self._library_index = None
 
     def prepare_destruction(self):
         self.clean_loaded_libraries()
 
     def clean_loaded_libraries(self):
-        self._loaded_libraries.clear()
+        with self._loaded_libraries_lock:
+            self._loaded_libraries.clear()
+
+    def evict_loaded_library(self, lib_os_path):
+        """Removes a library from the cache of loaded libraries
+
+        Library states created afterwards load the library again from the file system.
+
+        :param str lib_os_path: the location of the library
+        """
+        with self._loaded_libraries_lock:
+            self._loaded_libraries.pop(lib_os_path, None)
 
     def initialize(self):
         """Initializes the library manager
@@ -119,8 +135,37 @@ class LibraryManager(Observable):
             logger.debug("Adding library '{1}' from {0}".format(library_root_path, library_root_key))
 
         self._libraries = OrderedDict(sorted(self._libraries.items()))
+        self.save_library_index()
         logger.debug("Initialization of LibraryManager done")
 
+    def _get_library_index(self):
+        """Returns the index of the library directories
+
+        The index is stored in the file given by the config value ``LIBRARY_INDEX_PATH``. If the value changes, the
+        index is loaded from the new file.
+
+        :rtype: rafcon.core.library_index.LibraryIndex
+        """
+        index_path = config.global_config.get_optional_config_value("LIBRARY_INDEX_PATH")
+        if index_path is not None and index_path.startswith("%RAFCON_CONFIG_PATH"):
+            if config.global_config.path is None:
+                index_path = None
+            else:
+                index_path = index_path.replace("%RAFCON_CONFIG_PATH", config.global_config.path)
+        if index_path is not None:
+            if not os.path.isabs(os.path.expanduser(index_path)) and config.global_config.path is None:
+                index_path = None
+            else:
+                index_path = self._clean_path(index_path)
+        if self._library_index is None or self._library_index.path != index_path:
+            self._library_index = LibraryIndex(index_path)
+        return self._library_index
+
+    def save_library_index(self):
+        """Stores the index of the library directories and library interfaces, if it was modified"""
+        if self._library_index is not None:
+            self._library_index.save()
+
     @staticmethod
     def _clean_path(path):
         """Create a fully fissile absolute system path with no symbolic links and environment variables"""
@@ -140,6 +185,7 @@ class LibraryManager(Observable):
         return path
 
     def _load_libraries_from_root_path(self, library_root_key, library_root_path):
+        self._get_library_index()
         self._library_root_paths[library_root_key] = library_root_path
         self._libraries[library_root_key] = {}
         self._load_nested_libraries(library_root_path, self._libraries[library_root_key])
@@ -162,20 +208,20 @@ class LibraryManager(Observable):
         Adds all libraries specified in a given path and stores them into the provided library dictionary. The library
         entries in the dictionary consist only of the path to the library in the file system.
 
+        The directories are read via the library index, thus unchanged directories are not read again.
+
         :param library_path: the path to add all libraries from
         :param target_dict: the target dictionary to store all loaded libraries to
         """
-        for library_name in os.listdir(library_path):
+        for library_name, is_library in self._library_index.get_directory_entries(library_path):
             library_folder_path, library_name = self.check_clean_path_of_library(library_path, library_name)
             full_library_path = os.path.join(library_path, library_name)
-            if os.path.isdir(full_library_path) and library_name[0] != '.':
-                if os.path.exists(os.path.join(full_library_path, storage.STATEMACHINE_FILE)) \
-                        or os.path.exists(os.path.join(full_library_path, storage.STATEMACHINE_FILE_OLD)):
-                    target_dict[library_name] = full_library_path
-                else:
-                    target_dict[library_name] = {}
-                    self._load_nested_libraries(full_library_path, target_dict[library_name])
-                    target_dict[library_name] = OrderedDict(sorted(target_dict[library_name].items()))
+            if is_library:
+                target_dict[library_name] = full_library_path
+            else:
+                target_dict[library_name] = {}
+                self._load_nested_libraries(full_library_path, target_dict[library_name])
+                target_dict[library_name] = OrderedDict(sorted(target_dict[library_name].items()))
 
     @Observable.observed
     def refresh_libraries(self):
@@ -383,22 +429,74 @@ class LibraryManager(Observable):
         # state_machine = storage.load_state_machine_from_path(lib_os_path)
         # return state_machine.version, state_machine.root_state
 
-        # TODO observe changes on file system and update data
-        if lib_os_path in self._loaded_libraries:
-            # this list can also be taken to open library state machines TODO -> implement it -> because faster
-            state_machine = self._loaded_libraries[lib_os_path]
-            # logger.info("Take copy of {0}".format(lib_os_path))
-            # as long as the a library state root state is never edited so the state first has to be copied here
-            state_copy = copy.deepcopy(state_machine.root_state)
-            return state_machine.version, state_copy
-        else:
-            state_machine = storage.load_state_machine_from_path(lib_os_path)
-            self._loaded_libraries[lib_os_path] = state_machine
-            if config.global_config.get_config_value("NO_PROGRAMMATIC_CHANGE_OF_LIBRARY_STATES_PERFORMED", False):
-                return state_machine.version, state_machine.root_state
-            else:
-                state_copy = copy.deepcopy(state_machine.root_state)
-                return state_machine.version, state_copy
+        state_machine, newly_loaded = self._get_loaded_library(lib_os_path)
+        if newly_loaded and \
+                config.global_config.get_config_value("NO_PROGRAMMATIC_CHANGE_OF_LIBRARY_STATES_PERFORMED", False):
+            return state_machine.version, state_machine.root_state
+        # as long as the a library state root state is never edited so the state first has to be copied here
+        state_copy = copy.deepcopy(state_machine.root_state)
+        return state_machine.version, state_copy
+
+    def get_library_template(self, lib_os_path):
+        """Returns the root state of the library, which is shared by all library states referencing the library
+
+        The returned state (the template) must not be modified, library states create their own copy of it on
+        first use.
+
+        :param lib_os_path: the location of the library
+        :return: the version of the library and its root state
+        """
+        state_machine, _ = self._get_loaded_library(lib_os_path)
+        return state_machine.version, state_machine.root_state
+
+    def _get_loaded_library(self, lib_os_path):
+        """Returns the library state machine from the cache of loaded libraries
+
+        The library is (re-)loaded from the file system, if it is not in the cache or if the library has been
+        modified since it was loaded. The least recently used libraries are evicted from the cache, if it holds more
+        than ``LIBRARY_TEMPLATE_CACHE_SIZE`` libraries.
+
+        :param lib_os_path: the location of the library
+        :return: the library state machine and whether the library was newly loaded
+        """
+        modification_time = self._get_library_modification_time(lib_os_path)
+        with self._loaded_libraries_lock:
+            if lib_os_path in self._loaded_libraries:
+                loaded_modification_time, state_machine = self._loaded_libraries.pop(lib_os_path)
+                if loaded_modification_time == modification_time:
+                    self._loaded_libraries[lib_os_path] = (loaded_modification_time, state_machine)
+                    return state_machine, False
+                logger.debug("Library {0} was modified and is reloaded".format(lib_os_path))
+
+        state_machine = storage.load_state_machine_from_path(lib_os_path)
+        with self._loaded_libraries_lock:
+            self._loaded_libraries[lib_os_path] = (modification_time, state_machine)
+            max_size = config.global_config.get_optional_config_value("LIBRARY_TEMPLATE_CACHE_SIZE")
+            if max_size is not None:
+                while len(self._loaded_libraries) > max(1, max_size):
+                    self._loaded_libraries.popitem(last=False)
+        return state_machine, True
+
+    @staticmethod
+    def _get_library_modification_time(lib_os_path):
+        for filename in (storage.STATEMACHINE_FILE, storage.STATEMACHINE_FILE_OLD):
+            try:
+                return os.path.getmtime(os.path.join(lib_os_path, filename))
+            except OSError:
+                pass
+        return None
+
+    def get_library_info(self, lib_os_path):
+        """Returns the name, description and interface of the root state of a library
+
+        The info is cached in the library index and only read again, if the library changed.
+
+        :param str lib_os_path: the location of the library
+        :return: the library info, see :func:`rafcon.core.library_index.read_library_info`, or None, if the path is
+            no library
+        :rtype: dict
+        """
+        return self._get_library_index().get_library_info(lib_os_path)
 
     def remove_library_from_file_system(self, library_path, library_name):
         """Remove library from hard disk."""
@@ -18,8 +18,11 @@
 
 from future.utils import string_types
 from builtins import str
+from builtins import object
 import os
 import imp
+import threading
+from collections import OrderedDict
 import yaml
 from gtkmvc3.observable import Observable
 
@@ -37,6 +40,67 @@ DEFAULT_SCRIPT_FILE = "default_script.py"
 
 DEFAULT_SCRIPT = filesystem.read_file(os.path.dirname(__file__), DEFAULT_SCRIPT_FILE)
 
+# serializes the deferred reading of script files, see Script.set_script_file()
+_script_file_lock = threading.Lock()
+
+
+class ScriptCompilationCache(object):
+    """A process-wide cache for the code objects of compiled scripts
+
+    Compiling a script is the expensive part of building a script module. The cache stores the code objects keyed by
+    the path of the script file and the script text. As Python caches the hash of a string, repeated lookups with the
+    same script text are cheap. As the key contains the exact text that is compiled, no file system access is required
+    for a lookup. The least recently used entries are dropped, if more than ``max_size`` scripts are cached.
+
+    :ivar int max_size: the maximum number of cached code objects
+    :ivar int hits: the number of lookups, which could be served from the cache
+    :ivar int misses: the number of lookups, which required a compilation
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._code_objects = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_code(self, script_text, source_path, code_name):
+        """Returns the code object of the script text, which is only compiled if not cached yet
+
+        :param str script_text: the source code of the script
+        :param str source_path: the path of the script file, used as part of the key
+        :param str code_name: the file name stored in the code object, shown in tracebacks; only used for compilation
+        :return: the compiled code
+        :raises exceptions.SyntaxError: if the script cannot be compiled
+        """
+        key = (source_path, script_text)
+        with self._lock:
+            code = self._code_objects.pop(key, None)
+            if code is not None:
+                self.hits += 1
+                self._code_objects[key] = code
+                return code
+            self.misses += 1
+        code = compile(script_text, code_name, 'exec')
+        with self._lock:
+            self._code_objects[key] = code
+            while len(self._code_objects) > self.max_size:
+                self._code_objects.popitem(last=False)
+        return code
+
+    def clear(self):
+        """Removes all cached code objects and resets the counters"""
+        with self._lock:
+            self._code_objects.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._code_objects)
+
+
+script_compilation_cache = ScriptCompilationCache()
+
 
 class Script(Observable, yaml.YAMLObject):
     """A class for representing the script file for all execution states in a state machine.
@@ -46,6 +110,7 @@ class Script(Observable, yaml.YAMLObject):
     :ivar path: the path where the script resides
     :ivar filename: the full name of the script file
     :ivar _compiled_module: the compiled module
+    :ivar _compiled_script: the script text the compiled module was built from
     :ivar _script_id: the id of the script
     :ivar check_path: a flag to indicate if the path should be checked for existence
 
@@ -54,6 +119,8 @@ class Script(Observable, yaml.YAMLObject):
     yaml_tag = u'!Script'
 
     _script = None
+    # the file the script text is read from on first access, see set_script_file()
+    _script_file = None
 
     def __init__(self, path=None, filename=None, parent=None):
 
@@ -61,6 +128,7 @@ class Script(Observable, yaml.YAMLObject):
         self._path = None
         self._filename = None
         self._compiled_module = None
+        self._compiled_script = None
         self._script_id = generate_script_id()
         self._parent = None
 
@@ -72,18 +140,48 @@ class Script(Observable, yaml.YAMLObject):
 
     @property
     def script(self):
+        if self._script_file is not None:
+            self._load_script_file()
         return self._script
 
     @script.setter
     def script(self, script_text):
         if not isinstance(script_text, string_types):
             raise ValueError("The script text needs to be a string")
-        self._script = script_text
+        self._set_script_text(script_text)
 
     def set_script_without_compilation(self, script_text):
+        self._set_script_text(script_text)
+        self._compiled_script = None
+        self._compiled_module = None
+
+    def _set_script_text(self, script_text):
+        changed = self._script_file is not None or script_text != self._script
+        self._script_file = None
         self._script = script_text
+        # the script is not a state element, thus its state is marked as modified explicitly, see
+        # rafcon.core.states.state.State.modification_version
+        if changed and self.parent is not None:
+            self.parent.increment_modification_version()
+
+    def set_script_file(self, script_file):
+        """Defers the reading of the script text from the given file until the script is accessed the first time
+
+        Used when loading state machines, as most scripts are not needed until the state machine is executed.
+
+        :param script_file: the full path of the script file or a callable returning the content of the file
+        """
+        self._script_file = script_file
+        self._compiled_script = None
         self._compiled_module = None
 
+    def _load_script_file(self):
+        with _script_file_lock:
+            script_file = self._script_file
+            if script_file is not None:
+                self._script = script_file() if callable(script_file) else filesystem.read_file(script_file)
+                self._script_file = None
+
     def execute(self, state, inputs=None, outputs=None, backward_execution=False):
         """Execute the user 'execute' function specified in the script
 
@@ -94,7 +192,8 @@ class Script(Observable, yaml.YAMLObject):
         :return: Return value of the execute script
         :rtype: str | int
         """
-        if not self.compiled_module or global_config.get_config_value("SCRIPT_RECOMPILATION_ON_STATE_EXECUTION", True):
+        if not self.compiled_module or self._compiled_script is not self.script or \
+                global_config.get_config_value("SCRIPT_RECOMPILATION_ON_STATE_EXECUTION", True):
             self.compile_module()
         if not outputs:
             outputs = {}
@@ -127,19 +226,28 @@ class Script(Observable, yaml.YAMLObject):
     def compile_module(self):
         """Builds a temporary module from the script file
 
+        The code of the script is taken from the :data:`script_compilation_cache`, thus the script is only compiled
+        again, if its text changed. The module itself is created anew.
+
         :raises exceptions.IOError: if the compilation of the script module failed
         """
+        script_text = self.script
+        path = self.path
+        source_path = os.path.join(path, self.filename) if path else None
         try:
             imp.acquire_lock()
 
-            code = compile(self.script, '%s (%s)' % (self.filename, self._script_id), 'exec')
+            code = script_compilation_cache.get_code(script_text, source_path,
+                                                     '%s (%s)' % (self.filename, self._script_id))
             # load module
             module_name = os.path.splitext(self.filename)[0] + str(self._script_id)
             tmp_module = imp.new_module(module_name)
             exec(code, tmp_module.__dict__)
             # return the module
+            self._compiled_script = script_text
             self.compiled_module = tmp_module
         except Exception as e:
+            self._compiled_script = None
             self.compiled_module = None
             raise
         finally:
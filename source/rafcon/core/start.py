@@ -40,6 +40,7 @@ import rafcon.utils.filesystem as filesystem
 from rafcon.core.config import global_config
 import rafcon.core.singleton as core_singletons
 from rafcon.core.storage import storage
+from rafcon.core.storage.packed_storage import is_packed_state_machine_file
 from rafcon.core.states.state import StateExecutionStatus
 
 from rafcon.utils import plugins
@@ -95,8 +96,11 @@ def parse_state_machine_path(path):
 
     :param str path: Input path from the user
     :return: The path
-    :raises argparse.ArgumentTypeError: if the path does not contain a statemachine.json file
+    :raises argparse.ArgumentTypeError: if the path does not contain a statemachine.json file and is no packed state
+        machine file
     """
+    if is_packed_state_machine_file(path):
+        return path
     sm_root_file = join(path, storage.STATEMACHINE_FILE)
     if exists(sm_root_file):
         return path
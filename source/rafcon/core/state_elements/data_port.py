@@ -18,6 +18,7 @@
 
 """
 from weakref import ref
+from copy import deepcopy
 from future.utils import string_types
 from enum import Enum
 from gtkmvc3.observable import Observable
@@ -30,6 +31,33 @@ from rafcon.utils import log
 from rafcon.utils import type_helpers
 logger = log.get_logger(__name__)
 
+#: Values are deep-copied when passed on to the port and when stored in the execution history (default)
+PASS_BY_COPY = "copy"
+#: Values are passed on to the port and stored in the execution history without copying them
+PASS_BY_REFERENCE = "reference"
+#: Like ``PASS_BY_REFERENCE``, but values supporting it are flagged read-only before they are shared
+PASS_READ_ONLY = "read_only"
+
+PASSING_POLICIES = (PASS_BY_COPY, PASS_BY_REFERENCE, PASS_READ_ONLY)
+
+
+def make_read_only(value):
+    """Flags a value as read-only, if its type supports this
+
+    Numpy arrays (and other objects with a numpy like ``setflags`` method) are set to not writeable. Other values are
+    returned unchanged.
+
+    :param value: the value to be flagged
+    :return: the value
+    """
+    setflags = getattr(value, "setflags", None)
+    if callable(setflags):
+        try:
+            setflags(write=False)
+        except (TypeError, ValueError) as e:
+            logger.debug("Could not flag value of type {0} as read-only: {1}".format(type(value), e))
+    return value
+
 
 class DataPort(StateElement):
     """A class for representing a data ports in a state
@@ -44,6 +72,9 @@ class DataPort(StateElement):
     :ivar bool DataPort.init_without_default_value_type_exceptions: if true it is allowed to initiate with any default
                                                                     value type used to load not matching default value
                                                                     data types and correct them using the GUI.
+    :ivar str DataPort.passing_policy: specifies whether values passed on to the port are copied
+                                       (``PASS_BY_COPY``), shared (``PASS_BY_REFERENCE``) or shared and flagged
+                                       read-only (``PASS_READ_ONLY``)
     """
 
     # Define all parameters and set their default values
@@ -51,12 +82,16 @@ class DataPort(StateElement):
     _data_port_id = None
     _data_type = type(None)
     _default_value = None
+    _passing_policy = PASS_BY_COPY
 
     def __init__(self, name=None, data_type=None, default_value=None, data_port_id=None, parent=None, force_type=False,
-                 init_without_default_value_type_exceptions=False, safe_init=True):
+                 init_without_default_value_type_exceptions=False, safe_init=True, passing_policy=PASS_BY_COPY):
         if type(self) == DataPort and not force_type:
             raise NotImplementedError
         super(DataPort, self).__init__(safe_init=safe_init)
+        if passing_policy not in PASSING_POLICIES:
+            raise ValueError("The passing policy must be one of {0}".format(PASSING_POLICIES))
+        self._passing_policy = passing_policy
         self._no_type_error_exceptions = True if init_without_default_value_type_exceptions else False
         self._was_forced_type = force_type
         if data_port_id is None:
@@ -101,7 +136,7 @@ class DataPort(StateElement):
 
     def __copy__(self):
         return self.__class__(self._name, self._data_type, self._default_value, self._data_port_id, None,
-                              self._was_forced_type, safe_init=False)
+                              self._was_forced_type, safe_init=False, passing_policy=self._passing_policy)
 
     def __deepcopy__(self, memo=None, _nil=[]):
         return self.__copy__()
@@ -116,24 +151,43 @@ class DataPort(StateElement):
         name = dictionary['name']
         data_type = dictionary['data_type']
         default_value = dictionary['default_value']
+        passing_policy = dictionary.get('passing_policy', PASS_BY_COPY)
         # Allow creation of DataPort class when loading from YAML file
         safe_init = global_config.get_config_value("LOAD_SM_WITH_CHECKS", True)
         if cls == DataPort:
             return DataPort(name, data_type, default_value, data_port_id, force_type=True,
-                            init_without_default_value_type_exceptions=True, safe_init=safe_init)
+                            init_without_default_value_type_exceptions=True, safe_init=safe_init,
+                            passing_policy=passing_policy)
         # Call appropriate constructor, e.g. InputDataPort(...) for input data ports
         else:
             return cls(name, data_type, default_value, data_port_id, force_type=True,
-                       init_without_default_value_type_exceptions=True, safe_init=safe_init)
+                       init_without_default_value_type_exceptions=True, safe_init=safe_init,
+                       passing_policy=passing_policy)
 
     @staticmethod
     def state_element_to_dict(state_element):
-        return {
+        dictionary = {
             'data_port_id': state_element.data_port_id,
             'name': state_element.name,
             'data_type': state_element.data_type,
             'default_value': state_element.default_value
         }
+        # the default policy is not stored, keeping the files of existing state machines unchanged
+        if state_element.passing_policy != PASS_BY_COPY:
+            dictionary['passing_policy'] = state_element.passing_policy
+        return dictionary
+
+    def pass_value(self, value):
+        """Prepares a value to be passed on to the port according to the passing policy of the port
+
+        :param value: the value to be passed on
+        :return: a deep copy of the value or the value itself
+        """
+        if self._passing_policy == PASS_BY_COPY:
+            return deepcopy(value)
+        if self._passing_policy == PASS_READ_ONLY:
+            make_read_only(value)
+        return value
 
     #########################################################################
     # Properties for all class fields that must be observed by gtkmvc3
@@ -204,6 +258,21 @@ class DataPort(StateElement):
         except (TypeError, AttributeError) as e:
             raise e
 
+    @property
+    def passing_policy(self):
+        """Property for the _passing_policy field
+
+        """
+        return self._passing_policy
+
+    @passing_policy.setter
+    @lock_state_machine
+    @Observable.observed
+    def passing_policy(self, passing_policy):
+        if passing_policy not in PASSING_POLICIES:
+            raise ValueError("The passing policy must be one of {0}".format(PASSING_POLICIES))
+        self._passing_policy = passing_policy
+
     @lock_state_machine
     @Observable.observed
     def change_data_type(self, data_type, default_value=None):
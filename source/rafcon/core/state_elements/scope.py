@@ -124,6 +124,10 @@ class ScopedData(StateElement):
     _value = None
     _data_port_type = None
     _primary_key = None
+    # scoped data is runtime data, which is not stored
+    _modifies_parent = False
+    # the (state_id, data_port_id) key of the ScopedDataRecord this object was created from
+    _record_key = None
 
     def __init__(self, name, value, value_type, from_state, data_port_type, parent=None, safe_init=True):
 
@@ -153,6 +157,8 @@ class ScopedData(StateElement):
     def _unsafe_init(self, name, value, value_type, from_state, data_port_type, parent):
         self._from_state = from_state
         self._name = name
+        if isinstance(name, string_types) and isinstance(from_state, string_types):
+            self._primary_key = name + from_state
         if value_type is not None:
             self._value_type = value_type
         self._value = value
@@ -301,3 +307,69 @@ class ScopedData(StateElement):
         if not isinstance(timestamp, float):
             raise TypeError("timestamp must be of type float")
         self._timestamp = timestamp
+
+
+class ScopedDataRecord(object):
+    """A compact record of the scoped data of a container state during execution
+
+    Container states store their scoped data as records in a dictionary with (state_id, data_port_id) tuples as keys.
+    Records are not modified but replaced on each write, thus a snapshot of the scoped data, e.g. for the execution
+    history, is a copy of this dictionary. :class:`ScopedData` objects are only created on request, see
+    :func:`get_scoped_data_view`.
+
+    :ivar str name: the name of the data port that was written
+    :ivar value: the written value
+    :ivar type value_type: the type of the value
+    :ivar str from_state: the state_id of the state that wrote the value
+    :ivar data_port_type: the type of the data port that wrote the value
+    :ivar int timestamp: the time stamp of the write, see :func:`generate_time_stamp`
+    """
+
+    __slots__ = ('name', 'value', 'value_type', 'from_state', 'data_port_type', 'timestamp')
+
+    def __init__(self, name, value, value_type, from_state, data_port_type, timestamp=None):
+        self.name = name
+        self.value = value
+        self.value_type = value_type
+        self.from_state = from_state
+        self.data_port_type = data_port_type
+        self.timestamp = generate_time_stamp() if timestamp is None else timestamp
+
+    def __str__(self):
+        return "ScopedDataRecord: \n name: %s \n data_type: %s \n value: %s \n from_state %s" % \
+               (self.name, self.value_type, self.value, self.from_state)
+
+    def to_scoped_data(self, key, parent=None):
+        """Creates an observable :class:`ScopedData` object with the data of the record
+
+        :param tuple key: the (state_id, data_port_id) key of the record
+        :param parent: the container state the scoped data belongs to
+        :rtype: ScopedData
+        """
+        scoped_data = ScopedData(self.name, self.value, self.value_type, self.from_state, self.data_port_type,
+                                 parent=parent, safe_init=False)
+        scoped_data._timestamp = self.timestamp
+        scoped_data._record_key = key
+        return scoped_data
+
+    @staticmethod
+    def from_scoped_data(scoped_data):
+        """Creates a record with the data of a :class:`ScopedData` object
+
+        :param ScopedData scoped_data: the scoped data
+        :rtype: ScopedDataRecord
+        """
+        return ScopedDataRecord(scoped_data.name, scoped_data.value, scoped_data.value_type, scoped_data.from_state,
+                                scoped_data.data_port_type, scoped_data.timestamp)
+
+
+def get_scoped_data_view(scoped_data_records, parent=None):
+    """Creates :class:`ScopedData` objects for scoped data records
+
+    :param dict scoped_data_records: :class:`ScopedDataRecord` objects with (state_id, data_port_id) tuples as keys
+    :param parent: the container state the scoped data belongs to
+    :return: the :class:`ScopedData` objects with the data port id concatenated with the state id as keys
+    :rtype: dict
+    """
+    return {str(data_port_id) + state_id: record.to_scoped_data((state_id, data_port_id), parent)
+            for (state_id, data_port_id), record in scoped_data_records.items()}
@@ -44,6 +44,8 @@ class StateElement(Observable, YAMLObject, JSONObject, Hashable):
     :ivar rafcon.core.states.state.State StateElement.parent: Parent state of the state element
     """
     _parent = None
+    # whether changes of the element modify the stored data of its parent state
+    _modifies_parent = True
 
     yaml_tag = u'!StateElement'
 
@@ -75,6 +77,14 @@ class StateElement(Observable, YAMLObject, JSONObject, Hashable):
         else:
             self._parent = None
 
+    def _notify_method_after(self, instance, name, res_val, args, kwargs):
+        # modifications of state elements are modifications of their state, see State.modification_version
+        if self._modifies_parent and self._parent:
+            parent = self._parent()
+            if parent is not None:
+                parent.increment_modification_version()
+        super(StateElement, self)._notify_method_after(instance, name, res_val, args, kwargs)
+
     def __hash__(self):
         return id(self)
 
@@ -33,7 +33,8 @@ from gtkmvc3.observable import Observable
 from jsonconversion.jsonobject import JSONObject
 
 import rafcon
-from rafcon.core.execution.execution_history import ExecutionHistory, ExecutionHistoryStorage
+from rafcon.core.execution.execution_history import ExecutionHistory, ExecutionHistoryStorage, \
+    AsyncExecutionHistoryStorage, SHELVE_FORMAT, SEGMENTS_FORMAT
 from rafcon.core.id_generator import generate_state_machine_id, run_id_generator
 from rafcon.utils import log
 from rafcon.utils.hashable import Hashable
@@ -70,6 +71,7 @@ class StateMachine(Observable, JSONObject, Hashable):
         Observable.__init__(self)
 
         self._modification_lock = RLock()
+        self._runtime_lock = RLock()
 
         if state_machine_id is None:
             self.state_machine_id = generate_state_machine_id()
@@ -159,6 +161,13 @@ class StateMachine(Observable, JSONObject, Hashable):
     def get_modification_lock(self):
         return self._modification_lock
 
+    def get_runtime_lock(self):
+        """Returns the lock protecting the execution related data of the states, e.g. their execution status
+
+        Unlike the modification lock, this lock is not held during structural changes of the state machine.
+        """
+        return self._runtime_lock
+
     @contextmanager
     def modification_lock(self, blocking=True):
         """Get modification lock in with() statement
@@ -225,7 +234,9 @@ class StateMachine(Observable, JSONObject, Hashable):
 
     @Observable.observed
     def _add_new_execution_history(self):
-        new_execution_history = ExecutionHistory()
+        new_execution_history = ExecutionHistory(
+            max_items=global_config.get_optional_config_value("EXECUTION_HISTORY_MAX_ITEMS"),
+            max_age=global_config.get_optional_config_value("EXECUTION_HISTORY_MAX_AGE"))
 
         if global_config.get_config_value("EXECUTION_LOG_ENABLE", False):
             base_dir = global_config.get_config_value("EXECUTION_LOG_PATH", "%RAFCON_TEMP_PATH_BASE/execution_logs")
@@ -233,10 +244,19 @@ class StateMachine(Observable, JSONObject, Hashable):
                 base_dir = base_dir.replace('%RAFCON_TEMP_PATH_BASE', RAFCON_TEMP_PATH_BASE)
             if not os.path.exists(base_dir):
                 os.makedirs(base_dir)
-            shelve_name = os.path.join(base_dir, '%s_rafcon_execution_log_%s.shelve' %
-                                       (time.strftime('%Y-%m-%d-%H:%M:%S', time.localtime()),
-                                        self.root_state.name.replace(' ', '-')))
-            execution_history_store = ExecutionHistoryStorage(shelve_name)
+            log_format = global_config.get_config_value("EXECUTION_LOG_FORMAT", SHELVE_FORMAT)
+            log_name = os.path.join(base_dir, '%s_rafcon_execution_log_%s.%s' %
+                                    (time.strftime('%Y-%m-%d-%H:%M:%S', time.localtime()),
+                                     self.root_state.name.replace(' ', '-'),
+                                     'segments' if log_format == SEGMENTS_FORMAT else 'shelve'))
+            if global_config.get_config_value("EXECUTION_LOG_ASYNC_WRITE", True):
+                execution_history_store = AsyncExecutionHistoryStorage(
+                    log_name, log_format,
+                    max_queue_size=global_config.get_config_value("EXECUTION_LOG_QUEUE_SIZE", 1000),
+                    backpressure_policy=global_config.get_config_value("EXECUTION_LOG_BACKPRESSURE_POLICY", "BLOCK"),
+                    flush_interval=global_config.get_config_value("EXECUTION_LOG_FLUSH_INTERVAL", 1.0))
+            else:
+                execution_history_store = ExecutionHistoryStorage(log_name, log_format)
             new_execution_history.set_execution_history_storage(execution_history_store)
         self._execution_histories.append(new_execution_history)
         return new_execution_history
@@ -195,8 +195,7 @@ class BarrierConcurrencyState(ConcurrencyState):
         # standard state execution
         decider_state.input_data = self.get_inputs_for_state(decider_state)
         decider_state.output_data = self.create_output_dictionary_for_state(decider_state)
-        decider_state.start(self.execution_history, backward_execution=False)
-        decider_state.join()
+        decider_state.start_and_join(self.execution_history, backward_execution=False)
         decider_state_error = None
         if decider_state.final_outcome.outcome_id == -1:
             if 'error' in decider_state.output_data:
@@ -67,7 +67,7 @@ class ConcurrencyState(ContainerState):
             # pop the return item of this concurrency state to get the correct scoped data
             last_history_item = self.execution_history.pop_last_item()
             assert isinstance(last_history_item, ReturnItem)
-            self.scoped_data = last_history_item.scoped_data
+            self.scoped_data = last_history_item.scoped_data_records
             # get the concurrency item for the children execution historys
             concurrency_history_item = self.execution_history.get_last_history_item()
             assert isinstance(concurrency_history_item, ConcurrencyItem)
@@ -149,7 +149,7 @@ class ConcurrencyState(ContainerState):
         last_history_item = self.execution_history.pop_last_item()
         assert isinstance(last_history_item, CallItem)
         # this copy is convenience and not required here
-        self.scoped_data = last_history_item.scoped_data
+        self.scoped_data = last_history_item.scoped_data_records
         self.state_execution_status = StateExecutionStatus.WAIT_FOR_NEXT_STATE
         return self.finalize()
 
@@ -29,17 +29,18 @@ from gtkmvc3.observable import Observable
 
 from rafcon.core.custom_exceptions import RecoveryModeException
 from rafcon.core.decorators import lock_state_machine
+from rafcon.core.execution.execution_profiler import execution_profiler, INPUT, OUTPUT
 from rafcon.core.execution.execution_status import StateMachineExecutionStatus
 from rafcon.core.id_generator import *
 from rafcon.core.singleton import state_machine_execution_engine
 from rafcon.core.state_elements.data_flow import DataFlow
 from rafcon.core.state_elements.logical_port import Outcome
-from rafcon.core.state_elements.scope import ScopedData, ScopedVariable
+from rafcon.core.state_elements.scope import ScopedData, ScopedDataRecord, ScopedVariable, get_scoped_data_view
 from rafcon.core.state_elements.data_port import InputDataPort, OutputDataPort
 from rafcon.core.state_elements.state_element import StateElement
 from rafcon.core.state_elements.transition import Transition
 from rafcon.core.states.library_state import LibraryState
-from rafcon.core.states.state import State
+from rafcon.core.states.state import State, invalidate_state_machine_references
 from rafcon.core.states.state import StateExecutionStatus
 from rafcon.core.config import global_config
 from rafcon.utils.type_helpers import type_inherits_of_type
@@ -70,8 +71,14 @@ class ContainerState(State):
 
         self._states = OrderedDict()
         self._transitions = {}
+        # lazily built lookup table (from_state, from_outcome) -> transition, see _get_transition_lookup_table
+        self._transition_lookup_table = None
         self._data_flows = {}
+        # lazily built lookup tables (target port -> data flows, source port -> data flows), see
+        # _get_data_flow_routing_index
+        self._data_flow_routing_index = None
         self._scoped_variables = {}
+        # the scoped data during execution as ScopedDataRecord objects, keyed by (state_id, data_port_id) tuples
         self._scoped_data = {}
         self._current_state = None
         # condition variable to wait for not connected states
@@ -105,6 +112,8 @@ class ContainerState(State):
         self._states = states if states is not None else {}
         for _, state in self._states.items():
             state._parent = ref(self)
+        if self._states:
+            invalidate_state_machine_references()
         self._transitions = transitions if transitions is not None else {}
         for _, transition in self._transitions.items():
             transition._parent = ref(self)
@@ -1275,6 +1284,7 @@ class ContainerState(State):
         else:
             self.transitions[transition_id] = \
                 Transition(None, None, to_state_id, to_outcome, transition_id, self)
+        self._invalidate_transition_lookup_table()
 
         # notify all states waiting for transition to be connected
         with self._transitions_cv:
@@ -1305,6 +1315,7 @@ class ContainerState(State):
 
         new_transition = Transition(from_state_id, from_outcome, to_state_id, to_outcome, transition_id, self)
         self.transitions[transition_id] = new_transition
+        self._invalidate_transition_lookup_table()
 
         # notify all states waiting for transition to be connected
         with self._transitions_cv:
@@ -1324,11 +1335,32 @@ class ContainerState(State):
             raise TypeError("state must be of type State")
         if not isinstance(outcome, Outcome):
             raise TypeError("outcome must be of type Outcome")
-        result_transition = None
-        for key, transition in self.transitions.items():
-            if transition.from_state == state.state_id and transition.from_outcome == outcome.outcome_id:
-                result_transition = transition
-        return result_transition
+        transition_lookup_table = self._transition_lookup_table
+        if transition_lookup_table is None:
+            transition_lookup_table = self._get_transition_lookup_table()
+        return transition_lookup_table.get((state.state_id, outcome.outcome_id))
+
+    @lock_state_machine
+    def _get_transition_lookup_table(self):
+        """Returns the table mapping the origin of each transition to the transition
+
+        The table is built on first access and dropped by :meth:`_invalidate_transition_lookup_table` whenever the
+        transitions of the state change. Building it holds the modification lock of the state machine, thus no
+        structural change can interleave. Start transitions are stored with the key (None, None).
+
+        :return: dictionary mapping (from_state, from_outcome) to the transition
+        :rtype: dict
+        """
+        transition_lookup_table = self._transition_lookup_table
+        if transition_lookup_table is None:
+            transition_lookup_table = {(transition.from_state, transition.from_outcome): transition
+                                       for transition in self._transitions.values()}
+            self._transition_lookup_table = transition_lookup_table
+        return transition_lookup_table
+
+    def _invalidate_transition_lookup_table(self):
+        """Drops the transition lookup table, it is rebuilt on next access"""
+        self._transition_lookup_table = None
 
     @lock_state_machine
     @Observable.observed
@@ -1344,7 +1376,9 @@ class ContainerState(State):
             raise AttributeError("The transition_id %s does not exist" % str(transition_id))
 
         self.transitions[transition_id].parent = None
-        return self.transitions.pop(transition_id)
+        transition = self.transitions.pop(transition_id)
+        self._invalidate_transition_lookup_table()
+        return transition
 
     @lock_state_machine
     def remove_outcome_hook(self, outcome_id):
@@ -1395,6 +1429,7 @@ class ContainerState(State):
 
         self.data_flows[data_flow_id] = DataFlow(from_state_id, from_data_port_id, to_state_id, to_data_port_id,
                                                  data_flow_id, self)
+        self._invalidate_data_flow_routing_index()
         return data_flow_id
 
     @lock_state_machine
@@ -1409,7 +1444,61 @@ class ContainerState(State):
             raise AttributeError("The data_flow_id %s does not exist" % str(data_flow_id))
 
         self._data_flows[data_flow_id].parent = None
-        return self._data_flows.pop(data_flow_id)
+        data_flow = self._data_flows.pop(data_flow_id)
+        self._invalidate_data_flow_routing_index()
+        return data_flow
+
+    @lock_state_machine
+    def _get_data_flow_routing_index(self):
+        """Returns the lookup tables mapping data ports to their connected data flows
+
+        The tables are built on first access and dropped by :meth:`_invalidate_data_flow_routing_index` whenever the
+        data flows of the state change. Building them holds the modification lock of the state machine, thus no
+        structural change can interleave.
+
+        :return: dictionaries mapping (to_state, to_key) to incoming and (from_state, from_key) to outgoing data flows
+        :rtype: tuple(dict, dict)
+        """
+        routing_index = self._data_flow_routing_index
+        if routing_index is None:
+            incoming_data_flows = {}
+            outgoing_data_flows = {}
+            for data_flow in self._data_flows.values():
+                incoming_data_flows.setdefault((data_flow.to_state, data_flow.to_key), []).append(data_flow)
+                outgoing_data_flows.setdefault((data_flow.from_state, data_flow.from_key), []).append(data_flow)
+            routing_index = incoming_data_flows, outgoing_data_flows
+            self._data_flow_routing_index = routing_index
+        return routing_index
+
+    def _invalidate_data_flow_routing_index(self):
+        """Drops the data flow lookup tables, they are rebuilt on next access"""
+        self._data_flow_routing_index = None
+
+    def get_incoming_data_flows(self, state_id, data_port_id):
+        """Returns all data flows of this state targeting the specified data port
+
+        :param str state_id: The id of the state the data port belongs to (self or a child state)
+        :param int data_port_id: The id of the data port
+        :return: The data flows connected to the port, in the order of :attr:`data_flows`
+        :rtype: list[rafcon.core.state_elements.data_flow.DataFlow]
+        """
+        routing_index = self._data_flow_routing_index
+        if routing_index is None:
+            routing_index = self._get_data_flow_routing_index()
+        return routing_index[0].get((state_id, data_port_id), [])
+
+    def get_outgoing_data_flows(self, state_id, data_port_id):
+        """Returns all data flows of this state originating from the specified data port
+
+        :param str state_id: The id of the state the data port belongs to (self or a child state)
+        :param int data_port_id: The id of the data port
+        :return: The data flows connected to the port, in the order of :attr:`data_flows`
+        :rtype: list[rafcon.core.state_elements.data_flow.DataFlow]
+        """
+        routing_index = self._data_flow_routing_index
+        if routing_index is None:
+            routing_index = self._get_data_flow_routing_index()
+        return routing_index[1].get((state_id, data_port_id), [])
 
     @lock_state_machine
     def remove_data_flows_with_data_port_id(self, data_port_id):
@@ -1566,30 +1655,29 @@ class ContainerState(State):
         :param state: the state of which the input data is determined
         :return: the input data of the target state
         """
-        result_dict = {}
-
-        tmp_dict = self.get_default_input_values_for_state(state)
-        result_dict.update(tmp_dict)
+        with execution_profiler.measure(state, INPUT):
+            result_dict = {}
 
-        for input_port_key, value in state.input_data_ports.items():
-            # for all input keys fetch the correct data_flow connection and read data into the result_dict
-            actual_value = None
-            actual_value_time = 0
-            for data_flow_key, data_flow in self.data_flows.items():
+            tmp_dict = self.get_default_input_values_for_state(state)
+            result_dict.update(tmp_dict)
 
-                if data_flow.to_key == input_port_key:
-                    if data_flow.to_state == state.state_id:
-                        # fetch data from the scoped_data list: the key is the data_port_key + the state_id
-                        key = str(data_flow.from_key) + data_flow.from_state
-                        if key in self.scoped_data:
-                            if actual_value is None or actual_value_time < self.scoped_data[key].timestamp:
-                                actual_value = deepcopy(self.scoped_data[key].value)
-                                actual_value_time = self.scoped_data[key].timestamp
+            for input_port_key, value in state.input_data_ports.items():
+                # for all input keys fetch the correct data_flow connection and read data into the result_dict
+                actual_value = None
+                actual_value_time = 0
+                for data_flow in self.get_incoming_data_flows(state.state_id, input_port_key):
+                    # fetch data from the scoped data: the key is the state_id and the data_port_key
+                    record = self._scoped_data.get((data_flow.from_state, data_flow.from_key))
+                    if record is not None:
+                        if actual_value is None or actual_value_time < record.timestamp:
+                            actual_value = record.value
+                            actual_value_time = record.timestamp
 
-            if actual_value is not None:
-                result_dict[value.name] = actual_value
+                if actual_value is not None:
+                    # copies the value, unless the input port passes values by reference
+                    result_dict[value.name] = value.pass_value(actual_value)
 
-        return result_dict
+            return result_dict
 
     # ---------------------------------------------------------------------------------------------
     # ---------------------------- functions to modify the scoped data ----------------------------
@@ -1608,16 +1696,15 @@ class ContainerState(State):
         for dict_key, value in dictionary.items():
             for input_data_port_key, data_port in list(self.input_data_ports.items()):
                 if dict_key == data_port.name:
-                    self.scoped_data[str(input_data_port_key) + self.state_id] = \
-                        ScopedData(data_port.name, value, type(value), self.state_id, ScopedVariable, parent=self)
+                    self._scoped_data[(self.state_id, input_data_port_key)] = \
+                        ScopedDataRecord(data_port.name, value, type(value), self.state_id, ScopedVariable)
                     # forward the data to scoped variables
-                    for data_flow_key, data_flow in self.data_flows.items():
-                        if data_flow.from_key == input_data_port_key and data_flow.from_state == self.state_id:
-                            if data_flow.to_state == self.state_id and data_flow.to_key in self.scoped_variables:
-                                current_scoped_variable = self.scoped_variables[data_flow.to_key]
-                                self.scoped_data[str(data_flow.to_key) + self.state_id] = \
-                                    ScopedData(current_scoped_variable.name, value, type(value), self.state_id,
-                                               ScopedVariable, parent=self)
+                    for data_flow in self.get_outgoing_data_flows(self.state_id, input_data_port_key):
+                        if data_flow.to_state == self.state_id and data_flow.to_key in self.scoped_variables:
+                            current_scoped_variable = self.scoped_variables[data_flow.to_key]
+                            self._scoped_data[(self.state_id, data_flow.to_key)] = \
+                                ScopedDataRecord(current_scoped_variable.name, value, type(value), self.state_id,
+                                                 ScopedVariable)
 
     @lock_state_machine
     def add_state_execution_output_to_scoped_data(self, dictionary, state):
@@ -1626,17 +1713,19 @@ class ContainerState(State):
         :param dictionary: The dictionary that is added to the scoped data
         :param state: The state that finished execution and provide the dictionary
         """
-        for output_name, value in dictionary.items():
-            for output_data_port_key, data_port in list(state.output_data_ports.items()):
-                if output_name == data_port.name:
-                    if not isinstance(value, data_port.data_type):
-                        if (not ((type(value) is float or type(value) is int) and
-                                     (data_port.data_type is float or data_port.data_type is int)) and
-                                not (isinstance(value, type(None)))):
-                            logger.error("The data type of output port {0} should be of type {1}, but is of type {2}".
-                                         format(output_name, data_port.data_type, type(value)))
-                    self.scoped_data[str(output_data_port_key) + state.state_id] = \
-                        ScopedData(data_port.name, value, type(value), state.state_id, OutputDataPort, parent=self)
+        with execution_profiler.measure(state, OUTPUT):
+            for output_name, value in dictionary.items():
+                for output_data_port_key, data_port in list(state.output_data_ports.items()):
+                    if output_name == data_port.name:
+                        if not isinstance(value, data_port.data_type):
+                            if (not ((type(value) is float or type(value) is int) and
+                                         (data_port.data_type is float or data_port.data_type is int)) and
+                                    not (isinstance(value, type(None)))):
+                                logger.error("The data type of output port {0} should be of type {1}, "
+                                             "but is of type {2}".format(output_name, data_port.data_type,
+                                                                         type(value)))
+                        self._scoped_data[(state.state_id, output_data_port_key)] = \
+                            ScopedDataRecord(data_port.name, value, type(value), state.state_id, OutputDataPort)
 
     @lock_state_machine
     def add_default_values_of_scoped_variables_to_scoped_data(self):
@@ -1644,9 +1733,9 @@ class ContainerState(State):
 
         """
         for key, scoped_var in self.scoped_variables.items():
-            self.scoped_data[str(scoped_var.data_port_id) + self.state_id] = \
-                ScopedData(scoped_var.name, scoped_var.default_value, scoped_var.data_type, self.state_id,
-                           ScopedVariable, parent=self)
+            self._scoped_data[(self.state_id, scoped_var.data_port_id)] = \
+                ScopedDataRecord(scoped_var.name, scoped_var.default_value, scoped_var.data_type, self.state_id,
+                                 ScopedVariable)
 
     @lock_state_machine
     def update_scoped_variables_with_output_dictionary(self, dictionary, state):
@@ -1666,14 +1755,14 @@ class ContainerState(State):
                 if not key == "error":
                     logger.warning("Output variable %s was written during state execution, "
                                    "that has no data port connected to it.", str(key))
-            for data_flow_key, data_flow in self.data_flows.items():
-                if data_flow.from_key == output_data_port_key and data_flow.from_state == state.state_id:
-                    if data_flow.to_state == self.state_id:  # is target of data flow own state id?
-                        if data_flow.to_key in self.scoped_variables.keys():  # is target data port scoped?
-                            current_scoped_variable = self.scoped_variables[data_flow.to_key]
-                            self.scoped_data[str(data_flow.to_key) + self.state_id] = \
-                                ScopedData(current_scoped_variable.name, value, type(value), state.state_id,
-                                           ScopedVariable, parent=self)
+                continue
+            for data_flow in self.get_outgoing_data_flows(state.state_id, output_data_port_key):
+                if data_flow.to_state == self.state_id:  # is target of data flow own state id?
+                    if data_flow.to_key in self.scoped_variables:  # is target data port scoped?
+                        current_scoped_variable = self.scoped_variables[data_flow.to_key]
+                        self._scoped_data[(self.state_id, data_flow.to_key)] = \
+                            ScopedDataRecord(current_scoped_variable.name, value, type(value), state.state_id,
+                                             ScopedVariable)
 
     # ---------------------------------------------------------------------------------------------
     # ------------------------ functions to modify the scoped data end ----------------------------
@@ -1703,6 +1792,8 @@ class ContainerState(State):
                 data_flow._from_state = self.state_id
             if data_flow.to_state == old_state_id:
                 data_flow._to_state = self.state_id
+        self._invalidate_transition_lookup_table()
+        self._invalidate_data_flow_routing_index()
 
     def get_state_for_transition(self, transition):
         """Calculate the target state of a transition
@@ -1735,27 +1826,26 @@ class ContainerState(State):
             actual_value = None
             actual_value_was_written = False
             actual_value_time = 0
-            for data_flow_id, data_flow in self.data_flows.items():
-                if data_flow.to_state == self.state_id:
-                    if data_flow.to_key == output_port_id:
-                        scoped_data_key = str(data_flow.from_key) + data_flow.from_state
-                        if scoped_data_key in self.scoped_data:
-                            # if self.scoped_data[scoped_data_key].timestamp > actual_value_time is True
-                            # the data of a previous execution of the same state is overwritten
-                            if actual_value is None or self.scoped_data[scoped_data_key].timestamp > actual_value_time:
-                                actual_value = deepcopy(self.scoped_data[scoped_data_key].value)
-                                actual_value_time = self.scoped_data[scoped_data_key].timestamp
-                                actual_value_was_written = True
-                        else:
-                            if not self.backward_execution:
-                                logger.debug(
-                                    "Output data with name {0} of state {1} was not found in the scoped data "
-                                    "of state {2}. Thus the state did not write onto this output. "
-                                    "This can mean a state machine design error.".format(
-                                        str(output_name), str(self.states[data_flow.from_state].get_path()),
-                                        self.get_path()))
+            for data_flow in self.get_incoming_data_flows(self.state_id, output_port_id):
+                record = self._scoped_data.get((data_flow.from_state, data_flow.from_key))
+                if record is not None:
+                    # if record.timestamp > actual_value_time is True
+                    # the data of a previous execution of the same state is overwritten
+                    if actual_value is None or record.timestamp > actual_value_time:
+                        actual_value = record.value
+                        actual_value_time = record.timestamp
+                        actual_value_was_written = True
+                else:
+                    if not self.backward_execution:
+                        logger.debug(
+                            "Output data with name {0} of state {1} was not found in the scoped data "
+                            "of state {2}. Thus the state did not write onto this output. "
+                            "This can mean a state machine design error.".format(
+                                str(output_name), str(self.states[data_flow.from_state].get_path()),
+                                self.get_path()))
             if actual_value_was_written:
-                output_dict[output_name] = actual_value
+                # copies the value, unless the output port passes values by reference
+                output_dict[output_name] = self.output_data_ports[output_port_id].pass_value(actual_value)
 
     # ---------------------------------------------------------------------------------------------
     # -------------------------------------- check methods ---------------------------------------
@@ -1778,8 +1868,12 @@ class ContainerState(State):
         # Continue with checks if previous ones did not fail
         # Check type of child and call appropriate validity test
         if isinstance(child, DataFlow):
+            # the data flow is about to be added or modified in place
+            self._invalidate_data_flow_routing_index()
             return self._check_data_flow_validity(child)
         if isinstance(child, Transition):
+            # the transition is about to be added or modified in place
+            self._invalidate_transition_lookup_table()
             return self._check_transition_validity(child)
         return valid, message
 
@@ -2253,6 +2347,7 @@ class ContainerState(State):
         for old_transition in old_transitions.values():
             if old_transition not in self._transitions.values() and old_transition.parent is self:
                 old_transition.parent = None
+        self._invalidate_transition_lookup_table()
 
     @property
     def data_flows(self):
@@ -2310,6 +2405,7 @@ class ContainerState(State):
         for old_data_flow in old_data_flows.values():
             if old_data_flow not in self._data_flows.values() and old_data_flow.parent is self:
                 old_data_flow.parent = None
+        self._invalidate_data_flow_routing_index()
 
     @property
     def start_state_id(self):
@@ -2414,19 +2510,35 @@ class ContainerState(State):
     def scoped_data(self):
         """Property for the _scoped_data field
 
+        The scoped data is stored as :class:`rafcon.core.state_elements.scope.ScopedDataRecord` objects. This
+        property creates :class:`rafcon.core.state_elements.scope.ScopedData` objects for them on each access. Changes
+        of these objects do not change the scoped data of the state.
+
+        :return: the scoped data with the data port id concatenated with the state id as keys
+        :rtype: dict
         """
-        return self._scoped_data
+        return get_scoped_data_view(self._scoped_data, parent=self)
 
     @scoped_data.setter
     @lock_state_machine
     # @Observable.observed
     def scoped_data(self, scoped_data):
+        """Replaces the scoped data
+
+        :param dict scoped_data: either ScopedDataRecord objects with (state_id, data_port_id) tuples as keys, e.g.
+            as stored in the execution history, or ScopedData objects as returned by the getter
+        """
         if not isinstance(scoped_data, dict):
             raise TypeError("scoped_results must be of type dict")
+        scoped_data_records = {}
         for key, s in scoped_data.items():
-            if not isinstance(s, ScopedData):
-                raise TypeError("element of scoped_data must be of type ScopedData")
-        self._scoped_data = scoped_data
+            if isinstance(s, ScopedDataRecord):
+                scoped_data_records[key] = s
+            elif isinstance(s, ScopedData) and s._record_key is not None:
+                scoped_data_records[s._record_key] = ScopedDataRecord.from_scoped_data(s)
+            else:
+                raise TypeError("element of scoped_data must be of type ScopedDataRecord or ScopedData")
+        self._scoped_data = scoped_data_records
 
     @property
     def child_execution(self):
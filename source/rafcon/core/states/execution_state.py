@@ -32,6 +32,9 @@ from rafcon.core.state_elements.logical_port import Outcome
 from rafcon.core.script import Script
 from rafcon.core.states.state import StateExecutionStatus
 from rafcon.core.execution.execution_history import CallType
+from rafcon.core.execution.execution_profiler import execution_profiler, SCRIPT
+from rafcon.core.execution.process_execution_pool import get_execution_backend, get_process_execution_pool, \
+    PROCESS_BACKEND
 from rafcon.core.config import global_config
 
 from rafcon.utils import log
@@ -109,7 +112,12 @@ class ExecutionState(State):
         """Calls the custom execute function of the script.py of the state
 
         """
-        outcome_item = self._script.execute(self, execute_inputs, execute_outputs, backward_execution)
+        with execution_profiler.measure(self, SCRIPT):
+            if get_execution_backend(self) == PROCESS_BACKEND:
+                outcome_item = get_process_execution_pool().execute(self, execute_inputs, execute_outputs,
+                                                                    backward_execution)
+            else:
+                outcome_item = self._script.execute(self, execute_inputs, execute_outputs, backward_execution)
 
         # in the case of backward execution the outcome is not relevant
         if backward_execution:
@@ -131,6 +139,15 @@ class ExecutionState(State):
         logger.error("Returned outcome of {0} not existing: {1}".format(self, outcome_item))
         return Outcome(-1, "aborted")
 
+    def recursively_preempt_states(self):
+        """Preempt the state
+
+        If the script of the state is executed in a worker process, the worker is terminated.
+        """
+        super(ExecutionState, self).recursively_preempt_states()
+        if get_execution_backend(self) == PROCESS_BACKEND:
+            get_process_execution_pool().terminate(self)
+
     def run(self):
         """ This defines the sequence of actions that are taken when the execution state is executed
 
@@ -75,7 +75,7 @@ class HierarchyState(ContainerState):
         if self.backward_execution:
             last_history_item = self.execution_history.pop_last_item()
             assert isinstance(last_history_item, ReturnItem)
-            self.scoped_data = last_history_item.scoped_data
+            self.scoped_data = last_history_item.scoped_data_records
 
         else:  # forward_execution
             self.execution_history.push_call_history_item(self, CallType.CONTAINER, self, self.input_data)
@@ -117,6 +117,13 @@ class HierarchyState(ContainerState):
                     else:
                         break
                 elif execution_mode == StateMachineExecutionStatus.BACKWARD:
+                    if not self.execution_history.is_backward_step_possible():
+                        logger.warning("Cannot step backward in {0}, as the required history items are not retained "
+                                       "any more. See EXECUTION_HISTORY_MAX_ITEMS and EXECUTION_HISTORY_MAX_AGE."
+                                       "".format(self))
+                        singleton.state_machine_execution_engine.set_execution_mode(
+                            StateMachineExecutionStatus.STEP_MODE)
+                        continue
                     break_loop = self._handle_backward_execution_before_child_execution()
                     if break_loop:
                         break
@@ -178,7 +185,7 @@ class HierarchyState(ContainerState):
                 self.child_state.state_execution_status = StateExecutionStatus.INACTIVE
             return True
         assert isinstance(last_history_item, ReturnItem)
-        self.scoped_data = last_history_item.scoped_data
+        self.scoped_data = last_history_item.scoped_data_records
         self.child_state = last_history_item.state_reference
         return False
 
@@ -202,10 +209,8 @@ class HierarchyState(ContainerState):
         if not self.backward_execution:  # only add history item if it is not a backward execution
             self.execution_history.push_call_history_item(
                 self.child_state, CallType.EXECUTE, self, self.child_state.input_data)
-        self.child_state.start(self.execution_history, backward_execution=self.backward_execution,
-                               generate_run_id=False)
-
-        self.child_state.join()
+        self.child_state.start_and_join(self.execution_history, backward_execution=self.backward_execution,
+                                        generate_run_id=False)
 
         # this line is important to indicate the parent the current execution status
         # it may also change during the execution of an hierarchy state
@@ -243,16 +248,17 @@ class HierarchyState(ContainerState):
         last_history_item = self.execution_history.pop_last_item()
         assert isinstance(last_history_item, CallItem)
         # copy the scoped_data of the history from the point before the child_state was executed
-        self.scoped_data = last_history_item.scoped_data
+        self.scoped_data = last_history_item.scoped_data_records
 
         # this is a look-ahead step to directly leave this hierarchy-state if the last child_state
         # was executed; this leads to the backward and forward execution of a hierarchy child_state
         # having the exact same number of steps
         last_history_item = self.execution_history.get_last_history_item()
-        if last_history_item.state_reference is self:
+        # the last history item can only be missing, if older history items were dropped
+        if last_history_item is not None and last_history_item.state_reference is self:
             last_history_item = self.execution_history.pop_last_item()
             assert isinstance(last_history_item, CallItem)
-            self.scoped_data = last_history_item.scoped_data
+            self.scoped_data = last_history_item.scoped_data_records
             self.child_state.state_execution_status = StateExecutionStatus.INACTIVE
             return True
         return False
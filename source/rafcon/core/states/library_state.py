@@ -20,12 +20,13 @@
 from future.utils import string_types
 from builtins import str
 from weakref import ref
+from threading import RLock
 from copy import copy, deepcopy
 
 from gtkmvc3.observable import Observable
 from rafcon.core.states.state import StateExecutionStatus
 from rafcon.core.singleton import library_manager
-from rafcon.core.states.state import State, PATH_SEPARATOR
+from rafcon.core.states.state import State, PATH_SEPARATOR, invalidate_state_machine_references
 from rafcon.core.decorators import lock_state_machine
 from rafcon.core.config import global_config
 from rafcon.utils import log
@@ -34,6 +35,8 @@ from rafcon.utils.hashable import Hashable
 
 logger = log.get_logger(__name__)
 
+_state_copy_creation_lock = RLock()
+
 
 class LibraryState(State):
     """A class to represent a library state for the state machine
@@ -64,6 +67,7 @@ class LibraryState(State):
     _library_name = None
     _version = None
     _state_copy = None
+    _state_copy_template = None
 
     _input_data_port_runtime_values = {}
     _use_runtime_value_input_data_ports = {}
@@ -100,10 +104,18 @@ class LibraryState(State):
             logger.info("New library name '{0}' is located at {1}".format(new_library_name, new_library_path))
 
         # key = load_library_root_state_timer.start()
-        lib_version, state_copy = library_manager.get_library_state_copy_instance(self.lib_os_path)
+        if global_config.get_config_value("NO_PROGRAMMATIC_CHANGE_OF_LIBRARY_STATES_PERFORMED", False):
+            lib_version, state_copy = library_manager.get_library_state_copy_instance(self.lib_os_path)
+            template = None
+        else:
+            # the state copy is only created from the shared template, when it is accessed for the first time
+            lib_version, template = library_manager.get_library_template(self.lib_os_path)
         if not str(lib_version) == version and not str(lib_version) == "None":
             raise AttributeError("Library does not have the correct version!")
-        self.state_copy = state_copy
+        if template is None:
+            self.state_copy = state_copy
+        else:
+            self._state_copy_template = template
 
         if safe_init:
             LibraryState._safe_init(self, name)
@@ -122,31 +134,73 @@ class LibraryState(State):
 
         self.initialized = True
 
+    def _get_state_copy_interface(self):
+        """Returns the name, outcomes and data ports of the state copy
+
+        If the state copy was not yet created, the outcomes and data ports are copied from the template.
+        """
+        if self._state_copy is not None:
+            state_copy = self._state_copy
+            return state_copy.name, state_copy.outcomes, state_copy.input_data_ports, state_copy.output_data_ports
+        template = self._state_copy_template
+        return template.name, {key: copy(template.outcomes[key]) for key in template.outcomes}, \
+            {key: copy(template.input_data_ports[key]) for key in template.input_data_ports}, \
+            {key: copy(template.output_data_ports[key]) for key in template.output_data_ports}
+
     def _safe_init(self, name):
-        self.state_copy.parent = self
+        state_copy_name, outcomes, input_data_ports, output_data_ports = self._get_state_copy_interface()
+        if self._state_copy is not None:
+            self.state_copy.parent = self
         if name is None:
-            self.name = self.state_copy.name
+            self.name = state_copy_name
         # copy all ports and outcomes of self.state_copy to let the library state appear like the container state
         # this will also set the parent of all outcomes and data ports to self
-        self.outcomes = self.state_copy.outcomes
-        self.input_data_ports = self.state_copy.input_data_ports
-        self.output_data_ports = self.state_copy.output_data_ports
+        self.outcomes = outcomes
+        self.input_data_ports = input_data_ports
+        self.output_data_ports = output_data_ports
 
     def _unsafe_init(self, name):
-        self.state_copy._parent = ref(self)
+        state_copy_name, outcomes, input_data_ports, output_data_ports = self._get_state_copy_interface()
+        if self._state_copy is not None:
+            self.state_copy._parent = ref(self)
+            invalidate_state_machine_references()
         if name is None:
-            self._name = self.state_copy.name
-        self._outcomes = self.state_copy.outcomes
+            self._name = state_copy_name
+        self._outcomes = outcomes
         # add parents manually
         for outcome_id, outcome in self._outcomes.items():
             outcome._parent = ref(self)
-        self._input_data_ports = self.state_copy.input_data_ports
+        self._input_data_ports = input_data_ports
         for port_id, port in self._input_data_ports.items():
             port._parent = ref(self)
-        self._output_data_ports = self.state_copy.output_data_ports
+        self._output_data_ports = output_data_ports
         for port_id, port in self._output_data_ports.items():
             port._parent = ref(self)
 
+    def _get_state_copy_or_template(self):
+        """Returns the state copy or, if it was not yet created, the template for read-only access"""
+        if self._state_copy is None and self._state_copy_template is not None:
+            return self._state_copy_template
+        return self.state_copy
+
+    def _create_state_copy(self):
+        """Creates the state copy from the shared template
+
+        The state copy shares the outcomes and data ports with the library state, as if it had been created in the
+        constructor.
+        """
+        with _state_copy_creation_lock:
+            if self._state_copy is not None or self._state_copy_template is None:
+                return
+            state_copy = deepcopy(self._state_copy_template)
+            state_copy._outcomes = self._outcomes
+            state_copy._input_data_ports = self._input_data_ports
+            state_copy._output_data_ports = self._output_data_ports
+            state_copy._parent = ref(self)
+            self._state_copy = state_copy
+            invalidate_state_machine_references()
+            self._state_copy_template = None
+
     def _handle_runtime_values(self, input_data_port_runtime_values, use_runtime_value_input_data_ports,
                                output_data_port_runtime_values, use_runtime_value_output_data_ports):
         # handle input runtime values
@@ -212,7 +266,7 @@ class LibraryState(State):
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return False
-        return str(self) == str(other) and self._state_copy == other.state_copy
+        return str(self) == str(other) and self.state_copy == other.state_copy
 
     def __copy__(self):
         income = self._income
@@ -234,11 +288,12 @@ class LibraryState(State):
     def destroy(self, recursive=True):
         super(LibraryState, self).destroy(recursive)
         if recursive:
-            if self.state_copy:
-                self.state_copy.destroy(recursive)
-            else:
+            if self._state_copy:
+                self._state_copy.destroy(recursive)
+            elif self._state_copy_template is None:
                 logger.verbose("Multiple calls of destroy {0}".format(self))
             self._state_copy = None
+            self._state_copy_template = None
 
     def run(self):
         """ This defines the sequence of actions that are taken when the library state is executed
@@ -432,21 +487,21 @@ class LibraryState(State):
         Returns the numer of child states. As per default states do not have child states return 1.
         :return:
         """
-        return self.state_copy.get_states_statistics(hierarchy_level)
+        return self._get_state_copy_or_template().get_states_statistics(hierarchy_level)
 
     def get_number_of_transitions(self):
         """
         Return the number of transitions for a state. Per default states do not have transitions.
         :return:
         """
-        return self.state_copy.get_number_of_transitions()
+        return self._get_state_copy_or_template().get_number_of_transitions()
 
     def get_number_of_data_flows(self):
         """
         Return the number of data flows for a state. Per default states do not have data flows.
         :return:
         """
-        return self.state_copy.get_number_of_data_flows()
+        return self._get_state_copy_or_template().get_number_of_data_flows()
 
     #########################################################################
     # Properties for all class fields that must be observed by gtkmvc3
@@ -504,7 +559,10 @@ class LibraryState(State):
     def state_copy(self):
         """Property for the _state_copy field
 
+        The state copy is created from the library template on first access.
         """
+        if self._state_copy is None and self._state_copy_template is not None:
+            self._create_state_copy()
         return self._state_copy
 
     @state_copy.setter
@@ -38,6 +38,10 @@ from jsonconversion.jsonobject import JSONObject
 from yaml import YAMLObject
 
 from rafcon.core.id_generator import *
+from rafcon.core.execution.execution_profiler import execution_profiler
+from rafcon.core.execution.execution_status_channel import execution_status_channel
+from rafcon.core.execution.state_execution_pool import get_state_execution_mode, get_state_execution_pool, \
+    THREAD_MODE, INLINE_MODE
 from rafcon.core.state_elements.state_element import StateElement
 from rafcon.core.state_elements.data_port import DataPort, InputDataPort, OutputDataPort
 from rafcon.core.state_elements.logical_port import Income, Outcome
@@ -47,14 +51,31 @@ from rafcon.core.config import global_config
 from rafcon.utils import classproperty
 from rafcon.utils import log
 from rafcon.utils import multi_event
+from rafcon.utils import storage_utils
 from rafcon.utils.constants import RAFCON_TEMP_PATH_STORAGE
 from rafcon.utils.hashable import Hashable
 from rafcon.utils.vividict import Vividict
-from rafcon.core.decorators import lock_state_machine
+from rafcon.core.decorators import lock_state_machine, lock_state_machine_runtime
 
 logger = log.get_logger(__name__)
 PATH_SEPARATOR = '/'
 
+# Incremented whenever the parent of any state changes, which invalidates all cached state machine references
+_hierarchy_version = 0
+_hierarchy_version_lock = threading.Lock()
+# serializes the deferred reading of semantic data files, see State.set_semantic_data_file()
+_semantic_data_file_lock = threading.Lock()
+
+
+def invalidate_state_machine_references():
+    """Invalidates the state machine references cached by :meth:`State.get_state_machine`
+
+    Must be called whenever the parent of a state is changed without the use of the parent setter.
+    """
+    global _hierarchy_version
+    with _hierarchy_version_lock:
+        _hierarchy_version += 1
+
 
 class State(Observable, YAMLObject, JSONObject, Hashable):
 
@@ -74,6 +95,18 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
     """
 
     _parent = None
+    _state_machine_cache = None
+    _profiling_start_time = None
+    _profiling_run_start = None
+    # the file the semantic data is read from on first access, see set_semantic_data_file()
+    _semantic_data_file = None
+    # incremented with every modification of the state or its elements, see modification_version
+    _modification_version = 0
+    # maps storage base paths to the state path and modification version of the last save, see storage.py
+    _stored_versions = None
+    # observed methods, which only change the runtime data of the state
+    _runtime_methods = frozenset(['input_data', 'output_data', 'final_outcome', 'concurrency_queue', 'scoped_data',
+                                  'state_execution_status'])
     _state_element_attrs = ['income', 'outcomes', 'input_data_ports', 'output_data_ports']
 
     def __init__(self, name=None, state_id=None, input_data_ports=None, output_data_ports=None,
@@ -158,6 +191,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         self._name = str(name) if isinstance(name, (int, float)) else name
         if parent:
             self._parent = ref(parent)
+            invalidate_state_machine_references()
         else:
             self._parent = None
         self._input_data_ports = input_data_ports if input_data_ports is not None else {}
@@ -287,8 +321,31 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         if generate_run_id:
             self._run_id = run_id_generator()
         self.backward_execution = copy.copy(backward_execution)
-        self.thread = threading.Thread(target=self.run)
-        self.thread.start()
+        execution_profiler.state_started(self)
+        if get_state_execution_mode() == THREAD_MODE:
+            self.thread = threading.Thread(target=self.run)
+            self.thread.start()
+        else:
+            self.thread = get_state_execution_pool().submit(self.run)
+
+    def start_and_join(self, execution_history, backward_execution=False, generate_run_id=True):
+        """ Executes the state and waits until it finished execution.
+
+        Depending on the config value ``STATE_EXECUTION_MODE``, the state is either run directly in the calling
+        thread (``INLINE``) or started in a separate thread, which is joined afterwards.
+
+        :return:
+        """
+        if get_state_execution_mode() == INLINE_MODE:
+            self.execution_history = execution_history
+            if generate_run_id:
+                self._run_id = run_id_generator()
+            self.backward_execution = copy.copy(backward_execution)
+            self.thread = None
+            self.run()
+        else:
+            self.start(execution_history, backward_execution, generate_run_id)
+            self.join()
 
     def generate_run_id(self):
         self._run_id = run_id_generator()
@@ -309,6 +366,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         :raises exceptions.TypeError: if the input or output data are not of type dict
         """
         self._execution_counter += 1
+        execution_profiler.run_started(self)
         self.state_execution_status = StateExecutionStatus.ACTIVE
         self.preempted = False
         if not isinstance(self.input_data, dict):
@@ -318,6 +376,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         self.check_input_data_type()
 
     def setup_backward_run(self):
+        execution_profiler.run_started(self)
         self.state_execution_status = StateExecutionStatus.ACTIVE
         self.preempted = False
 
@@ -613,22 +672,39 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
     def get_state_machine(self):
         """Get a reference of the state_machine the state belongs to
 
+        The reference is cached until the parent of any state changes, thus repeated calls do not walk up the
+        hierarchy.
+
         :rtype rafcon.core.state_machine.StateMachine
         :return: respective state machine
         """
-        if self.parent:
+        cache = self._state_machine_cache
+        if cache is not None and cache[0] == _hierarchy_version:
+            if cache[1] is None:
+                return None
+            state_machine = cache[1]()
+            if state_machine is not None:
+                return state_machine
+
+        # the version is read before the hierarchy is walked, thus a concurrent change invalidates the new cache entry
+        version = _hierarchy_version
+        state_machine = None
+        parent = self.parent
+        if parent:
             if self.is_root_state:
-                return self.parent
+                state_machine = parent
             else:
-                return self.parent.get_state_machine()
-
-        return None
+                state_machine = parent.get_state_machine()
+        self._state_machine_cache = (version, ref(state_machine) if state_machine is not None else None)
+        return state_machine
 
     @property
     def file_system_path(self):
         """Provides the path in the file system where the state is stored
 
-        The method returns None if the state was not stored, before,
+        The method returns None if the state was not stored, before. For states loaded from a packed state machine
+        file, the path is located within the packed file and does not exist, see
+        :mod:`rafcon.core.storage.packed_storage`.
 
         :rtype: str
         :return: the path on the file system where the state is stored
@@ -636,7 +712,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._file_system_path
 
     @file_system_path.setter
-    @lock_state_machine
+    @lock_state_machine_runtime
     def file_system_path(self, file_system_path):
         """Setter for file_system_path attribute of state
 
@@ -1073,6 +1149,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
                 raise TypeError("parent must be of type State or StateMachine or None")
 
             self._parent = ref(parent)
+        invalidate_state_machine_references()
 
     @property
     def input_data_ports(self):
@@ -1306,7 +1383,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._preempted.is_set()
 
     @preempted.setter
-    @lock_state_machine
+    @lock_state_machine_runtime
     def preempted(self, preempted):
         if not isinstance(preempted, bool):
             raise TypeError("preempted must be of type bool")
@@ -1322,7 +1399,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._started.is_set()
 
     @started.setter
-    @lock_state_machine
+    @lock_state_machine_runtime
     def started(self, started):
         if not isinstance(started, bool):
             raise TypeError("started must be of type bool")
@@ -1338,7 +1415,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._paused.is_set()
 
     @paused.setter
-    @lock_state_machine
+    @lock_state_machine_runtime
     def paused(self, paused):
         if not isinstance(paused, bool):
             raise TypeError("paused must be of type bool")
@@ -1392,7 +1469,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._final_outcome
 
     @final_outcome.setter
-    @lock_state_machine
+    @lock_state_machine_runtime
     #@Observable.observed
     def final_outcome(self, final_outcome):
         if not isinstance(final_outcome, Outcome):
@@ -1437,13 +1514,39 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._state_execution_status
 
     @state_execution_status.setter
-    @lock_state_machine
-    @Observable.observed
+    @lock_state_machine_runtime
     def state_execution_status(self, state_execution_status):
+        """Setter for the execution status
+
+        If the :data:`execution_status_channel` is enabled, the change is only published to the channel. The consumer
+        draining the channel emits the observable notifications of the coalesced changes, see
+        :meth:`notify_state_execution_status`. Otherwise, the observable notification is emitted immediately.
+        """
         if not isinstance(state_execution_status, StateExecutionStatus):
             raise TypeError("state_execution_status must be of type StateExecutionStatus")
 
+        if execution_status_channel.enabled:
+            self._state_execution_status = state_execution_status
+            execution_status_channel.publish(self, state_execution_status)
+        else:
+            self._change_state_execution_status(state_execution_status)
+
+    def _change_state_execution_status(self, state_execution_status):
         self._state_execution_status = state_execution_status
+    # observers identify the notification by the method name, which thus has to be the name of the property
+    _change_state_execution_status.__name__ = 'state_execution_status'
+    _change_state_execution_status = Observable.observed(_change_state_execution_status)
+
+    def notify_state_execution_status(self, state_execution_status):
+        """Emits the observable notification of an execution status change, which was already applied
+
+        Used for the changes drained from the :data:`execution_status_channel`. The notification equals the one of
+        the setter of :attr:`state_execution_status`.
+
+        :param StateExecutionStatus state_execution_status: the status drained from the channel
+        """
+    notify_state_execution_status.__name__ = 'state_execution_status'
+    notify_state_execution_status = Observable.observed(notify_state_execution_status)
 
     @property
     def is_root_state(self):
@@ -1514,6 +1617,8 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         if outcome is not None:
             self.final_outcome = outcome
 
+        execution_profiler.run_finished(self)
+
         # If we are within a concurrency state, we have to notify it about our finalization
         if self.concurrency_queue:
             self.concurrency_queue.put(self.state_id)
@@ -1545,6 +1650,8 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         """Property for the _semantic_data field
 
         """
+        if self._semantic_data_file is not None:
+            self._load_semantic_data_file()
         return self._semantic_data
 
     @semantic_data.setter
@@ -1553,11 +1660,57 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
     def semantic_data(self, semantic_data):
         if not isinstance(semantic_data, dict):
             raise TypeError("semantic_data must be of type Vividict or dict")
+        self._semantic_data_file = None
         if isinstance(semantic_data, dict):
             self._semantic_data = Vividict(semantic_data)
         else:
             self._semantic_data = semantic_data
 
 
+    def set_semantic_data_file(self, semantic_data_file):
+        """Defers the reading of the semantic data from the given file until the semantic data is accessed
+
+        :param semantic_data_file: the full path of the semantic data file or a callable returning the content of the
+            file
+        """
+        self._semantic_data_file = semantic_data_file
+
+    def _load_semantic_data_file(self):
+        with _semantic_data_file_lock:
+            semantic_data_file = self._semantic_data_file
+            if semantic_data_file is not None:
+                try:
+                    if callable(semantic_data_file):
+                        semantic_data = storage_utils.load_objects_from_json_string(semantic_data_file())
+                    else:
+                        semantic_data = storage_utils.load_objects_from_json(semantic_data_file)
+                    self._semantic_data = Vividict(semantic_data)
+                except Exception:
+                    # semantic data file does not have to be there
+                    pass
+                self._semantic_data_file = None
+
+    @property
+    def modification_version(self):
+        """A counter, which is incremented with every modification of the state or one of its elements
+
+        Changes of the runtime data, e.g. the input data or the execution status, are not counted. The counter is used
+        to only save the states that were modified since the last save, see
+        :func:`rafcon.core.storage.storage.save_state_recursively`.
+
+        :rtype: int
+        """
+        return self._modification_version
+
+    def increment_modification_version(self):
+        """Marks the state as modified, e.g. if one of its elements changed"""
+        self._modification_version += 1
+
+    def _notify_method_after(self, instance, name, res_val, args, kwargs):
+        if name not in self._runtime_methods:
+            self._modification_version += 1
+        super(State, self)._notify_method_after(instance, name, res_val, args, kwargs)
+
+
 StateType = Enum('STATE_TYPE', 'EXECUTION HIERARCHY BARRIER_CONCURRENCY PREEMPTION_CONCURRENCY LIBRARY DECIDER_STATE')
 StateExecutionStatus = Enum('STATE_EXECUTION_STATE', 'INACTIVE ACTIVE EXECUTE_CHILDREN WAIT_FOR_NEXT_STATE')
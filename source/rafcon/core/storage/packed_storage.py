@@ -0,0 +1,314 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: packed_storage
+   :synopsis: A module to pack a stored state machine into a single file and to load state machines from such files
+
+A packed state machine file contains all files of a state machine directory. It starts with a fixed size header,
+followed by an index and the concatenated file contents::
+
+    header:  magic (10 bytes) | format version (uint16) | index length (uint64)
+    index:   JSON object mapping the relative file paths to (offset, length) tuples
+    data:    the file contents, offsets are relative to the begin of the data
+
+The file is memory-mapped when loading, thus single files can be read without further system calls. Packed state
+machines are loaded with :func:`rafcon.core.storage.storage.load_state_machine_from_path`. To change them, they have to
+be unpacked.
+
+The ``file_system_path`` of the states of a packed state machine is formed by the path of the packed file and the
+relative path of the state directory, e.g. ``my_sm.rafcon/root_state_id/child_state_id``. This directory does not
+exist. Scripts, which access further files relative to the path of their state, e.g. via
+``self.get_file_system_path()``, require the state machine to be unpacked.
+
+"""
+
+from builtins import object
+from builtins import str
+from functools import partial
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from timeit import default_timer as timer
+
+from rafcon.core.storage.storage import StateDirectory, build_state_recursively, FILE_NAME_CORE_DATA, \
+    STATEMACHINE_FILE
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+PACKED_FILE_MAGIC = b"RAFCONPACK"
+PACKED_FILE_FORMAT_VERSION = 1
+PACKED_FILE_EXTENSION = ".rafcon"
+
+# os.rename does not replace existing files on Windows
+_replace_file = getattr(os, 'replace', os.rename)
+
+_HEADER = struct.Struct("<{0}sHQ".format(len(PACKED_FILE_MAGIC)))
+
+
+def is_packed_state_machine_file(path):
+    """Checks whether the given path is a packed state machine file
+
+    :param str path: the path to check
+    :rtype: bool
+    """
+    if not os.path.isfile(path):
+        return False
+    with open(path, 'rb') as packed_file:
+        return packed_file.read(len(PACKED_FILE_MAGIC)) == PACKED_FILE_MAGIC
+
+
+def pack_state_machine(state_machine_path, packed_file_path):
+    """Packs all files of a stored state machine into a single file
+
+    The file is written to a temporary file first, which is renamed afterwards. Python byte code and cache folders are
+    skipped.
+
+    :param str state_machine_path: the directory of the state machine
+    :param str packed_file_path: the path of the packed file
+    :return: the number of packed files
+    :rtype: int
+    :raises ValueError: if the directory does not contain a state machine
+    """
+    if not os.path.isfile(os.path.join(state_machine_path, STATEMACHINE_FILE)):
+        raise ValueError("Provided path doesn't contain a valid state machine: {0}".format(state_machine_path))
+
+    relative_paths = []
+    for dir_path, dir_names, file_names in os.walk(state_machine_path):
+        dir_names[:] = sorted(dir_name for dir_name in dir_names if dir_name != "__pycache__")
+        for file_name in sorted(file_names):
+            if file_name.endswith(".pyc"):
+                continue
+            relative_path = os.path.relpath(os.path.join(dir_path, file_name), state_machine_path)
+            relative_paths.append(relative_path.replace(os.sep, '/'))
+
+    index = {}
+    contents = []
+    offset = 0
+    for relative_path in relative_paths:
+        with open(os.path.join(state_machine_path, *relative_path.split('/')), 'rb') as source_file:
+            content = source_file.read()
+        index[relative_path] = (offset, len(content))
+        contents.append(content)
+        offset += len(content)
+    index_data = json.dumps(index, sort_keys=True).encode('utf-8')
+
+    temporary_file_path = packed_file_path + ".tmp"
+    with open(temporary_file_path, 'wb') as packed_file:
+        packed_file.write(_HEADER.pack(PACKED_FILE_MAGIC, PACKED_FILE_FORMAT_VERSION, len(index_data)))
+        packed_file.write(index_data)
+        for content in contents:
+            packed_file.write(content)
+    _replace_file(temporary_file_path, packed_file_path)
+    logger.debug("Packed {0} files of state machine {1} into {2}".format(len(relative_paths), state_machine_path,
+                                                                         packed_file_path))
+    return len(relative_paths)
+
+
+def unpack_state_machine(packed_file_path, state_machine_path):
+    """Writes the files of a packed state machine into a directory
+
+    :param str packed_file_path: the path of the packed file
+    :param str state_machine_path: the directory of the state machine, which is created if not existing
+    :return: the number of unpacked files
+    :rtype: int
+    :raises ValueError: if the path of a packed file is absolute or leads out of the state machine directory
+    """
+    packed_file = PackedStateMachineFile(packed_file_path)
+    try:
+        target_path = os.path.abspath(state_machine_path)
+        file_paths = []
+        for relative_path in packed_file.file_paths:
+            file_path = os.path.normpath(os.path.join(target_path, *relative_path.split('/')))
+            if os.path.isabs(relative_path) or not file_path.startswith(os.path.join(target_path, '')):
+                raise ValueError("The packed state machine {0} contains the invalid file path {1}".format(
+                    packed_file_path, relative_path))
+            file_paths.append((relative_path, file_path))
+        for relative_path, file_path in file_paths:
+            if not os.path.isdir(os.path.dirname(file_path)):
+                os.makedirs(os.path.dirname(file_path))
+            with open(file_path, 'wb') as target_file:
+                target_file.write(packed_file.read_bytes(relative_path))
+        return len(packed_file.file_paths)
+    finally:
+        packed_file.close()
+
+
+class PackedStateDirectory(StateDirectory):
+    """A state directory within a packed state machine file
+
+    :ivar PackedStateMachineFile packed_file: the packed file containing the directory
+    :ivar str relative_path: the path of the directory relative to the state machine directory
+    """
+
+    __slots__ = ('packed_file', 'relative_path')
+
+    def __init__(self, packed_file, relative_path):
+        super(PackedStateDirectory, self).__init__(os.path.join(packed_file.path, *relative_path.split('/')))
+        self.packed_file = packed_file
+        self.relative_path = relative_path
+
+    def get_deferred_file(self, file_name):
+        return partial(self.packed_file.read_file, self.relative_path + '/' + file_name)
+
+    def read_file(self, file_name):
+        return self.packed_file.read_file(self.relative_path + '/' + file_name)
+
+
+class PackedStateMachineFile(object):
+    """Random access to the files of a packed state machine
+
+    The file is memory-mapped until :meth:`close` is called or the object is garbage collected. Deferred script texts
+    and semantic data of states loaded from the file keep a reference to it.
+
+    :ivar str path: the path of the packed file
+    :ivar list file_paths: the relative paths of all packed files
+    :raises ValueError: if the file is no valid packed state machine file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as packed_file:
+            header = packed_file.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError("Provided file is no packed state machine: {0}".format(path))
+            magic, version, index_length = _HEADER.unpack(header)
+            if magic != PACKED_FILE_MAGIC:
+                raise ValueError("Provided file is no packed state machine: {0}".format(path))
+            if version > PACKED_FILE_FORMAT_VERSION:
+                raise ValueError("The packed state machine {0} has the unsupported format version {1}".format(
+                    path, version))
+            self._index = json.loads(packed_file.read(index_length).decode('utf-8'))
+            self._data_offset = _HEADER.size + index_length
+            self._mmap = mmap.mmap(packed_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if STATEMACHINE_FILE not in self._index:
+            raise ValueError("Provided file doesn't contain a valid state machine: {0}".format(path))
+
+    @property
+    def file_paths(self):
+        return sorted(self._index.keys())
+
+    def read_bytes(self, relative_path):
+        """Reads a packed file
+
+        :param str relative_path: the path of the file relative to the state machine directory, separated by '/'
+        :return: the content of the file or None, if there is no such file
+        :rtype: bytes
+        """
+        entry = self._index.get(relative_path)
+        if entry is None:
+            return None
+        start = self._data_offset + entry[0]
+        return self._mmap[start:start + entry[1]]
+
+    def read_file(self, relative_path):
+        """Reads a packed text file
+
+        :param str relative_path: the path of the file relative to the state machine directory, separated by '/'
+        :return: the content of the file or None, if there is no such file
+        :rtype: str
+        """
+        content = self.read_bytes(relative_path)
+        return content.decode('utf-8') if content is not None else None
+
+    def get_state_directories(self, state_storage_id):
+        """Builds the directory tree of a state and its descendants from the index
+
+        :param str state_storage_id: the path of the state directory relative to the state machine directory
+        :return: the directory of the state
+        :rtype: PackedStateDirectory
+        """
+        directories = {}
+        for relative_path in self._index:
+            parts = relative_path.split('/')
+            for depth in range(1, len(parts)):
+                directory_path = '/'.join(parts[:depth])
+                if directory_path not in directories:
+                    directories[directory_path] = PackedStateDirectory(self, directory_path)
+            if len(parts) > 1:
+                directories['/'.join(parts[:-1])].file_names.add(parts[-1])
+        for directory_path in sorted(directories):
+            state_directory = directories[directory_path]
+            parent_path = directory_path.rpartition('/')[0]
+            # sub-directories without core data file do not contain a state
+            if parent_path in directories and FILE_NAME_CORE_DATA in state_directory.file_names:
+                directories[parent_path].children.append(state_directory)
+        return directories.get(state_storage_id)
+
+    def load_state(self, parent, state_storage_id, dirty_states, timings=None):
+        """Loads a state and its descendants from the packed file
+
+        :param parent: the state machine or state the loaded state is added to
+        :param str state_storage_id: the path of the state directory relative to the state machine directory
+        :param dirty_states: a list collecting the states which changed during loading
+        :param dict timings: if given, the durations of the phases `scan`, `read` and `build` are stored in seconds
+        :return: the loaded state
+        """
+        timings = {} if timings is None else timings
+        start_time = timer()
+        state_directory = self.get_state_directories(state_storage_id)
+        if state_directory is None:
+            raise ValueError("The packed state machine {0} contains no state {1}".format(self.path, state_storage_id))
+        scan_time = timer()
+        pending = [state_directory]
+        while pending:
+            current_directory = pending.pop()
+            current_directory.core_data = current_directory.read_file(
+                os.path.basename(current_directory.core_data_file))
+            pending.extend(current_directory.children)
+        read_time = timer()
+        state = build_state_recursively(parent, state_directory, dirty_states)
+        timings['scan'] = scan_time - start_time
+        timings['read'] = read_time - scan_time
+        timings['build'] = timer() - read_time
+        return state
+
+    def close(self):
+        self._mmap.close()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Pack a state machine into a single file or unpack such a file")
+    subparsers = parser.add_subparsers(dest='command')
+    pack_parser = subparsers.add_parser('pack', help="pack a state machine directory")
+    pack_parser.add_argument('state_machine_path', help="path of the state machine directory")
+    pack_parser.add_argument('packed_file_path', nargs='?', default=None,
+                             help="path of the packed file, defaults to the directory path with the extension "
+                                  "'{0}'".format(PACKED_FILE_EXTENSION))
+    unpack_parser = subparsers.add_parser('unpack', help="unpack a packed state machine file")
+    unpack_parser.add_argument('packed_file_path', help="path of the packed file")
+    unpack_parser.add_argument('state_machine_path', help="path of the state machine directory to be created")
+    arguments = parser.parse_args(args)
+
+    try:
+        if arguments.command == 'pack':
+            packed_file_path = arguments.packed_file_path
+            if packed_file_path is None:
+                packed_file_path = os.path.normpath(arguments.state_machine_path) + PACKED_FILE_EXTENSION
+            number_of_files = pack_state_machine(arguments.state_machine_path, packed_file_path)
+            logger.info("Packed {0} files into {1}".format(number_of_files, packed_file_path))
+        elif arguments.command == 'unpack':
+            number_of_files = unpack_state_machine(arguments.packed_file_path, arguments.state_machine_path)
+            logger.info("Unpacked {0} files into {1}".format(number_of_files, arguments.state_machine_path))
+        else:
+            parser.print_help()
+            return 1
+    except (ValueError, IOError, OSError) as e:
+        logger.error(str(e))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
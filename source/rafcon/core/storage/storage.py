@@ -19,7 +19,12 @@
 from weakref import ref
 from future.utils import string_types
 from builtins import str
+from builtins import object
 import os
+import atexit
+import threading
+from multiprocessing.pool import ThreadPool
+from timeit import default_timer as timer
 import re
 import math
 import shutil
@@ -152,22 +157,37 @@ def save_state_machine_to_path(state_machine, base_path, delete_old_state_machin
     The `as_copy` flag determines whether the state machine is saved as copy. If so (`as_copy=True`), some state
     machine attributes will be left untouched, such as the `file_system_path` or the `dirty_flag`.
 
+    The files of states, which were not modified since they were last saved to or loaded from `base_path`, are not
+    written again, see :func:`save_state_recursively`. This can be disabled with the config value
+    ``STORAGE_INCREMENTAL_SAVE``. All files are written atomically, i.e. to a temporary file first, which then
+    replaces the previous file.
+
     :param rafcon.core.state_machine.StateMachine state_machine: the state_machine to be saved
     :param str base_path: base_path to which all further relative paths refers to
     :param bool delete_old_state_machine: Whether to delete any state machine existing at the given path
     :param bool as_copy: Whether to use a copy storage for the state machine
+    :return: the number of written files
+    :rtype: int
     """
+    if os.path.isfile(base_path):
+        raise ValueError("Cannot save state machine to {0}, as it is a file, e.g. a packed state machine. Unpack it "
+                         "to save changes.".format(base_path))
+
     # warns the user in the logger when using deprecated names
     clean_path_from_deprecated_naming(base_path)
 
     state_machine.acquire_modification_lock()
     try:
         root_state = state_machine.root_state
+        write_all = not global_config.get_config_value("STORAGE_INCREMENTAL_SAVE", True)
 
         # clean old path first
         if delete_old_state_machine:
             if os.path.exists(base_path):
+                # the files of deferred script texts and semantic data might be removed
+                load_deferred_state_data_recursively(root_state)
                 shutil.rmtree(base_path)
+            write_all = True
 
         # Ensure that path is existing
         if not os.path.exists(base_path):
@@ -176,7 +196,7 @@ def save_state_machine_to_path(state_machine, base_path, delete_old_state_machin
         old_update_time = state_machine.last_update
         state_machine.last_update = storage_utils.get_current_time_string()
         state_machine_dict = state_machine.to_dict()
-        storage_utils.write_dict_to_json(state_machine_dict, os.path.join(base_path, STATEMACHINE_FILE))
+        storage_utils.write_dict_to_json(state_machine_dict, os.path.join(base_path, STATEMACHINE_FILE), atomic=True)
 
         # set the file_system_path of the state machine
         if not as_copy:
@@ -185,12 +205,15 @@ def save_state_machine_to_path(state_machine, base_path, delete_old_state_machin
             state_machine.last_update = old_update_time
 
         # add root state recursively
+        load_deferred_data_of_moved_states(root_state, base_path, "")
         remove_obsolete_folders([root_state], base_path)
-        save_state_recursively(root_state, base_path, "", as_copy)
+        number_of_written_files = 1 + save_state_recursively(root_state, base_path, "", as_copy, write_all)
 
         if state_machine.marked_dirty and not as_copy:
             state_machine.marked_dirty = False
-        logger.debug("State machine with id {0} was saved at {1}".format(state_machine.state_machine_id, base_path))
+        logger.debug("State machine with id {0} was saved at {1} ({2} files written)".format(
+            state_machine.state_machine_id, base_path, number_of_written_files))
+        return number_of_written_files
     except Exception:
         raise
     finally:
@@ -212,7 +235,7 @@ def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=F
         destination_script_file = os.path.join(state_path_full, SCRIPT_FILE)
 
         try:
-            write_file(destination_script_file, state.script_text)
+            write_file(destination_script_file, state.script_text, atomic=True)
         except Exception:
             logger.exception("Storing of script file failed: {0} -> {1}".format(state.get_path(),
                                                                                 destination_script_file))
@@ -226,82 +249,213 @@ def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=F
 def save_semantic_data_for_state(state, state_path_full):
     """Saves the semantic data in a separate json file.
 
+    The file of a state without semantic data is removed.
+
     :param state: The state of which the script file should be saved
     :param str state_path_full: The path to the file system storage location of the state
+    :return: whether the file was written
+    :rtype: bool
     """
 
     destination_script_file = os.path.join(state_path_full, SEMANTIC_DATA_FILE)
 
     if state.semantic_data:
         try:
-            storage_utils.write_dict_to_json(state.semantic_data, destination_script_file)
+            storage_utils.write_dict_to_json(state.semantic_data, destination_script_file, atomic=True)
         except IOError:
             logger.exception("Storing of semantic data for state {0} failed! Destination path: {1}".
                              format(state.get_path(), destination_script_file))
             raise
+        return True
+    if os.path.exists(destination_script_file):
+        os.remove(destination_script_file)
+    return False
 
 
-def save_state_recursively(state, base_path, parent_path, as_copy=False):
+def save_state_recursively(state, base_path, parent_path, as_copy=False, write_all=False):
     """Recursively saves a state to a json file
 
-    It calls this method on all its substates.
+    It calls this method on all its substates. The files of a state are only written, if the state was modified
+    since it was last saved to or loaded from `base_path` (see :attr:`rafcon.core.states.state.State.
+    modification_version`), if it is marked dirty or if its path changed. Obsolete folders are only removed in
+    the folders of written states and of states with moved child states.
 
     :param state: State to be stored
     :param base_path: Path to the state machine
     :param parent_path: Path to the parent state
     :param bool as_copy: Temporary storage flag to signal that the given path is not the new file_system_path
-    :return:
+    :param bool write_all: Whether to write the files of all states, including the unmodified ones
+    :return: the number of written files
+    :rtype: int
     """
     from rafcon.core.states.execution_state import ExecutionState
     from rafcon.core.states.container_state import ContainerState
 
     state_path = os.path.join(parent_path, get_storage_id_for_state(state))
     state_path_full = os.path.join(base_path, state_path)
-    if not os.path.exists(state_path_full):
-        os.makedirs(state_path_full)
+    storage_key = _get_storage_key(base_path)
+    number_of_written_files = 0
 
-    storage_utils.write_dict_to_json(state, os.path.join(state_path_full, FILE_NAME_CORE_DATA))
-    if not as_copy:
-        state.file_system_path = state_path_full
+    state_written = write_all or not _is_stored(state, storage_key, state_path) or \
+        (not as_copy and state.file_system_path != state_path_full)
+    if state_written:
+        if not os.path.exists(state_path_full):
+            os.makedirs(state_path_full)
 
-    if isinstance(state, ExecutionState):
-        save_script_file_for_state_and_source_path(state, state_path_full, as_copy)
+        storage_utils.write_dict_to_json(state, os.path.join(state_path_full, FILE_NAME_CORE_DATA), atomic=True)
+        number_of_written_files += 1
+        if not as_copy:
+            state.file_system_path = state_path_full
+            state.marked_dirty = False
 
-    save_semantic_data_for_state(state, state_path_full)
+        if isinstance(state, ExecutionState):
+            save_script_file_for_state_and_source_path(state, state_path_full, as_copy)
+            number_of_written_files += 1
+
+        if save_semantic_data_for_state(state, state_path_full):
+            number_of_written_files += 1
+        _set_stored(state, storage_key, state_path)
 
     # create yaml files for all children
     if isinstance(state, ContainerState):
-        remove_obsolete_folders(state.states.values(), os.path.join(base_path, state_path))
-        for state in state.states.values():
-            save_state_recursively(state, base_path, state_path, as_copy)
+        child_states = list(state.states.values())
+        if state_written or any(_get_stored_path(child_state, storage_key) !=
+                                os.path.join(state_path, get_storage_id_for_state(child_state))
+                                for child_state in child_states):
+            remove_obsolete_folders(child_states, state_path_full)
+        for child_state in child_states:
+            number_of_written_files += save_state_recursively(child_state, base_path, state_path, as_copy, write_all)
+    return number_of_written_files
+
+
+def _get_storage_key(base_path):
+    return os.path.normpath(os.path.abspath(base_path))
+
+
+def _get_semantic_data_hash(state):
+    """Returns a hash of the semantic data of a state or None, if the semantic data was not yet read
+
+    The semantic data is a dictionary, which might be modified without notification.
+    """
+    if state._semantic_data_file is not None:
+        return None
+    if not state.semantic_data:
+        return 0
+    return hash(storage_utils.get_json_string(state.semantic_data))
+
+
+def _get_stored_path(state, storage_key):
+    if state._stored_versions is None or storage_key not in state._stored_versions:
+        return None
+    return state._stored_versions[storage_key][0]
+
+
+def _is_stored(state, storage_key, state_path):
+    """Checks whether the files of a state at the given path exist and are up to date
+
+    :param state: the state to check
+    :param str storage_key: the normalized path of the state machine
+    :param str state_path: the path of the state relative to the state machine
+    :rtype: bool
+    """
+    if state.marked_dirty or state._stored_versions is None or storage_key not in state._stored_versions:
+        return False
+    stored_path, stored_version, stored_semantic_data_hash = state._stored_versions[storage_key]
+    if stored_path != state_path or stored_version != state.modification_version:
+        return False
+    # the folder of the state might have been removed in the meantime, e.g. by the user or with an old backup
+    if not os.path.isfile(os.path.join(storage_key, state_path, FILE_NAME_CORE_DATA)):
+        return False
+    semantic_data_hash = _get_semantic_data_hash(state)
+    if stored_semantic_data_hash is None:
+        # the semantic data was not read when the state was stored, thus it is assumed to be unchanged
+        state._stored_versions[storage_key] = (stored_path, stored_version, semantic_data_hash)
+        return True
+    return semantic_data_hash is None or semantic_data_hash == stored_semantic_data_hash
+
+
+def _set_stored(state, storage_key, state_path):
+    if state._stored_versions is None:
+        state._stored_versions = {}
+    state._stored_versions[storage_key] = (state_path, state.modification_version, _get_semantic_data_hash(state))
+
+
+def set_states_stored_recursively(state, base_path):
+    """Records a state and its descendants as stored in their current file system path
+
+    Such states are not written again by :func:`save_state_recursively`, until they are modified.
+
+    :param state: the state to start with
+    :param str base_path: the path of the state machine
+    """
+    from rafcon.core.states.container_state import ContainerState
+    if state.file_system_path is None or state.marked_dirty:
+        return
+    _set_stored(state, _get_storage_key(base_path), os.path.relpath(state.file_system_path, base_path))
+    if isinstance(state, ContainerState):
+        for child_state in state.states.values():
+            set_states_stored_recursively(child_state, base_path)
+
+
+def load_deferred_data_of_moved_states(state, base_path, parent_path):
+    """Reads the deferred script texts and semantic data of states, which are saved to another folder of `base_path`
+
+    The previous folders of these states are removed while saving, including the files the deferred data is read from.
+
+    :param state: the state to start with
+    :param str base_path: the path of the state machine
+    :param str parent_path: the path of the parent state relative to the state machine
+    """
+    from rafcon.core.states.container_state import ContainerState
+    state_path = os.path.join(parent_path, get_storage_id_for_state(state))
+    if state.file_system_path is not None and state.file_system_path != os.path.join(base_path, state_path) and \
+            _get_storage_key(state.file_system_path).startswith(_get_storage_key(base_path) + os.sep):
+        load_deferred_state_data_recursively(state)
+    elif isinstance(state, ContainerState):
+        for child_state in state.states.values():
+            load_deferred_data_of_moved_states(child_state, base_path, state_path)
 
 
 @measure_time
-def load_state_machine_from_path(base_path, state_machine_id=None):
+def load_state_machine_from_path(base_path, state_machine_id=None, timings=None):
     """Loads a state machine from the given path
 
-    :param base_path: An optional base path for the state machine.
+    The state directories are scanned and the core data files are read by a pool of threads, see
+    :func:`load_state_recursively`.
+
+    :param base_path: An optional base path for the state machine, or the path of a packed state machine file, see
+        :mod:`rafcon.core.storage.packed_storage`
+    :param dict timings: if given, the durations of the loading phases (`scan`, `read`, `build` and `total`) are
+        stored in this dictionary in seconds
     :return: a tuple of the loaded container state, the version of the state and the creation time
     :raises ValueError: if the provided path does not contain a valid state machine
     """
     logger.debug("Loading state machine from path {0}...".format(base_path))
+    start_time = timer()
+    timings = {} if timings is None else timings
+
+    from rafcon.core.storage.packed_storage import is_packed_state_machine_file, PackedStateMachineFile
+    packed_file = None
+    if is_packed_state_machine_file(base_path):
+        packed_file = PackedStateMachineFile(base_path)
+        state_machine_dict = storage_utils.load_objects_from_json_string(packed_file.read_file(STATEMACHINE_FILE))
+    else:
+        state_machine_file_path = os.path.join(base_path, STATEMACHINE_FILE)
+        state_machine_file_path_old = os.path.join(base_path, STATEMACHINE_FILE_OLD)
 
-    state_machine_file_path = os.path.join(base_path, STATEMACHINE_FILE)
-    state_machine_file_path_old = os.path.join(base_path, STATEMACHINE_FILE_OLD)
-
-    # was the root state specified as state machine base_path to load from?
-    if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
+        # was the root state specified as state machine base_path to load from?
+        if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
 
-        # catch the case that a state machine root file is handed
-        if os.path.exists(base_path) and os.path.isfile(base_path):
-            base_path = os.path.dirname(base_path)
-            state_machine_file_path = os.path.join(base_path, STATEMACHINE_FILE)
-            state_machine_file_path_old = os.path.join(base_path, STATEMACHINE_FILE_OLD)
+            # catch the case that a state machine root file is handed
+            if os.path.exists(base_path) and os.path.isfile(base_path):
+                base_path = os.path.dirname(base_path)
+                state_machine_file_path = os.path.join(base_path, STATEMACHINE_FILE)
+                state_machine_file_path_old = os.path.join(base_path, STATEMACHINE_FILE_OLD)
 
-        if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
-            raise ValueError("Provided path doesn't contain a valid state machine: {0}".format(base_path))
+            if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
+                raise ValueError("Provided path doesn't contain a valid state machine: {0}".format(base_path))
 
-    state_machine_dict = storage_utils.load_objects_from_json(state_machine_file_path)
+        state_machine_dict = storage_utils.load_objects_from_json(state_machine_file_path)
     if 'used_rafcon_version' in state_machine_dict:
         previously_used_rafcon_version = StrictVersion(state_machine_dict['used_rafcon_version']).version
         active_rafcon_version = StrictVersion(rafcon.__version__).version
@@ -345,17 +499,26 @@ def load_state_machine_from_path(base_path, state_machine_id=None):
     else:
         root_state_storage_id = state_machine_dict['root_state_storage_id']
 
-    root_state_path = os.path.join(base_path, root_state_storage_id)
     state_machine.file_system_path = base_path
     dirty_states = []
-    state_machine.root_state = load_state_recursively(parent=state_machine, state_path=root_state_path,
-                                                      dirty_states=dirty_states)
+    if packed_file is not None:
+        state_machine.root_state = packed_file.load_state(parent=state_machine, state_storage_id=root_state_storage_id,
+                                                          dirty_states=dirty_states, timings=timings)
+    else:
+        root_state_path = os.path.join(base_path, root_state_storage_id)
+        state_machine.root_state = load_state_recursively(parent=state_machine, state_path=root_state_path,
+                                                          dirty_states=dirty_states, timings=timings)
     if state_machine.root_state is None:
         return  # a corresponding exception has been handled with a proper error log in load_state_recursively
+    timings['total'] = timer() - start_time
+    logger.debug("Loaded state machine {0} in {1:.3f}s (scan: {2:.3f}s, read: {3:.3f}s, build: {4:.3f}s)".format(
+        base_path, timings['total'], timings['scan'], timings['read'], timings['build']))
     if len(dirty_states) > 0:
         state_machine.marked_dirty = True
     else:
         state_machine.marked_dirty = False
+    if packed_file is None:
+        set_states_stored_recursively(state_machine.root_state, base_path)
 
     hierarchy_level = 0
     number_of_states, hierarchy_level = state_machine.root_state.get_states_statistics(hierarchy_level)
@@ -378,37 +541,247 @@ def load_state_from_path(state_path):
     return load_state_recursively(parent=None, state_path=state_path)
 
 
-def load_state_recursively(parent, state_path=None, dirty_states=[]):
+class StateDirectory(object):
+    """The content of a state directory, as needed to load the state
+
+    :ivar str path: the path of the directory
+    :ivar set file_names: the names of the files in the directory
+    :ivar list children: the :class:`StateDirectory` objects of the child states
+    :ivar str core_data: the content of the core data file
+    """
+
+    __slots__ = ('path', 'file_names', 'children', 'core_data')
+
+    def __init__(self, path):
+        self.path = path
+        self.file_names = set()
+        self.children = []
+        self.core_data = None
+
+    @property
+    def core_data_file(self):
+        # TODO: Should be removed with next minor release
+        if FILE_NAME_CORE_DATA not in self.file_names and FILE_NAME_CORE_DATA_OLD in self.file_names:
+            return os.path.join(self.path, FILE_NAME_CORE_DATA_OLD)
+        return os.path.join(self.path, FILE_NAME_CORE_DATA)
+
+    def get_deferred_file(self, file_name):
+        """Returns the file in the form expected by :meth:`rafcon.core.script.Script.set_script_file`
+
+        :param str file_name: the name of the file in the directory
+        :return: the full path of the file
+        """
+        return os.path.join(os.path.realpath(self.path), file_name)
+
+    def read_file(self, file_name):
+        """Reads a file of the directory
+
+        :param str file_name: the name of the file in the directory
+        :return: the content of the file or None, if the file does not exist
+        """
+        return read_file(self.path, file_name)
+
+
+if hasattr(os, 'scandir'):
+    def _scan_directory(path):
+        """Lists the names of the files and the paths of the sub-directories of a directory
+
+        With `os.scandir` the type of the entries is known without an additional stat call per entry. A directory,
+        which cannot be listed, e.g. as it does not exist, is treated as empty directory.
+        """
+        file_names = set()
+        dir_paths = []
+        try:
+            for entry in os.scandir(path):
+                if entry.is_dir():
+                    dir_paths.append(entry.path)
+                else:
+                    file_names.add(entry.name)
+        except OSError:
+            pass
+        return file_names, dir_paths
+else:
+    def _scan_directory(path):
+        file_names = set()
+        dir_paths = []
+        try:
+            names = os.listdir(path)
+        except OSError:
+            names = []
+        for name in names:
+            entry_path = os.path.join(path, name)
+            if os.path.isdir(entry_path):
+                dir_paths.append(entry_path)
+            else:
+                file_names.add(name)
+        return file_names, dir_paths
+
+
+def _read_text_file(path):
+    try:
+        with open(path, 'r') as file_pointer:
+            return file_pointer.read()
+    except (IOError, OSError):
+        return None
+
+
+class _LoadingPool(object):
+    """A thread pool of the given size together with the number of its running map calls
+
+    A pool replaced due to a changed config value ``STORAGE_LOADING_THREADS`` is retired and only closed after its last
+    map call returned.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.pool = ThreadPool(size)
+        self.users = 0
+        self.retired = False
+
+
+_loading_pool = None
+_loading_pool_lock = threading.Lock()
+
+
+def _map(func, iterable):
+    """Maps the function on the items using the loading thread pool, whose size is given by the config value
+    ``STORAGE_LOADING_THREADS``"""
+    global _loading_pool
+    items = list(iterable)
+    number_of_threads = global_config.get_config_value("STORAGE_LOADING_THREADS", 8)
+    if len(items) < 2 or not number_of_threads or number_of_threads < 2:
+        return [func(item) for item in items]
+    with _loading_pool_lock:
+        if _loading_pool is None or _loading_pool.size != number_of_threads:
+            if _loading_pool is not None:
+                _loading_pool.retired = True
+                if not _loading_pool.users:
+                    _loading_pool.pool.close()
+            _loading_pool = _LoadingPool(number_of_threads)
+        loading_pool = _loading_pool
+        loading_pool.users += 1
+    try:
+        return loading_pool.pool.map(func, items)
+    finally:
+        with _loading_pool_lock:
+            loading_pool.users -= 1
+            if loading_pool.retired and not loading_pool.users:
+                loading_pool.pool.close()
+
+
+@atexit.register
+def _close_loading_pool():
+    """Terminates the threads of the loading pool, before the interpreter tears down the modules they use"""
+    global _loading_pool
+    with _loading_pool_lock:
+        if _loading_pool is not None:
+            _loading_pool.pool.close()
+            _loading_pool.pool.join()
+            _loading_pool = None
+
+
+def scan_state_directories(state_path):
+    """Scans the directory of a state and all directories of its descendants
+
+    The directories of one hierarchy level are scanned in parallel. Sub-directories without a core data file are
+    skipped, e.g. `__pycache__` folders created for the script files.
+
+    :param str state_path: the path of the state directory
+    :return: the directory of the state
+    :rtype: StateDirectory
+    """
+    root_directory = StateDirectory(state_path)
+    level = [(None, root_directory)]
+    while level:
+        scan_results = _map(_scan_directory, [state_directory.path for _, state_directory in level])
+        next_level = []
+        for (parent_directory, state_directory), (file_names, dir_paths) in zip(level, scan_results):
+            if parent_directory is not None:
+                if FILE_NAME_CORE_DATA not in file_names:
+                    # this means that the directory is a folder, not containing a valid state
+                    continue
+                parent_directory.children.append(state_directory)
+            state_directory.file_names = file_names
+            next_level.extend((state_directory, StateDirectory(dir_path)) for dir_path in dir_paths)
+        level = next_level
+    return root_directory
+
+
+def read_core_data_files(state_directory):
+    """Reads the core data files of a state and all its descendants in parallel
+
+    :param StateDirectory state_directory: the directory of the state, as returned by :func:`scan_state_directories`
+    """
+    state_directories = []
+    pending = [state_directory]
+    while pending:
+        current_directory = pending.pop()
+        state_directories.append(current_directory)
+        pending.extend(current_directory.children)
+    core_data = _map(_read_text_file, [current_directory.core_data_file for current_directory in state_directories])
+    for current_directory, content in zip(state_directories, core_data):
+        current_directory.core_data = content
+
+
+def load_state_recursively(parent, state_path=None, dirty_states=[], timings=None):
     """Recursively loads the state
 
-    It calls this method on each sub-state of a container state.
+    The loading is done in three phases: First, the directories of the state and its descendants are scanned. Then,
+    their core data files are read. Both is done by a pool of threads with the size given by the config value
+    ``STORAGE_LOADING_THREADS``, as for state machines on network file systems the latency of the file accesses
+    dominates. Finally, the states are built from the core data. Script texts and semantic data are only read on first
+    access, if the config value ``STORAGE_LAZY_LOADING`` is True.
 
     :param parent:  the root state of the last load call to which the loaded state will be added
     :param state_path: the path on the filesystem where to find the meta file for the state
     :param dirty_states: a dict of states which changed during loading
+    :param dict timings: if given, the durations of the phases `scan`, `read` and `build` are stored in seconds
     :return:
     """
+    timings = {} if timings is None else timings
+    start_time = timer()
+    state_directory = scan_state_directories(state_path)
+    scan_time = timer()
+    read_core_data_files(state_directory)
+    read_time = timer()
+    state = build_state_recursively(parent, state_directory, dirty_states)
+    timings['scan'] = scan_time - start_time
+    timings['read'] = read_time - scan_time
+    timings['build'] = timer() - read_time
+    return state
+
+
+def build_state_recursively(parent, state_directory, dirty_states, lazy=None):
+    """Builds a state from its scanned directory and the ones of its descendants
+
+    :param parent:  the root state of the last load call to which the loaded state will be added
+    :param StateDirectory state_directory: the directory of the state with the read core data
+    :param dirty_states: a dict of states which changed during loading
+    :param bool lazy: whether to defer the reading of script texts and semantic data until their first access, if
+        None, the config value ``STORAGE_LAZY_LOADING`` is used
+    :return: the built state
+    """
+    if lazy is None:
+        lazy = global_config.get_config_value("STORAGE_LAZY_LOADING", True)
     from rafcon.core.states.execution_state import ExecutionState
     from rafcon.core.states.container_state import ContainerState
     from rafcon.core.states.hierarchy_state import HierarchyState
 
-    path_core_data = os.path.join(state_path, FILE_NAME_CORE_DATA)
+    state_path = state_directory.path
 
     logger.debug("Load state recursively: {0}".format(str(state_path)))
 
-    # TODO: Should be removed with next minor release
-    if not os.path.exists(path_core_data):
-        path_core_data = os.path.join(state_path, FILE_NAME_CORE_DATA_OLD)
-
     try:
-        state_info = load_data_file(path_core_data)
+        if state_directory.core_data is None:
+            raise ValueError("Data file not found: {0}".format(state_directory.core_data_file))
+        state_info = storage_utils.load_objects_from_json_string(state_directory.core_data)
     except ValueError as e:
         logger.exception("Error while loading state data: {0}".format(e))
         return
     except LibraryNotFoundException as e:
         logger.error("Library could not be loaded: {0}\n"
                      "Skipping library and continuing loading the state machine".format(e))
-        state_info = storage_utils.load_objects_from_json(path_core_data, as_dict=True)
+        state_info = storage_utils.load_objects_from_json_string(state_directory.core_data, as_dict=True)
         state_id = state_info["state_id"]
         dummy_state = HierarchyState(LIBRARY_NOT_FOUND_DUMMY_STATE_NAME, state_id=state_id)
         # set parent of dummy state
@@ -436,32 +809,32 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
 
     # read script file if state is an ExecutionState
     if isinstance(state, ExecutionState):
-        script_text = read_file(state_path, state.script.filename)
-        state.script.set_script_without_compilation(script_text)
+        if lazy:
+            state.script.set_script_file(state_directory.get_deferred_file(state.script.filename))
+        else:
+            state.script.set_script_without_compilation(state_directory.read_file(state.script.filename))
 
     # load semantic data
-    try:
-        semantic_data = load_data_file(os.path.join(state_path, SEMANTIC_DATA_FILE))
-        state.semantic_data = semantic_data
-    except Exception as e:
-        # semantic data file does not have to be there
-        pass
+    if SEMANTIC_DATA_FILE in state_directory.file_names:
+        if lazy:
+            state.set_semantic_data_file(state_directory.get_deferred_file(SEMANTIC_DATA_FILE))
+        else:
+            try:
+                state.semantic_data = storage_utils.load_objects_from_json_string(
+                    state_directory.read_file(SEMANTIC_DATA_FILE))
+            except Exception as e:
+                # semantic data file does not have to be valid
+                pass
 
     one_of_my_child_states_not_found = False
 
     # load child states
-    for p in os.listdir(state_path):
-        child_state_path = os.path.join(state_path, p)
-        if os.path.isdir(child_state_path):
-            if not os.path.exists(os.path.join(child_state_path, FILE_NAME_CORE_DATA)):
-                # this means that child_state_path is a folder, not containing a valid state
-                # this also happens when pip creates __pycache__ folders for the script.py files upon installing rafcon
-                continue
-            child_state = load_state_recursively(state, child_state_path, dirty_states)
-            if not child_state:
-                return None
-            if child_state.name is LIBRARY_NOT_FOUND_DUMMY_STATE_NAME:
-                one_of_my_child_states_not_found = True
+    for child_state_directory in state_directory.children:
+        child_state = build_state_recursively(state, child_state_directory, dirty_states, lazy)
+        if not child_state:
+            return None
+        if child_state.name is LIBRARY_NOT_FOUND_DUMMY_STATE_NAME:
+            one_of_my_child_states_not_found = True
 
     if one_of_my_child_states_not_found:
         # omit adding transitions and data flows in this case
@@ -475,9 +848,11 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
             state._transitions = transitions
             for _, transition in state.transitions.items():
                 transition._parent = ref(state)
+            state._invalidate_transition_lookup_table()
             state._data_flows = data_flows
             for _, data_flow in state.data_flows.items():
                 data_flow._parent = ref(state)
+            state._invalidate_data_flow_routing_index()
 
     state.file_system_path = state_path
 
@@ -487,6 +862,21 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
     return state
 
 
+def load_deferred_state_data_recursively(state):
+    """Reads the script texts and semantic data of a state and its descendants, which were not accessed since loading
+
+    :param rafcon.core.states.state.State state: the state to start with
+    """
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.states.container_state import ContainerState
+    state.semantic_data
+    if isinstance(state, ExecutionState):
+        state.script.script
+    elif isinstance(state, ContainerState):
+        for child_state in state.states.values():
+            load_deferred_state_data_recursively(child_state)
+
+
 def load_data_file(path_of_file):
     """ Loads the content of a file by using json.load.
 
@@ -22,7 +22,6 @@
 """
 
 from builtins import range
-from builtins import next
 from builtins import str
 from os import path
 from gi.repository import Gtk
@@ -61,6 +60,8 @@ class ExecutionHistoryTreeController(ExtendedController):
     LABEL_NAME_STORAGE_ID = 0
     HISTORY_ITEM_STORAGE_ID = 1
     TOOL_TIP_STORAGE_ID = 2
+    # the not yet inserted child items of a row as (history items, start index, stop index, is root) tuple
+    PENDING_CHILDREN_STORAGE_ID = 3
     TOOL_TIP_TEXT = "Right click for more details\n" \
                     "Middle click for external more detailed viewer\n" \
                     "Double click to select corresponding state"
@@ -70,7 +71,8 @@ class ExecutionHistoryTreeController(ExtendedController):
         assert isinstance(view, ExecutionHistoryView)
 
         super(ExecutionHistoryTreeController, self).__init__(model, view)
-        self.history_tree_store = Gtk.TreeStore(GObject.TYPE_STRING, GObject.TYPE_PYOBJECT, GObject.TYPE_STRING)
+        self.history_tree_store = Gtk.TreeStore(GObject.TYPE_STRING, GObject.TYPE_PYOBJECT, GObject.TYPE_STRING,
+                                                GObject.TYPE_PYOBJECT)
         # a TreeView
         self.history_tree = view['history_tree']
         self.history_tree.set_model(self.history_tree_store)
@@ -89,6 +91,7 @@ class ExecutionHistoryTreeController(ExtendedController):
     def register_view(self, view):
         super(ExecutionHistoryTreeController, self).register_view(view)
         self.history_tree.connect('button_press_event', self.mouse_click)
+        self.history_tree.connect('test-expand-row', self.on_test_expand_row)
         view['reload_button'].connect('clicked', self.reload_history)
         view['clean_button'].connect('clicked', self.clean_history)
         view['open_separately_button'].connect('clicked', self.open_selected_history_separately)
@@ -100,8 +103,7 @@ class ExecutionHistoryTreeController(ExtendedController):
 
         # check if valid history item (in case of concurrency not all tree items has a history item in the tree store
         if selected_history_item is None and model.iter_has_child(row):
-            child_iter = model.iter_nth_child(row, 0)
-            selected_history_item = model.get_value(child_iter, self.HISTORY_ITEM_STORAGE_ID)
+            selected_history_item = self.get_history_item_for_tree_iter(row)
             if selected_history_item is None:
                 logger.info("The selected element could not be connected to a run-id. Therefore, no run-id is handed "\
                             "to the external execution log viewer.")
@@ -257,7 +259,11 @@ class ExecutionHistoryTreeController(ExtendedController):
         """
         history_item = self.history_tree_store[child_tree_iter][self.HISTORY_ITEM_STORAGE_ID]
         if history_item is None:  # is dummy item
-            if self.history_tree_store.iter_n_children(child_tree_iter) > 0:
+            pending_children = self.history_tree_store[child_tree_iter][self.PENDING_CHILDREN_STORAGE_ID]
+            if pending_children is not None:
+                history_items, start, _, _ = pending_children
+                history_item = history_items[start]
+            elif self.history_tree_store.iter_n_children(child_tree_iter) > 0:
                 child_iter = self.history_tree_store.iter_nth_child(child_tree_iter, 0)
                 history_item = self.history_tree_store[child_iter][self.HISTORY_ITEM_STORAGE_ID]
             else:
@@ -273,7 +279,7 @@ class ExecutionHistoryTreeController(ExtendedController):
             history_item = self.get_history_item_for_tree_iter(child_tree_iter)
 
             # store expansion state if tree item path is valid and expansion state was not stored already
-            if tree_item_path is not None:
+            if tree_item_path is not None and history_item is not None:
                 # if first element of sub-tree has same history_item as the parent ignore it's expansion state
                 if history_item not in expansion_state:
                     expansion_state[history_item] = self.history_tree.row_expanded(tree_item_path)
@@ -389,6 +395,8 @@ class ExecutionHistoryTreeController(ExtendedController):
                     first_history_item = execution_history[0]
                     # the next lines filter out the StateMachineStartItem, which is not intended to
                     # be displayed, but merely as convenient entry point in the saved log file
+                    # the items of the runs are only inserted into the tree store when the row of the run is expanded
+                    history_items = list(execution_history)
                     if isinstance(first_history_item, StateMachineStartItem):
                         if len(execution_history) > 1:
                             first_history_item = execution_history[1]
@@ -396,8 +404,8 @@ class ExecutionHistoryTreeController(ExtendedController):
                                 None,
                                 None,
                                 (first_history_item.state_reference.name + " - Run " + str(execution_number + 1),
-                                 first_history_item, self.TOOL_TIP_TEXT))
-                            self.insert_execution_history(tree_item, execution_history[1:], is_root=True)
+                                 first_history_item, self.TOOL_TIP_TEXT, None))
+                            self.set_pending_children(tree_item, (history_items, 1, len(history_items), True))
                         else:
                             pass  # there was only the Start item in the history
                     else:
@@ -405,8 +413,8 @@ class ExecutionHistoryTreeController(ExtendedController):
                             None,
                             None,
                             (first_history_item.state_reference.name + " - Run " + str(execution_number + 1),
-                             first_history_item, self.TOOL_TIP_TEXT))
-                        self.insert_execution_history(tree_item, execution_history, is_root=True)
+                             first_history_item, self.TOOL_TIP_TEXT, None))
+                        self.set_pending_children(tree_item, (history_items, 0, len(history_items), True))
 
             self._restore_expansion_state()
 
@@ -429,59 +437,117 @@ class ExecutionHistoryTreeController(ExtendedController):
             content = (history_item.state_reference.name + " - " +
                            history_item.state_reference.get_path() + " - " +
                            description, None if dummy else history_item,
-                           None if dummy else self.TOOL_TIP_TEXT)
+                           None if dummy else self.TOOL_TIP_TEXT, None)
         else:
             content = (history_item.state_reference.name + " - " +
                            description, None if dummy else history_item,
-                           None if dummy else self.TOOL_TIP_TEXT)
+                           None if dummy else self.TOOL_TIP_TEXT, None)
 
         tree_item = self.history_tree_store.insert_before(
             parent, None, content)
         return tree_item
 
-    def insert_execution_history(self, parent, execution_history, is_root=False):
-        """Insert a list of history items into a the tree store
+    def set_pending_children(self, tree_item, pending_children):
+        """Defers the insertion of the child items of a row until the row is expanded
 
-        If there are concurrency history items, the method is called recursively.
+        A placeholder child row is inserted, which makes the row expandable.
+
+        :param Gtk.TreeIter tree_item: The row getting the child items
+        :param tuple pending_children: The history items, the start and stop index of the child items within them and
+            whether the first child item is the call of the root state
+        """
+        self.history_tree_store.set_value(tree_item, self.PENDING_CHILDREN_STORAGE_ID, pending_children)
+        self.history_tree_store.insert_before(tree_item, None, ("", None, None, None))
+
+    def insert_pending_children(self, tree_item):
+        """Inserts the child items of a row, which were deferred by :meth:`set_pending_children`
+
+        :param Gtk.TreeIter tree_item: The row to insert the child items for
+        """
+        with self._update_lock:
+            pending_children = self.history_tree_store.get_value(tree_item, self.PENDING_CHILDREN_STORAGE_ID)
+            if pending_children is None:
+                return
+            self.history_tree_store.set_value(tree_item, self.PENDING_CHILDREN_STORAGE_ID, None)
+            placeholder_iter = self.history_tree_store.iter_nth_child(tree_item, 0)
+            history_items, start, stop, is_root = pending_children
+            self.insert_execution_history(tree_item, history_items, is_root, start, stop)
+            self.history_tree_store.remove(placeholder_iter)
+
+    def on_test_expand_row(self, tree_view, tree_iter, tree_path):
+        """Inserts the child items of a row before it is expanded"""
+        self.insert_pending_children(tree_iter)
+        return False
+
+    @staticmethod
+    def get_container_end_index(history_items, index, stop):
+        """Finds the end of the items of a container state
+
+        :param list history_items: The history items
+        :param int index: The index of the call item of the container state
+        :param int stop: The index up to which the history items are considered
+        :return: The index following the return item of the container state or `stop`, if the container state is
+            still running
+        :rtype: int
+        """
+        depth = 0
+        for history_index in range(index + 1, stop):
+            history_item = history_items[history_index]
+            if not isinstance(history_item, ScopedDataItem) or history_item.call_type is not CallType.CONTAINER:
+                continue
+            if isinstance(history_item, CallItem):
+                depth += 1
+            elif depth:
+                depth -= 1
+            else:
+                return history_index + 1
+        return stop
+
+    def insert_execution_history(self, parent, execution_history, is_root=False, start=0, stop=None):
+        """Insert the history items of one hierarchy level into the tree store
+
+        The items of the child states of container states and of concurrent branches are only inserted when their
+        row is expanded, see :meth:`set_pending_children`.
 
         :param Gtk.TreeItem parent: the parent to add the next history item to
-        :param ExecutionHistory execution_history: all history items of a certain state machine execution
+        :param execution_history: all history items of a certain state machine execution
         :param bool is_root: Whether this is the root execution history
+        :param int start: The index of the first history item to insert
+        :param int stop: The index following the last history item to insert, by default the end of the history
         """
-        current_parent = parent
-        execution_history_iterator = iter(execution_history)
-        for history_item in execution_history_iterator:
+        stop = len(execution_history) if stop is None else stop
+        index = start
+        level_exited = False
+        while index < stop:
+            history_item = execution_history[index]
+            index += 1
             if isinstance(history_item, ConcurrencyItem):
-                self.insert_concurrent_execution_histories(current_parent, history_item.execution_histories)
+                self.insert_concurrent_execution_histories(parent, history_item.execution_histories)
 
             elif isinstance(history_item, CallItem):
-                tree_item = self.insert_history_item(current_parent, history_item, "Enter" if is_root else "Call")
+                tree_item = self.insert_history_item(parent, history_item, "Enter" if is_root else "Call")
                 if not tree_item:
                     return
                 if history_item.call_type is CallType.EXECUTE:
                     # this is necessary that already the CallType.EXECUTE item opens a new hierarchy in the
                     # tree view and not the CallType.CONTAINER item
                     next_history_item = history_item.next
-                    if next_history_item and next_history_item.call_type is CallType.CONTAINER:
-                        current_parent = tree_item
-                        self.insert_history_item(current_parent, next_history_item, "Enter")
-                        try:
-                            next(execution_history_iterator)  # skips the next history item in the iterator
-                        except StopIteration as e:
-                            # the execution engine does not have another item
-                            return
+                    if index < stop and next_history_item and next_history_item.call_type is CallType.CONTAINER:
+                        end_index = self.get_container_end_index(execution_history, index, stop)
+                        self.set_pending_children(tree_item, (execution_history, index, end_index, True))
+                        index = end_index
 
             else:  # history_item is ReturnItem
-                if current_parent is None:
+                if level_exited:
                     # The reasons here can be: missing history items, items in the wrong order etc.
                     # Does not happen when using RAFCON without plugins
-                    logger.error("Invalid execution history: current_parent is None")
+                    logger.error("Invalid execution history: return item after the exit of the container state")
                     return
                 if history_item.call_type is CallType.EXECUTE:
-                    self.insert_history_item(current_parent, history_item, "Return")
+                    self.insert_history_item(parent, history_item, "Return")
                 else:  # CONTAINER
-                    self.insert_history_item(current_parent, history_item, "Exit")
-                    current_parent = self.history_tree_store.iter_parent(current_parent)
+                    self.insert_history_item(parent, history_item, "Exit")
+                    level_exited = True
 
             is_root = False
 
@@ -494,8 +560,9 @@ class ExecutionHistoryTreeController(ExtendedController):
         """
         for execution_history in concurrent_execution_histories:
             if len(execution_history) >= 1:
-                first_history_item = execution_history[0]
+                history_items = list(execution_history)
                 # this is just a dummy item to have an extra parent for each branch
                 # gives better overview in case that one of the child state is a simple execution state
-                tree_item = self.insert_history_item(parent, first_history_item, "Concurrency Branch", dummy=True)
-                self.insert_execution_history(tree_item, execution_history)
+                tree_item = self.insert_history_item(parent, history_items[0], "Concurrency Branch", dummy=True)
+                if tree_item:
+                    self.set_pending_children(tree_item, (history_items, 0, len(history_items), False))
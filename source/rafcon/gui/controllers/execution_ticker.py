@@ -113,6 +113,32 @@ class ExecutionTickerController(ExtendedController):
         :return:
         """
         from rafcon.gui.utils.notification_overview import NotificationOverview
+
+        if 'kwargs' in info and 'method_name' in info['kwargs']:
+            overview = NotificationOverview(info)
+            # with an active drainer, the state is shown at the refresh rate in on_execution_status_changes
+            if overview.get_cause() == 'state_execution_status' and \
+                    not rafcon.gui.singleton.execution_status_drainer.active:
+                self.show_active_state(overview.get_affected_model().state)
+
+    def on_execution_status_changes(self, changes):
+        """ Show a state of the observed state machine, whose execution status changed
+
+        :param list changes: (state, state_execution_status) tuples drained from the execution status channel
+        """
+        if self.current_observed_sm_m is None:
+            return
+        state_machine = self.current_observed_sm_m.state_machine
+        for state, _ in changes:
+            if state.get_state_machine() is state_machine:
+                self.show_active_state(state)
+                return
+
+    def show_active_state(self, active_state):
+        """ Show the path of the given state in the widget
+
+        :param rafcon.core.states.state.State active_state: the state to be shown
+        """
         from rafcon.core.states.state import State
 
         def name_and_next_state(state):
@@ -134,21 +160,18 @@ class ExecutionTickerController(ExtendedController):
                 path = separator + '..' + path
             return path
 
-        if 'kwargs' in info and 'method_name' in info['kwargs']:
-            overview = NotificationOverview(info)
-            if overview.get_cause() == 'state_execution_status':
-                active_state = overview.get_affected_model().state
-                assert isinstance(active_state, State)
+        assert isinstance(active_state, State)
 
-                path_depth = rafcon.gui.singleton.global_gui_config.get_config_value("EXECUTION_TICKER_PATH_DEPTH", 3)
+        path_depth = rafcon.gui.singleton.global_gui_config.get_config_value("EXECUTION_TICKER_PATH_DEPTH", 3)
 
-                message = self._fix_text_of_label + create_path(active_state, path_depth)
-                if rafcon.gui.singleton.main_window_controller.view is not None:
-                    self.ticker_text_label.set_text(message)
-                else:
-                    logger.warning("Not initialized yet")
+        message = self._fix_text_of_label + create_path(active_state, path_depth)
+        if rafcon.gui.singleton.main_window_controller.view is not None:
+            self.ticker_text_label.set_text(message)
+        else:
+            logger.warning("Not initialized yet")
 
     def stop_sm_m_observation(self, sm_m):
+        rafcon.gui.singleton.execution_status_drainer.unregister(self.on_execution_status_changes)
         self.relieve_model(sm_m)
         self.ticker_text_label.set_text(self._fix_text_of_label + 'None')
         self.current_observed_sm_m = None
@@ -158,6 +181,7 @@ class ExecutionTickerController(ExtendedController):
         if active_sm_id:
             self.current_observed_sm_m = rafcon.gui.singleton.state_machine_manager_model.state_machines[active_sm_id]
             self.observe_model(self.current_observed_sm_m)
+            rafcon.gui.singleton.execution_status_drainer.register(self.on_execution_status_changes)
 
     @ExtendedController.observe("execution_engine", after=True)
     def execution_engine_model_changed(self, model, prop_name, info):
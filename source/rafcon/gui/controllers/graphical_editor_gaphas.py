@@ -24,6 +24,7 @@ from gi.repository import Gtk
 from gi.repository import Gdk
 from gi.repository import GLib
 from future.utils import string_types
+import hashlib
 import time
 from functools import partial
 from gaphas.aspect import InMotion, ItemFinder
@@ -84,6 +85,10 @@ class GraphicalEditorController(ExtendedController):
         self.canvas = MyCanvas()
         self.zoom = 3.
         self.perform_drag_and_drop = False
+        # zoom, translation and size of the viewport at the last check of the level of detail
+        self._last_viewport = None
+        self._level_of_detail_update_scheduled = False
+        self._meta_data_generated = False
 
         view.setup_canvas(self.canvas, self.zoom)
 
@@ -93,6 +98,7 @@ class GraphicalEditorController(ExtendedController):
                        "".format(time.time() - start_time, self.model.state_machine_id))
 
     def destroy(self):
+        rafcon.gui.singleton.execution_status_drainer.unregister(self.on_execution_status_changes)
         if self.view:
             self.view.editor.prepare_destruction()
         super(GraphicalEditorController, self).destroy()
@@ -105,6 +111,8 @@ class GraphicalEditorController(ExtendedController):
         self.focus_changed_handler_id = self.view.editor.connect('focus-changed', self._move_focused_item_into_viewport)
         self.view.editor.connect("drag-data-received", self.on_drag_data_received)
         self.drag_motion_handler_id = self.view.editor.connect("drag-motion", self.on_drag_motion)
+        self.view.editor.connect("draw", self._on_editor_draw)
+        rafcon.gui.singleton.execution_status_drainer.register(self.on_execution_status_changes)
 
         try:
             self.setup_canvas()
@@ -177,6 +185,8 @@ class GraphicalEditorController(ExtendedController):
         if not isinstance(parent_m, ContainerStateModel):
             return
         state_v = self.canvas.get_view_for_model(parent_m.states[state_id_insert])
+        if state_v is None:
+            return
         pos_start = state_v.model.get_meta_data_editor()['rel_pos']
         motion = InMotion(state_v, self.view.editor)
         motion.start_move(self.view.editor.get_matrix_i2v(state_v).transform_point(pos_start[0], pos_start[1]))
@@ -269,6 +279,9 @@ class GraphicalEditorController(ExtendedController):
         :param view:
         :param StateView | ConnectionView | PortView focused_item: The focused item
         """
+        if focused_item is None and isinstance(self.model.selection.focus, AbstractStateModel):
+            # The focused state is within content, whose views have not been created, yet
+            focused_item = self._create_state_view_with_parents(self.model.selection.focus)
         self.view.editor.handler_block(self.drag_motion_handler_id)
         self.move_item_into_viewport(focused_item)
         self.view.editor.handler_unblock(self.drag_motion_handler_id)
@@ -318,8 +331,21 @@ class GraphicalEditorController(ExtendedController):
         self.view.editor.vadjustment.set_value(state_pos[VERTICAL] - padding_offset_vertical)
 
     def _meta_data_changed(self, view, model, name, affects_children):
+        if name in ['append_initial_change', 'append_to_last_change']:
+            self._meta_data_generated = False  # Generated meta data is part of this change
         msg = MetaSignalMsg('graphical_editor_gaphas', name, affects_children)
         model.meta_signal.emit(msg)
+        # States might have been resized by the user
+        if view is not None:
+            self._schedule_level_of_detail_update()
+
+    def _emit_generated_meta_data(self):
+        """Emits a meta data signal, if the creation of views generated meta data
+
+        The generated meta data is handled like meta data generated when opening the state machine.
+        """
+        if self._meta_data_generated:
+            self._meta_data_changed(None, self.root_state_m, 'append_initial_change', True)
 
     @ExtendedController.observe("destruction_signal", signal=True)
     def state_machine_destruction(self, model, prop_name, info):
@@ -349,6 +375,8 @@ class GraphicalEditorController(ExtendedController):
 
         model = notification.model
         view = self.canvas.get_view_for_model(model)
+        if view is None:  # The view is created from the meta data, when the content of its parent becomes visible
+            return
 
         if meta_signal_message.change == 'show_content':
             library_state_m = model
@@ -361,14 +389,11 @@ class GraphicalEditorController(ExtendedController):
                     logger.warning("Show library content without initialized state copy does not work {0}"
                                    "".format(library_state_m))
                 logger.debug("Show content of {}".format(library_state_m.state))
-                gui_helper_meta_data.scale_library_content(library_state_m)
-                self.add_state_view_for_model(library_state_m.state_copy, view,
-                                              hierarchy_level=library_state_v.hierarchy_level + 1)
+                if not library_state_v.content_created and self._is_content_to_be_created(library_state_v):
+                    self._add_content_views(library_state_m, library_state_v)
             else:
                 logger.debug("Hide content of {}".format(library_state_m.state))
-                state_copy_v = self.canvas.get_view_for_model(library_state_m.state_copy)
-                if state_copy_v:
-                    state_copy_v.remove()
+                library_state_v.remove_content()
         else:
             if isinstance(view, StateView):
                 view.apply_meta_data(recursive=meta_signal_message.affects_children)
@@ -385,6 +410,16 @@ class GraphicalEditorController(ExtendedController):
             action_name, action_dict = self.model.complex_action_observer.nested_action_already_in[-1]
             self.adapt_complex_action(action_dict['target'], action_dict['new'])
 
+    def on_execution_status_changes(self, changes):
+        """Redraws the states whose execution status changed
+
+        :param list changes: (state, state_execution_status) tuples drained from the execution status channel
+        """
+        for state, _ in changes:
+            state_v = self.canvas.get_view_for_core_element(state)
+            if state_v:  # Children of LibraryStates are not modeled, yet
+                self.canvas.request_update(state_v, matrix=False)
+
     @ExtendedController.observe("state_machine", after=True)
     def state_machine_change_after(self, model, prop_name, info):
         """Called on any change within th state machine
@@ -425,15 +460,19 @@ class GraphicalEditorController(ExtendedController):
                         return
 
             if method_name == 'state_execution_status':
-                state_v = self.canvas.get_view_for_model(model)
-                if state_v:  # Children of LibraryStates are not modeled, yet
-                    self.canvas.request_update(state_v, matrix=False)
+                # with an active drainer, the states are redrawn at the refresh rate in on_execution_status_changes
+                if not rafcon.gui.singleton.execution_status_drainer.active:
+                    state_v = self.canvas.get_view_for_model(model)
+                    if state_v:  # Children of LibraryStates are not modeled, yet
+                        self.canvas.request_update(state_v, matrix=False)
             elif method_name == 'add_state':
-                new_state = arguments[1]
-                new_state_m = model.states[new_state.state_id]
-                self.add_state_view_with_meta_data_for_model(new_state_m, model)
-                if not self.perform_drag_and_drop:
-                    self.canvas.wait_for_update()
+                # Without views of the content, the view is created when the content becomes visible
+                if self._get_state_view_with_content(model):
+                    new_state = arguments[1]
+                    new_state_m = model.states[new_state.state_id]
+                    self.add_state_view_with_meta_data_for_model(new_state_m, model)
+                    if not self.perform_drag_and_drop:
+                        self.canvas.wait_for_update()
             elif method_name == 'remove_state':
                 state_v = self.canvas.get_view_for_core_element(result)
                 if state_v:
@@ -499,12 +538,15 @@ class GraphicalEditorController(ExtendedController):
             elif method_name == 'add_outcome':
                 state_m = model
                 state_v = self.canvas.get_view_for_model(state_m)
-                for outcome_m in state_m.outcomes:
-                    if outcome_m.outcome.outcome_id == result:
-                        state_v.add_outcome(outcome_m)
-                        self.canvas.request_update(state_v, matrix=False)
-                        self.canvas.wait_for_update()
-                        break
+                if state_v is None:
+                    logger.debug("no state_v found for method_name '{}'".format(method_name))
+                else:
+                    for outcome_m in state_m.outcomes:
+                        if outcome_m.outcome.outcome_id == result:
+                            state_v.add_outcome(outcome_m)
+                            self.canvas.request_update(state_v, matrix=False)
+                            self.canvas.wait_for_update()
+                            break
             elif method_name == 'remove_outcome':
                 state_m = model
                 state_v = self.canvas.get_view_for_model(state_m)
@@ -523,21 +565,27 @@ class GraphicalEditorController(ExtendedController):
             elif method_name == 'add_input_data_port':
                 state_m = model
                 state_v = self.canvas.get_view_for_model(state_m)
-                for input_data_port_m in state_m.input_data_ports:
-                    if input_data_port_m.data_port.data_port_id == result:
-                        state_v.add_input_port(input_data_port_m)
-                        self.canvas.request_update(state_v, matrix=False)
-                        self.canvas.wait_for_update()
-                        break
+                if state_v is None:
+                    logger.debug("no state_v found for method_name '{}'".format(method_name))
+                else:
+                    for input_data_port_m in state_m.input_data_ports:
+                        if input_data_port_m.data_port.data_port_id == result:
+                            state_v.add_input_port(input_data_port_m)
+                            self.canvas.request_update(state_v, matrix=False)
+                            self.canvas.wait_for_update()
+                            break
             elif method_name == 'add_output_data_port':
                 state_m = model
                 state_v = self.canvas.get_view_for_model(state_m)
-                for output_data_port_m in state_m.output_data_ports:
-                    if output_data_port_m.data_port.data_port_id == result:
-                        state_v.add_output_port(output_data_port_m)
-                        self.canvas.request_update(state_v, matrix=False)
-                        self.canvas.wait_for_update()
-                        break
+                if state_v is None:
+                    logger.debug("no state_v found for method_name '{}'".format(method_name))
+                else:
+                    for output_data_port_m in state_m.output_data_ports:
+                        if output_data_port_m.data_port.data_port_id == result:
+                            state_v.add_output_port(output_data_port_m)
+                            self.canvas.request_update(state_v, matrix=False)
+                            self.canvas.wait_for_update()
+                            break
             elif method_name == 'remove_input_data_port':
                 state_m = model
                 state_v = self.canvas.get_view_for_model(state_m)
@@ -571,12 +619,15 @@ class GraphicalEditorController(ExtendedController):
             elif method_name == 'add_scoped_variable':
                 state_m = model
                 state_v = self.canvas.get_view_for_model(state_m)
-                for scoped_variable_m in state_m.scoped_variables:
-                    if scoped_variable_m.scoped_variable.data_port_id == result:
-                        state_v.add_scoped_variable(scoped_variable_m)
-                        self.canvas.request_update(state_v, matrix=False)
-                        self.canvas.wait_for_update()
-                        break
+                if state_v is None:
+                    logger.debug("no state_v found for method_name '{}'".format(method_name))
+                else:
+                    for scoped_variable_m in state_m.scoped_variables:
+                        if scoped_variable_m.scoped_variable.data_port_id == result:
+                            state_v.add_scoped_variable(scoped_variable_m)
+                            self.canvas.request_update(state_v, matrix=False)
+                            self.canvas.wait_for_update()
+                            break
             elif method_name == 'remove_scoped_variable':
                 state_m = model
                 state_v = self.canvas.get_view_for_model(state_m)
@@ -600,12 +651,15 @@ class GraphicalEditorController(ExtendedController):
                 else:
                     parent_model = model
                 state_v = self.canvas.get_view_for_model(parent_model)
-                if parent_model is model:
+                if state_v is None:
+                    logger.debug("no state_v found for method_name '{}'".format(method_name))
+                elif parent_model is model:
                     state_v.name_view.name = arguments[1]
                     self.canvas.request_update(state_v.name_view, matrix=False)
+                    self.canvas.wait_for_update()
                 else:
                     self.canvas.request_update(state_v, matrix=False)
-                self.canvas.wait_for_update()
+                    self.canvas.wait_for_update()
             elif method_name == 'parent':
                 pass
             elif method_name == 'description':
@@ -638,8 +692,9 @@ class GraphicalEditorController(ExtendedController):
     @lock_state_machine
     def adapt_complex_action(self, old_state_m, new_state_m):
         old_state_v = self.canvas.get_view_for_model(old_state_m)
-        parent_state_v = self.canvas.get_view_for_model(new_state_m.parent)
-        old_state_v.remove()
+        parent_state_v = self._get_state_view_with_content(new_state_m.parent)
+        if old_state_v:
+            old_state_v.remove()
 
         # If the root state has been changed, we recreate the whole state machine view
         if old_state_m is self.root_state_m:
@@ -648,6 +703,10 @@ class GraphicalEditorController(ExtendedController):
             root_state_v = self.add_state_view_for_model(self.root_state_m)
             self.canvas.request_update(root_state_v)
 
+        # Without views of the content of the parent, the views are created when the content becomes visible
+        elif parent_state_v is None:
+            pass
+
         # Otherwise we only look at the modified state and its children
         else:
             # TODO make the redraw again not recursive for all elements because that is expansive (longer drawing waits)
@@ -720,9 +779,10 @@ class GraphicalEditorController(ExtendedController):
         :return:
         """
         state_machine_m = self.model
-        state_v = self.canvas.get_view_for_model(state_m)
+        state_v = self._create_state_view_with_parents(state_m)
         if state_v is None:
             logger.warning('There is no view for state model {0}'.format(state_m))
+            return
         self.move_item_into_viewport(state_v)
         # check_relative size in view and call it again if the state is still very small
         state_v = self.canvas.get_view_for_model(state_machine_m.root_state)
@@ -735,15 +795,15 @@ class GraphicalEditorController(ExtendedController):
         logger.verbose("start setup canvas")
         start_time_view_generation = time.time()
         with self.model.state_machine.modification_lock():
-            hash_before = self.model.meta_data_hash()
+            # Only the meta data of elements, for which views are created, is checked, see add_state_view_for_model
+            self._meta_data_generated = False
             # there is no more root state position it will be set always to the root state default relative position
             if not self.root_state_m.get_meta_data_editor()['rel_pos'] == gui_helper_meta_data.ROOT_STATE_DEFAULT_REL_POS:
                 self.root_state_m.set_meta_data_editor('rel_pos', gui_helper_meta_data.ROOT_STATE_DEFAULT_REL_POS)
+                self._meta_data_generated = True
             self.add_state_view_for_model(self.root_state_m, rel_pos=gui_helper_meta_data.STATE_DEFAULT_REL_POS)
-            hash_after = self.model.meta_data_hash()
-            if hash_before.digest() != hash_after.digest():
-                logger.debug("Hash has changed from {0} to {1}".format(hash_before.hexdigest(), hash_after.hexdigest()))
-                self._meta_data_changed(None, self.root_state_m, 'append_initial_change', True)
+            if self._meta_data_generated:
+                self._emit_generated_meta_data()
                 logger.info("Opening the state machine caused some meta data to be generated, which will be stored "
                             " when the state machine is being saved.")
         logger.verbose("Time spent in setup canvas {0} state machine {1}".format(time.time() - start_time_view_generation,
@@ -757,8 +817,10 @@ class GraphicalEditorController(ExtendedController):
     def add_state_view_for_model(self, state_m, parent_v=None, rel_pos=(0, 0), size=(100, 100), hierarchy_level=1):
         """Creates a `StateView` (recursively) and adds it to the canvas
 
-        The method uses the `StateModel` `state_m` to create the according `StateView`. For all content within 
-        `state_m`, such as connections, states and ports, the views are also created. All views are added to the canvas.
+        The method uses the `StateModel` `state_m` to create the according `StateView`. The views of the ports of
+        `state_m` are also created. The views of its content, such as states and connections, are only created (again
+        recursively), if the state is large enough on the screen and within the viewport, see
+        :meth:`_is_content_to_be_created`. All views are added to the canvas.
 
         :param rafcon.gui.models.state.StateModel state_m: The state to be drawn
         :param rafcon.gui.mygaphas.items.state.StateView parent_v: The parent state view of new state view `state_m`
@@ -769,6 +831,7 @@ class GraphicalEditorController(ExtendedController):
         :rtype: StateView
         """
         assert isinstance(state_m, AbstractStateModel)
+        meta_data_hash_before = self._get_state_meta_data_hash(state_m)
         state_meta = state_m.get_meta_data_editor()
 
         # Use default values if no size information is stored
@@ -815,32 +878,234 @@ class GraphicalEditorController(ExtendedController):
             # Keep state within parent
             pass
 
-        if isinstance(state_m, LibraryStateModel) and state_m.show_content() and state_m.state_copy_initialized:
+        if isinstance(state_m, ContainerStateModel):
+            for scoped_variable_m in state_m.scoped_variables:
+                state_v.add_scoped_variable(scoped_variable_m)
+
+        if meta_data_hash_before != self._get_state_meta_data_hash(state_m):
+            self._meta_data_generated = True
+
+        if self._is_content_to_be_created(state_v):
+            self._add_content_views(state_m, state_v)
+
+        return state_v
+
+    @lock_state_machine
+    def _add_content_views(self, state_m, state_v):
+        """Creates the views of the content of a state and adds them to the canvas
+
+        The content of a container state are its child states, transitions and data flows, the content of a library
+        state showing its content is its state copy.
+
+        :param rafcon.gui.models.abstract_state.AbstractStateModel state_m: The state, whose content is to be drawn
+        :param StateView state_v: The view of the state
+        """
+        state_v.content_created = True
+        hierarchy_level = state_v.hierarchy_level
+
+        if isinstance(state_m, LibraryStateModel):
             gui_helper_meta_data.scale_library_content(state_m)
             self.add_state_view_for_model(state_m.state_copy, state_v, hierarchy_level=hierarchy_level + 1)
+            return
 
-        elif isinstance(state_m, ContainerStateModel):
-            num_child_state = 0
+        meta_data_hash_before = self._get_connections_meta_data_hash(state_m)
+        num_child_state = 0
 
-            for scoped_variable_m in state_m.scoped_variables:
-                state_v.add_scoped_variable(scoped_variable_m)
+        for child_state_m in state_m.states.values():
+            # generate optional meta data for child state - not used if valid meta data already in child state model
+            child_rel_pos, child_size = gui_helper_meta_data.generate_default_state_meta_data(state_m, self.canvas,
+                                                                                              num_child_state)
+            num_child_state += 1
+
+            self.add_state_view_for_model(child_state_m, state_v, child_rel_pos, child_size, hierarchy_level + 1)
 
-            for child_state_m in state_m.states.values():
-                # generate optional meta data for child state - not used if valid meta data already in child state model
-                child_rel_pos, child_size = gui_helper_meta_data.generate_default_state_meta_data(state_m, self.canvas,
-                                                                                                  num_child_state)
-                num_child_state += 1
+        for transition_m in state_m.transitions:
+            self.add_transition_view_for_model(transition_m, state_m)
 
-                self.add_state_view_for_model(child_state_m, state_v, child_rel_pos, child_size, hierarchy_level + 1)
+        for data_flow_m in state_m.data_flows:
+            self.add_data_flow_view_for_model(data_flow_m, state_m)
 
-            for transition_m in state_m.transitions:
-                self.add_transition_view_for_model(transition_m, state_m)
+        if meta_data_hash_before != self._get_connections_meta_data_hash(state_m):
+            self._meta_data_generated = True
 
-            for data_flow_m in state_m.data_flows:
-                self.add_data_flow_view_for_model(data_flow_m, state_m)
+    @staticmethod
+    def _has_content(state_m):
+        """Checks whether a state has content, which can be shown in the graphical editor"""
+        if isinstance(state_m, LibraryStateModel):
+            return state_m.show_content() and state_m.state_copy_initialized
+        return isinstance(state_m, ContainerStateModel)
 
+    @staticmethod
+    def _get_state_meta_data_hash(state_m):
+        """Returns a hash of the meta data of a state and its ports, which excludes the meta data of its content"""
+        obj_hash = hashlib.sha256()
+        AbstractStateModel.update_meta_data_hash(state_m, obj_hash)
+        if isinstance(state_m, ContainerStateModel):
+            for scoped_variable_m in state_m.scoped_variables:
+                scoped_variable_m.update_meta_data_hash(obj_hash)
+        return obj_hash.digest()
+
+    @staticmethod
+    def _get_connections_meta_data_hash(state_m):
+        """Returns a hash of the meta data of the transitions and data flows of a container state"""
+        obj_hash = hashlib.sha256()
+        for connection_m in state_m.transitions[:] + state_m.data_flows[:]:
+            connection_m.update_meta_data_hash(obj_hash)
+        return obj_hash.digest()
+
+    def _get_state_view_with_content(self, state_m):
+        """Returns the view of a state, if the views of its content exist
+
+        :param rafcon.gui.models.abstract_state.AbstractStateModel state_m: The state model
+        :return: The view of the state or None
+        :rtype: StateView
+        """
+        state_v = self.canvas.get_view_for_model(state_m)
+        if state_v is None or not state_v.content_created:
+            return None
         return state_v
 
+    def _create_state_view_with_parents(self, state_m):
+        """Returns the view of a state and creates it, if the content of its parents has no views, yet
+
+        :param rafcon.gui.models.abstract_state.AbstractStateModel state_m: The state model
+        :return: The view of the state or None, if the state cannot be shown, e.g. within a library
+        :rtype: StateView
+        """
+        state_v = self.canvas.get_view_for_model(state_m)
+        if state_v is not None or state_m.parent is None:
+            return state_v
+        parent_state_v = self._create_state_view_with_parents(state_m.parent)
+        if parent_state_v is None or parent_state_v.content_created or not self._has_content(parent_state_v.model):
+            return None
+        with self.model.state_machine.modification_lock():
+            self._add_content_views(parent_state_v.model, parent_state_v)
+        self._emit_generated_meta_data()
+        self.canvas.wait_for_update()
+        return self.canvas.get_view_for_model(state_m)
+
+    def _get_view_extents(self, state_v):
+        """Returns the position and size of a state view in view (pixel) coordinates
+
+        The position is calculated from the relative positions of the state and its parents, as the matrices of newly
+        created views are not updated before the next canvas update.
+
+        :param StateView state_v: The state view
+        :return: x, y, width, height
+        :rtype: tuple
+        """
+        x, y = 0., 0.
+        item = state_v
+        while item is not None:
+            rel_x, rel_y = item.position
+            x, y = x + rel_x, y + rel_y
+            item = self.canvas.get_parent(item)
+        matrix = self.view.editor.matrix
+        x, y = matrix.transform_point(x, y)
+        width, height = matrix.transform_distance(state_v.width, state_v.height)
+        return x, y, width, height
+
+    def _is_content_to_be_created(self, state_v):
+        """Checks whether the views of the content of a state are to be created
+
+        This is the case, if the smaller side of the state is at least GAPHAS_EDITOR_MINIMUM_SIZE_FOR_CONTENT_VIEWS
+        pixels long on the screen and the state intersects with the viewport.
+
+        :param StateView state_v: The state view
+        :rtype: bool
+        """
+        if not self._has_content(state_v.model):
+            return False
+        minimum_size = rafcon.gui.singleton.global_gui_config.get_config_value(
+            'GAPHAS_EDITOR_MINIMUM_SIZE_FOR_CONTENT_VIEWS', 30)
+        if not minimum_size:
+            return True
+        x, y, width, height = self._get_view_extents(state_v)
+        if min(width, height) < minimum_size:
+            return False
+        allocation = self.view.editor.get_allocation()
+        if allocation.width <= 1 or allocation.height <= 1:  # The editor is not shown, yet
+            return True
+        return x < allocation.width and y < allocation.height and x + width > 0 and y + height > 0
+
+    def _is_content_to_be_removed(self, state_v):
+        """Checks whether the views of the content of a state are to be removed
+
+        This is the case, if the smaller side of the state got shorter than half of
+        GAPHAS_EDITOR_MINIMUM_SIZE_FOR_CONTENT_VIEWS on the screen and no item of the content is selected. The views
+        are kept, when the state is moved out of the viewport.
+
+        :param StateView state_v: The state view
+        :rtype: bool
+        """
+        minimum_size = rafcon.gui.singleton.global_gui_config.get_config_value(
+            'GAPHAS_EDITOR_MINIMUM_SIZE_FOR_CONTENT_VIEWS', 30)
+        if not minimum_size:
+            return False
+        _, _, width, height = self._get_view_extents(state_v)
+        if min(width, height) >= minimum_size / 2.:
+            return False
+        for item in self.view.editor.selected_items:
+            if item is not None and not isinstance(item, Item):  # ports
+                item = item.parent
+            while item is not None:
+                if item is state_v:
+                    return False
+                item = self.canvas.get_parent(item)
+        return True
+
+    def _on_editor_draw(self, editor, _):
+        """Schedules an update of the level of detail, if the zoom, the position or the size of the viewport changed"""
+        matrix = editor.matrix
+        allocation = editor.get_allocation()
+        viewport = (matrix[0], matrix[4], matrix[5], allocation.width, allocation.height)
+        if viewport != self._last_viewport:
+            self._last_viewport = viewport
+            self._schedule_level_of_detail_update()
+        return False
+
+    def _schedule_level_of_detail_update(self):
+        if not self._level_of_detail_update_scheduled:
+            self._level_of_detail_update_scheduled = True
+            GLib.idle_add(self.update_level_of_detail)
+
+    def update_level_of_detail(self):
+        """Creates and removes the views of the content of states depending on their size on the screen
+
+        The views of the content of a state are created, when the state got large enough and is within the viewport.
+        They are removed again, when the state gets too small due to zooming out. Thus, the number of canvas items
+        and constraints scales with the visible part of the state machine and not with its size.
+        """
+        self._level_of_detail_update_scheduled = False
+        if not self.view:  # The editor was destroyed meanwhile
+            return False
+        root_state_v = self.canvas.get_view_for_model(self.root_state_m)
+        if root_state_v is None or self.model.ongoing_complex_actions:
+            self._last_viewport = None  # Check again with the next redraw
+            return False
+
+        def update_state_v(state_v):
+            if not state_v.content_created:
+                if self._is_content_to_be_created(state_v):
+                    self._add_content_views(state_v.model, state_v)
+                    changed_state_views.append(state_v)
+            elif self._is_content_to_be_removed(state_v):
+                state_v.remove_content()
+                changed_state_views.append(state_v)
+            else:
+                for child_state_v in list(state_v.child_state_views()):
+                    update_state_v(child_state_v)
+
+        changed_state_views = []
+        with self.model.state_machine.modification_lock():
+            update_state_v(root_state_v)
+        self._emit_generated_meta_data()
+        if changed_state_views:
+            for state_v in changed_state_views:
+                self.canvas.request_update(state_v)
+            self.canvas.wait_for_update()
+        return False
+
     @lock_state_machine
     def add_transition_view_for_model(self, transition_m, parent_state_m):
         """Creates a `TransitionView` and adds it to the canvas
@@ -849,8 +1114,11 @@ class GraphicalEditorController(ExtendedController):
 
         :param TransitionModel transition_m: The transition for which a view is to be created 
         :param ContainerStateModel parent_state_m: The parental `StateModel` of the transition
+        :return: The created `TransitionView` or None, if the views of the content of the parent do not exist
         """
-        parent_state_v = self.canvas.get_view_for_model(parent_state_m)
+        parent_state_v = self._get_state_view_with_content(parent_state_m)
+        if parent_state_v is None:
+            return
 
         hierarchy_level = parent_state_v.hierarchy_level
         transition_v = TransitionView(transition_m, hierarchy_level)
@@ -871,7 +1139,9 @@ class GraphicalEditorController(ExtendedController):
         :param DataFlowModel data_flow_m: The data flow for which a view is to be created 
         :param ContainerStateModel parent_state_m: The parental `StateModel` of the data flow
         """
-        parent_state_v = self.canvas.get_view_for_model(parent_state_m)
+        parent_state_v = self._get_state_view_with_content(parent_state_m)
+        if parent_state_v is None:
+            return
 
         hierarchy_level = parent_state_v.hierarchy_level
         data_flow_v = DataFlowView(data_flow_m, hierarchy_level)
@@ -1003,6 +1273,8 @@ class GraphicalEditorController(ExtendedController):
             to_state_v.connect_to_input_port(to_key, data_flow_v, data_flow_v.to_handle())
 
     def _reconnect_transition(self, transition_v, transition_m, parent_state_m):
+        if transition_v is None:
+            return
         parent_state_v = self.canvas.get_view_for_model(parent_state_m)
 
         self.canvas.disconnect_item(transition_v)
@@ -1011,6 +1283,8 @@ class GraphicalEditorController(ExtendedController):
         self.canvas.update()
 
     def _reconnect_data_flow(self, data_flow_v, data_flow_m, parent_state_m):
+        if data_flow_v is None:
+            return
         self.canvas.disconnect_item(data_flow_v)
         data_flow_v.remove_connection_from_ports()
         self._connect_data_flow_to_ports(data_flow_m, data_flow_v, parent_state_m)
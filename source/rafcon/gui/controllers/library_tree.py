@@ -194,6 +194,7 @@ class LibraryTreeController(ExtendedController):
         self.library_row_iter_dict_by_library_path.clear()
         for library_key, library_item in self.model.library_manager.libraries.items():
             self.insert_rec(None, library_key, library_item, "")
+        self.model.library_manager.save_library_index()
         self.redo_expansion_state()
         if self.__expansion_state:
             logger.info("Libraries have been updated")
@@ -217,10 +218,13 @@ class LibraryTreeController(ExtendedController):
         :return:
         """
         def add_description_to_tooltip(tool_tip_with_only_sm_file_system_path_in):
-            from rafcon.gui.helpers.state_machine import get_root_state_description_of_sm_file_system_path
-            description = get_root_state_description_of_sm_file_system_path(tool_tip_with_only_sm_file_system_path_in)
-            enabled = global_gui_config.get_config_value('LIBRARY_TREE_TOOLTIP_INCLUDES_ROOT_STATE_DESCRIPTION', True)
-            if description and enabled:
+            description = None
+            if global_gui_config.get_config_value('LIBRARY_TREE_TOOLTIP_INCLUDES_ROOT_STATE_DESCRIPTION', True):
+                # the description is cached in the library index and only read, if the library changed
+                library_info = self.model.library_manager.get_library_info(tool_tip_with_only_sm_file_system_path_in)
+                if library_info is not None:
+                    description = library_info['description']
+            if description:
                 return "[source]:\n{0}\n\n[description]:\n\n{1}" \
                        "".format(tool_tip_with_only_sm_file_system_path_in, description)
             else:
@@ -84,6 +84,7 @@ class StateMachineTreeController(TreeViewController):
         """Called when the view was registered"""
         super(StateMachineTreeController, self).register_view(view)
         self.view.connect('button_press_event', self.mouse_click)
+        self.view.connect('test-expand-row', self.on_test_expand_row)
         self.view_is_registered = True
         self.update(with_expand=True)
 
@@ -160,11 +161,13 @@ class StateMachineTreeController(TreeViewController):
 
         if overview.get_affected_property() == 'state' and \
                 overview.get_cause() in ["name"]:  # , "add_state", "remove_state"]:
-            self.update_tree_store_row(overview.get_affected_model())
+            if not self.is_below_placeholder(overview.get_affected_model()):
+                self.update_tree_store_row(overview.get_affected_model())
         # TODO check the work around for get_library_root_state -> maybe the notifications can be avoided if upper lib
         elif overview.get_affected_property() == 'state' and not overview.get_affected_model().state.get_next_upper_library_root_state() and \
                 overview.get_cause() in ["add_state", "remove_state"]:
-            self.update(overview.get_affected_model())
+            # only the rows of the added or removed child states change
+            self.update(overview.get_affected_model(), recursive=False)
 
     @TreeViewController.observe("state_meta_signal", signal=True)
     def state_meta_update(self, model, prop_name, info):
@@ -225,8 +228,15 @@ class StateMachineTreeController(TreeViewController):
         if not self._ongoing_complex_actions:
             self.relieve_model(model)
 
-            # TODO check selection warnings if not all a the tree is recreated
-            self.update()  # if target_state_m.state.is_root_state else self.update(target_state_m.parent)
+            # only the sub tree of the changed state is updated, the whole tree only if the root state was exchanged
+            if not target_state_m.state.is_root_state:
+                self.update(target_state_m.parent)
+            elif target_state_m.state.get_path() in self.state_row_iter_dict_by_state_path:
+                self.update(target_state_m)
+            else:
+                self.update()
+            # the state machine selection may have changed during the action while rows were outdated or missing
+            self.update_selection_sm_prior()
 
     @TreeViewController.observe("root_state", assign=True)
     def state_machine_notification(self, model, property, info):
@@ -278,7 +288,8 @@ class StateMachineTreeController(TreeViewController):
                     if state_path in self.state_row_iter_dict_by_state_path:
                         if state_row_expanded:
                             set_expansion_state(state_path)
-                    else:
+                    # rows of collapsed states only exist, if their parent row was expanded
+                    elif state_row_expanded:
                         if not ignore_not_existing_rows and self._selected_sm_model and \
                                 self._selected_sm_model.state_machine.get_state_by_path(state_path, as_check=True):
                             state = self._selected_sm_model.state_machine.get_state_by_path(state_path)
@@ -291,11 +302,12 @@ class StateMachineTreeController(TreeViewController):
                 logger.error("Expansion state of state machine {0} could not be restored"
                              "".format(self.__my_selected_sm_id))
 
-    def update(self, changed_state_model=None, with_expand=False):
+    def update(self, changed_state_model=None, with_expand=False, recursive=True):
         """Checks if all states are in tree and if tree has states which were deleted
 
         :param changed_state_model: Model that row has to be updated
         :param with_expand: The expand flag for the tree
+        :param bool recursive: Flag whether the rows of child states already in the tree are updated, too
         """
         if not self.view_is_registered:
             return
@@ -313,6 +325,9 @@ class StateMachineTreeController(TreeViewController):
         else:  # pick
             if changed_state_model.state.is_root_state:
                 parent_row_iter = self.state_row_iter_dict_by_state_path[changed_state_model.state.get_path()]
+            elif self.is_below_placeholder(changed_state_model):
+                # the row is created with the current data, when the row of its parent is expanded
+                return
             else:
                 if changed_state_model.state.is_root_state_of_library:
                     # because either lib-state or lib-state-root is in tree the next higher hierarchy state is updated
@@ -327,7 +342,7 @@ class StateMachineTreeController(TreeViewController):
                 parent_row_iter = self.state_row_iter_dict_by_state_path[changed_upper_state_m.state.get_path()]
 
         # do recursive update
-        self.insert_and_update_recursively(parent_row_iter, changed_state_model, with_expand)
+        self.insert_and_update_recursively(parent_row_iter, changed_state_model, with_expand, recursive)
 
     def get_row_iter_for_state_model(self, state_model):
         if state_model.state.get_path() not in self.state_row_iter_dict_by_state_path:
@@ -344,11 +359,11 @@ class StateMachineTreeController(TreeViewController):
         state_row_iter = self.get_row_iter_for_state_model(state_model)
         if state_row_iter is None:
             return
-        state_row_iter = self.state_row_iter_dict_by_state_path[state_model.state.get_path()]
         state_row_path = self.tree_store.get_path(state_row_iter)
 
         if not type(state_model.state).__name__ == self.tree_store[state_row_path][self.TYPE_NAME_STORAGE_ID] or \
-                not state_model.state.name == self.tree_store[state_row_path][self.NAME_STORAGE_ID]:
+                not state_model.state.name == self.tree_store[state_row_path][self.NAME_STORAGE_ID] or \
+                state_model is not self.tree_store[state_row_path][self.MODEL_STORAGE_ID]:
             self.tree_store[state_row_path][self.NAME_STORAGE_ID] = state_model.state.name
             self.tree_store[state_row_path][self.TYPE_NAME_STORAGE_ID] = type(state_model.state).__name__
             self.tree_store[state_row_path][self.MODEL_STORAGE_ID] = state_model
@@ -375,12 +390,16 @@ class StateMachineTreeController(TreeViewController):
         else:
             return True
 
-    def insert_and_update_recursively(self, parent_iter, state_model, with_expand=False):
+    def insert_and_update_recursively(self, parent_iter, state_model, with_expand=False, recursive=True):
         """ Insert and/or update the handed state model in parent tree store element iterator
 
+        Inserted states always get the rows of all their child states. If `recursive` is False, the rows of child
+        states already in the tree are kept as they are, which is sufficient if only states were added or removed.
+
         :param parent_iter: Parent tree store iterator the insert should be performed in
         :param StateModel state_model: Model of state that has to be insert and/or updated
         :param bool with_expand: Trigger to expand tree
+        :param bool recursive: Trigger to update the rows of child states already in the tree
         :return:
         """
         # the case handling of this method
@@ -424,7 +443,8 @@ class StateMachineTreeController(TreeViewController):
 
         # check if in
         state_path = state_model.state.get_path()
-        if state_path not in self.state_row_iter_dict_by_state_path:
+        inserted = state_path not in self.state_row_iter_dict_by_state_path
+        if inserted:
             # if not in -> insert it
             state_row_iter = self.tree_store.insert_before(parent=parent_iter, sibling=None,
                                                            row=(state_model.state.name,
@@ -433,23 +453,32 @@ class StateMachineTreeController(TreeViewController):
                                                                 _state_model,
                                                                 state_model.state.get_path()))
             self.state_row_iter_dict_by_state_path[state_path] = state_row_iter
-            if with_expand:
-                parent_path = self.tree_store.get_path(state_row_iter)
-                self.view.expand_to_path(parent_path)
         else:
             # if in -> check if up to date
             state_row_iter = self.state_row_iter_dict_by_state_path[state_model.state.get_path()]
             self.update_tree_store_row(state_model)
 
         # check children
+        # - the rows of child states without models are created on expansion, as this creates the models
+        children_pending = isinstance(state_model, ContainerStateModel) and not state_model.states.loaded
+        placeholder_iter = None if inserted else self.get_placeholder_iter(state_row_iter)
+        if children_pending:
+            if placeholder_iter is None:
+                self.tree_store.insert_before(parent=state_row_iter, sibling=None, row=("", "", "", None, None))
+        elif placeholder_iter is not None:
+            self.tree_store.remove(placeholder_iter)
+            inserted = True
         # - check if ALL children are in
-        if isinstance(state_model, ContainerStateModel):
+        if isinstance(state_model, ContainerStateModel) and not children_pending:
             for child_state_id, child_state_model in state_model.states.items():
-                self.insert_and_update_recursively(state_row_iter, child_state_model, with_expand=False)
+                if recursive or inserted or not self.is_state_model_in_tree(child_state_model):
+                    self.insert_and_update_recursively(state_row_iter, child_state_model, with_expand=False,
+                                                       recursive=recursive)
 
-        # - check if TOO MUCH children are in
+        # - check if TOO MUCH children are in -> a freshly inserted row has no left over rows
         # if state_model.state.get_library_root_state() is not None or isinstance(state_model, LibraryStateModel):
-        for n in reversed(range(self.tree_store.iter_n_children(state_row_iter))):
+        number_of_child_rows = 0 if inserted or children_pending else self.tree_store.iter_n_children(state_row_iter)
+        for n in reversed(range(number_of_child_rows)):
             child_iter = self.tree_store.iter_nth_child(state_row_iter, n)
             child_state_path = self.tree_store.get_value(child_iter, self.STATE_PATH_STORAGE_ID)
             child_model = None
@@ -474,15 +503,78 @@ class StateMachineTreeController(TreeViewController):
                 del self.state_row_iter_dict_by_state_path[self.tree_store.get_value(child_iter, self.STATE_PATH_STORAGE_ID)]
                 self.tree_store.remove(child_iter)
 
+        if with_expand:
+            self.view.expand_to_path(self.tree_store.get_path(state_row_iter))
+
         if self._state_which_is_updated is _state_model:
             self._state_which_is_updated = None
 
+    def get_placeholder_iter(self, state_row_iter):
+        """Returns the placeholder row of a state row, whose child rows have not been created, yet
+
+        :param Gtk.TreeIter state_row_iter: The row of the state
+        :return: the placeholder row or None
+        :rtype: Gtk.TreeIter
+        """
+        child_iter = self.tree_store.iter_children(state_row_iter)
+        if child_iter is not None and self.tree_store.get_value(child_iter, self.STATE_PATH_STORAGE_ID) is None:
+            return child_iter
+        return None
+
+    def insert_pending_children(self, state_row_iter):
+        """Creates the child state models and rows of a state row, which only has a placeholder row
+
+        :param Gtk.TreeIter state_row_iter: The row of the state
+        """
+        placeholder_iter = self.get_placeholder_iter(state_row_iter)
+        if placeholder_iter is None:
+            return
+        state_model = self.tree_store.get_value(state_row_iter, self.MODEL_STORAGE_ID)
+        if isinstance(state_model, LibraryStateModel):
+            state_model = state_model.state_copy
+        for child_state_model in list(state_model.states.values()):
+            self.insert_and_update_recursively(state_row_iter, child_state_model)
+        # the placeholder is removed last, so that the row stays expandable
+        self.tree_store.remove(placeholder_iter)
+
+    def is_below_placeholder(self, state_model):
+        """Checks whether the row of a state is only created, when the row of one of its parents is expanded
+
+        :param rafcon.gui.models.abstract_state.AbstractStateModel state_model: The state model to check
+        :rtype: bool
+        """
+        parent_model = state_model.parent
+        while parent_model is not None:
+            parent_row_iter = self.state_row_iter_dict_by_state_path.get(parent_model.state.get_path())
+            if parent_row_iter is not None:
+                return self.get_placeholder_iter(parent_row_iter) is not None
+            parent_model = parent_model.parent
+        return False
+
+    def on_test_expand_row(self, tree_view, state_row_iter, state_row_path):
+        """Inserts the child rows of a row before it is expanded"""
+        self.insert_pending_children(state_row_iter)
+        return False
+
+    def is_state_model_in_tree(self, state_model):
+        """Checks if a row of the state or, in case of a library state, of its library root state exists
+
+        :param rafcon.gui.models.abstract_state.AbstractStateModel state_model: The state model to check
+        :rtype: bool
+        """
+        if state_model.state.get_path() in self.state_row_iter_dict_by_state_path:
+            return True
+        return isinstance(state_model, LibraryStateModel) and state_model.state_copy_initialized and \
+            state_model.state_copy.state.get_path() in self.state_row_iter_dict_by_state_path
+
     def remove_tree_children(self, child_tree_iter):
         for n in reversed(range(self.tree_store.iter_n_children(child_tree_iter))):
             child_iter = self.tree_store.iter_nth_child(child_tree_iter, n)
             if self.tree_store.iter_n_children(child_iter):
                 self.remove_tree_children(child_iter)
-            del self.state_row_iter_dict_by_state_path[self.tree_store.get_value(child_iter, self.STATE_PATH_STORAGE_ID)]
+            child_state_path = self.tree_store.get_value(child_iter, self.STATE_PATH_STORAGE_ID)
+            if child_state_path is not None:
+                del self.state_row_iter_dict_by_state_path[child_state_path]
             # self.tree_store.remove(child_iter)
 
     def get_state_machine_selection(self):
@@ -521,6 +613,21 @@ class StateMachineTreeController(TreeViewController):
                                     isinstance(state_model, LibraryStateModel) and self.show_content(state_model):
                         self.view.expand_to_path(path)
 
+    def update_selection_sm_prior(self):
+        """State machine prior update of tree selection, which creates the missing rows of selected states"""
+        if self._selected_sm_model and not self._do_selection_update:
+            for state_model in self._selected_sm_model.selection.states:
+                parent_models = []
+                parent_model = state_model.parent
+                while parent_model is not None:
+                    parent_models.insert(0, parent_model)
+                    parent_model = parent_model.parent
+                for parent_model in parent_models:
+                    parent_row_iter = self.state_row_iter_dict_by_state_path.get(parent_model.state.get_path())
+                    if parent_row_iter is not None:
+                        self.insert_pending_children(parent_row_iter)
+        super(StateMachineTreeController, self).update_selection_sm_prior()
+
     @TreeViewController.observe("sm_selection_changed_signal", signal=True)
     def assign_notification_selection(self, state_machine_m, signal_name, signal_msg):
         if state_machine_m is None and self._selected_sm_model and \
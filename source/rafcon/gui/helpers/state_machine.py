@@ -212,6 +212,13 @@ def save_state_machine(delete_old_state_machine=False, recent_opened_notificatio
     state_machine_m = state_machine_manager_model.get_selected_state_machine_model()
     sm_path = state_machine_m.state_machine.file_system_path
 
+    # models created later would read their meta data from the new path or from the removed folder
+    root_state = state_machine_m.state_machine.root_state
+    if not as_copy and isinstance(state_machine_m.root_state, ContainerStateModel) and \
+            (delete_old_state_machine or
+             root_state.file_system_path != os.path.join(sm_path, storage.get_storage_id_for_state(root_state))):
+        state_machine_m.root_state.load_pending_state_models()
+
     storage.save_state_machine_to_path(state_machine_m.state_machine, copy_path if as_copy else sm_path,
                                        delete_old_state_machine=delete_old_state_machine, as_copy=as_copy)
     if recent_opened_notification:
@@ -27,6 +27,7 @@ from rafcon.core.states.state import State
 from rafcon.core.storage import storage
 
 from rafcon.utils import storage_utils, constants
+from rafcon.utils.filesystem import write_file
 from rafcon.utils.hashable import Hashable
 from rafcon.utils.vividict import Vividict
 from rafcon.utils import log
@@ -77,6 +78,8 @@ class AbstractStateModel(MetaModel, Hashable):
 
     _parent = None
     _is_about_to_be_destroyed_recursively = False
+    # maps meta data file paths to the hash of the meta data last written there, see store_meta_data()
+    _stored_meta_data_hashes = None
     is_start = None
     state = None
     income = None
@@ -537,7 +540,16 @@ class AbstractStateModel(MetaModel, Hashable):
             meta_file_path_json = os.path.join(self.state.file_system_path, storage.FILE_NAME_META_DATA)
         meta_data = deepcopy(self.meta)
         self._generate_element_meta_data(meta_data)
-        storage_utils.write_dict_to_json(meta_data, meta_file_path_json)
+        meta_data_string = storage_utils.get_json_string(meta_data)
+        # unchanged meta data is not written again, as the core data of unmodified states, see storage.py
+        meta_data_hash = hash(meta_data_string)
+        if self._stored_meta_data_hashes is None:
+            self._stored_meta_data_hashes = {}
+        elif self._stored_meta_data_hashes.get(meta_file_path_json) == meta_data_hash and \
+                os.path.exists(meta_file_path_json):
+            return
+        write_file(meta_file_path_json, meta_data_string, atomic=True)
+        self._stored_meta_data_hashes[meta_file_path_json] = meta_data_hash
 
     def copy_meta_data_from_state_m(self, source_state_m):
         """Dismiss current meta data and copy meta data from given state model
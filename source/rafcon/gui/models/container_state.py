@@ -15,10 +15,13 @@
 from future.utils import string_types
 
 from copy import deepcopy
+import os.path
+import threading
 
 from gtkmvc3.model_mt import ModelMT
 
 from rafcon.core.states.container_state import ContainerState
+from rafcon.core.storage import storage
 from rafcon.gui.models.abstract_state import AbstractStateModel
 from rafcon.gui.models.abstract_state import get_state_model_class_for_state
 from rafcon.gui.models.data_flow import DataFlowModel, StateElementModel
@@ -26,10 +29,80 @@ from rafcon.gui.models.scoped_variable import ScopedVariableModel
 from rafcon.gui.models.state import StateModel
 from rafcon.gui.models.transition import TransitionModel
 
+from rafcon.gui.config import global_gui_config
 from rafcon.gui.utils.notification_overview import NotificationOverview
+from rafcon.utils.filesystem import copy_file_if_update_required
 from rafcon.utils import log
 logger = log.get_logger(__name__)
 
+# secures that the models of a hierarchy level are only created once, if accessed from several threads
+_child_state_models_lock = threading.RLock()
+
+
+class LazyStateModelDict(dict):
+    """Dictionary of child state models, which creates the models on the first access
+
+    The models of all child states of a hierarchy level are created at once, as soon as the dictionary is accessed,
+    e.g. if the level is expanded in the state machine tree, shown in the graphical editor or one of its states is
+    selected. Until then, no models (and thus no observers) exist for the child states.
+    The models are inserted without notifications, as they represent the already existing child states.
+
+    The models are only created by the Python level methods of the dictionary. Functions reading the underlying dict
+    directly on the C level see an empty dictionary, if it has not been loaded, yet. This applies to the unbound
+    methods of dict (e.g. ``dict.keys(d)``), the C encoder of :mod:`json` and, on Python 2, also to ``dict(d)``,
+    ``{}.update(d)`` and ``copy.copy(d)``. Such callers have to call :meth:`load` before.
+
+    :param load_models: Function creating the models, which is called with the dictionary as argument
+    """
+
+    def __init__(self, load_models=None):
+        super(LazyStateModelDict, self).__init__()
+        self._load_models = load_models
+        self._loading = False
+
+    @property
+    def loaded(self):
+        """Whether the child state models have been created"""
+        return self._load_models is None
+
+    def load(self):
+        """Creates the child state models, if not done, yet
+
+        Accesses while the models are created, e.g. by the models themselves, see the models created so far.
+        """
+        if self._load_models is None:
+            return
+        with _child_state_models_lock:
+            if self._load_models is None or self._loading:
+                return
+            self._loading = True
+            try:
+                self._load_models(self)
+            finally:
+                self._loading = False
+                self._load_models = None
+
+    def clear(self):
+        # models which have not been created yet do not need to be created for being removed
+        self._load_models = None
+        super(LazyStateModelDict, self).clear()
+
+
+def _loading_method(method_name):
+    method = getattr(dict, method_name)
+
+    def load_and_call(self, *args, **kwargs):
+        self.load()
+        return method(self, *args, **kwargs)
+    load_and_call.__name__ = method_name
+    return load_and_call
+
+for _method_name in ["__getitem__", "__setitem__", "__delitem__", "__contains__", "__iter__", "__len__", "__eq__",
+                     "__ne__", "__repr__", "get", "keys", "values", "items", "pop", "popitem", "setdefault", "update",
+                     "copy", "has_key", "iterkeys", "itervalues", "iteritems", "viewkeys", "viewvalues", "viewitems"]:
+    if hasattr(dict, _method_name):
+        setattr(LazyStateModelDict, _method_name, _loading_method(_method_name))
+
 
 class ContainerStateModel(StateModel):
     """This model class manages a ContainerState
@@ -72,18 +145,32 @@ class ContainerStateModel(StateModel):
     def _load_child_state_models(self, load_meta_data):
         """Adds models for each child state of the state
 
+        If ``LAZY_STATE_MODEL_CREATION`` is enabled, the models are created on the first access of the states
+        dictionary, see :class:`LazyStateModelDict`. Models for states added in the meantime are created by the usual
+        notifications.
+
         :param bool load_meta_data: Whether to load the meta data of the child state
         """
-        self.states = {}
-        # Create model for each child class
-        child_states = self.state.states
-        for child_state in child_states.values():
-            # Create hierarchy
-            model_class = get_state_model_class_for_state(child_state)
-            if model_class is not None:
-                self._add_model(self.states, child_state, model_class, child_state.state_id, load_meta_data)
-            else:
-                logger.error("Unknown state type '{type:s}'. Cannot create model.".format(type=type(child_state)))
+        child_state_ids = list(self.state.states.keys())
+
+        def load_child_state_models(states):
+            # Create model for each child class
+            for child_state_id in child_state_ids:
+                child_state = self.state.states.get(child_state_id)
+                if child_state is None:
+                    continue
+                # Create hierarchy
+                model_class = get_state_model_class_for_state(child_state)
+                if model_class is not None:
+                    self._add_model(states, child_state, model_class, child_state.state_id, load_meta_data)
+                else:
+                    logger.error("Unknown state type '{type:s}'. Cannot create model.".format(type=type(child_state)))
+
+        self.states = LazyStateModelDict(load_child_state_models)
+        # expected models have to be passed to the child states immediately, as they are not kept
+        if self.expected_future_models or \
+                not global_gui_config.get_config_value("LAZY_STATE_MODEL_CREATION", True):
+            self.states.load()
 
     def _load_scoped_variable_models(self):
         """ Adds models for each scoped variable of the state """
@@ -115,7 +202,8 @@ class ContainerStateModel(StateModel):
         """
         if not isinstance(item, (StateModel, StateElementModel)):
             return False
-        return super(ContainerStateModel, self).__contains__(item) or item in self.states.values() \
+        return super(ContainerStateModel, self).__contains__(item) \
+               or (self.states.loaded and item in self.states.values()) \
                or item in self.transitions or item in self.data_flows \
                or item in self.scoped_variables
 
@@ -131,8 +219,9 @@ class ContainerStateModel(StateModel):
                 scoped_variable.prepare_destruction()
             for connection in self.transitions[:] + self.data_flows[:]:
                 connection.prepare_destruction()
-            for state in self.states.values():
-                state.prepare_destruction(recursive)
+            if self.states.loaded:
+                for state in self.states.values():
+                    state.prepare_destruction(recursive)
         del self.scoped_variables[:]
         del self.transitions[:]
         del self.data_flows[:]
@@ -223,8 +312,21 @@ class ContainerStateModel(StateModel):
         return cause, changed_list
 
 
+    def load_pending_state_models(self):
+        """Creates the models of all hierarchy levels below the state, which were not accessed, yet
+
+        The models read their meta data from the current path of their states. Thus, they have to be created before the
+        state machine is saved to another path or its folder is deleted.
+        """
+        for state_m in self.states.values():
+            if isinstance(state_m, ContainerStateModel):
+                state_m.load_pending_state_models()
+
     def update_child_is_start(self):
         """ Updates the `is_child` property of its child states """
+        if not self.states.loaded:
+            # models created later determine the property themselves
+            return
         for state_id, state_m in self.states.items():
             state_m.update_is_start()
 
@@ -423,6 +525,11 @@ class ContainerStateModel(StateModel):
         :param str copy_path: Optional copy path if meta data is not stored to the file system path of state machine
         """
         super(ContainerStateModel, self).store_meta_data(copy_path)
+        if not self.states.loaded:
+            # the meta data of levels without models is unchanged, a copy of the state machine needs the files, though
+            if copy_path:
+                _copy_meta_data_files_of_child_states(self.state, copy_path)
+            return
         for state_key, state in self.states.items():
             state.store_meta_data(copy_path)
 
@@ -488,3 +595,19 @@ class ContainerStateModel(StateModel):
         for scoped_variable_m in self.scoped_variables:
             self._copy_element_meta_data_to_meta_file_data(meta_data, scoped_variable_m, "scoped_variable",
                                                            scoped_variable_m.scoped_variable.data_port_id)
+
+
+def _copy_meta_data_files_of_child_states(container_state, copy_path):
+    """Copies the meta data files of all child states recursively from their path to a copy of the state machine
+
+    :param rafcon.core.states.container_state.ContainerState container_state: The state whose children are considered
+    :param str copy_path: The path of the state machine copy
+    """
+    for child_state in container_state.states.values():
+        if child_state.file_system_path is not None:
+            source_file = os.path.join(child_state.file_system_path, storage.FILE_NAME_META_DATA)
+            target_folder = os.path.join(copy_path, child_state.get_storage_path())
+            if os.path.isfile(source_file) and os.path.isdir(target_folder):
+                copy_file_if_update_required(source_file, os.path.join(target_folder, storage.FILE_NAME_META_DATA))
+        if isinstance(child_state, ContainerState):
+            _copy_meta_data_files_of_child_states(child_state, copy_path)
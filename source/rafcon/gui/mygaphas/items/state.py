@@ -41,7 +41,7 @@ from rafcon.gui.mygaphas.utils import gap_draw_helper
 from rafcon.gui.mygaphas.utils.cache.image_cache import ImageCache
 
 from rafcon.gui.models import AbstractStateModel, LibraryStateModel, ContainerStateModel
-from rafcon.gui.helpers.meta_data import contains_geometric_info
+from rafcon.gui.helpers.meta_data import contains_geometric_info, resize_state_content_meta
 from rafcon.gui.helpers.label import set_label_markup
 from rafcon.gui.config import global_gui_config as gui_config
 from rafcon.gui.runtime_config import global_runtime_config
@@ -88,6 +88,8 @@ class StateView(Element):
         self.port_constraints = {}
 
         self._moving = False
+        # Whether the views of the content (child states, transitions, data flows or the state copy of a library) exist
+        self.content_created = False
 
         self._view = None
 
@@ -211,6 +213,17 @@ class StateView(Element):
             self._constraints.remove(constraint)
         self.canvas.remove(self)
 
+    def remove_content(self):
+        """Remove the views of the content of the state
+
+        The views of the child states, transitions and data flows (or of the state copy of a library) are removed
+        recursively, the state view itself with its ports and its NameView is kept.
+        """
+        for child in self.canvas.get_children(self)[:]:
+            if child is not self.name_view:
+                child.remove()
+        self.content_created = False
+
     @staticmethod
     def add_keep_rect_within_constraint(canvas, parent, child):
         solver = canvas.solver
@@ -387,9 +400,10 @@ class StateView(Element):
         if isinstance(self.model, ContainerStateModel):
             for scoped_port_v in self.scoped_variables:
                 update_port_position(scoped_port_v, scoped_port_v.model.get_meta_data_editor())
-            for transition_m in self.model.transitions:
-                transition_v = self.canvas.get_view_for_model(transition_m)
-                transition_v.apply_meta_data()
+            if self.content_created:
+                for transition_m in self.model.transitions:
+                    transition_v = self.canvas.get_view_for_model(transition_m)
+                    transition_v.apply_meta_data()
 
             if recursive:
                 for state_v in self.canvas.get_children(self):
@@ -871,7 +885,11 @@ class StateView(Element):
                 new_port_rel_pos = calc_new_rel_pos(port_v.handle.pos, old_state_size, new_state_size)
                 port_v.handle.pos = new_port_rel_pos
 
-            if isinstance(state_v.model, ContainerStateModel):
+            if not state_v.content_created:
+                # The content has no views, thus only its meta data is scaled
+                if isinstance(state_v.model, ContainerStateModel) or state_v.show_content():
+                    resize_state_content_meta(state_v.model, (width_factor, height_factor))
+            elif isinstance(state_v.model, ContainerStateModel):
                 for transition_v in state_v.get_transitions():
                     for waypoint in transition_v.waypoints:
                         old_rel_pos = self.canvas.get_matrix_i2i(transition_v, transition_v.parent).transform_point(
@@ -206,7 +206,7 @@ class ExtendedGtkView(GtkView, Observer):
     @Observer.observe("selection_changed_signal", signal=True)
     def _on_selection_changed_externally(self, selection_m, signal_name, signal_msg):
         selected_items = self._get_selected_items()
-        previously_selected_items = set(self.canvas.get_view_for_model(model) for model in signal_msg.arg.old_selection)
+        previously_selected_items = self._get_views_for_models(signal_msg.arg.old_selection)
         affected_items = selected_items ^ previously_selected_items
         self.queue_draw_item(*affected_items)
         self.emit('selection-changed', selected_items)
@@ -251,9 +251,15 @@ class ExtendedGtkView(GtkView, Observer):
         self.queue_draw_item(*items)
         self.emit('selection-changed', self._get_selected_items())
 
+    def _get_views_for_models(self, models):
+        """ Return the existing views of the models, the content of small states has no views """
+        views = set(self.canvas.get_view_for_model(model) for model in models)
+        views.discard(None)
+        return views
+
     def _get_selected_items(self):
         """ Return an Item (e.g. StateView) for each model (e.g. StateModel) in the current selection """
-        return set(self.canvas.get_view_for_model(model) for model in self._selection)
+        return self._get_views_for_models(self._selection)
 
     def handle_new_selection(self, items):
         """ Determines the selection
@@ -22,12 +22,14 @@ from rafcon.core.config import global_config
 from rafcon.gui.runtime_config import global_runtime_config
 from rafcon.core.singleton import state_machine_manager,\
     global_variable_manager, state_machine_execution_engine, library_manager
+from rafcon.core.execution.execution_status_channel import execution_status_channel
 from rafcon.gui.config import global_gui_config
 from rafcon.gui.models.config_model import ConfigModel
 from rafcon.gui.models.global_variable_manager import GlobalVariableManagerModel
 from rafcon.gui.models.library_manager import LibraryManagerModel
 from rafcon.gui.models.state_machine_execution_engine import StateMachineExecutionEngineModel
 from rafcon.gui.models.state_machine_manager import StateMachineManagerModel
+from rafcon.gui.utils.execution_status import ExecutionStatusDrainer
 
 global_focus = None
 
@@ -43,6 +45,8 @@ state_machine_execution_model = StateMachineExecutionEngineModel(state_machine_e
 
 global_variable_manager_model = GlobalVariableManagerModel(global_variable_manager)
 
+execution_status_drainer = ExecutionStatusDrainer(execution_status_channel)
+
 main_window_controller = None
 
 core_config_model = ConfigModel(global_config)
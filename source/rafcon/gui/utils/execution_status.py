@@ -0,0 +1,94 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: execution_status
+   :synopsis: A module to process execution status changes of states at a fixed rate in the GTK main loop
+
+"""
+
+from builtins import object
+from gi.repository import GLib
+
+from rafcon.gui.config import global_gui_config
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+
+class ExecutionStatusDrainer(object):
+    """Drains the :class:`rafcon.core.execution.execution_status_channel.ExecutionStatusChannel` in the GTK main loop
+
+    The channel is enabled as long as callbacks are registered. With the rate given by the GUI config value
+    ``EXECUTION_STATUS_REFRESH_RATE``, the pending status changes are drained: the observable notifications of the
+    coalesced changes are emitted in the GTK main loop and the changes are handed to all callbacks as list of
+    (state, state_execution_status) tuples. Registered consumers thus ignore the notifications while the drainer is
+    :attr:`active`. If the rate is 0, the channel stays disabled and the callbacks are not called, thus the consumers
+    use the notifications, which are emitted immediately in the executing thread.
+    """
+
+    def __init__(self, channel):
+        self._channel = channel
+        self._callbacks = []
+        self._timeout_id = None
+
+    @property
+    def active(self):
+        return self._timeout_id is not None
+
+    def register(self, callback):
+        """Registers a callback for status changes and starts the drainer, if not done already
+
+        :param callback: a callable accepting the list of status changes
+        """
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+        if not self.active:
+            self._start()
+
+    def unregister(self, callback):
+        """Unregisters a callback, the drainer is stopped with the last callback
+
+        :param callback: the callable passed to :meth:`register`
+        """
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+        if not self._callbacks and self.active:
+            self._stop()
+
+    def _start(self):
+        refresh_rate = global_gui_config.get_config_value("EXECUTION_STATUS_REFRESH_RATE", 30)
+        if not refresh_rate:
+            return
+        self._channel.enabled = True
+        self._timeout_id = GLib.timeout_add(max(1, int(1000. / refresh_rate)), self._drain)
+
+    def _stop(self):
+        GLib.source_remove(self._timeout_id)
+        self._timeout_id = None
+        self._channel.enabled = False
+        # the observers are notified about the last changes, which were already applied to the states
+        self._channel.drain(notify=True)
+
+    def flush(self):
+        """Processes the pending status changes immediately, instead of waiting for the next refresh"""
+        if self.active:
+            self._drain()
+
+    def _drain(self):
+        changes = self._channel.drain(notify=True)
+        if changes:
+            for callback in list(self._callbacks):
+                try:
+                    callback(changes)
+                except Exception:
+                    logger.exception("Error while processing execution status changes")
+        # keep the timeout
+        return True
@@ -13,19 +13,54 @@
 from future.utils import string_types, native_str
 from builtins import range
 from builtins import str
+from collections import Mapping
 import shelve
 import json
 import pickle
 
 from rafcon.utils.vividict import Vividict
+from rafcon.utils.segment_log import SegmentLogReader, SegmentLogWriter, is_segment_log
 from rafcon.utils import log
 logger = log.get_logger(__name__)
 
 
+def open_execution_log(filename):
+    """Opens an execution log for reading
+
+    :param str filename: path of a shelve log file or of a segment log directory
+    :return: the opened log, a mapping from history_item_id to history item
+    :rtype: shelve.Shelf | rafcon.utils.segment_log.SegmentLogReader
+    """
+    if is_segment_log(filename):
+        return SegmentLogReader(filename)
+    return shelve.open(filename, 'r')
+
+
+def shelve_to_segment_log(shelve_filename, segment_log_path):
+    """Converts a shelve execution log into a segment log
+
+    The records are written in the order of their history_item_ids, i.e. in the order of their creation.
+
+    :param str shelve_filename: path of the shelve log file
+    :param str segment_log_path: directory of the new segment log
+    :return: the number of converted history items
+    :rtype: int
+    """
+    execution_history_items = shelve.open(shelve_filename, 'r')
+    writer = SegmentLogWriter(segment_log_path)
+    try:
+        for history_item_id in sorted(execution_history_items.keys()):
+            writer[history_item_id] = execution_history_items[history_item_id]
+        return len(execution_history_items)
+    finally:
+        writer.close()
+        execution_history_items.close()
+
+
 def log_to_raw_structure(execution_history_items):
     """
     :param dict execution_history_items: history items, in the simplest case
-           directly the opened shelve log file
+           directly the opened shelve log file or segment log reader (see :func:`open_execution_log`)
     :return: start_item, the StateMachineStartItem of the log file
              previous, a dict mapping history_item_id --> history_item_id of previous history item
              next_, a dict mapping history_item_id --> history_item_id of the next history item (except if
@@ -85,7 +120,7 @@ def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=Tr
     The collapsed items hold input as well as output data (direct and scoped), and the outcome
     the state execution.
     :param dict execution_history_items: history items, in the simplest case
-           directly the opened shelve log file
+           directly the opened shelve log file or segment log reader (see :func:`open_execution_log`)
     :param bool throw_on_pickle_error: flag if an error is thrown if an object cannot be un-pickled
     :param bool include_erroneous_data_ports: flag if to include erroneous data ports
     :param bool full_next: flag to indicate if the next relationship has also to be created at the end
@@ -307,6 +342,182 @@ def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=Tr
     return start_item, collapsed_next, collapsed_concurrent, collapsed_hierarchy, collapsed_items
 
 
+#: properties of the start item, which are copied into its collapsed item
+START_ITEM_KEYS = ['description', 'path_by_name', 'state_name', 'run_id', 'state_type', 'path', 'timestamp',
+                   'root_state_storage_id', 'state_machine_version', 'used_rafcon_version', 'creation_time',
+                   'last_update', 'os_environment']
+#: properties added in later rafcon versions, with their default values
+EXTENDED_ITEM_KEYS = [('semantic_data', {}), ('is_library', None), ('library_state_name', None),
+                      ('library_name', None), ('library_path', None)]
+#: properties of the call item, which are copied into the collapsed item of a state execution
+CALL_ITEM_KEYS = ['description', 'path_by_name', 'state_name', 'run_id', 'state_type', 'path']
+#: the columns of collapsed items holding pickled data
+DATA_COLUMNS = {'data_ins': 'input_output_data', 'data_outs': 'input_output_data',
+                'scoped_data_ins': 'scoped_data', 'scoped_data_outs': 'scoped_data', 'semantic_data': 'semantic_data'}
+
+COLLAPSED_STATE_TYPES = ('ExecutionState', 'HierarchyState', 'LibraryState')
+
+
+class LazyUnpickledDict(Mapping):
+    """A read-only dict of pickled data, which unpickles a value on each access
+
+    Keys starting with '!' indicate data that could not be pickled during the execution, they are only included
+    with ``include_erroneous_data_ports``. Values, which cannot be unpickled, raise an exception on access.
+    """
+
+    def __init__(self, pickled_data, include_erroneous_data_ports=False):
+        self._pickled_data = pickled_data
+        self._include_erroneous_data_ports = include_erroneous_data_ports
+
+    def __getitem__(self, key):
+        if key.startswith('!'):
+            if not self._include_erroneous_data_ports:
+                raise KeyError(key)
+            return self._pickled_data[key]
+        return pickle.loads(self._pickled_data[key])
+
+    def __iter__(self):
+        for key in self._pickled_data:
+            if self._include_erroneous_data_ports or not key.startswith('!'):
+                yield key
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+
+def _unpickle_data(data_dict, throw_on_pickle_error=True, include_erroneous_data_ports=False, lazy=False):
+    # support backward compatibility
+    if isinstance(data_dict, string_types):  # formerly data dict was a json string
+        return json.loads(data_dict)
+    if isinstance(data_dict, Vividict):  # formerly semantic data was stored unpickled
+        return data_dict
+    if lazy:
+        return LazyUnpickledDict(data_dict, include_erroneous_data_ports)
+    r = dict()
+    for k, v in data_dict.items():
+        if not k.startswith('!'):  # ! indicates storage error
+            try:
+                r[k] = pickle.loads(v)
+            except Exception as e:
+                if throw_on_pickle_error:
+                    raise
+                elif include_erroneous_data_ports:
+                    r['!' + k] = (str(e), v)
+        elif include_erroneous_data_ports:
+            r[k] = v
+    return r
+
+
+def iter_log_records(execution_history_items):
+    """Yields the history items of a log in the order of their creation
+
+    Segment logs are read in the order in which the items were written. For other logs, e.g. shelves, the keys are
+    sorted by their history_item_id, which reflects the order of creation.
+
+    :param dict execution_history_items: history items, e.g. an opened shelve log file or segment log reader
+    :return: generator of (history_item_id, history item) tuples
+    """
+    if isinstance(execution_history_items, SegmentLogReader):
+        history_item_ids = iter(execution_history_items)
+    else:
+        history_item_ids = sorted(execution_history_items.keys())
+    for history_item_id in history_item_ids:
+        yield history_item_id, execution_history_items[history_item_id]
+
+
+def iter_collapsed_items(execution_history_items, columns=None, lazy_unpickling=False, throw_on_pickle_error=True,
+                         include_erroneous_data_ports=False):
+    """Yields the collapsed items of a log one by one
+
+    In contrast to :func:`log_to_collapsed_structure`, the log is streamed: only the call items of the currently
+    running state executions are held in memory, thus the memory usage does not depend on the size of the log. The
+    collapsed item of a state execution is yielded, once its return item is read, i.e. in the order in which the
+    executions finished. The start item is yielded first. Executions without return item of type EXECUTE (e.g. of
+    the root state or of an aborted execution) are yielded at the end of the log.
+
+    The relations between the items (next, concurrent, hierarchy) are not determined.
+
+    :param dict execution_history_items: history items, e.g. an opened shelve log file or segment log reader
+    :param columns: optional keys of the collapsed items to be included, data columns (e.g. 'data_ins') that are not
+        selected are not unpickled
+    :param bool lazy_unpickling: if True, the data columns are :class:`LazyUnpickledDict` objects, which only
+        unpickle the accessed values
+    :param bool throw_on_pickle_error: flag if an error is thrown if an object cannot be un-pickled
+    :param bool include_erroneous_data_ports: flag if to include erroneous data ports
+    :return: generator of (run_id, collapsed item) tuples
+    """
+    columns = None if columns is None else set(columns)
+    unpickle_options = dict(throw_on_pickle_error=throw_on_pickle_error,
+                            include_erroneous_data_ports=include_erroneous_data_ports, lazy=lazy_unpickling)
+
+    # run_id --> [call item of type EXECUTE, call item of type CONTAINER, return item of type CONTAINER]
+    running_executions = {}
+    for history_item_id, item in iter_log_records(execution_history_items):
+        if item['item_type'] == 'StateMachineStartItem':
+            execution_item = {}
+            for key in START_ITEM_KEYS:
+                if key in item:
+                    execution_item[key] = item[key]
+                else:
+                    logger.warning("Key {} not in history start item".format(str(key)))
+            for key, default in EXTENDED_ITEM_KEYS:
+                execution_item[key] = item.get(key, default)
+            yield item['run_id'], _select_columns(execution_item, columns)
+            continue
+        if item['item_type'] not in ('CallItem', 'ReturnItem') or \
+                (item['state_type'] not in COLLAPSED_STATE_TYPES and 'Concurrency' not in item['state_type']):
+            continue
+        run_id = item['run_id']
+        execution = running_executions.setdefault(run_id, [None, None, None])
+        if item['item_type'] == 'CallItem':
+            execution[0 if item['call_type'] == 'EXECUTE' else 1] = item
+        elif item['call_type'] == 'CONTAINER':
+            execution[2] = item
+        else:
+            del running_executions[run_id]
+            yield run_id, _collapse_execution(run_id, execution[0] or execution[1], item, columns, unpickle_options)
+
+    for run_id, (call_item, container_call_item, container_return_item) in running_executions.items():
+        yield run_id, _collapse_execution(run_id, call_item or container_call_item, container_return_item, columns,
+                                          unpickle_options)
+
+
+def _select_columns(execution_item, columns):
+    if columns is None:
+        return execution_item
+    return {key: value for key, value in execution_item.items() if key in columns}
+
+
+def _collapse_execution(run_id, call_item, return_item, columns, unpickle_options):
+    if call_item is None:
+        logger.warning('Could not find a CallItem in run_id group %s\nThere will probably be log information missing '
+                       'on this execution branch!' % str(run_id))
+        call_item = dict(description=None, history_item_id=None, path_by_name=None, state_name=None, run_id=None,
+                         state_type=None, path=None, timestamp=None, input_output_data={}, scoped_data={})
+    if return_item is None:
+        logger.warning('Could not find a ReturnItem in run_id group %s\nThere will probably be log information '
+                       'missing on this execution branch!' % str(run_id))
+        return_item = dict(history_item_id=None, outcome_name=None, outcome_id=None, timestamp=None,
+                           input_output_data={}, scoped_data={})
+
+    execution_item = {}
+    for key in CALL_ITEM_KEYS:
+        execution_item[key] = call_item[key]
+    for key, default in EXTENDED_ITEM_KEYS:
+        execution_item[key] = return_item.get(key, default)
+    for key in ['outcome_name', 'outcome_id']:
+        execution_item[key] = return_item[key]
+    execution_item['timestamp_call'] = call_item['timestamp']
+    execution_item['timestamp_return'] = return_item['timestamp']
+    execution_item = _select_columns(execution_item, columns)
+
+    for key, item in [('data_ins', call_item), ('data_outs', return_item), ('scoped_data_ins', call_item),
+                      ('scoped_data_outs', return_item), ('semantic_data', return_item)]:
+        if columns is None or key in columns:
+            execution_item[key] = _unpickle_data(item.get(DATA_COLUMNS[key], {}), **unpickle_options)
+    return execution_item
+
+
 def log_to_DataFrame(execution_history_items, data_in_columns=[], data_out_columns=[], scoped_in_columns=[],
                      scoped_out_columns=[], semantic_data_columns=[], throw_on_pickle_error=True):
     """
@@ -327,41 +538,38 @@ def log_to_DataFrame(execution_history_items, data_in_columns=[], data_out_colum
     except ImportError:
         raise ImportError("The Python package 'pandas' is required for log_to_DataFrame.")
 
-    start, next_, concurrency, hierarchy, gitems = log_to_collapsed_structure(
-        execution_history_items, throw_on_pickle_error=throw_on_pickle_error)
-    gitems.pop(start['run_id'])
-    if len(gitems) == 0:
-        return pd.DataFrame()
-
-    # remove columns which are not generic over all states (basically the
-    # data flow stuff)
-    df_keys = list(list(gitems.values())[0].keys())
-    df_keys.remove('data_ins')
-    df_keys.remove('data_outs')
-    df_keys.remove('scoped_data_ins')
-    df_keys.remove('scoped_data_outs')
-    df_keys.remove('semantic_data')
-    df_keys.sort()
-
+    selected_columns_by_key = [('data_ins', data_in_columns),
+                               ('data_outs', data_out_columns),
+                               ('scoped_data_ins', scoped_in_columns),
+                               ('scoped_data_outs', scoped_out_columns),
+                               ('semantic_data', semantic_data_columns)]
+    # the log is streamed and only the selected data values are unpickled
+    df_keys = None
     df_items = []
-
-    for rid, item in gitems.items():
+    collapsed_items = iter_collapsed_items(execution_history_items, lazy_unpickling=True)
+    for rid, item in collapsed_items:
+        if 'timestamp_call' not in item:  # start item
+            continue
+        if df_keys is None:
+            # remove columns which are not generic over all states (basically the
+            # data flow stuff)
+            df_keys = sorted(key for key in item.keys() if key not in DATA_COLUMNS)
         row_data = [item[k] for k in df_keys]
 
-        for key, selected_columns in [('data_ins', data_in_columns),
-                                      ('data_outs', data_out_columns),
-                                      ('scoped_data_ins', scoped_in_columns),
-                                      ('scoped_data_outs', scoped_out_columns),
-                                      ('semantic_data', semantic_data_columns)]:
+        for key, selected_columns in selected_columns_by_key:
             for column_key in selected_columns:
-                row_data.append(item[key].get(column_key, None))
+                try:
+                    row_data.append(item[key].get(column_key, None))
+                except Exception:
+                    if throw_on_pickle_error:
+                        raise
+                    row_data.append(None)
         df_items.append(row_data)
 
-    for key, selected_columns in [('data_ins', data_in_columns),
-                                  ('data_outs', data_out_columns),
-                                  ('scoped_data_ins', scoped_in_columns),
-                                  ('scoped_data_outs', scoped_out_columns),
-                                  ('semantic_data', semantic_data_columns)]:
+    if df_keys is None:
+        return pd.DataFrame()
+
+    for key, selected_columns in selected_columns_by_key:
         df_keys.extend([key + '__' + s for s in selected_columns])
     df = pd.DataFrame(df_items, columns=df_keys)
     # convert epoch to datetime
@@ -23,6 +23,9 @@ import shutil
 from os.path import realpath, dirname, join, expanduser
 import shutil, errno
 
+# os.rename does not replace existing files on Windows
+_replace_file = getattr(os, 'replace', os.rename)
+
 
 def create_path(path):
     """Creates a absolute path in the file system.
@@ -97,13 +100,27 @@ def read_file(file_path, filename=None):
     return file_content
 
     
-def write_file(file_path, content, create_full_path=False):
+def write_file(file_path, content, create_full_path=False, atomic=False):
+    """Writes a string to a file
+
+    :param str file_path: the path of the file
+    :param str content: the content to be written
+    :param bool create_full_path: whether to create the directory of the file, if not existing
+    :param bool atomic: if True, the content is written to a temporary file, which then replaces the file. Thus, the
+        file is never left partially written.
+    """
     file_path = os.path.realpath(file_path)
     if create_full_path:
         head, tail = os.path.split(file_path)
         create_path(head)
-    with open(file_path, 'w') as file_pointer:
+    if not atomic:
+        with open(file_path, 'w') as file_pointer:
+            file_pointer.write(content)
+        return
+    temporary_file_path = file_path + ".tmp"
+    with open(temporary_file_path, 'w') as file_pointer:
         file_pointer.write(content)
+    _replace_file(temporary_file_path, file_path)
     
         
 def get_default_config_path():
@@ -0,0 +1,208 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: segment_log
+   :synopsis: An append-only log format for execution history records
+
+A segment log is a directory holding the records in segment files and a sidecar index file. Each record is stored
+as pickle prefixed by its length. The index stores for each record its history_item_id, its run_id and its
+position. Records are only appended, thus a log can be synced without reopening it and can be read while it is
+written. Segments are rotated once they exceed a maximum size.
+
+"""
+from future.utils import native_str
+from builtins import object
+from collections import Mapping, OrderedDict
+import os
+import struct
+import pickle
+
+from rafcon.utils import log
+logger = log.get_logger(__name__)
+
+INDEX_FILENAME = "index.dat"
+SEGMENT_FILENAME = "segment-{0:05d}.dat"
+
+#: unsigned length of the following record, big endian
+_LENGTH_PREFIX = struct.Struct(">I")
+
+
+def is_segment_log(path):
+    """Checks whether the path points to a segment log
+
+    :param str path: path of the log
+    :rtype: bool
+    """
+    return os.path.isdir(path) and os.path.isfile(os.path.join(path, INDEX_FILENAME))
+
+
+def _write_record(file_handle, data):
+    file_handle.write(_LENGTH_PREFIX.pack(len(data)))
+    file_handle.write(data)
+
+
+def _read_records(file_handle):
+    """Yields the records of a file, a truncated record at the end of the file is ignored"""
+    while True:
+        prefix = file_handle.read(_LENGTH_PREFIX.size)
+        if len(prefix) < _LENGTH_PREFIX.size:
+            return
+        length = _LENGTH_PREFIX.unpack(prefix)[0]
+        data = file_handle.read(length)
+        if len(data) < length:
+            return
+        yield data
+
+
+class SegmentLogWriter(object):
+    """Appends records to a segment log
+
+    The writer can be used in place of a shelve for the :class:`ExecutionHistoryStorage`, as records can be
+    stored via ``writer[history_item_id] = record``. Appending to an existing log starts a new segment.
+
+    :ivar str path: the directory of the log
+    :ivar int max_segment_size: size in bytes after which a new segment is started
+    """
+
+    def __init__(self, path, max_segment_size=64 * 1024 * 1024, protocol=2):
+        self.path = path
+        self.max_segment_size = max_segment_size
+        self.protocol = protocol
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self._segment_number = len([filename for filename in os.listdir(path) if filename.startswith("segment-")])
+        self._segment_file = None
+        self._open_segment()
+        self._index_file = open(os.path.join(path, INDEX_FILENAME), 'ab')
+
+    def _open_segment(self):
+        if self._segment_file is not None:
+            self._segment_file.close()
+        self._segment_file = open(os.path.join(self.path, SEGMENT_FILENAME.format(self._segment_number)), 'ab')
+        self._segment_size = self._segment_file.tell()
+
+    def __setitem__(self, history_item_id, record):
+        self.append(record, history_item_id)
+
+    def append(self, record, history_item_id=None):
+        """Appends a record to the log
+
+        :param dict record: the record of a history item
+        :param str history_item_id: the key of the record, by default the history_item_id of the record
+        """
+        if history_item_id is None:
+            history_item_id = record['history_item_id']
+        data = pickle.dumps(record, self.protocol)
+        if self._segment_size > 0 and self._segment_size + len(data) > self.max_segment_size:
+            self._segment_number += 1
+            self._open_segment()
+        offset = self._segment_size + _LENGTH_PREFIX.size
+        _write_record(self._segment_file, data)
+        self._segment_size = offset + len(data)
+        # the data is written before its index entry, thus the index only refers to existing data
+        index_entry = (native_str(history_item_id), record.get('run_id'), self._segment_number, offset, len(data))
+        _write_record(self._index_file, pickle.dumps(index_entry, self.protocol))
+
+    def sync(self):
+        """Writes all buffered records to the disk"""
+        for file_handle in (self._segment_file, self._index_file):
+            file_handle.flush()
+            os.fsync(file_handle.fileno())
+
+    def close(self):
+        if self._index_file.closed:
+            return
+        self.sync()
+        self._segment_file.close()
+        self._index_file.close()
+
+
+class SegmentLogReader(Mapping):
+    """Provides read access to a segment log
+
+    The reader is a mapping from history_item_id to record, like an opened shelve log, thus it can be passed to the
+    functions of :mod:`rafcon.utils.execution_log`. Only the index is read on opening, records are read and
+    unpickled on access. Iteration follows the order in which the records were written.
+
+    :ivar str path: the directory of the log
+    """
+
+    def __init__(self, path, cache_size=1024):
+        if not is_segment_log(path):
+            raise ValueError("No segment log found at {0}".format(path))
+        self.path = path
+        self.cache_size = cache_size
+        self._index = OrderedDict()
+        self._run_ids = OrderedDict()
+        self._segment_files = {}
+        self._cache = OrderedDict()
+        self.reload_index()
+
+    def reload_index(self):
+        """Reads the index, e.g. to access records appended after the reader was opened"""
+        self._index.clear()
+        self._run_ids.clear()
+        with open(os.path.join(self.path, INDEX_FILENAME), 'rb') as index_file:
+            for data in _read_records(index_file):
+                history_item_id, run_id, segment_number, offset, length = pickle.loads(data)
+                self._index[history_item_id] = (segment_number, offset, length)
+                self._run_ids.setdefault(run_id, []).append(history_item_id)
+
+    @property
+    def run_ids(self):
+        """The run_ids of the log in the order of their first record"""
+        return list(self._run_ids.keys())
+
+    def get_history_item_ids_of_run(self, run_id):
+        """Returns the ids of all records with the given run_id, without reading the records
+
+        :param str run_id: the run_id of a state execution
+        :rtype: list
+        """
+        return list(self._run_ids.get(run_id, []))
+
+    def __getitem__(self, history_item_id):
+        if history_item_id in self._cache:
+            self._cache[history_item_id] = record = self._cache.pop(history_item_id)
+            return record
+        segment_number, offset, length = self._index[history_item_id]
+        segment_file = self._segment_files.get(segment_number)
+        if segment_file is None:
+            segment_file = open(os.path.join(self.path, SEGMENT_FILENAME.format(segment_number)), 'rb')
+            self._segment_files[segment_number] = segment_file
+        segment_file.seek(offset)
+        record = pickle.loads(segment_file.read(length))
+        if self.cache_size:
+            self._cache[history_item_id] = record
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return record
+
+    def __contains__(self, history_item_id):
+        return history_item_id in self._index
+
+    def __iter__(self):
+        return iter(list(self._index.keys()))
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        for segment_file in self._segment_files.values():
+            segment_file.close()
+        self._segment_files.clear()
+        self._cache.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
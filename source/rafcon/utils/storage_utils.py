@@ -23,6 +23,8 @@ from time import gmtime, strftime, strptime, mktime
 from jsonconversion.decoder import JSONObjectDecoder
 from jsonconversion.encoder import JSONObjectEncoder
 
+from rafcon.utils.filesystem import write_file
+
 substitute_modules = {
     # backward compatibiliy (remove in next minor release): state elements
     'rafcon.statemachine.data_flow.DataFlow': 'rafcon.core.state_elements.data_flow.DataFlow',
@@ -99,19 +101,29 @@ def load_dict_from_yaml(path):
     return dictionary
 
 
-def write_dict_to_json(dictionary, path, **kwargs):
+def get_json_string(dictionary, **kwargs):
+    """
+    Convert a dictionary to the json string written by :func:`write_dict_to_json`.
+    :param dictionary: The dictionary to be converted
+    :param kwargs: optional additional parameters for dumper
+    :return: the json string
+    """
+    return json.dumps(dictionary, cls=JSONObjectEncoder,
+                      indent=4, separators=(', ', ': '), builtins_str="__builtin__", sort_keys=True,
+                      check_circular=False, **kwargs)
+
+
+def write_dict_to_json(dictionary, path, atomic=False, **kwargs):
     """
     Write a dictionary to a json file.
     :param path: The relative path to save the dictionary to
     :param dictionary: The dictionary to get saved
+    :param bool atomic: Whether to write a temporary file first, which then replaces the file at `path`
     :param kwargs: optional additional parameters for dumper
     """
-    result_string = json.dumps(dictionary, cls=JSONObjectEncoder,
-                               indent=4, separators=(', ', ': '), builtins_str="__builtin__", sort_keys=True,
-                               check_circular=False, **kwargs)
-    with open(path, 'w') as f:
-        # We cannot write directly to the file, as otherwise the 'encode' method wouldn't be called
-        f.write(result_string)
+    result_string = get_json_string(dictionary, **kwargs)
+    # We cannot write directly to the file, as otherwise the 'encode' method wouldn't be called
+    write_file(path, result_string, atomic=atomic)
 
 
 def load_objects_from_json(path, as_dict=False):
@@ -127,3 +139,14 @@ def load_objects_from_json(path, as_dict=False):
         result = json.load(f, cls=JSONObjectDecoder, substitute_modules=substitute_modules)
     f.close()
     return result
+
+
+def load_objects_from_json_string(json_string, as_dict=False):
+    """Loads a dictionary from a json string, e.g. the content of a json file read before.
+
+    :param str json_string: The json string
+    :return: The dictionary specified in the json string
+    """
+    if as_dict:
+        return json.loads(json_string)
+    return json.loads(json_string, cls=JSONObjectDecoder, substitute_modules=substitute_modules)
@@ -250,9 +250,90 @@ def test_connections_from_object_type(caplog):
 
 
 
+class ReadOnlyFlaggedPayload(object):
+    """Mimics the setflags method of numpy arrays"""
+
+    def __init__(self):
+        self.data = list(range(10))
+        self.writeable = True
+
+    def setflags(self, write=None):
+        if write is not None:
+            self.writeable = write
+
+
+def create_state_machine_passing_payload(passing_policy):
+    from rafcon.core.state_elements.data_port import InputDataPort, OutputDataPort
+    producer = ExecutionState("Producer")
+    producer.script_text = 'def execute(self, inputs, outputs, gvm):\n' \
+                           '    outputs["payload"] = gvm.get_variable("payload", per_reference=True)\n' \
+                           '    return 0\n'
+    producer_output = producer.add_output_data_port("payload", "object")
+    consumer = ExecutionState("Consumer")
+    consumer.script_text = 'def execute(self, inputs, outputs, gvm):\n' \
+                           '    gvm.set_variable("received", inputs["payload"], per_reference=True)\n' \
+                           '    outputs["payload"] = inputs["payload"]\n' \
+                           '    return 0\n'
+    consumer_input = consumer.add_input_data_port("payload", "object")
+    consumer_output = consumer.add_output_data_port("payload", "object")
+
+    root_state = HierarchyState("Root")
+    root_state.add_state(producer)
+    root_state.add_state(consumer)
+    root_state.set_start_state(producer.state_id)
+    root_state.add_transition(producer.state_id, 0, consumer.state_id, None)
+    root_state.add_transition(consumer.state_id, 0, root_state.state_id, 0)
+    root_output = root_state.add_output_data_port("payload", "object")
+    root_state.add_data_flow(producer.state_id, producer_output, consumer.state_id, consumer_input)
+    root_state.add_data_flow(consumer.state_id, consumer_output, root_state.state_id, root_output)
+
+    consumer.get_data_port_by_id(consumer_input).passing_policy = passing_policy
+    root_state.get_data_port_by_id(root_output).passing_policy = passing_policy
+    assert isinstance(consumer.get_data_port_by_id(consumer_input), InputDataPort)
+    assert isinstance(root_state.get_data_port_by_id(root_output), OutputDataPort)
+    return StateMachine(root_state)
+
+
+@pytest.mark.parametrize("passing_policy", ["copy", "reference", "read_only"])
+def test_passing_policy_of_data_ports(caplog, passing_policy):
+    from rafcon.core.state_elements.data_port import PASS_BY_COPY, PASS_READ_ONLY
+    testing_utils.initialize_environment_core()
+    gvm = rafcon.core.singleton.global_variable_manager
+    payload = ReadOnlyFlaggedPayload()
+    gvm.set_variable("payload", payload, per_reference=True)
+
+    storage_path = testing_utils.get_unique_temp_path()
+    storage.save_state_machine_to_path(create_state_machine_passing_payload(passing_policy), storage_path)
+    state_machine = storage.load_state_machine_from_path(storage_path)
+    root_state = state_machine.root_state
+    root_output = root_state.get_data_port_by_id(list(root_state.output_data_ports.keys())[0])
+    assert root_output.passing_policy == passing_policy
+    # the default policy is not stored
+    assert ('passing_policy' in root_output.state_element_to_dict(root_output)) is (passing_policy != PASS_BY_COPY)
+    try:
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id)
+        rafcon.core.singleton.state_machine_execution_engine.join()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+
+        received = gvm.get_variable("received", per_reference=True)
+        assert received.data == payload.data
+        if passing_policy == PASS_BY_COPY:
+            assert received is not payload
+            assert root_state.output_data["payload"] is not received
+        else:
+            assert received is payload
+            assert root_state.output_data["payload"] is payload
+        assert payload.writeable is not (passing_policy == PASS_READ_ONLY)
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
 if __name__ == '__main__':
     test_default_values_of_data_ports(None)
     test_last_wins_value_collection_for_data_ports(None)
     test_unique_port_names(None)
     test_runtime_checks_for_data_port_data_types(None)
+    for passing_policy in ["copy", "reference", "read_only"]:
+        test_passing_policy_of_data_ports(None, passing_policy)
     # pytest.main([__file__])
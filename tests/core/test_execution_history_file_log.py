@@ -2,11 +2,200 @@
 import rafcon.core.singleton
 from rafcon.core.storage import storage as global_storage
 import rafcon.utils.execution_log as log_helper
+from rafcon.core.config import global_config
 
 # test environment elements
 import pytest
 from tests import utils as testing_utils
 import os
+import shelve
+import pickle
+import time
+import threading
+
+
+class LogItem(object):
+    """A minimal stand-in for a history item"""
+
+    def __init__(self, history_item_id, prev=None, value=None):
+        self.history_item_id = history_item_id
+        self.prev = prev
+        self.value = value
+
+    def to_dict(self):
+        return {'history_item_id': self.history_item_id,
+                'prev_history_item_id': self.prev.history_item_id if self.prev else None,
+                'value': pickle.dumps(self.value)}
+
+
+def stall_writer(storage):
+    """Blocks the writer thread of the storage, thus the queue fills up"""
+    storage.store_lock.acquire()
+    storage.store_history_item(LogItem(0))
+    while storage.queue_depth:
+        time.sleep(0.001)
+
+
+def test_async_execution_log_drop_oldest():
+    from rafcon.core.execution.execution_history import AsyncExecutionHistoryStorage
+    filename = os.path.join(testing_utils.get_unique_temp_path(), 'async_execution_log')
+    storage = AsyncExecutionHistoryStorage(filename, max_queue_size=4, backpressure_policy="DROP_OLDEST")
+    stall_writer(storage)
+    items = []
+    for history_item_id in range(1, 11):
+        items.append(LogItem(history_item_id, items[-1] if items else None))
+        storage.store_history_item(items[-1])
+    # removing the link to the previous item after queuing does not change the record
+    items[7].prev = None
+    storage.store_lock.release()
+    storage.close()
+
+    assert storage.number_of_dropped_items == 6
+    assert storage.max_queue_depth == 4
+    assert storage.number_of_written_items == 5
+    execution_log = shelve.open(filename)
+    assert sorted(int(key) for key in execution_log.keys()) == [0, 7, 8, 9, 10]
+    assert execution_log['8']['prev_history_item_id'] == 7
+    execution_log.close()
+
+
+def test_async_execution_log_sample():
+    from rafcon.core.execution.execution_history import AsyncExecutionHistoryStorage
+    filename = os.path.join(testing_utils.get_unique_temp_path(), 'async_execution_log')
+    storage = AsyncExecutionHistoryStorage(filename, max_queue_size=4, backpressure_policy="SAMPLE",
+                                           sampling_interval=2)
+    stall_writer(storage)
+    for history_item_id in range(1, 5):
+        storage.store_history_item(LogItem(history_item_id))
+    # every second item waits for space in the queue, which is available after the writer continues
+    threading.Timer(0.1, storage.store_lock.release).start()
+    for history_item_id in range(5, 9):
+        storage.store_history_item(LogItem(history_item_id))
+    storage.close()
+
+    assert storage.number_of_dropped_items == 1
+    execution_log = shelve.open(filename)
+    assert sorted(int(key) for key in execution_log.keys()) == [0, 1, 2, 3, 4, 6, 7, 8]
+    execution_log.close()
+
+
+def test_async_execution_log_flush():
+    from rafcon.core.execution.execution_history import AsyncExecutionHistoryStorage
+    filename = os.path.join(testing_utils.get_unique_temp_path(), 'async_execution_log')
+    storage = AsyncExecutionHistoryStorage(filename, flush_interval=60.)
+    first_item = LogItem(1, value={'counter': 1})
+    storage.store_history_item(first_item)
+    storage.store_history_item(LogItem(2, first_item))
+    # the record is created when the item is queued, later modifications of the values are not logged
+    first_item.value['counter'] = 2
+    storage.flush()
+    assert storage.queue_depth == 0
+    assert storage.number_of_written_items == 2
+    assert storage.max_write_latency >= storage.average_write_latency > 0
+    storage.close()
+    storage.close()
+    execution_log = shelve.open(filename)
+    assert execution_log['2']['prev_history_item_id'] == 1
+    assert pickle.loads(execution_log['1']['value']) == {'counter': 1}
+    execution_log.close()
+
+
+def test_segment_log(caplog):
+    from rafcon.utils.segment_log import SegmentLogWriter, SegmentLogReader
+    from tests.core.test_execution_history_retention import create_counter_state_machine
+    base_path = testing_utils.get_unique_temp_path()
+    testing_utils.initialize_environment_core(
+        core_config={'EXECUTION_LOG_ENABLE': True,
+                     'EXECUTION_LOG_FORMAT': 'SEGMENTS',
+                     'EXECUTION_LOG_PATH': os.path.join(base_path, 'segment_log')})
+    rafcon.core.singleton.global_variable_manager.set_variable("counter", 0)
+    try:
+        state_machine = create_counter_state_machine(3)
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id)
+        rafcon.core.singleton.state_machine_execution_engine.join()
+        execution_log_filename = state_machine.get_last_execution_log_filename()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+
+        with log_helper.open_execution_log(execution_log_filename) as execution_log:
+            assert isinstance(execution_log, SegmentLogReader)
+            # start item, call and return item of the root state and of each child state
+            assert len(execution_log) == 1 + 2 + 3 * 2
+            assert list(execution_log)[0] == execution_log.get_history_item_ids_of_run(execution_log.run_ids[0])[0]
+            start, next_, concurrent, hierarchy, collapsed_items = log_helper.log_to_collapsed_structure(execution_log)
+            assert sorted(item['state_name'] for item in collapsed_items.values()) == \
+                ['Counter0', 'Counter1', 'Counter2', 'Root', 'StateMachineStartItem']
+            records = dict(execution_log.items())
+            # the streamed collapsed items equal the collapsed structure
+            assert dict(log_helper.iter_collapsed_items(execution_log)) == collapsed_items
+
+        # a shelve log is converted to an equal segment log
+        shelve_filename = os.path.join(base_path, 'converted.shelve')
+        shelve_log = shelve.open(shelve_filename, protocol=2)
+        shelve_log.update(records)
+        shelve_log.close()
+        assert log_helper.shelve_to_segment_log(shelve_filename, os.path.join(base_path, 'converted')) == 9
+        with log_helper.open_execution_log(os.path.join(base_path, 'converted')) as converted_log:
+            assert list(converted_log) == list(records)
+            assert dict(converted_log.items()) == records
+
+        # segments are rotated and appending to a log starts a new segment
+        writer = SegmentLogWriter(os.path.join(base_path, 'rotated'), max_segment_size=100)
+        for i in range(3):
+            writer.append({'history_item_id': str(i), 'run_id': 'run', 'data': 'x' * 60})
+        writer.close()
+        writer = SegmentLogWriter(os.path.join(base_path, 'rotated'))
+        writer['3'] = {'history_item_id': '3', 'run_id': 'other_run'}
+        writer.close()
+        assert len(os.listdir(os.path.join(base_path, 'rotated'))) == 1 + 4
+        with SegmentLogReader(os.path.join(base_path, 'rotated'), cache_size=0) as reader:
+            assert reader.run_ids == ['run', 'other_run']
+            assert reader['1']['data'] == 'x' * 60
+            assert reader['3']['run_id'] == 'other_run'
+    finally:
+        global_config.set_config_value('EXECUTION_LOG_ENABLE', False)
+        global_config.set_config_value('EXECUTION_LOG_FORMAT', 'SHELVE')
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def create_history_item(history_item_id, item_type, call_type, run_id, **data):
+    record = {'history_item_id': history_item_id, 'item_type': item_type, 'call_type': call_type, 'run_id': run_id,
+              'state_type': 'ExecutionState', 'state_name': run_id, 'path': run_id, 'path_by_name': run_id,
+              'description': None, 'timestamp': float(history_item_id[-1]), 'outcome_name': 'success',
+              'outcome_id': 0, 'semantic_data': {}, 'scoped_data': {}, 'input_output_data': {}}
+    record['input_output_data'] = {key: pickle.dumps(value) for key, value in data.items()}
+    return history_item_id, record
+
+
+def test_iter_collapsed_items():
+    execution_history_items = dict([
+        create_history_item('item-1', 'CallItem', 'EXECUTE', 'outer', value=1),
+        create_history_item('item-2', 'CallItem', 'EXECUTE', 'inner', value=2),
+        create_history_item('item-3', 'ReturnItem', 'EXECUTE', 'inner', value=3),
+        create_history_item('item-4', 'ReturnItem', 'EXECUTE', 'outer', value=4),
+        create_history_item('item-5', 'CallItem', 'EXECUTE', 'aborted', value=5),
+    ])
+    execution_history_items['item-3']['input_output_data']['broken'] = b'no pickle'
+
+    collapsed_items = log_helper.iter_collapsed_items(execution_history_items, columns=['state_name', 'data_outs'],
+                                                      lazy_unpickling=True)
+    run_id, item = next(collapsed_items)
+    # items are yielded as soon as their execution finished, and only selected columns are included
+    assert run_id == 'inner' and set(item.keys()) == {'state_name', 'data_outs'}
+    assert isinstance(item['data_outs'], log_helper.LazyUnpickledDict)
+    assert item['data_outs']['value'] == 3
+    with pytest.raises(Exception):
+        item['data_outs']['broken']
+    assert next(collapsed_items)[0] == 'outer'
+    # executions without return item are yielded at the end
+    assert next(collapsed_items)[0] == 'aborted'
+    with pytest.raises(StopIteration):
+        next(collapsed_items)
+
+    items = dict(log_helper.iter_collapsed_items(execution_history_items, throw_on_pickle_error=False))
+    assert items['inner']['data_ins'] == {'value': 2}
+    assert items['inner']['data_outs'] == {'value': 3}
+    assert items['aborted']['outcome_name'] is None
 
 
 def test_execution_log(caplog):
@@ -63,5 +252,10 @@ def test_execution_log(caplog):
         testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=0, expected_errors=0)
 
 if __name__ == '__main__':
+    test_async_execution_log_drop_oldest()
+    test_async_execution_log_sample()
+    test_async_execution_log_flush()
+    test_segment_log(None)
+    test_iter_collapsed_items()
     test_execution_log(None)
     # pytest.main([__file__])
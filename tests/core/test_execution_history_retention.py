@@ -0,0 +1,139 @@
+import shelve
+
+# core elements
+import rafcon.core.singleton
+from rafcon.core.singleton import state_machine_execution_engine
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.execution.execution_status import StateMachineExecutionStatus
+from rafcon.core.config import global_config
+from rafcon.utils import log
+
+# test environment elements
+from tests import utils as testing_utils
+from tests.utils import wait_for_execution_engine_sync_counter
+
+logger = log.get_logger(__name__)
+
+COUNTER_SCRIPT = 'def execute(self, inputs, outputs, gvm):\n' \
+                 '    gvm.set_variable("counter", gvm.get_variable("counter") + 1)\n' \
+                 '    return 0\n\n\n' \
+                 'def backward_execute(self, inputs, outputs, gvm):\n' \
+                 '    gvm.set_variable("counter", gvm.get_variable("counter") - 1)\n'
+
+
+def create_counter_state_machine(number_child_states):
+    root_state = HierarchyState("Root")
+    last_state = None
+    for i in range(number_child_states):
+        state = ExecutionState("Counter" + str(i))
+        state.script_text = COUNTER_SCRIPT
+        root_state.add_state(state)
+        if last_state is None:
+            root_state.set_start_state(state.state_id)
+        else:
+            root_state.add_transition(last_state.state_id, 0, state.state_id, None)
+        last_state = state
+    root_state.add_transition(last_state.state_id, 0, root_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+def test_execution_history_max_items_with_execution_log(caplog):
+    testing_utils.initialize_environment_core(
+        core_config={'EXECUTION_LOG_ENABLE': True,
+                     'EXECUTION_LOG_PATH': testing_utils.get_unique_temp_path() + '/test_execution_log',
+                     'EXECUTION_HISTORY_MAX_ITEMS': 5})
+    rafcon.core.singleton.global_variable_manager.set_variable("counter", 0)
+    try:
+        state_machine = create_counter_state_machine(6)
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        state_machine_execution_engine.start(state_machine.state_machine_id)
+        state_machine_execution_engine.join()
+
+        execution_history = state_machine.execution_histories[-1]
+        assert len(execution_history) == 5
+        assert execution_history.number_of_dropped_items > 0
+        assert execution_history[0].prev is None
+        assert execution_history.number_of_items >= len(execution_history)
+        assert execution_history.bytes_held > 0
+
+        # dropped items are still available in the execution log
+        execution_log = shelve.open(state_machine.get_last_execution_log_filename())
+        # start item, call and return item of the root state and of each child state
+        assert len(execution_log) == 1 + 2 + 6 * 2
+        execution_log.close()
+    finally:
+        global_config.set_config_value('EXECUTION_LOG_ENABLE', False)
+        global_config.set_config_value('EXECUTION_HISTORY_MAX_ITEMS', None)
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_execution_history_limit_disabled_by_none_string(caplog):
+    # config files written by the config editor store disabled values as string
+    testing_utils.initialize_environment_core(core_config={'EXECUTION_HISTORY_MAX_ITEMS': "None"})
+    try:
+        state_machine = create_counter_state_machine(1)
+        execution_history = state_machine._add_new_execution_history()
+        assert execution_history.max_items is None
+    finally:
+        global_config.set_config_value('EXECUTION_HISTORY_MAX_ITEMS', None)
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_dropping_without_execution_log_is_warned_once(caplog):
+    testing_utils.initialize_environment_core(core_config={'EXECUTION_HISTORY_MAX_ITEMS': 3})
+    rafcon.core.singleton.global_variable_manager.set_variable("counter", 0)
+    try:
+        state_machine = create_counter_state_machine(6)
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        state_machine_execution_engine.start(state_machine.state_machine_id)
+        state_machine_execution_engine.join()
+        assert state_machine.execution_histories[-1].number_of_dropped_items > 1
+    finally:
+        global_config.set_config_value('EXECUTION_HISTORY_MAX_ITEMS', None)
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=1)
+
+
+def test_backward_stepping_within_retained_history(caplog):
+    testing_utils.initialize_environment_core(core_config={'EXECUTION_HISTORY_MAX_ITEMS': 6})
+    gvm = rafcon.core.singleton.global_variable_manager
+    gvm.set_variable("counter", 0)
+    state_machine = create_counter_state_machine(6)
+    rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+    try:
+        with state_machine_execution_engine._status.execution_condition_variable:
+            state_machine_execution_engine.synchronization_counter = 0
+
+        state_machine_execution_engine.step_mode(state_machine.state_machine_id)
+        wait_for_execution_engine_sync_counter(1, logger)
+        for i in range(5):
+            state_machine_execution_engine.step_into()
+            wait_for_execution_engine_sync_counter(1, logger)
+        assert gvm.get_variable("counter") == 5
+
+        # the call and return items of the last three executed states are retained
+        for i in range(3):
+            state_machine_execution_engine.backward_step()
+            wait_for_execution_engine_sync_counter(1, logger)
+        assert gvm.get_variable("counter") == 2
+
+        # further backward steps are refused and the execution falls back to the step mode
+        state_machine_execution_engine.backward_step()
+        wait_for_execution_engine_sync_counter(1, logger)
+        assert gvm.get_variable("counter") == 2
+        assert state_machine_execution_engine.status.execution_mode is StateMachineExecutionStatus.STEP_MODE
+
+        state_machine_execution_engine.stop()
+        state_machine_execution_engine.join()
+    finally:
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+        global_config.set_config_value('EXECUTION_HISTORY_MAX_ITEMS', None)
+        # dropping the items without execution log and refusing the backward step
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=2)
+
+
+if __name__ == '__main__':
+    test_execution_history_max_items_with_execution_log(None)
+    test_dropping_without_execution_log_is_warned_once(None)
+    test_backward_stepping_within_retained_history(None)
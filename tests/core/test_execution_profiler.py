@@ -0,0 +1,81 @@
+import json
+import os
+
+# core elements
+import rafcon.core.singleton
+from rafcon.core.singleton import state_machine_execution_engine
+from rafcon.core.config import global_config
+from rafcon.core.execution.execution_profiler import execution_profiler, RUN, SCRIPT, INPUT, OUTPUT, HISTORY, QUEUE
+
+# test environment elements
+from tests import utils as testing_utils
+from tests.core.test_execution_history_retention import create_counter_state_machine
+
+
+def test_execution_profiling(caplog):
+    testing_utils.initialize_environment_core(core_config={'EXECUTION_PROFILING_ENABLED': True})
+    rafcon.core.singleton.global_variable_manager.set_variable("counter", 0)
+    try:
+        state_machine = create_counter_state_machine(3)
+        root_state = state_machine.root_state
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        state_machine_execution_engine.start(state_machine.state_machine_id)
+        state_machine_execution_engine.join()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+        assert execution_profiler.enabled
+
+        statistics = execution_profiler.get_statistics()
+        assert set(statistics[root_state.get_path()]) >= {RUN, HISTORY}
+        for state in root_state.states.values():
+            state_statistics = statistics[state.get_path()]
+            assert set(state_statistics) >= {RUN, SCRIPT, INPUT, OUTPUT, HISTORY, QUEUE}
+            assert state_statistics[RUN]['count'] == 1
+            # call and return history items for the execute method
+            assert state_statistics[HISTORY]['count'] == 2
+            # the run of a state contains its script execution
+            assert state_statistics[RUN]['wall_time'] >= state_statistics[SCRIPT]['wall_time'] > 0
+            assert state_statistics[RUN]['wall_time'] <= statistics[root_state.get_path()][RUN]['wall_time']
+
+            run_statistics = execution_profiler.get_run_statistics(state.run_id)
+            assert run_statistics[SCRIPT]['count'] == 1
+
+        trace_file = os.path.join(testing_utils.get_unique_temp_path(), 'trace.json')
+        execution_profiler.export_trace_events(trace_file)
+        with open(trace_file) as f:
+            trace_events = json.load(f)['traceEvents']
+        assert len(trace_events) == len(execution_profiler.records)
+        assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in trace_events)
+
+        # switching the config value off disables the profiler on the next start
+        global_config.set_config_value('EXECUTION_PROFILING_ENABLED', False)
+        number_of_records = len(execution_profiler.records)
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        state_machine_execution_engine.start(state_machine.state_machine_id)
+        state_machine_execution_engine.join()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+        assert not execution_profiler.enabled
+        assert len(execution_profiler.records) == number_of_records
+    finally:
+        global_config.set_config_value('EXECUTION_PROFILING_ENABLED', False)
+        execution_profiler.disable()
+        execution_profiler.clear()
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_disabled_execution_profiling(caplog):
+    testing_utils.initialize_environment_core()
+    rafcon.core.singleton.global_variable_manager.set_variable("counter", 0)
+    try:
+        state_machine = create_counter_state_machine(3)
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        state_machine_execution_engine.start(state_machine.state_machine_id)
+        state_machine_execution_engine.join()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+        assert not execution_profiler.records
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    test_execution_profiling(None)
+    test_disabled_execution_profiling(None)
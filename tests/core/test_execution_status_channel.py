@@ -0,0 +1,139 @@
+import threading
+import time
+
+# core elements
+import rafcon.core.singleton
+from rafcon.core.singleton import state_machine_execution_engine
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.states.state import StateExecutionStatus
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.execution.execution_status_channel import ExecutionStatusChannel, execution_status_channel
+
+# test environment elements
+from tests import utils as testing_utils
+from tests.core.test_execution_history_retention import create_counter_state_machine
+
+
+def test_coalescing():
+    channel = ExecutionStatusChannel()
+    states = [ExecutionState("state" + str(i)) for i in range(10)]
+
+    def publish():
+        for _ in range(100):
+            for state in states:
+                channel.publish(state, StateExecutionStatus.ACTIVE)
+        for state in states:
+            channel.publish(state, StateExecutionStatus.INACTIVE)
+
+    threads = [threading.Thread(target=publish) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    changes = channel.drain()
+    assert len(changes) == len(states)
+    assert set(state for state, _ in changes) == set(states)
+    assert all(status is StateExecutionStatus.INACTIVE for _, status in changes)
+    assert len(channel) == 0 and channel.drain() == []
+    assert channel.number_of_drained_changes == len(states)
+
+
+def test_execution_with_enabled_channel(caplog):
+    testing_utils.initialize_environment_core()
+    rafcon.core.singleton.global_variable_manager.set_variable("counter", 0)
+    state_machine = create_counter_state_machine(5)
+    notifications = []
+    for state in [state_machine.root_state] + list(state_machine.root_state.states.values()):
+        state._notify_method_before = lambda *args: notifications.append(args)
+
+    execution_status_channel.enabled = True
+    try:
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        state_machine_execution_engine.start(state_machine.state_machine_id)
+        state_machine_execution_engine.join()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+
+        # status changes are not notified but published to the channel, which holds at most one change per state
+        assert not [args for args in notifications if args[1] == 'state_execution_status']
+        changes = execution_status_channel.drain(notify=True)
+        assert len(changes) == 1 + 5
+        assert all(status is StateExecutionStatus.INACTIVE for _, status in changes)
+        # the notifications of the drained changes are emitted by the draining thread
+        status_notifications = [args for args in notifications if args[1] == 'state_execution_status']
+        assert len(status_notifications) == 1 + 5
+        assert all(args[2][1] is StateExecutionStatus.INACTIVE for args in status_notifications)
+    finally:
+        execution_status_channel.enabled = False
+        execution_status_channel.clear()
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def create_loop_state_machine(number_of_iterations):
+    loop_state = ExecutionState("Loop", state_id="LOOP")
+    again_outcome_id = loop_state.add_outcome("again")
+    loop_state.script_text = 'def execute(self, inputs, outputs, gvm):\n' \
+                             '    counter = gvm.get_variable("counter") + 1\n' \
+                             '    gvm.set_variable("counter", counter)\n' \
+                             '    return "again" if counter < {0} else "success"\n'.format(number_of_iterations)
+    root_state = HierarchyState("Root", state_id="ROOT")
+    root_state.add_state(loop_state)
+    root_state.set_start_state(loop_state.state_id)
+    root_state.add_transition(loop_state.state_id, again_outcome_id, loop_state.state_id, None)
+    root_state.add_transition(loop_state.state_id, 0, root_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+def test_notifications_bounded_by_drain_rate(caplog):
+    testing_utils.initialize_environment_core()
+    rafcon.core.singleton.global_variable_manager.set_variable("counter", 0)
+    number_of_iterations = 2000
+    state_machine = create_loop_state_machine(number_of_iterations)
+    states = [state_machine.root_state, state_machine.root_state.states["LOOP"]]
+    notification_threads = []
+    for state in states:
+        state._notify_method_before = lambda instance, method_name, *args: \
+            method_name == 'state_execution_status' and notification_threads.append(threading.current_thread())
+
+    drain_rate = 50.
+    finished = threading.Event()
+    drains = []
+
+    def drain_periodically():
+        while not finished.wait(1. / drain_rate):
+            drains.append(execution_status_channel.drain(notify=True))
+        drains.append(execution_status_channel.drain(notify=True))
+
+    execution_status_channel.enabled = True
+    drain_thread = threading.Thread(target=drain_periodically)
+    drain_thread.start()
+    try:
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        start_time = time.time()
+        state_machine_execution_engine.start(state_machine.state_machine_id)
+        state_machine_execution_engine.join()
+        duration = time.time() - start_time
+        finished.set()
+        drain_thread.join()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+
+        assert rafcon.core.singleton.global_variable_manager.get_variable("counter") == number_of_iterations
+        # the loop state changes its status several times per iteration, the observers are notified at most once per
+        # state and drain, only by the draining thread
+        assert set(notification_threads) == {drain_thread}
+        assert len(notification_threads) <= len(drains) * len(states)
+        assert len(notification_threads) < number_of_iterations
+        # thus, the notifications per second are bounded by the drain rate, not by the execution rate
+        assert len(notification_threads) <= (duration * drain_rate + 2) * len(states)
+    finally:
+        finished.set()
+        execution_status_channel.enabled = False
+        execution_status_channel.clear()
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    test_coalescing()
+    test_execution_with_enabled_channel(None)
+    test_notifications_bounded_by_drain_rate(None)
@@ -1,4 +1,6 @@
 from rafcon.core.global_variable_manager import GlobalVariableManager
+import threading
+import time
 import pytest
 from tests import utils as testing_utils
 from pytest import raises
@@ -58,6 +60,92 @@ def test_locks(caplog):
     testing_utils.assert_logger_warnings_and_errors(caplog, expected_warnings=1, expected_errors=1)
 
 
+def test_lock_timeout_and_contention_metrics(caplog):
+    gvm = GlobalVariableManager()
+    gvm.set_variable('a', 1)
+    access_key = gvm.lock_variable('a')
+    assert gvm.get_contention_metrics('a')['holder'] == threading.current_thread().name
+
+    # the lock cannot be acquired while held by another access key
+    start = time.time()
+    assert gvm.lock_variable('a', block=True, timeout=0.05) is False
+    assert 0.05 <= time.time() - start < 1.
+
+    # a waiting thread is woken up immediately once the lock is released
+    values = []
+    thread = threading.Thread(target=lambda: values.append(gvm.get_variable('a')))
+    thread.start()
+    time.sleep(0.05)
+    release_time = time.time()
+    gvm.unlock_variable('a', access_key)
+    thread.join()
+    assert values == [1]
+    assert time.time() - release_time < 0.05
+
+    metrics = gvm.get_contention_metrics('a')
+    assert metrics['holder'] is None and metrics['hold_duration'] == 0.
+    assert metrics['number_of_contended_acquisitions'] == 2
+    assert metrics['max_wait_time'] >= 0.05
+    assert metrics['max_hold_time'] >= 0.1
+    assert list(gvm.get_contention_metrics().keys()) == ['a']
+    with raises(AttributeError):
+        gvm.get_contention_metrics('b')
+    testing_utils.assert_logger_warnings_and_errors(caplog, expected_warnings=1)
+
+
+def test_versioned_snapshots(caplog):
+    gvm = GlobalVariableManager()
+    assert gvm.get_variable_snapshot('config', default={}) == ({}, None)
+    assert gvm.get_variable_version('config') is None
+    assert gvm.wait_for_change('config', timeout=0.01) is None
+
+    config = {'speed': 1}
+    gvm.set_variable('config', config)
+    value, version = gvm.get_variable_snapshot('config')
+    assert value == config and value is not config
+    # snapshots are not copied
+    assert gvm.get_variable_snapshot('config')[0] is value
+    assert gvm.get_variable_version('config') == version
+    assert gvm.wait_for_change('config', since_version=version - 1) == version
+
+    # a locked variable can still be read as snapshot
+    access_key = gvm.lock_variable('config')
+    assert gvm.get_variable_snapshot('config') == (config, version)
+    gvm.set_variable('config', {'speed': 2}, access_key=access_key)
+    gvm.unlock_variable('config', access_key)
+    new_value, new_version = gvm.get_variable_snapshot('config')
+    assert new_version > version
+    assert value == {'speed': 1} and new_value == {'speed': 2}
+
+    # waiting states are woken up by a new version
+    versions = []
+    thread = threading.Thread(target=lambda: versions.append(gvm.wait_for_change('config', new_version, timeout=5.)))
+    thread.start()
+    time.sleep(0.05)
+    assert thread.is_alive()
+    gvm.set_variable('config', {'speed': 3})
+    thread.join()
+    assert versions == [gvm.get_variable_version('config')]
+
+    # versions keep increasing, even if a variable is deleted and created again
+    last_version = gvm.get_variable_version('config')
+    gvm.delete_variable('config')
+    assert gvm.get_variable_version('config') is None
+    gvm.set_variable('config', {})
+    assert gvm.get_variable_version('config') > last_version
+
+    # snapshots of variables set per reference are shallow, in-place modifications do not publish a new version
+    data = {'speed': 1}
+    gvm.set_variable('data', data, per_reference=True)
+    value, version = gvm.get_variable_snapshot('data')
+    assert value is data
+    data['speed'] = 2
+    assert gvm.get_variable_snapshot('data') == ({'speed': 2}, version)
+    gvm.set_variable('data', data, per_reference=True)
+    assert gvm.get_variable_version('data') > version
+    testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
 def test_type_check(caplog):
     # valid
     gvm = GlobalVariableManager()
@@ -126,6 +214,8 @@ def test_type_check(caplog):
 
 if __name__ == '__main__':
     test_locks(None)
+    test_lock_timeout_and_contention_metrics(None)
+    test_versioned_snapshots(None)
     # test_references(None)
     # test_type_check(None)
     # pytest.main([__file__])
@@ -0,0 +1,130 @@
+import os
+import shutil
+
+# core elements
+import rafcon.core.singleton
+from rafcon.core.singleton import state_machine_execution_engine
+from rafcon.core.config import global_config
+from rafcon.core.storage import storage
+
+# test environment elements
+from tests import utils as testing_utils
+from tests.core.test_storage_loading import create_state_machine, assert_equal_state_machines
+from tests.core.test_execution_history_retention import create_counter_state_machine
+
+
+def get_modification_times(path):
+    modification_times = {}
+    for dir_path, _, file_names in os.walk(path):
+        for file_name in file_names:
+            file_path = os.path.join(dir_path, file_name)
+            modification_times[file_path] = os.stat(file_path).st_mtime
+    return modification_times
+
+
+def get_changed_files(path, modification_times):
+    new_modification_times = get_modification_times(path)
+    return set(file_path for file_path, mtime in new_modification_times.items()
+               if modification_times.get(file_path) != mtime)
+
+
+def test_incremental_save(caplog):
+    testing_utils.initialize_environment_core()
+    path = testing_utils.get_unique_temp_path()
+    try:
+        state_machine = create_state_machine()
+        # state machine file, root state core and semantic data, five core data, script and semantic data files
+        assert storage.save_state_machine_to_path(state_machine, path) == 18
+        # only the state machine file is written, if nothing changed
+        assert storage.save_state_machine_to_path(state_machine, path) == 1
+
+        # modifications of the state and of its elements are detected
+        state = state_machine.root_state.states[sorted(state_machine.root_state.states)[0]]
+        state.script_text = 'def execute(self, inputs, outputs, gvm):\n    return 42\n'
+        assert storage.save_state_machine_to_path(state_machine, path) == 4
+        outcome = state.outcomes[0]
+        outcome.name = "done"
+        assert storage.save_state_machine_to_path(state_machine, path) == 4
+        # semantic data modified in place is detected as well
+        state.semantic_data["key"] = "modified"
+        assert storage.save_state_machine_to_path(state_machine, path) == 4
+        assert_equal_state_machines(state_machine, storage.load_state_machine_from_path(path))
+        assert not [file_name for _, _, file_names in os.walk(path) for file_name in file_names
+                    if file_name.endswith(".tmp")]
+
+        # a loaded state machine is not written again, the deferred data of a renamed state is preserved
+        loaded_state_machine = storage.load_state_machine_from_path(path)
+        modification_times = get_modification_times(path)
+        assert storage.save_state_machine_to_path(loaded_state_machine, path) == 1
+        assert get_changed_files(path, modification_times) <= {os.path.join(path, storage.STATEMACHINE_FILE)}
+        loaded_state = loaded_state_machine.root_state.states[state.state_id]
+        old_state_path = loaded_state.file_system_path
+        loaded_state.name = "renamed"
+        assert storage.save_state_machine_to_path(loaded_state_machine, path) == 4
+        assert not os.path.exists(old_state_path)
+        assert_equal_state_machines(state_machine, storage.load_state_machine_from_path(path))
+
+        # saving as copy is incremental per path and does not influence the original path
+        copy_path = os.path.join(path, "copy")
+        assert storage.save_state_machine_to_path(loaded_state_machine, copy_path, as_copy=True) == 18
+        loaded_state.description = "description"
+        assert storage.save_state_machine_to_path(loaded_state_machine, copy_path, as_copy=True) == 4
+        assert storage.save_state_machine_to_path(loaded_state_machine, path) == 4
+
+        # removed states are removed from the file system
+        loaded_state_machine.root_state.remove_state(loaded_state.state_id)
+        assert storage.save_state_machine_to_path(loaded_state_machine, path) == 3
+        assert not os.path.exists(loaded_state.file_system_path)
+
+        global_config.set_config_value("STORAGE_INCREMENTAL_SAVE", False)
+        assert storage.save_state_machine_to_path(loaded_state_machine, path) == 15
+    finally:
+        global_config.set_config_value("STORAGE_INCREMENTAL_SAVE", True)
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_incremental_save_after_execution_and_external_changes(caplog):
+    testing_utils.initialize_environment_core()
+    rafcon.core.singleton.global_variable_manager.set_variable("counter", 0)
+    path = testing_utils.get_unique_temp_path()
+    try:
+        state_machine = create_counter_state_machine(2)
+        # state machine file, root state core data, two core data and script files
+        assert storage.save_state_machine_to_path(state_machine, path) == 6
+
+        # the execution only changes runtime data
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        state_machine_execution_engine.start(state_machine.state_machine_id)
+        state_machine_execution_engine.join()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+        assert rafcon.core.singleton.global_variable_manager.get_variable("counter") == 2
+        assert storage.save_state_machine_to_path(state_machine, path) == 1
+
+        # changes of the script object are changes of its state
+        state = state_machine.root_state.states[sorted(state_machine.root_state.states)[0]]
+        script_text = 'def execute(self, inputs, outputs, gvm):\n    return 0\n'
+        state.script.script = script_text
+        assert storage.save_state_machine_to_path(state_machine, path) == 3
+        with open(os.path.join(state.file_system_path, storage.SCRIPT_FILE)) as script_file:
+            assert script_file.read() == script_text
+
+        # folders removed outside of RAFCON are written again
+        shutil.rmtree(state.file_system_path)
+        assert storage.save_state_machine_to_path(state_machine, path) == 3
+        loaded_root_state = storage.load_state_machine_from_path(path).root_state
+        assert loaded_root_state.states[state.state_id].script_text == script_text
+
+        # the same holds for copies, e.g. backups
+        copy_path = os.path.join(testing_utils.get_unique_temp_path(), "backup")
+        assert storage.save_state_machine_to_path(state_machine, copy_path, as_copy=True) == 6
+        shutil.rmtree(copy_path)
+        assert storage.save_state_machine_to_path(state_machine, copy_path, as_copy=True) == 6
+        loaded_root_state = storage.load_state_machine_from_path(copy_path).root_state
+        assert set(loaded_root_state.states) == set(state_machine.root_state.states)
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    test_incremental_save(None)
+    test_incremental_save_after_execution_and_external_changes(None)
@@ -0,0 +1,126 @@
+import os
+import time
+
+# core elements
+import rafcon.core.singleton
+from rafcon.core.config import global_config
+from rafcon.core.library_index import LibraryIndex
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+
+# test environment elements
+from tests import utils as testing_utils
+
+
+def save_library(path, description):
+    root_state = ExecutionState("library", state_id="ROOT")
+    root_state.description = description
+    root_state.add_input_data_port("input", "int", 0)
+    root_state.add_outcome("done", 1)
+    storage.save_state_machine_to_path(StateMachine(root_state), path)
+
+
+def set_old_modification_times(path, age=100.):
+    """Sets the modification times of all files and directories, as the index does not cache recent times"""
+    modification_time = time.time() - age
+    for dir_path, dir_names, file_names in os.walk(path):
+        for name in dir_names + file_names:
+            os.utime(os.path.join(dir_path, name), (modification_time, modification_time))
+    os.utime(path, (modification_time, modification_time))
+
+
+def test_library_index(caplog, monkeypatch):
+    testing_utils.initialize_environment_core()
+    base_path = testing_utils.get_unique_temp_path()
+    library_root_path = os.path.join(base_path, "libraries")
+    index_path = os.path.join(base_path, "index", "library_index.json")
+    try:
+        save_library(os.path.join(library_root_path, "first"), "first library")
+        os.makedirs(os.path.join(library_root_path, "folder"))
+        os.makedirs(os.path.join(library_root_path, ".hidden"))
+        set_old_modification_times(library_root_path)
+
+        listed_directories = []
+        listdir = os.listdir
+
+        def counting_listdir(path):
+            listed_directories.append(path)
+            return listdir(path)
+        monkeypatch.setattr(os, "listdir", counting_listdir)
+
+        library_index = LibraryIndex(index_path)
+        assert sorted(library_index.get_directory_entries(library_root_path)) == [("first", True), ("folder", False)]
+        assert library_index.get_library_info(os.path.join(library_root_path, "first")) == {
+            'name': "library", 'description': "first library", 'input_data_ports': [[0, "input", "int", 0]],
+            'output_data_ports': [], 'outcomes': [[-2, "preempted"], [-1, "aborted"], [0, "success"], [1, "done"]]}
+        assert library_index.get_library_info(os.path.join(library_root_path, "folder")) is None
+        library_index.save()
+        assert os.path.isfile(index_path)
+
+        # a second index reads the stored file and does not read the unchanged directory again
+        del listed_directories[:]
+        library_index = LibraryIndex(index_path)
+        assert sorted(library_index.get_directory_entries(library_root_path)) == [("first", True), ("folder", False)]
+        assert library_index.get_library_info(os.path.join(library_root_path, "first"))['description'] == \
+            "first library"
+        assert not listed_directories
+
+        # changed directories and libraries are read again
+        save_library(os.path.join(library_root_path, "second"), "second library")
+        save_library(os.path.join(library_root_path, "first"), "modified library")
+        set_old_modification_times(library_root_path, age=50.)
+        del listed_directories[:]
+        assert sorted(library_index.get_directory_entries(library_root_path)) == \
+            [("first", True), ("folder", False), ("second", True)]
+        assert listed_directories == [library_root_path]
+        assert library_index.get_library_info(os.path.join(library_root_path, "first"))['description'] == \
+            "modified library"
+
+        # a directory becoming a library is detected, although the modification time of its parent is unchanged
+        save_library(os.path.join(library_root_path, "folder"), "new library")
+        root_modification_time = os.path.getmtime(library_root_path)
+        set_old_modification_times(os.path.join(library_root_path, "folder"), age=30.)
+        os.utime(library_root_path, (root_modification_time, root_modification_time))
+        assert sorted(library_index.get_directory_entries(library_root_path)) == \
+            [("first", True), ("folder", True), ("second", True)]
+        assert library_index.get_library_info(os.path.join(library_root_path, "folder"))['description'] == \
+            "new library"
+
+        # recently modified directories are not cached, as a further change could keep the modification time
+        os.makedirs(os.path.join(library_root_path, "third"))
+        del listed_directories[:]
+        library_index.get_directory_entries(library_root_path)
+        library_index.get_directory_entries(library_root_path)
+        assert listed_directories == [library_root_path] * 2
+        monkeypatch.undo()
+
+        # an invalid index file is ignored
+        with open(index_path, 'w') as index_file:
+            index_file.write("{invalid")
+        assert LibraryIndex(index_path).get_directory_entries(library_root_path)
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=1)
+
+
+def test_library_manager_with_index(caplog):
+    base_path = testing_utils.get_unique_temp_path()
+    library_root_path = os.path.join(base_path, "libraries")
+    index_path = os.path.join(base_path, "library_index.json")
+    save_library(os.path.join(library_root_path, "folder", "library"), "library description")
+    testing_utils.initialize_environment_core(core_config={"LIBRARY_INDEX_PATH": index_path},
+                                              libraries={"index_test": library_root_path})
+    try:
+        library_manager = rafcon.core.singleton.library_manager
+        library_path = library_manager.libraries["index_test"]["folder"]["library"]
+        assert library_path == os.path.join(os.path.realpath(library_root_path), "folder", "library")
+        assert os.path.isfile(index_path)
+        assert library_manager.get_library_info(library_path)['description'] == "library description"
+    finally:
+        global_config.set_config_value("LIBRARY_INDEX_PATH", "%RAFCON_CONFIG_PATH/library_index.json")
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    test_library_index(None, None)
+    test_library_manager_with_index(None)
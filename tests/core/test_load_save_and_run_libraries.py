@@ -177,6 +177,47 @@ def test_nested_library_state_machine(caplog):
         testing_utils.assert_logger_warnings_and_errors(caplog)
 
 
+def test_library_template_cache(caplog):
+    with testing_utils.test_multithreading_lock:
+        library_manager = rafcon.core.singleton.library_manager
+        library_manager.initialize()
+        library_manager.clean_loaded_libraries()
+        library_states = [LibraryState("temporary_libraries", "hierarchy_library", "0.1") for _ in range(3)]
+        library_os_path = library_states[0].lib_os_path
+        _, template = library_manager.get_library_template(library_os_path)
+
+        # the library is loaded once and the state copies are only created from the template on first access
+        assert all(library_state._state_copy is None for library_state in library_states)
+        state_copy = library_states[0].state_copy
+        assert state_copy is not template and state_copy is not library_states[1].state_copy
+        assert state_copy.parent is library_states[0]
+        assert state_copy.outcomes is library_states[0].outcomes
+        assert library_states[0].get_number_of_transitions() == template.get_number_of_transitions()
+        assert library_states[2]._state_copy is None
+        state_copy.description = "modified copy"
+        assert library_states[2].state_copy.description != "modified copy"
+        assert template.description != "modified copy"
+
+        # a modified library is loaded again
+        state_machine_file = join(library_os_path, storage.STATEMACHINE_FILE)
+        modification_time = os.path.getmtime(state_machine_file) + 10
+        os.utime(state_machine_file, (modification_time, modification_time))
+        assert library_manager.get_library_template(library_os_path)[1] is not template
+
+        # least recently used libraries are evicted
+        rafcon.core.config.global_config.set_config_value("LIBRARY_TEMPLATE_CACHE_SIZE", 1)
+        try:
+            LibraryState("temporary_libraries", "execution_library", "0.1")
+            assert list(library_manager._loaded_libraries.keys()) == [join(TEST_LIBRARY_PATH, "execution_library")]
+        finally:
+            rafcon.core.config.global_config.set_config_value("LIBRARY_TEMPLATE_CACHE_SIZE", None)
+        library_manager.evict_loaded_library(join(TEST_LIBRARY_PATH, "execution_library"))
+        assert not library_manager._loaded_libraries
+        for library_state in library_states:
+            library_state.destroy()
+        testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
 def test_rafcon_library_path_variable(caplog):
     rafcon.core.config.global_config.set_config_value("LIBRARY_PATHS", {})
     os.environ['RAFCON_LIBRARY_PATH'] = os.path.join(testing_utils.LIBRARY_SM_PATH, 'generic')
@@ -198,4 +239,5 @@ if __name__ == '__main__':
     # test_hierarchy_state_library(None)
     # test_save_nested_library_state(None)
     # test_nested_library_state_machine(None)
+    # test_library_template_cache(None)
     pytest.main(['-s', __file__])
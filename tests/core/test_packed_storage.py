@@ -0,0 +1,119 @@
+import json
+import os
+import pytest
+
+# core elements
+import rafcon.core.singleton
+from rafcon.core.singleton import state_machine_execution_engine
+from rafcon.core.storage import storage
+from rafcon.core.storage.packed_storage import is_packed_state_machine_file, pack_state_machine, \
+    unpack_state_machine, PackedStateMachineFile, main, PACKED_FILE_MAGIC, PACKED_FILE_FORMAT_VERSION, _HEADER
+
+# test environment elements
+from tests import utils as testing_utils
+from tests.core.test_execution_history_retention import create_counter_state_machine
+
+
+def test_pack_load_and_unpack(caplog):
+    testing_utils.initialize_environment_core()
+    rafcon.core.singleton.global_variable_manager.set_variable("counter", 0)
+    base_path = testing_utils.get_unique_temp_path()
+    state_machine_path = os.path.join(base_path, "counter")
+    packed_file_path = os.path.join(base_path, "counter.rafcon")
+    try:
+        state_machine = create_counter_state_machine(5)
+        state_machine.root_state.semantic_data = {"key": "value"}
+        storage.save_state_machine_to_path(state_machine, state_machine_path)
+        assert not is_packed_state_machine_file(state_machine_path)
+
+        number_of_files = pack_state_machine(state_machine_path, packed_file_path)
+        assert is_packed_state_machine_file(packed_file_path)
+        packed_file = PackedStateMachineFile(packed_file_path)
+        assert len(packed_file.file_paths) == number_of_files
+        assert packed_file.read_file("does/not/exist") is None
+        packed_file.close()
+
+        timings = {}
+        loaded_state_machine = storage.load_state_machine_from_path(packed_file_path, timings=timings)
+        assert set(timings) == {'scan', 'read', 'build', 'total'}
+        assert loaded_state_machine.file_system_path == packed_file_path
+        assert loaded_state_machine.root_state.semantic_data["key"] == "value"
+        for state_id, state in state_machine.root_state.states.items():
+            assert loaded_state_machine.root_state.states[state_id].script_text == state.script_text
+        # packed state machines cannot be changed
+        with pytest.raises(ValueError):
+            storage.save_state_machine_to_path(loaded_state_machine, packed_file_path)
+
+        # the scripts are read from the memory-mapped file
+        rafcon.core.singleton.state_machine_manager.add_state_machine(loaded_state_machine)
+        state_machine_execution_engine.start(loaded_state_machine.state_machine_id)
+        state_machine_execution_engine.join()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(loaded_state_machine.state_machine_id)
+        assert rafcon.core.singleton.global_variable_manager.get_variable("counter") == 5
+
+        unpacked_path = os.path.join(base_path, "unpacked")
+        assert unpack_state_machine(packed_file_path, unpacked_path) == number_of_files
+        for dir_path, _, file_names in os.walk(state_machine_path):
+            for file_name in file_names:
+                file_path = os.path.join(dir_path, file_name)
+                unpacked_file_path = os.path.join(unpacked_path, os.path.relpath(file_path, state_machine_path))
+                with open(file_path, 'rb') as f, open(unpacked_file_path, 'rb') as unpacked_f:
+                    assert f.read() == unpacked_f.read()
+
+        # packing again replaces the existing file
+        assert pack_state_machine(state_machine_path, packed_file_path) == number_of_files
+        assert is_packed_state_machine_file(packed_file_path)
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_pack_command_line(caplog):
+    testing_utils.initialize_environment_core()
+    base_path = testing_utils.get_unique_temp_path()
+    state_machine_path = os.path.join(base_path, "counter")
+    try:
+        state_machine = create_counter_state_machine(2)
+        storage.save_state_machine_to_path(state_machine, state_machine_path)
+
+        assert main(["pack", state_machine_path]) == 0
+        assert is_packed_state_machine_file(state_machine_path + ".rafcon")
+        assert main(["unpack", state_machine_path + ".rafcon", os.path.join(base_path, "unpacked")]) == 0
+        loaded_state_machine = storage.load_state_machine_from_path(os.path.join(base_path, "unpacked"))
+        assert len(loaded_state_machine.root_state.states) == 2
+        assert main(["pack", os.path.join(base_path, "does_not_exist")]) == 1
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_errors=1)
+
+
+def write_packed_file(packed_file_path, files):
+    index = {}
+    offset = 0
+    for relative_path, content in files:
+        index[relative_path] = (offset, len(content))
+        offset += len(content)
+    index_data = json.dumps(index).encode('utf-8')
+    with open(packed_file_path, 'wb') as packed_file:
+        packed_file.write(_HEADER.pack(PACKED_FILE_MAGIC, PACKED_FILE_FORMAT_VERSION, len(index_data)))
+        packed_file.write(index_data)
+        for _, content in files:
+            packed_file.write(content)
+
+
+@pytest.mark.parametrize("invalid_path", ["../outside.txt", "root/../../outside.txt", "/tmp/outside.txt"])
+def test_unpack_rejects_paths_outside_of_target(invalid_path):
+    base_path = testing_utils.get_unique_temp_path()
+    packed_file_path = os.path.join(base_path, "crafted.rafcon")
+    state_machine_path = os.path.join(base_path, "unpacked")
+    write_packed_file(packed_file_path, [("statemachine.json", b"{}"), (invalid_path, b"outside")])
+
+    with pytest.raises(ValueError):
+        unpack_state_machine(packed_file_path, state_machine_path)
+    assert not os.path.exists(os.path.join(base_path, "outside.txt"))
+    assert not os.path.exists(state_machine_path)
+
+
+if __name__ == '__main__':
+    test_pack_load_and_unpack(None)
+    test_pack_command_line(None)
+    for invalid_path in ["../outside.txt", "root/../../outside.txt", "/tmp/outside.txt"]:
+        test_unpack_rejects_paths_outside_of_target(invalid_path)
@@ -0,0 +1,98 @@
+import os
+
+# core elements
+import rafcon.core.singleton
+from rafcon.core.singleton import state_machine_execution_engine
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.states.preemptive_concurrency_state import PreemptiveConcurrencyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.execution.process_execution_pool import get_execution_backend, get_process_execution_pool, \
+    EXECUTION_BACKEND_KEY, PROCESS_BACKEND, THREAD_BACKEND
+
+# test environment elements
+from tests import utils as testing_utils
+
+WORKER_SCRIPT = 'import os\n\n\n' \
+                'def execute(self, inputs, outputs, gvm):\n' \
+                '    outputs["pid"] = os.getpid()\n' \
+                '    outputs["result"] = inputs["value"] * 2\n' \
+                '    gvm.set_variable("worker_state", self.name)\n' \
+                '    return "success"\n'
+
+BLOCKING_SCRIPT = 'def execute(self, inputs, outputs, gvm):\n' \
+                  '    while True:\n' \
+                  '        pass\n'
+
+FINISHING_SCRIPT = 'import time\n\n\n' \
+                   'def execute(self, inputs, outputs, gvm):\n' \
+                   '    time.sleep(0.5)\n' \
+                   '    gvm.set_variable("finished", True)\n' \
+                   '    return 0\n'
+
+
+def execute_state(root_state):
+    state_machine = StateMachine(root_state)
+    rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+    state_machine_execution_engine.start(state_machine.state_machine_id)
+    state_machine_execution_engine.join()
+    rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+
+
+def test_process_execution(caplog):
+    testing_utils.initialize_environment_core()
+    gvm = rafcon.core.singleton.global_variable_manager
+    try:
+        root_state = HierarchyState("root")
+        state = ExecutionState("worker")
+        state.script_text = WORKER_SCRIPT
+        state.add_input_data_port("value", "int", 21)
+        state.add_output_data_port("result", "int")
+        state.add_output_data_port("pid", "int")
+        root_state.add_state(state)
+        root_state.set_start_state(state.state_id)
+        root_state.add_transition(state.state_id, 0, root_state.state_id, 0)
+        assert get_execution_backend(state) == THREAD_BACKEND
+        # the backend is inherited from the ancestors
+        root_state.semantic_data[EXECUTION_BACKEND_KEY] = PROCESS_BACKEND
+        assert get_execution_backend(state) == PROCESS_BACKEND
+
+        execute_state(root_state)
+        assert state.output_data["result"] == 42
+        assert state.output_data["pid"] != os.getpid()
+        assert gvm.get_variable("worker_state") == "worker"
+        assert state.final_outcome.outcome_id == 0
+    finally:
+        get_process_execution_pool().shutdown()
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_process_execution_preemption(caplog):
+    testing_utils.initialize_environment_core()
+    gvm = rafcon.core.singleton.global_variable_manager
+    pool = get_process_execution_pool()
+    try:
+        preemptive_state = PreemptiveConcurrencyState("preemptive")
+        blocking_state = ExecutionState("blocking")
+        blocking_state.script_text = BLOCKING_SCRIPT
+        blocking_state.semantic_data[EXECUTION_BACKEND_KEY] = PROCESS_BACKEND
+        finishing_state = ExecutionState("finishing")
+        finishing_state.script_text = FINISHING_SCRIPT
+        preemptive_state.add_state(blocking_state)
+        preemptive_state.add_state(finishing_state)
+        preemptive_state.add_transition(finishing_state.state_id, 0, preemptive_state.state_id, 0)
+
+        terminated_workers = pool.terminated_workers
+        # the busy loop of the blocking state is interrupted by the termination of its worker
+        execute_state(preemptive_state)
+        assert gvm.get_variable("finished")
+        assert blocking_state.final_outcome.outcome_id == -2
+        assert pool.terminated_workers == terminated_workers + 1
+    finally:
+        pool.shutdown()
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    test_process_execution(None)
+    test_process_execution_preemption(None)
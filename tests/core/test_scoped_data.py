@@ -3,6 +3,8 @@ import rafcon.core.singleton
 from rafcon.core.states.execution_state import ExecutionState
 from rafcon.core.states.hierarchy_state import HierarchyState
 from rafcon.core.state_elements.data_port import InputDataPort, OutputDataPort
+from rafcon.core.state_elements.scope import ScopedData, ScopedDataRecord
+from rafcon.core.execution.execution_history import CallItem
 from rafcon.core.storage import storage
 from rafcon.core.state_machine import StateMachine
 
@@ -68,5 +70,50 @@ def test_scoped_data(caplog):
         testing_utils.assert_logger_warnings_and_errors(caplog)
 
 
+def test_scoped_data_records_and_views(caplog):
+    sm = create_state_machine()
+    root_state = sm.root_state
+
+    with testing_utils.test_multithreading_lock:
+        rafcon.core.singleton.state_machine_manager.add_state_machine(sm)
+        rafcon.core.singleton.state_machine_execution_engine.start(sm.state_machine_id)
+        rafcon.core.singleton.state_machine_execution_engine.join()
+        try:
+            input_port_id = root_state.get_io_data_port_id_from_name_and_type("data_input_port1", InputDataPort)
+            # the scoped data is stored as compact records keyed by (state_id, data_port_id)
+            record = root_state._scoped_data[(root_state.state_id, input_port_id)]
+            assert isinstance(record, ScopedDataRecord)
+            assert record.value == 22.0
+
+            # ScopedData objects are only created on access
+            scoped_data = root_state.scoped_data[str(input_port_id) + root_state.state_id]
+            assert isinstance(scoped_data, ScopedData)
+            assert scoped_data.name == "data_input_port1"
+            assert scoped_data.value == 22.0
+            assert scoped_data.timestamp == record.timestamp
+            assert scoped_data.parent is root_state
+
+            # snapshots of the execution history are not affected by later writes
+            history_items = [item for item in sm.execution_histories[0] if isinstance(item, CallItem) and
+                             item.state_reference is root_state.states[root_state.start_state_id]]
+            assert history_items
+            snapshot = history_items[0].scoped_data_records
+            root_state.add_input_data_to_scoped_data({"data_input_port1": 1.0})
+            assert root_state._scoped_data[(root_state.state_id, input_port_id)].value == 1.0
+            assert snapshot[(root_state.state_id, input_port_id)].value == 22.0
+            assert history_items[0].scoped_data[str(input_port_id) + root_state.state_id].value == 22.0
+
+            # views and records can both be used to restore the scoped data
+            root_state.scoped_data = snapshot
+            assert root_state._scoped_data == snapshot and root_state._scoped_data is not snapshot
+            root_state.scoped_data = history_items[0].scoped_data
+            assert root_state._scoped_data[(root_state.state_id, input_port_id)].value == 22.0
+            with pytest.raises(TypeError):
+                root_state.scoped_data = {"key": 1.0}
+        finally:
+            rafcon.core.singleton.state_machine_manager.remove_state_machine(sm.state_machine_id)
+        testing_utils.assert_logger_warnings_and_errors(caplog)
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
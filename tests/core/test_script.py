@@ -0,0 +1,79 @@
+import os
+
+from rafcon.core.script import Script, ScriptCompilationCache, script_compilation_cache
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.config import global_config
+
+# test environment elements
+from tests import utils as testing_utils
+
+SCRIPT_TEXT = 'counter = 0\n\n\ndef execute(self, inputs, outputs, gvm):\n    global counter\n' \
+              '    counter += 1\n    outputs["counter"] = counter\n    return 0\n'
+
+
+def test_script_compilation_cache():
+    cache = ScriptCompilationCache(max_size=2)
+    code = cache.get_code(SCRIPT_TEXT, None, "script.py")
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.get_code(SCRIPT_TEXT, None, "script.py") is code
+    # an equal text of another string object is found as well
+    assert cache.get_code(''.join(list(SCRIPT_TEXT)), None, "script.py") is code
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # the source path is part of the key
+    cache.get_code(SCRIPT_TEXT, "/other/script.py", "script.py")
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    # least recently used entries are dropped
+    cache.get_code(SCRIPT_TEXT + "\n", None, "script.py")
+    assert len(cache) == 2
+    cache.get_code(SCRIPT_TEXT, "/other/script.py", "script.py")
+    cache.get_code(SCRIPT_TEXT, None, "script.py")
+    assert (cache.hits, cache.misses) == (3, 4)
+
+    cache.clear()
+    assert len(cache) == 0 and (cache.hits, cache.misses) == (0, 0)
+
+
+def test_script_recompiled_on_modification():
+    path = testing_utils.get_unique_temp_path()
+    with open(os.path.join(path, "script.py"), "w") as script_file:
+        script_file.write(SCRIPT_TEXT)
+    script = Script(path=path, filename="script.py")
+    state = ExecutionState("cached script")
+
+    script.compile_module()
+    hits, misses = script_compilation_cache.hits, script_compilation_cache.misses
+    script.compile_module()
+    assert (script_compilation_cache.hits, script_compilation_cache.misses) == (hits + 1, misses)
+
+    # the cached code only depends on the script text, not on the modification time of the script file
+    modification_time = os.path.getmtime(os.path.join(path, "script.py")) + 10
+    os.utime(os.path.join(path, "script.py"), (modification_time, modification_time))
+    script.compile_module()
+    assert (script_compilation_cache.hits, script_compilation_cache.misses) == (hits + 2, misses)
+
+    recompilation = global_config.get_config_value("SCRIPT_RECOMPILATION_ON_STATE_EXECUTION")
+    try:
+        # the module is created anew, thus global variables of the script are reset
+        global_config.set_config_value("SCRIPT_RECOMPILATION_ON_STATE_EXECUTION", True)
+        outputs = {"counter": None}
+        script.execute(state, outputs=outputs)
+        script.execute(state, outputs=outputs)
+        assert outputs["counter"] == 1
+
+        global_config.set_config_value("SCRIPT_RECOMPILATION_ON_STATE_EXECUTION", False)
+        script.execute(state, outputs=outputs)
+        script.execute(state, outputs=outputs)
+        assert outputs["counter"] == 3
+        # a changed script text is compiled even without SCRIPT_RECOMPILATION_ON_STATE_EXECUTION
+        script.script = SCRIPT_TEXT.replace("counter += 1", "counter += 10")
+        script.execute(state, outputs=outputs)
+        assert outputs["counter"] == 10
+    finally:
+        global_config.set_config_value("SCRIPT_RECOMPILATION_ON_STATE_EXECUTION", recompilation)
+
+
+if __name__ == '__main__':
+    test_script_compilation_cache()
+    test_script_recompiled_on_modification()
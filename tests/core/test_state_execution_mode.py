@@ -0,0 +1,147 @@
+import os
+import time
+import threading
+import pytest
+
+# core elements
+import rafcon.core.singleton
+from rafcon.core.storage import storage
+from rafcon.core.singleton import state_machine_execution_engine
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.config import global_config
+from rafcon.core.execution.state_execution_pool import StateExecutionPool, get_state_execution_mode
+from rafcon.utils import log
+
+# test environment elements
+from tests import utils as testing_utils
+from tests.utils import wait_for_execution_engine_sync_counter
+from tests.core.test_hierarchy_state_execution import create_hierarchy_state
+
+logger = log.get_logger(__name__)
+
+execution_modes = ["THREAD", "INLINE", "POOL"]
+
+
+@pytest.fixture(autouse=True)
+def reset_state_execution_mode():
+    """Restores the default execution mode, as the config values persist for the following tests"""
+    yield
+    global_config.set_config_value("STATE_EXECUTION_MODE", "THREAD")
+
+
+def wait_for_idle_workers(pool, number_of_idle_workers):
+    # a worker is put back into the pool after the task signaled its end
+    while pool.number_of_idle_workers < number_of_idle_workers:
+        time.sleep(0.005)
+
+
+def test_state_execution_pool():
+    pool = StateExecutionPool(max_idle_workers=2)
+    results = []
+    for i in range(5):
+        pool.submit(lambda: results.append(threading.current_thread().name)).join()
+        wait_for_idle_workers(pool, 1)
+    assert len(results) == 5
+    assert pool.created_workers == 1
+    assert pool.reused_workers == 4
+
+    # all workers busy: additional workers are created, but only max_idle_workers are retained
+    release = threading.Event()
+    tasks = [pool.submit(release.wait) for _ in range(4)]
+    assert all(task.is_alive() for task in tasks)
+    release.set()
+    for task in tasks:
+        task.join()
+    assert not any(task.is_alive() for task in tasks)
+    wait_for_idle_workers(pool, 2)
+    time.sleep(0.05)
+    assert pool.number_of_idle_workers == 2
+
+
+@pytest.mark.parametrize("mode", execution_modes)
+def test_hierarchy_execution(caplog, mode):
+    testing_utils.initialize_environment_core(core_config={"STATE_EXECUTION_MODE": mode})
+    hierarchy_state = create_hierarchy_state()
+    state_machine = StateMachine(hierarchy_state)
+    try:
+        assert get_state_execution_mode() == mode
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        state_machine_execution_engine.start(state_machine.state_machine_id)
+        state_machine_execution_engine.join()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+        assert hierarchy_state.output_data["output1"] == 52.0
+    finally:
+        # 2 type error -> one child output port data type error and root state scoped data type error
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_errors=2)
+
+
+@pytest.mark.parametrize("mode", execution_modes)
+def test_preemption(caplog, mode):
+    testing_utils.initialize_environment_core(core_config={"STATE_EXECUTION_MODE": mode})
+    sm = state_machine_execution_engine.execute_state_machine_from_path(
+        path=testing_utils.get_test_sm_path(os.path.join("unit_test_state_machines", "preemption_behaviour_test_sm")))
+    rafcon.core.singleton.state_machine_manager.remove_state_machine(sm.state_machine_id)
+    from rafcon.core.singleton import global_variable_manager
+    try:
+        assert global_variable_manager.get_variable("s2") == 1.0
+        assert not global_variable_manager.variable_exist("s3")
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+@pytest.mark.parametrize("mode", execution_modes)
+def test_backward_stepping_preemptive_state(caplog, mode):
+    testing_utils.initialize_environment_core(core_config={"STATE_EXECUTION_MODE": mode})
+    from rafcon.core.singleton import global_variable_manager
+    global_variable_manager.set_variable("global_variable_1", "value1")
+    global_variable_manager.set_variable("global_variable_2", "value2")
+
+    state_machine = storage.load_state_machine_from_path(
+        testing_utils.get_test_sm_path(os.path.join("unit_test_state_machines", "backward_step_preemtive_test")))
+    rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+
+    try:
+        with state_machine_execution_engine._status.execution_condition_variable:
+            state_machine_execution_engine.synchronization_counter = 0
+
+        state_machine_execution_engine.step_mode(state_machine.state_machine_id)
+        wait_for_execution_engine_sync_counter(1, logger)
+
+        # forward
+        for i in range(3):
+            state_machine_execution_engine.step_into()
+            wait_for_execution_engine_sync_counter(2, logger)
+
+        state_machine_execution_engine.step_into()
+        wait_for_execution_engine_sync_counter(1, logger)
+
+        # preemptive concurrency state must be finished before the next step
+        while not state_machine.get_state_by_path("AOURYA/LXEMOO").final_outcome:
+            time.sleep(0.010)
+
+        state_machine_execution_engine.step_into()
+        wait_for_execution_engine_sync_counter(1, logger)
+
+        # backward
+        state_machine_execution_engine.backward_step()
+        wait_for_execution_engine_sync_counter(1, logger)
+
+        for i in range(3):
+            state_machine_execution_engine.backward_step()
+            wait_for_execution_engine_sync_counter(2, logger)
+
+        state_machine_execution_engine.backward_step()
+
+        while not state_machine_execution_engine.finished_or_stopped():
+            time.sleep(0.1)
+        state_machine_execution_engine.join()
+
+        assert global_variable_manager.get_variable('beers') == 0
+        assert global_variable_manager.get_variable('whiskey') == 0
+    finally:
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
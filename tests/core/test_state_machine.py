@@ -1,8 +1,10 @@
 from __future__ import print_function
+import threading
 # state machine
 from rafcon.core.states.state import State
 from rafcon.core.decorators import global_lock_counter, lock_state_machine
 from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
 from rafcon.core.state_machine import StateMachine
 
 from tests.utils import assert_logger_warnings_and_errors
@@ -37,5 +39,36 @@ def test_lock_state_machine(caplog):
     assert_logger_warnings_and_errors(caplog)
 
 
+def test_cached_state_machine_reference(caplog):
+    root_state = HierarchyState("root")
+    child_state = HierarchyState("child")
+    grandchild_state = ExecutionState("grandchild")
+    child_state.add_state(grandchild_state)
+    root_state.add_state(child_state)
+    assert grandchild_state.get_state_machine() is None
+
+    state_machine = StateMachine(root_state)
+    assert grandchild_state.get_state_machine() is state_machine
+    assert grandchild_state.get_state_machine() is state_machine
+
+    # re-parenting invalidates the cached references
+    other_state_machine = StateMachine(HierarchyState("other root"))
+    root_state.remove_state(child_state.state_id, recursive=False, destroy=False)
+    assert grandchild_state.get_state_machine() is None
+    other_state_machine.root_state.add_state(child_state)
+    assert grandchild_state.get_state_machine() is other_state_machine
+
+    # runtime data can be changed while the structure of the state machine is locked by another thread
+    with other_state_machine.modification_lock():
+        thread = threading.Thread(target=setattr, args=(grandchild_state, "started", True))
+        thread.start()
+        thread.join(1.)
+        assert not thread.is_alive()
+    assert grandchild_state.started
+
+    assert_logger_warnings_and_errors(caplog)
+
+
 if __name__ == '__main__':
     test_lock_state_machine(None)
+    test_cached_state_machine_reference(None)
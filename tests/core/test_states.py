@@ -261,8 +261,93 @@ def test_port_and_outcome_removal(caplog):
     assert_logger_warnings_and_errors(caplog)
 
 
+def test_data_flow_routing_index(caplog):
+    container = ContainerState("Container")
+    input_container_state = container.add_input_data_port("input", "float")
+    output_container_state = container.add_output_data_port("output", "float")
+
+    state1 = ExecutionState("first_state")
+    input_state1 = state1.add_input_data_port("input", "float")
+    output_state1 = state1.add_output_data_port("output", "float")
+    state2 = ExecutionState("second_state")
+    input_state2 = state2.add_input_data_port("input", "float")
+    output_state2 = state2.add_output_data_port("output", "float")
+    container.add_state(state1)
+    container.add_state(state2)
+
+    assert container.get_incoming_data_flows(state1.state_id, input_state1) == []
+
+    df_in = container.add_data_flow(container.state_id, input_container_state, state1.state_id, input_state1)
+    df_1_2 = container.add_data_flow(state1.state_id, output_state1, state2.state_id, input_state2)
+    df_1_out = container.add_data_flow(state1.state_id, output_state1, container.state_id, output_container_state)
+
+    assert container.get_incoming_data_flows(state1.state_id, input_state1) == [container.data_flows[df_in]]
+    assert container.get_outgoing_data_flows(container.state_id, input_container_state) == \
+        [container.data_flows[df_in]]
+    assert set(container.get_outgoing_data_flows(state1.state_id, output_state1)) == \
+        {container.data_flows[df_1_2], container.data_flows[df_1_out]}
+
+    # in place modifications of a data flow are reflected
+    container.data_flows[df_1_out].modify_origin(state2.state_id, output_state2)
+    assert container.get_outgoing_data_flows(state1.state_id, output_state1) == [container.data_flows[df_1_2]]
+    assert container.get_incoming_data_flows(container.state_id, output_container_state) == \
+        [container.data_flows[df_1_out]]
+    assert container.get_outgoing_data_flows(state2.state_id, output_state2) == [container.data_flows[df_1_out]]
+
+    container.remove_data_flow(df_1_2)
+    assert container.get_incoming_data_flows(state2.state_id, input_state2) == []
+
+    old_state_id = container.state_id
+    container.change_state_id()
+    assert container.get_incoming_data_flows(old_state_id, output_container_state) == []
+    assert container.get_incoming_data_flows(container.state_id, output_container_state) == \
+        [container.data_flows[df_1_out]]
+
+    container.remove_state(state1.state_id)
+    assert container.get_outgoing_data_flows(container.state_id, input_container_state) == []
+
+    assert_logger_warnings_and_errors(caplog)
+
+
+def test_transition_lookup_table(caplog):
+    container = ContainerState("Container")
+    state1 = ExecutionState("first_state")
+    state2 = ExecutionState("second_state")
+    container.add_state(state1)
+    container.add_state(state2)
+    container.set_start_state(state1)
+
+    assert container.get_transition_for_outcome(state1, state1.outcomes[0]) is None
+
+    t_1_2 = container.add_transition(state1.state_id, 0, state2.state_id, None)
+    t_2_out = container.add_transition(state2.state_id, 0, container.state_id, 0)
+    assert container.get_transition_for_outcome(state1, state1.outcomes[0]) is container.transitions[t_1_2]
+    assert container.get_transition_for_outcome(state2, state2.outcomes[0]) is container.transitions[t_2_out]
+    assert container.get_transition_for_outcome(state2, state2.outcomes[-1]) is None
+
+    # in place modifications of a transition are reflected
+    container.transitions[t_2_out].modify_origin(state2.state_id, -1)
+    assert container.get_transition_for_outcome(state2, state2.outcomes[0]) is None
+    assert container.get_transition_for_outcome(state2, state2.outcomes[-1]) is container.transitions[t_2_out]
+
+    container.remove_transition(t_1_2)
+    assert container.get_transition_for_outcome(state1, state1.outcomes[0]) is None
+
+    container.transitions = {}
+    assert container.get_transition_for_outcome(state2, state2.outcomes[-1]) is None
+
+    t_2_out = container.add_transition(state2.state_id, 0, container.state_id, 0)
+    container.change_state_id()
+    assert container.transitions[t_2_out].to_state == container.state_id
+    assert container.get_transition_for_outcome(state2, state2.outcomes[0]) is container.transitions[t_2_out]
+
+    assert_logger_warnings_and_errors(caplog)
+
+
 if __name__ == '__main__':
     test_create_state(None)
     test_port_and_outcome_removal(None)
     test_create_container_state(None)
+    test_data_flow_routing_index(None)
+    test_transition_lookup_table(None)
     # pytest.main([__file__])
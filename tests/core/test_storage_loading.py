@@ -0,0 +1,142 @@
+import os
+import shutil
+import threading
+
+# core elements
+from rafcon.core.config import global_config
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+
+# test environment elements
+from tests import utils as testing_utils
+
+
+def create_state_machine():
+    root_state = HierarchyState("root")
+    root_state.semantic_data = {"key": "root_value"}
+    for i in range(5):
+        state = ExecutionState("state" + str(i))
+        state.script_text = 'def execute(self, inputs, outputs, gvm):\n    return {0}\n'.format(i)
+        state.semantic_data = {"key": i}
+        root_state.add_state(state)
+    return StateMachine(root_state)
+
+
+def assert_equal_state_machines(state_machine, loaded_state_machine):
+    root_state = loaded_state_machine.root_state
+    assert root_state.semantic_data["key"] == "root_value"
+    assert len(root_state.states) == len(state_machine.root_state.states)
+    for state_id, state in state_machine.root_state.states.items():
+        assert root_state.states[state_id].script_text == state.script_text
+        assert root_state.states[state_id].semantic_data["key"] == state.semantic_data["key"]
+
+
+def test_parallel_lazy_loading(caplog):
+    testing_utils.initialize_environment_core()
+    path = testing_utils.get_unique_temp_path()
+    try:
+        state_machine = create_state_machine()
+        storage.save_state_machine_to_path(state_machine, path)
+
+        timings = {}
+        loaded_state_machine = storage.load_state_machine_from_path(path, timings=timings)
+        assert set(timings) == {'scan', 'read', 'build', 'total'}
+        assert timings['total'] >= timings['scan'] + timings['read'] + timings['build']
+        # script texts and semantic data are only read on access
+        for state in loaded_state_machine.root_state.states.values():
+            assert state.script._script_file is not None
+            assert state._semantic_data_file is not None
+        assert_equal_state_machines(state_machine, loaded_state_machine)
+
+        # the data not yet read must be preserved, if the files are removed while saving
+        loaded_state_machine = storage.load_state_machine_from_path(path)
+        storage.save_state_machine_to_path(loaded_state_machine, path, delete_old_state_machine=True)
+        assert_equal_state_machines(state_machine, storage.load_state_machine_from_path(path))
+
+        global_config.set_config_value("STORAGE_LOADING_THREADS", 1)
+        global_config.set_config_value("STORAGE_LAZY_LOADING", False)
+        loaded_state_machine = storage.load_state_machine_from_path(path)
+        for state in loaded_state_machine.root_state.states.values():
+            assert state.script._script_file is None
+            assert state._semantic_data_file is None
+        assert_equal_state_machines(state_machine, loaded_state_machine)
+    finally:
+        global_config.set_config_value("STORAGE_LOADING_THREADS", 8)
+        global_config.set_config_value("STORAGE_LAZY_LOADING", True)
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_skip_folders_without_state(caplog):
+    testing_utils.initialize_environment_core()
+    path = testing_utils.get_unique_temp_path()
+    try:
+        state_machine = create_state_machine()
+        storage.save_state_machine_to_path(state_machine, path)
+        root_state_path = state_machine.root_state.file_system_path
+        os.makedirs(os.path.join(root_state_path, "__pycache__", "nested"))
+
+        loaded_state_machine = storage.load_state_machine_from_path(path)
+        assert_equal_state_machines(state_machine, loaded_state_machine)
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_missing_state_directories(caplog):
+    testing_utils.initialize_environment_core()
+    path = testing_utils.get_unique_temp_path()
+    try:
+        assert storage.load_state_from_path(os.path.join(path, "does_not_exist")) is None
+
+        state_machine = create_state_machine()
+        storage.save_state_machine_to_path(state_machine, path)
+        shutil.rmtree(state_machine.root_state.file_system_path)
+        assert storage.load_state_machine_from_path(path) is None
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_errors=2)
+
+
+def test_change_loading_threads_while_loading(caplog):
+    testing_utils.initialize_environment_core()
+    path = testing_utils.get_unique_temp_path()
+    state_machine = create_state_machine()
+    storage.save_state_machine_to_path(state_machine, path)
+    scan_directory = storage._scan_directory
+    scanning = threading.Event()
+    continue_scanning = threading.Event()
+
+    def blocking_scan_directory(directory_path):
+        if os.path.basename(directory_path).startswith("state0"):
+            scanning.set()
+            continue_scanning.wait(5.)
+        return scan_directory(directory_path)
+
+    loaded_state_machines = []
+    try:
+        storage._scan_directory = blocking_scan_directory
+        thread = threading.Thread(target=lambda: loaded_state_machines.append(storage.load_state_machine_from_path(path)))
+        thread.start()
+        assert scanning.wait(5.)
+        # the pool used by the loading thread is replaced, but only closed after the loading thread finished with it
+        used_pool = storage._loading_pool
+        global_config.set_config_value("STORAGE_LOADING_THREADS", 4)
+        assert storage._map(len, ["a", "bc"]) == [1, 2]
+        assert storage._loading_pool is not used_pool
+        assert used_pool.retired and used_pool.users == 1
+        continue_scanning.set()
+        thread.join(5.)
+        assert used_pool.users == 0
+        assert_equal_state_machines(state_machine, loaded_state_machines[0])
+    finally:
+        continue_scanning.set()
+        storage._scan_directory = scan_directory
+        global_config.set_config_value("STORAGE_LOADING_THREADS", 8)
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    test_parallel_lazy_loading(None)
+    test_skip_folders_without_state(None)
+    test_missing_state_directories(None)
+    test_change_loading_threads_while_loading(None)
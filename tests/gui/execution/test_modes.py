@@ -83,6 +83,12 @@ def test_execution_modes(gui):
             time.sleep(0.1)
             print("##### in wait {0} #####".format(state_machine_execution_engine.synchronization_counter))
         print("##### after {0} #####".format(state_machine_execution_engine.synchronization_counter))
+        wait_for_gui_and_execution_status_changes()
+
+    def wait_for_gui_and_execution_status_changes():
+        # the execution status changes are notified at the refresh rate of the drainer, thus they are flushed
+        testing_utils.call_gui_callback(testing_utils.wait_for_gui)
+        testing_utils.call_gui_callback(gui_singleton.execution_status_drainer.flush)
         testing_utils.call_gui_callback(testing_utils.wait_for_gui)
 
     from gtkmvc3.observer import Observer
@@ -132,8 +138,10 @@ def test_execution_modes(gui):
     # active state should not change from step mode to pause -> this can cause bad situations with a robot in the loop
     last_active_state = execution_observer.last_execution_change_at_state
     print("last active state {0}".format(last_active_state))
+    # the execution status changes are notified by the drainer of the status channel
+    assert last_active_state is not None
     testing_utils.call_gui_callback(menubar_ctrl.on_pause_activate, None)
-    testing_utils.call_gui_callback(testing_utils.wait_for_gui)
+    wait_for_gui_and_execution_status_changes()
     current_active_state = execution_observer.last_execution_change_at_state
     print("last active state {0}".format(last_active_state))
     print("current active state {0} {1}".format(current_active_state, last_active_state == current_active_state))
@@ -143,7 +151,7 @@ def test_execution_modes(gui):
     last_active_state = execution_observer.last_execution_change_at_state
     print("last active state {0}".format(last_active_state))
     testing_utils.call_gui_callback(menubar_ctrl.on_step_mode_activate, None)
-    testing_utils.call_gui_callback(testing_utils.wait_for_gui)
+    wait_for_gui_and_execution_status_changes()
     current_active_state = execution_observer.last_execution_change_at_state
     print("last active state {0}".format(last_active_state))
     print("current active state {0} {1}".format(current_active_state, last_active_state == current_active_state))
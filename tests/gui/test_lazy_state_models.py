@@ -0,0 +1,122 @@
+import os
+
+from tests import utils as testing_utils
+import pytest
+
+
+def create_state_machine(number_child_states=5, number_childs_per_child=5):
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.states.hierarchy_state import HierarchyState
+    from rafcon.core.state_machine import StateMachine
+
+    root_state = HierarchyState("Root", state_id="ROOT")
+    for i in range(number_child_states):
+        child_state = HierarchyState("Child {0}".format(i), state_id="CHILD{0}".format(i))
+        for j in range(number_childs_per_child):
+            child_state.add_state(ExecutionState("Grandchild {0}".format(j), state_id="GRANDCHILD{0}{1}".format(i, j)))
+        child_state.set_start_state("GRANDCHILD{0}0".format(i))
+        root_state.add_state(child_state)
+    root_state.set_start_state("CHILD0")
+    return StateMachine(root_state)
+
+
+def test_lazy_state_model_creation(caplog):
+    testing_utils.dummy_gui(None)
+    testing_utils.initialize_environment(gui_already_started=False,
+                                         gui_config={'HISTORY_ENABLED': False, 'AUTO_BACKUP_ENABLED': False})
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.gui.models.state_machine import StateMachineModel
+    try:
+        state_machine = create_state_machine()
+        sm_m = StateMachineModel(state_machine)
+        root_state_m = sm_m.root_state
+        assert not root_state_m.states.loaded
+
+        # the models of a hierarchy level are created on the first access, the levels below are not
+        child_state_m = root_state_m.states["CHILD1"]
+        assert root_state_m.states.loaded
+        assert len(root_state_m.states) == 5
+        assert root_state_m.states["CHILD0"].is_start and not child_state_m.is_start
+        assert not child_state_m.states.loaded
+        assert child_state_m not in root_state_m.states["CHILD0"]
+
+        # selecting a state by its path creates the models along the path
+        grandchild_state = state_machine.root_state.states["CHILD2"].states["GRANDCHILD21"]
+        grandchild_state_m = sm_m.get_state_model_by_path(grandchild_state.get_path())
+        assert grandchild_state_m.state is grandchild_state
+        assert root_state_m.states["CHILD2"].states.loaded
+        assert not root_state_m.states["CHILD3"].states.loaded
+
+        # states added or removed before the level is accessed get their models by the usual notifications
+        state_machine.root_state.states["CHILD3"].add_state(ExecutionState("New", state_id="NEW"))
+        state_machine.root_state.states["CHILD4"].remove_state("GRANDCHILD40")
+        assert set(root_state_m.states["CHILD3"].states) == {"GRANDCHILD3{0}".format(j) for j in range(5)} | {"NEW"}
+        assert set(root_state_m.states["CHILD4"].states) == {"GRANDCHILD4{0}".format(j) for j in range(1, 5)}
+        for state_m in root_state_m.states["CHILD3"].states.values():
+            assert state_m.parent is root_state_m.states["CHILD3"]
+
+        # models that were never accessed do not need to be created for the destruction
+        sm_m.prepare_destruction()
+    finally:
+        testing_utils.shutdown_environment(caplog=caplog, unpatch_threading=False)
+
+
+def test_meta_data_of_unloaded_levels(caplog):
+    testing_utils.dummy_gui(None)
+    testing_utils.initialize_environment(gui_already_started=False,
+                                         gui_config={'HISTORY_ENABLED': False, 'AUTO_BACKUP_ENABLED': False})
+    from rafcon.core.storage import storage
+    from rafcon.gui.models.state_machine import StateMachineModel
+    base_path = testing_utils.get_unique_temp_path()
+    try:
+        state_machine = create_state_machine(2, 2)
+        storage.save_state_machine_to_path(state_machine, os.path.join(base_path, "original"))
+        sm_m = StateMachineModel(state_machine)
+        sm_m.root_state.states["CHILD1"].states["GRANDCHILD11"].set_meta_data_editor("size", (42., 42.))
+        sm_m.store_meta_data()
+        sm_m.prepare_destruction()
+
+        def get_grandchild_size(state_machine_m):
+            grandchild_state_m = state_machine_m.root_state.states["CHILD1"].states["GRANDCHILD11"]
+            return tuple(grandchild_state_m.get_meta_data_editor()["size"])
+
+        # a copy of the state machine gets the meta data of levels without models, e.g. an auto backup
+        state_machine = storage.load_state_machine_from_path(os.path.join(base_path, "original"))
+        sm_m = StateMachineModel(state_machine)
+        storage.save_state_machine_to_path(state_machine, os.path.join(base_path, "copy"), as_copy=True)
+        sm_m.store_meta_data(copy_path=os.path.join(base_path, "copy"))
+        assert not sm_m.root_state.states["CHILD1"].states.loaded
+        copy_sm_m = StateMachineModel(storage.load_state_machine_from_path(os.path.join(base_path, "copy")))
+        assert get_grandchild_size(copy_sm_m) == (42., 42.)
+        copy_sm_m.prepare_destruction()
+
+        # before the state machine is saved to another path, the levels read their meta data from the old path
+        sm_m.root_state.load_pending_state_models()
+        storage.save_state_machine_to_path(state_machine, os.path.join(base_path, "moved"))
+        sm_m.store_meta_data()
+        assert get_grandchild_size(sm_m) == (42., 42.)
+        moved_sm_m = StateMachineModel(storage.load_state_machine_from_path(os.path.join(base_path, "moved")))
+        assert get_grandchild_size(moved_sm_m) == (42., 42.)
+        moved_sm_m.prepare_destruction()
+        sm_m.prepare_destruction()
+    finally:
+        testing_utils.shutdown_environment(caplog=caplog, unpatch_threading=False)
+
+
+def test_eager_state_model_creation(caplog):
+    testing_utils.dummy_gui(None)
+    testing_utils.initialize_environment(gui_already_started=False,
+                                         gui_config={'HISTORY_ENABLED': False, 'AUTO_BACKUP_ENABLED': False,
+                                                     'LAZY_STATE_MODEL_CREATION': False})
+    from rafcon.gui.models.state_machine import StateMachineModel
+    try:
+        sm_m = StateMachineModel(create_state_machine())
+        assert sm_m.root_state.states.loaded
+        assert all(child_state_m.states.loaded for child_state_m in sm_m.root_state.states.values())
+        sm_m.prepare_destruction()
+    finally:
+        testing_utils.shutdown_environment(caplog=caplog, unpatch_threading=False)
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
@@ -0,0 +1,68 @@
+import pytest
+
+from tests import utils as testing_utils
+
+LEAF_STATE_PATH = "ROOT/LEVEL1/LEVEL2/LEVEL3/LEAF"
+
+config_options = {
+    "gui_config": {
+        'HISTORY_ENABLED': False,
+        'GAPHAS_EDITOR_AUTO_FOCUS_OF_ROOT_STATE': False,
+        'GAPHAS_EDITOR_MINIMUM_SIZE_FOR_CONTENT_VIEWS': 30
+    }
+}
+
+
+def create_state_machine():
+    import rafcon.core.singleton
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.states.hierarchy_state import HierarchyState
+    from rafcon.core.state_machine import StateMachine
+
+    root_state = HierarchyState("Root", state_id="ROOT")
+    parent_state = root_state
+    for level in range(1, 4):
+        state = HierarchyState("Level {0}".format(level), state_id="LEVEL{0}".format(level))
+        parent_state.add_state(state)
+        parent_state = state
+    parent_state.add_state(ExecutionState("Leaf", state_id="LEAF"))
+
+    state_machine = StateMachine(root_state)
+    rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+    return state_machine.state_machine_id
+
+
+@pytest.mark.parametrize('gui', [config_options], indirect=True)
+def test_level_of_detail(gui):
+    state_machine_id = gui(create_state_machine)
+    gui(testing_utils.wait_for_gui)
+
+    sm_m = gui.singletons.state_machine_manager_model.state_machines[state_machine_id]
+    state_machines_ctrl = gui.singletons.main_window_controller.get_controller('state_machines_editor_ctrl')
+    graphical_editor_ctrl = state_machines_ctrl.get_controller(state_machine_id)
+    canvas = graphical_editor_ctrl.canvas
+
+    def get_view(path):
+        return canvas.get_view_for_model(sm_m.get_state_model_by_path(path))
+
+    # The default size of child states is a fifth of the size of their parent, thus the content of deep levels is too
+    # small to be shown
+    assert get_view("ROOT").content_created
+    assert get_view("ROOT/LEVEL1") is not None
+    assert get_view(LEAF_STATE_PATH) is None
+
+    # Focusing a state creates the views of its parents
+    gui(graphical_editor_ctrl.set_focus_to_state_model, sm_m.get_state_model_by_path(LEAF_STATE_PATH))
+    gui(testing_utils.wait_for_gui)
+    assert get_view(LEAF_STATE_PATH) is not None
+    assert get_view("ROOT/LEVEL1/LEVEL2/LEVEL3").content_created
+
+    # Zooming out removes the views of the content of small states
+    gui(graphical_editor_ctrl.view.editor.zoom, 0.001)
+    gui(graphical_editor_ctrl.update_level_of_detail)
+    assert get_view("ROOT/LEVEL1") is None
+    assert not get_view("ROOT").content_created
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
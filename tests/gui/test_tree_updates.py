@@ -0,0 +1,220 @@
+import time
+import pytest
+
+from tests import utils as testing_utils
+
+config_options = {
+    "gui_config": {
+        'HISTORY_ENABLED': False,
+        'AUTO_BACKUP_ENABLED': False
+    }
+}
+
+
+def create_state_machine():
+    import rafcon.core.singleton
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.states.hierarchy_state import HierarchyState
+    from rafcon.core.state_machine import StateMachine
+
+    root_state = HierarchyState("Root", state_id="ROOT")
+    child_state = HierarchyState("Child", state_id="CHILD")
+    child_state.add_state(ExecutionState("Leaf", state_id="LEAF"))
+    child_state.start_state_id = "LEAF"
+    child_state.add_transition("LEAF", 0, "CHILD", 0)
+    root_state.add_state(child_state)
+    root_state.start_state_id = "CHILD"
+    root_state.add_transition("CHILD", 0, "ROOT", 0)
+
+    state_machine = StateMachine(root_state)
+    rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+    return state_machine.state_machine_id
+
+
+WAIT_SCRIPT = 'def execute(self, inputs, outputs, gvm):\n' \
+              '    gvm.get_variable("continue", per_reference=True).wait(5)\n' \
+              '    return 0\n'
+
+
+def create_concurrency_state_machine():
+    import rafcon.core.singleton
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.states.hierarchy_state import HierarchyState
+    from rafcon.core.states.barrier_concurrency_state import BarrierConcurrencyState
+    from rafcon.core.constants import UNIQUE_DECIDER_STATE_ID
+    from rafcon.core.state_machine import StateMachine
+
+    root_state = HierarchyState("Root", state_id="ROOT")
+    concurrency_state = BarrierConcurrencyState("Concurrency", state_id="CONCURRENCY")
+    concurrency_state.add_state(ExecutionState("Fast", state_id="FAST"))
+    branch_state = HierarchyState("Branch", state_id="BRANCH")
+    wait_state = ExecutionState("Wait", state_id="WAIT")
+    wait_state.script_text = WAIT_SCRIPT
+    branch_state.add_state(wait_state)
+    branch_state.start_state_id = "WAIT"
+    branch_state.add_transition("WAIT", 0, "BRANCH", 0)
+    concurrency_state.add_state(branch_state)
+    concurrency_state.add_transition(UNIQUE_DECIDER_STATE_ID, 0, "CONCURRENCY", 0)
+    root_state.add_state(concurrency_state)
+    root_state.start_state_id = "CONCURRENCY"
+    root_state.add_transition("CONCURRENCY", 0, "ROOT", 0)
+
+    state_machine = StateMachine(root_state)
+    rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+    return state_machine.state_machine_id
+
+
+def get_child_labels(tree_store, parent_iter, column):
+    return [tree_store.get_value(tree_store.iter_nth_child(parent_iter, n), column)
+            for n in range(tree_store.iter_n_children(parent_iter))]
+
+
+@pytest.mark.parametrize('gui', [config_options], indirect=True)
+def test_state_machine_tree_update(gui):
+    from rafcon.core.states.execution_state import ExecutionState
+    import rafcon.gui.helpers.state_machine as gui_helper_state_machine
+    state_machine_id = gui(create_state_machine)
+    sm_manager_m = gui.singletons.state_machine_manager_model
+    gui(setattr, sm_manager_m, "selected_state_machine_id", state_machine_id)
+    gui(testing_utils.wait_for_gui)
+
+    tree_ctrl = gui.singletons.main_window_controller.get_controller('state_machine_tree_controller')
+    child_state = sm_manager_m.state_machines[state_machine_id].root_state.state.states["CHILD"]
+    row_iters = tree_ctrl.state_row_iter_dict_by_state_path
+    # the rows of child states are created, when the row of their parent is expanded
+    gui(tree_ctrl.view.expand_to_path, tree_ctrl.tree_store.get_path(row_iters["ROOT/CHILD"]))
+    leaf_row_iter = row_iters["ROOT/CHILD/LEAF"]
+
+    # adding and removing states only changes their rows, the other rows and their expansion are kept
+    gui(child_state.add_state, ExecutionState("New", state_id="NEW"))
+    gui(testing_utils.wait_for_gui)
+    assert "ROOT/CHILD/NEW" in row_iters
+    assert row_iters["ROOT/CHILD/LEAF"] is leaf_row_iter
+    assert tree_ctrl.view.row_expanded(tree_ctrl.tree_store.get_path(row_iters["ROOT/CHILD"]))
+
+    gui(child_state.remove_state, "NEW")
+    gui(testing_utils.wait_for_gui)
+    assert "ROOT/CHILD/NEW" not in row_iters
+    assert row_iters["ROOT/CHILD/LEAF"] is leaf_row_iter
+    assert get_child_labels(tree_ctrl.tree_store, row_iters["ROOT/CHILD"], tree_ctrl.NAME_STORAGE_ID) == ["Leaf"]
+
+    # after complex actions only the sub tree of the parent is updated and the selection is kept consistent
+    sm_m = sm_manager_m.state_machines[state_machine_id]
+    gui(sm_m.selection.set, [sm_m.get_state_model_by_path("ROOT/CHILD/LEAF")])
+    group_state = gui(gui_helper_state_machine.group_selected_states_and_scoped_variables)
+    gui(testing_utils.wait_for_gui)
+    assert "ROOT/CHILD/" + group_state.state_id in row_iters
+    assert "ROOT/CHILD/LEAF" not in row_iters
+    assert tree_ctrl.check_selection_consistency()
+
+
+@pytest.mark.parametrize('gui', [config_options], indirect=True)
+def test_execution_history_tree_lazy_rows(gui):
+    execution_engine = gui.core_singletons.state_machine_execution_engine
+    state_machine_id = gui(create_state_machine)
+    gui(setattr, gui.singletons.state_machine_manager_model, "selected_state_machine_id", state_machine_id)
+    gui(execution_engine.start, state_machine_id)
+    if not execution_engine.join(3):
+        raise RuntimeError("State machine did not finish within the given time")
+    gui(testing_utils.wait_for_gui)
+
+    history_ctrl = gui.singletons.main_window_controller.get_controller('execution_history_ctrl')
+    gui(history_ctrl.reload_history, None)
+    tree_store = history_ctrl.history_tree_store
+    label_column = history_ctrl.LABEL_NAME_STORAGE_ID
+
+    # only the row of the run and a placeholder exist before the run is expanded
+    run_iter = tree_store.get_iter_first()
+    assert tree_store.iter_n_children(run_iter) == 1
+    assert get_child_labels(tree_store, run_iter, label_column) == [""]
+
+    gui(history_ctrl.history_tree.expand_to_path, tree_store.get_path(run_iter))
+    assert get_child_labels(tree_store, run_iter, label_column) == \
+        ["Root - Enter", "Child - Call", "Child - Return", "Root - Exit"]
+    child_call_iter = tree_store.iter_nth_child(run_iter, 1)
+    assert tree_store.iter_n_children(child_call_iter) == 1
+    assert history_ctrl.get_history_item_for_tree_iter(child_call_iter).state_reference.state_id == "CHILD"
+
+    gui(history_ctrl.history_tree.expand_to_path, tree_store.get_path(child_call_iter))
+    assert get_child_labels(tree_store, child_call_iter, label_column) == \
+        ["Child - Enter", "Leaf - Call", "Leaf - Return", "Child - Exit"]
+
+    # the expansion is restored after a reload
+    gui(history_ctrl.reload_history, None)
+    child_call_iter = tree_store.iter_nth_child(tree_store.get_iter_first(), 1)
+    assert tree_store.iter_n_children(child_call_iter) == 4
+
+
+def get_child_iter(tree_store, parent_iter, column, label):
+    for n in range(tree_store.iter_n_children(parent_iter)):
+        child_iter = tree_store.iter_nth_child(parent_iter, n)
+        if tree_store.get_value(child_iter, column) == label:
+            return child_iter
+    raise AssertionError("No child row with the label {}".format(label))
+
+
+@pytest.mark.parametrize('gui', [config_options], indirect=True)
+def test_execution_history_tree_concurrency_and_running_container(gui):
+    import threading
+    execution_engine = gui.core_singletons.state_machine_execution_engine
+    continue_event = threading.Event()
+    gui.core_singletons.global_variable_manager.set_variable("continue", continue_event, per_reference=True)
+    state_machine_id = gui(create_concurrency_state_machine)
+    gui(setattr, gui.singletons.state_machine_manager_model, "selected_state_machine_id", state_machine_id)
+    state_machine = gui.core_singletons.state_machine_manager.state_machines[state_machine_id]
+    wait_state = state_machine.get_state_by_path("ROOT/CONCURRENCY/BRANCH/WAIT")
+    gui(execution_engine.start, state_machine_id)
+
+    history_ctrl = gui.singletons.main_window_controller.get_controller('execution_history_ctrl')
+    tree_store = history_ctrl.history_tree_store
+    label_column = history_ctrl.LABEL_NAME_STORAGE_ID
+
+    def expand(parent_iter, label):
+        row_iter = get_child_iter(tree_store, parent_iter, label_column, label)
+        gui(history_ctrl.history_tree.expand_to_path, tree_store.get_path(row_iter))
+        return row_iter
+
+    try:
+        for _ in range(50):
+            if wait_state.active:
+                break
+            time.sleep(0.1)
+        assert wait_state.active
+        gui(testing_utils.wait_for_gui)
+
+        # the rows of the still running container states end with the call of the running child state
+        gui(history_ctrl.reload_history, None)
+        run_iter = tree_store.get_iter_first()
+        gui(history_ctrl.history_tree.expand_to_path, tree_store.get_path(run_iter))
+        assert get_child_labels(tree_store, run_iter, label_column) == ["Root - Enter", "Concurrency - Call"]
+        concurrency_iter = expand(run_iter, "Concurrency - Call")
+        assert sorted(get_child_labels(tree_store, concurrency_iter, label_column)) == \
+            ["Branch - Concurrency Branch", "Concurrency - Enter", "Fast - Concurrency Branch"]
+        fast_branch_iter = expand(concurrency_iter, "Fast - Concurrency Branch")
+        assert get_child_labels(tree_store, fast_branch_iter, label_column) == ["Fast - Call", "Fast - Return"]
+        branch_iter = expand(concurrency_iter, "Branch - Concurrency Branch")
+        assert get_child_labels(tree_store, branch_iter, label_column) == ["Branch - Call"]
+        branch_call_iter = expand(branch_iter, "Branch - Call")
+        assert get_child_labels(tree_store, branch_call_iter, label_column) == ["Branch - Enter", "Wait - Call"]
+    finally:
+        continue_event.set()
+    if not execution_engine.join(3):
+        raise RuntimeError("State machine did not finish within the given time")
+    gui(testing_utils.wait_for_gui)
+
+    # after the execution finished, the reloaded rows contain the return items of the container states
+    gui(history_ctrl.reload_history, None)
+    run_iter = tree_store.get_iter_first()
+    assert get_child_labels(tree_store, run_iter, label_column) == \
+        ["Root - Enter", "Concurrency - Call", "Concurrency - Return", "Root - Exit"]
+    concurrency_iter = expand(run_iter, "Concurrency - Call")
+    assert get_child_labels(tree_store, concurrency_iter, label_column)[-1] == "Concurrency - Exit"
+    branch_iter = expand(concurrency_iter, "Branch - Concurrency Branch")
+    assert get_child_labels(tree_store, branch_iter, label_column) == ["Branch - Call", "Branch - Return"]
+    branch_call_iter = expand(branch_iter, "Branch - Call")
+    assert get_child_labels(tree_store, branch_call_iter, label_column) == \
+        ["Branch - Enter", "Wait - Call", "Wait - Return", "Branch - Exit"]
+
+
+if __name__ == '__main__':
+    pytest.main(['-s', __file__])
@@ -1,19 +1,30 @@
 # core elements
 from builtins import range
 from builtins import str
+import os
+import sys
+import time
+import rafcon
 import rafcon.core.singleton
 from rafcon.core.states.execution_state import ExecutionState
 from rafcon.core.states.hierarchy_state import HierarchyState
 from rafcon.core.states.barrier_concurrency_state import BarrierConcurrencyState
 from rafcon.core.states.preemptive_concurrency_state import PreemptiveConcurrencyState
 from rafcon.core.constants import UNIQUE_DECIDER_STATE_ID
+from rafcon.core.id_generator import state_id_generator
 from rafcon.core.state_elements.data_port import InputDataPort, OutputDataPort
+from rafcon.core.state_elements.transition import Transition
 from rafcon.core.state_machine import StateMachine
+from rafcon.core.config import global_config
 
 from rafcon.utils.timer import measure_time
+from rafcon.utils import log
+from timeit import default_timer as timer
 
 from tests import utils as testing_utils
 
+logger = log.get_logger(__name__)
+
 
 @measure_time
 def create_hierarchy_state(number_child_states=10, sleep=False):
@@ -113,11 +124,598 @@ def test_preemption_concurrency_state_execution(number_child_states=10, number_c
     execute_state(preemption_state)
 
 
+@measure_time
+def create_hierarchy_state_with_transitions(number_of_transitions):
+    """Creates a hierarchy of sequentially connected execution states without checks to save creation time"""
+    states = {}
+    transitions = {}
+    last_state = None
+    for i in range(number_of_transitions):
+        state = ExecutionState("state" + str(i), safe_init=False)
+        states[state.state_id] = state
+        if last_state:
+            transitions[i] = Transition(last_state.state_id, 0, state.state_id, None, i, safe_init=False)
+        last_state = state
+    hierarchy_state_id = state_id_generator(used_state_ids=list(states.keys()))
+    transitions[number_of_transitions] = Transition(last_state.state_id, 0, hierarchy_state_id, 0,
+                                                    number_of_transitions, safe_init=False)
+    return HierarchyState("hierarchy", hierarchy_state_id, states=states, transitions=transitions, safe_init=False)
+
+
+def measure_transition_lookup_per_step(number_of_transitions, rounds=20):
+    """Measures the time the parent needs to determine the next transition after a child finished
+
+    Per step a hierarchy state calls get_transition_for_outcome twice: once after the child finished and once in
+    check_if_child_state_was_modified.
+    """
+    hierarchy = create_hierarchy_state_with_transitions(number_of_transitions)
+    child_states = list(hierarchy.states.values())
+    start = timer()
+    for _ in range(rounds):
+        for state in child_states:
+            transition = hierarchy.get_transition_for_outcome(state, state.outcomes[0])
+            hierarchy.get_state_for_transition(transition)
+            hierarchy.get_transition_for_outcome(state, state.outcomes[0])
+    duration_per_step = (timer() - start) / (rounds * len(child_states))
+    logger.info("Transition lookup with {0} transitions: {1:.3f} us per step".format(number_of_transitions,
+                                                                                   duration_per_step * 1e6))
+    return duration_per_step
+
+
+def test_transition_lookup_per_step():
+    for number_of_transitions in (10, 100, 1000):
+        measure_transition_lookup_per_step(number_of_transitions)
+
+
+def set_script_without_wait_recursively(state):
+    """Replaces the default script, which waits for two seconds, of all execution states"""
+    if isinstance(state, ExecutionState):
+        state.script_text = 'def execute(self, inputs, outputs, gvm):\n    return "success"\n'
+    elif hasattr(state, "states"):
+        for child_state in state.states.values():
+            set_script_without_wait_recursively(child_state)
+
+
+def measure_state_execution_throughput(execution_mode, root_state, number_of_steps, rounds=5):
+    """Measures the number of executed states per second in the given STATE_EXECUTION_MODE"""
+    global_config.set_config_value("STATE_EXECUTION_MODE", execution_mode)
+    try:
+        start = timer()
+        for _ in range(rounds):
+            execute_state(root_state)
+        steps_per_second = rounds * number_of_steps / (timer() - start)
+    finally:
+        global_config.set_config_value("STATE_EXECUTION_MODE", "THREAD")
+    logger.info("State execution in mode {0}: {1:.0f} steps per second".format(execution_mode, steps_per_second))
+    return steps_per_second
+
+
+def test_state_execution_throughput(number_child_states=100, number_of_branches=10):
+    hierarchy_state = create_hierarchy_state(number_child_states)
+    barrier_state = create_barrier_concurrency_state(number_of_branches, number_child_states // number_of_branches)
+    set_script_without_wait_recursively(hierarchy_state)
+    set_script_without_wait_recursively(barrier_state)
+    for execution_mode in ("THREAD", "INLINE", "POOL"):
+        # hierarchy state plus its children
+        measure_state_execution_throughput(execution_mode, hierarchy_state, number_child_states + 1)
+        # barrier state, decider state, branches and their children
+        measure_state_execution_throughput(execution_mode, barrier_state,
+                                           2 + number_of_branches * (number_child_states // number_of_branches + 1))
+
+
+@measure_time
+def create_hierarchy_state_passing_payload(number_child_states, payload_size, passing_policy):
+    """Creates a chain of execution states, each passing a payload of the given size in bytes to its successor"""
+    hierarchy = HierarchyState("payload_hierarchy")
+    hierarchy.add_outcome("hierarchy_outcome", 1)
+    hierarchy_output_port_id = hierarchy.add_output_data_port("payload", "object")
+    hierarchy.get_data_port_by_id(hierarchy_output_port_id).passing_policy = passing_policy
+    last_state = last_output_port_id = None
+    for i in range(number_child_states):
+        state = ExecutionState("state" + str(i))
+        output_port_id = state.add_output_data_port("payload", "object")
+        state.get_data_port_by_id(output_port_id).passing_policy = passing_policy
+        hierarchy.add_state(state)
+        if last_state is None:
+            state.script_text = 'def execute(self, inputs, outputs, gvm):\n' \
+                                '    outputs["payload"] = bytearray({0})\n' \
+                                '    return "success"\n'.format(payload_size)
+            hierarchy.set_start_state(state.state_id)
+        else:
+            state.script_text = 'def execute(self, inputs, outputs, gvm):\n' \
+                                '    outputs["payload"] = inputs["payload"]\n' \
+                                '    return "success"\n'
+            input_port_id = state.add_input_data_port("payload", "object")
+            state.get_data_port_by_id(input_port_id).passing_policy = passing_policy
+            hierarchy.add_transition(last_state.state_id, 0, state.state_id, None)
+            hierarchy.add_data_flow(last_state.state_id, last_output_port_id, state.state_id, input_port_id)
+        last_state, last_output_port_id = state, output_port_id
+    hierarchy.add_transition(last_state.state_id, 0, hierarchy.state_id, 1)
+    hierarchy.add_data_flow(last_state.state_id, last_output_port_id, hierarchy.state_id, hierarchy_output_port_id)
+    return hierarchy
+
+
+def measure_payload_passing(number_child_states, payload_size, passing_policy):
+    """Measures the execution time and the peak memory usage of passing a large payload along a chain of states"""
+    import tracemalloc
+    hierarchy = create_hierarchy_state_passing_payload(number_child_states, payload_size, passing_policy)
+    tracemalloc.start()
+    start = timer()
+    execute_state(hierarchy)
+    duration = timer() - start
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    logger.info("Passing {0} MB along {1} states with passing policy '{2}': {3:.3f} s, peak memory {4:.1f} MB".format(
+        payload_size / 1e6, number_child_states, passing_policy, duration, peak_memory / 1e6))
+    return duration, peak_memory
+
+
+def test_payload_passing(number_child_states=10, payload_size=50 * 1000 * 1000):
+    for passing_policy in ("copy", "reference", "read_only"):
+        measure_payload_passing(number_child_states, payload_size, passing_policy)
+
+
+def measure_scoped_data_writes(number_child_states, rounds=3):
+    """Measures the time per step and the memory blocks allocated per step for a chain of states writing scoped data
+
+    The allocations are counted with tracemalloc while the state machine and thus its execution history, including the
+    scoped data snapshots, still exist.
+
+    :return: the time per step in seconds and the number of allocated memory blocks per step
+    """
+    import tracemalloc
+    hierarchy = create_hierarchy_state_passing_payload(number_child_states, 8, "copy")
+    number_of_steps = number_child_states + 1
+    durations = []
+    for _ in range(rounds):
+        start = timer()
+        execute_state(hierarchy)
+        durations.append(timer() - start)
+    state_machine = StateMachine(hierarchy)
+    rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+    tracemalloc.start()
+    try:
+        rafcon.core.singleton.state_machine_execution_engine.start(state_machine.state_machine_id)
+        rafcon.core.singleton.state_machine_execution_engine.join()
+        allocated_blocks = sum(statistic.count for statistic in tracemalloc.take_snapshot().statistics('filename'))
+    finally:
+        tracemalloc.stop()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+    time_per_step = min(durations) / number_of_steps
+    logger.info("Scoped data writes of {0} states: {1:.1f} us and {2:.0f} allocated memory blocks per step".format(
+        number_child_states, time_per_step * 1e6, allocated_blocks / float(number_of_steps)))
+    return time_per_step, allocated_blocks / float(number_of_steps)
+
+
+def test_scoped_data_writes(number_child_states=200):
+    measure_scoped_data_writes(number_child_states)
+
+
+def create_library_heavy_state_machine(base_path, number_of_library_states, number_child_states):
+    """Saves a library and a state machine using the library the given number of times
+
+    :return: the path of the state machine
+    """
+    from rafcon.core.states.library_state import LibraryState
+    from rafcon.core.storage import storage
+    library_root_path = os.path.join(base_path, "libraries")
+    storage.save_state_machine_to_path(StateMachine(create_hierarchy_state(number_child_states)),
+                                       os.path.join(library_root_path, "benchmark_library"))
+    global_config.set_config_value("LIBRARY_PATHS", {"benchmark": library_root_path})
+    rafcon.core.singleton.library_manager.initialize()
+    root_state = HierarchyState("library_heavy")
+    for i in range(number_of_library_states):
+        root_state.add_state(LibraryState("benchmark", "benchmark_library", "0.1", "library" + str(i)))
+    state_machine_path = os.path.join(base_path, "library_heavy")
+    storage.save_state_machine_to_path(StateMachine(root_state), state_machine_path)
+    return state_machine_path
+
+
+def measure_library_state_machine_loading(state_machine_path, rounds=3):
+    """Measures the load time of a state machine and the number of state copies created while loading"""
+    from rafcon.core.storage import storage
+    durations = []
+    for _ in range(rounds):
+        rafcon.core.singleton.library_manager.clean_loaded_libraries()
+        start = timer()
+        state_machine = storage.load_state_machine_from_path(state_machine_path)
+        durations.append(timer() - start)
+    number_of_state_copies = len([state for state in state_machine.root_state.states.values()
+                                  if state._state_copy is not None])
+    logger.info("Loading {0} library states: {1:.3f} s (min of {2} rounds), {3} state copies created".format(
+        len(state_machine.root_state.states), min(durations), rounds, number_of_state_copies))
+    return min(durations)
+
+
+def test_library_state_machine_loading(number_of_library_states=200, number_child_states=20):
+    testing_utils.initialize_environment_core()
+    try:
+        state_machine_path = create_library_heavy_state_machine(testing_utils.get_unique_temp_path(),
+                                                                number_of_library_states, number_child_states)
+        measure_library_state_machine_loading(state_machine_path)
+        # library states created with copies of the library, as done before the template cache was introduced
+        global_config.set_config_value("NO_PROGRAMMATIC_CHANGE_OF_LIBRARY_STATES_PERFORMED", True)
+        measure_library_state_machine_loading(state_machine_path)
+    finally:
+        global_config.set_config_value("NO_PROGRAMMATIC_CHANGE_OF_LIBRARY_STATES_PERFORMED", False)
+        testing_utils.shutdown_environment_only_core()
+
+
+def measure_runtime_setter_in_deep_hierarchy(depth, rounds=10000):
+    """Measures the time to set the execution status of the innermost state of a deep hierarchy
+
+    The setter locks the state machine, which requires the state machine reference of the state.
+    """
+    from rafcon.core.states.state import StateExecutionStatus
+    root_state = HierarchyState("level0")
+    innermost_state = root_state
+    for level in range(1, depth):
+        state = HierarchyState("level" + str(level))
+        innermost_state.add_state(state)
+        innermost_state = state
+    StateMachine(root_state)
+    start = timer()
+    for i in range(rounds):
+        innermost_state.state_execution_status = StateExecutionStatus.ACTIVE if i % 2 else \
+            StateExecutionStatus.INACTIVE
+        innermost_state.started = bool(i % 2)
+    duration_per_set = (timer() - start) / (2 * rounds)
+    logger.info("Runtime setter at depth {0}: {1:.3f} us".format(depth, duration_per_set * 1e6))
+    return duration_per_set
+
+
+def test_runtime_setter_in_deep_hierarchy():
+    for depth in (1, 10, 100):
+        measure_runtime_setter_in_deep_hierarchy(depth)
+
+
+GVM_CONTENTION_SCRIPT = 'def execute(self, inputs, outputs, gvm):\n' \
+                        '    for _ in range({0}):\n' \
+                        '        access_key = gvm.lock_variable("counter", block=True)\n' \
+                        '        value = gvm.get_locked_variable("counter", access_key)\n' \
+                        '        gvm.set_locked_variable("counter", access_key, value + 1)\n' \
+                        '        gvm.unlock_variable("counter", access_key)\n' \
+                        '    return 0\n'
+
+
+def measure_global_variable_contention(number_of_states, number_of_increments):
+    """Measures the time N concurrent execution states need to increment the same global variable"""
+    gvm = rafcon.core.singleton.global_variable_manager
+    gvm.set_variable("counter", 0)
+    barrier_state = BarrierConcurrencyState("gvm_contention")
+    for i in range(number_of_states):
+        state = ExecutionState("incrementer" + str(i))
+        state.script_text = GVM_CONTENTION_SCRIPT.format(number_of_increments)
+        barrier_state.add_state(state)
+    barrier_state.add_transition(barrier_state.states[UNIQUE_DECIDER_STATE_ID].state_id, 0, barrier_state.state_id, 0)
+    start = timer()
+    execute_state(barrier_state)
+    duration = timer() - start
+    assert gvm.get_variable("counter") == number_of_states * number_of_increments
+    metrics = gvm.get_contention_metrics("counter")
+    logger.info("{0} states incrementing one global variable {1} times: {2:.3f} s, {3} contended acquisitions, "
+                "max wait time {4:.3f} s, max hold time {5:.6f} s".format(
+                    number_of_states, number_of_increments, duration, metrics['number_of_contended_acquisitions'],
+                    metrics['max_wait_time'], metrics['max_hold_time']))
+    gvm.delete_variable("counter")
+    return duration
+
+
+def test_global_variable_contention(number_of_increments=200):
+    testing_utils.initialize_environment_core()
+    try:
+        for number_of_states in (2, 8, 32):
+            measure_global_variable_contention(number_of_states, number_of_increments)
+    finally:
+        testing_utils.shutdown_environment_only_core()
+
+
+def measure_global_variable_readers(number_of_readers, number_of_reads, variable_size, snapshot):
+    """Measures the time concurrent readers need to read a large global variable"""
+    import threading
+    from rafcon.core.global_variable_manager import GlobalVariableManager
+    gvm = GlobalVariableManager()
+    gvm.set_variable("map", {str(i): float(i) for i in range(variable_size)})
+
+    def read():
+        for _ in range(number_of_reads):
+            if snapshot:
+                gvm.get_variable_snapshot("map")
+            else:
+                gvm.get_variable("map")
+
+    readers = [threading.Thread(target=read) for _ in range(number_of_readers)]
+    start = timer()
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    duration = timer() - start
+    logger.info("{0} readers reading a variable of size {1} {2} times {3}: {4:.3f} s".format(
+        number_of_readers, variable_size, number_of_reads, "as snapshot" if snapshot else "with lock and copy",
+        duration))
+    return duration
+
+
+def test_global_variable_readers(number_of_readers=8, number_of_reads=20, variable_size=10000):
+    for snapshot in (False, True):
+        measure_global_variable_readers(number_of_readers, number_of_reads, variable_size, snapshot)
+
+
+CPU_HEAVY_SCRIPT = 'def execute(self, inputs, outputs, gvm):\n' \
+                   '    total = 0\n' \
+                   '    for i in range({0}):\n' \
+                   '        total += i * i\n' \
+                   '    return 0\n'
+
+
+def measure_process_execution_scaling(number_of_branches, backend, iterations):
+    """Measures the time a barrier concurrency state with CPU heavy branches needs with the given execution backend"""
+    from rafcon.core.execution.process_execution_pool import EXECUTION_BACKEND_KEY
+    barrier_state = BarrierConcurrencyState("cpu_heavy")
+    barrier_state.semantic_data[EXECUTION_BACKEND_KEY] = backend
+    for i in range(number_of_branches):
+        state = ExecutionState("branch" + str(i))
+        state.script_text = CPU_HEAVY_SCRIPT.format(iterations)
+        barrier_state.add_state(state)
+    barrier_state.add_transition(barrier_state.states[UNIQUE_DECIDER_STATE_ID].state_id, 0, barrier_state.state_id, 0)
+    start = timer()
+    execute_state(barrier_state)
+    duration = timer() - start
+    logger.info("{0} CPU heavy branches with backend {1}: {2:.3f} s".format(number_of_branches, backend, duration))
+    return duration
+
+
+def test_process_execution_scaling(iterations=2000000):
+    import multiprocessing
+    from rafcon.core.execution.process_execution_pool import get_process_execution_pool
+    testing_utils.initialize_environment_core()
+    try:
+        # start the workers before the measurement
+        measure_process_execution_scaling(multiprocessing.cpu_count(), "PROCESS", 1)
+        number_of_branches = 1
+        while number_of_branches <= multiprocessing.cpu_count():
+            for backend in ("THREAD", "PROCESS"):
+                measure_process_execution_scaling(number_of_branches, backend, iterations)
+            number_of_branches *= 2
+    finally:
+        get_process_execution_pool().shutdown()
+        testing_utils.shutdown_environment_only_core()
+
+
+# ---------------------------------------------------------------------------------------------
+# ----------------------------------- benchmark suite -----------------------------------------
+# ---------------------------------------------------------------------------------------------
+
+def create_deep_hierarchy_state(depth, number_child_states):
+    """Creates hierarchy states nested `depth` times, the innermost one executing a chain of child states
+
+    :return: the outermost hierarchy state and the number of states executed per run
+    """
+    root_state = innermost_state = create_hierarchy_state(number_child_states)
+    # the innermost hierarchy state finishes with its outcome "hierarchy_outcome"
+    outcome_id = 1
+    for level in range(1, depth):
+        hierarchy = HierarchyState("level" + str(level))
+        hierarchy.add_state(root_state)
+        hierarchy.set_start_state(root_state.state_id)
+        hierarchy.add_transition(root_state.state_id, outcome_id, hierarchy.state_id, 0)
+        root_state, outcome_id = hierarchy, 0
+    set_script_without_wait_recursively(innermost_state)
+    return root_state, depth + number_child_states
+
+
+def measure_steps_per_second(root_state, number_of_steps, rounds=3):
+    """Executes the state several times and returns the best number of executed states per second"""
+    durations = []
+    for _ in range(rounds):
+        start = timer()
+        execute_state(root_state)
+        durations.append(timer() - start)
+    return number_of_steps / min(durations)
+
+
+def benchmark_deep_hierarchy(depth=20, number_child_states=100):
+    root_state, number_of_steps = create_deep_hierarchy_state(depth, number_child_states)
+    return measure_steps_per_second(root_state, number_of_steps)
+
+
+def benchmark_wide_barrier(number_of_branches=50, number_child_states=5):
+    barrier_state = create_barrier_concurrency_state(number_of_branches, number_child_states)
+    set_script_without_wait_recursively(barrier_state)
+    # barrier state, decider state, branches and their children
+    return measure_steps_per_second(barrier_state, 2 + number_of_branches * (number_child_states + 1))
+
+
+def benchmark_library_loading(number_of_library_states=100, number_child_states=20):
+    state_machine_path = create_library_heavy_state_machine(testing_utils.get_unique_temp_path(),
+                                                            number_of_library_states, number_child_states)
+    return measure_library_state_machine_loading(state_machine_path)
+
+
+def benchmark_payload_passing(number_child_states=10, payload_size=10 * 1000 * 1000):
+    hierarchy = create_hierarchy_state_passing_payload(number_child_states, payload_size, "copy")
+    start = timer()
+    execute_state(hierarchy)
+    return timer() - start
+
+
+def benchmark_scoped_data_writes(number_child_states=200):
+    return measure_scoped_data_writes(number_child_states)[0] * 1e6
+
+
+def benchmark_scoped_data_allocations(number_child_states=200):
+    return measure_scoped_data_writes(number_child_states, rounds=1)[1]
+
+
+def benchmark_execution_log(enabled, number_child_states=200):
+    hierarchy_state = create_hierarchy_state(number_child_states)
+    set_script_without_wait_recursively(hierarchy_state)
+    log_enabled = global_config.get_config_value("EXECUTION_LOG_ENABLE", False)
+    log_path = global_config.get_config_value("EXECUTION_LOG_PATH")
+    global_config.set_config_value("EXECUTION_LOG_ENABLE", enabled)
+    global_config.set_config_value("EXECUTION_LOG_PATH", testing_utils.get_unique_temp_path())
+    try:
+        return measure_steps_per_second(hierarchy_state, number_child_states + 1)
+    finally:
+        global_config.set_config_value("EXECUTION_LOG_ENABLE", log_enabled)
+        global_config.set_config_value("EXECUTION_LOG_PATH", log_path)
+
+
+def benchmark_storage(operation, number_child_states=200, loading_threads=8, lazy_loading=True,
+                      incremental_save=True):
+    from rafcon.core.storage import storage
+    state_machine = StateMachine(create_hierarchy_state(number_child_states))
+    path = os.path.join(testing_utils.get_unique_temp_path(), "storage_benchmark")
+    start = timer()
+    storage.save_state_machine_to_path(state_machine, path)
+    save_duration = timer() - start
+    if operation == "save":
+        return save_duration
+    if operation == "save_modified":
+        # save again after the modification of a single script
+        child_state = next(iter(state_machine.root_state.states.values()))
+        child_state.script_text += "\n"
+        global_config.set_config_value("STORAGE_INCREMENTAL_SAVE", incremental_save)
+        try:
+            start = timer()
+            number_of_files = storage.save_state_machine_to_path(state_machine, path)
+            save_duration = timer() - start
+        finally:
+            global_config.set_config_value("STORAGE_INCREMENTAL_SAVE", True)
+        print("save after modification (incremental: {0}): {1} files written".format(incremental_save,
+                                                                                     number_of_files))
+        return save_duration
+    if operation == "load_packed":
+        from rafcon.core.storage.packed_storage import pack_state_machine
+        pack_state_machine(path, path + ".rafcon")
+        path += ".rafcon"
+    global_config.set_config_value("STORAGE_LOADING_THREADS", loading_threads)
+    global_config.set_config_value("STORAGE_LAZY_LOADING", lazy_loading)
+    try:
+        timings = {}
+        storage.load_state_machine_from_path(path, timings=timings)
+        print("load phases (threads: {0}, lazy: {1}): {2}".format(
+            loading_threads, lazy_loading, ", ".join("{0} {1:.4f}s".format(phase, duration)
+                                                     for phase, duration in sorted(timings.items()))))
+        return timings['total']
+    finally:
+        global_config.set_config_value("STORAGE_LOADING_THREADS", 8)
+        global_config.set_config_value("STORAGE_LAZY_LOADING", True)
+
+
+#: name, function, unit and whether higher values are better for all benchmarks of the suite
+BENCHMARKS = [
+    ("deep_hierarchy", benchmark_deep_hierarchy, "steps/s", True),
+    ("wide_barrier", benchmark_wide_barrier, "steps/s", True),
+    ("library_loading", benchmark_library_loading, "s", False),
+    ("payload_passing", benchmark_payload_passing, "s", False),
+    ("scoped_data_writes", benchmark_scoped_data_writes, "us/step", False),
+    ("scoped_data_allocations", benchmark_scoped_data_allocations, "blocks/step", False),
+    ("execution_log_off", lambda: benchmark_execution_log(False), "steps/s", True),
+    ("execution_log_on", lambda: benchmark_execution_log(True), "steps/s", True),
+    ("save", lambda: benchmark_storage("save"), "s", False),
+    ("save_modified", lambda: benchmark_storage("save_modified"), "s", False),
+    ("save_modified_full", lambda: benchmark_storage("save_modified", incremental_save=False), "s", False),
+    ("load", lambda: benchmark_storage("load"), "s", False),
+    ("load_serial_eager", lambda: benchmark_storage("load", loading_threads=1, lazy_loading=False), "s", False),
+    ("load_packed", lambda: benchmark_storage("load_packed"), "s", False),
+]
+
+
+def run_benchmark_suite(names=None):
+    """Runs the benchmarks of the suite
+
+    :param list names: the names of the benchmarks to run, all if None
+    :return: the results as dictionary, mapping the benchmark name to its value, unit and direction
+    :rtype: dict
+    """
+    results = {}
+    testing_utils.initialize_environment_core()
+    try:
+        for name, function, unit, higher_is_better in BENCHMARKS:
+            if names and name not in names:
+                continue
+            value = function()
+            logger.info("Benchmark {0}: {1:.4g} {2}".format(name, value, unit))
+            results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+    finally:
+        testing_utils.shutdown_environment_only_core()
+    return results
+
+
+def write_benchmark_results(results, filename):
+    """Writes the results together with information about the environment to a JSON file"""
+    import json
+    import platform
+    data = {"rafcon_version": rafcon.__version__,
+            "python_version": platform.python_version(),
+            "machine": platform.node(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results}
+    with open(filename, "w") as result_file:
+        json.dump(data, result_file, indent=4, sort_keys=True)
+
+
+def compare_benchmark_results(results, baseline_filename, tolerance=0.2):
+    """Compares results against the results stored in a baseline file
+
+    :param dict results: the results of :func:`run_benchmark_suite`
+    :param str baseline_filename: a file written by :func:`write_benchmark_results`
+    :param float tolerance: the relative deterioration that is still accepted
+    :return: the regressions as list of (name, baseline value, current value) tuples
+    :rtype: list
+    """
+    import json
+    with open(baseline_filename) as baseline_file:
+        baseline = json.load(baseline_file)["results"]
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        baseline_value, value = baseline[name]["value"], result["value"]
+        if result["higher_is_better"]:
+            regressed = value < baseline_value * (1 - tolerance)
+        else:
+            regressed = value > baseline_value * (1 + tolerance)
+        logger.info("{0}: {1:.4g} {3} (baseline {2:.4g} {3}){4}".format(
+            name, value, baseline_value, result["unit"], " REGRESSION" if regressed else ""))
+        if regressed:
+            regressions.append((name, baseline_value, value))
+    return regressions
+
+
+def test_benchmark_suite():
+    filename = os.path.join(testing_utils.get_unique_temp_path(), "benchmark.json")
+    results = run_benchmark_suite(["wide_barrier", "save", "load"])
+    assert set(results.keys()) == {"wide_barrier", "save", "load"}
+    write_benchmark_results(results, filename)
+    assert compare_benchmark_results(results, filename) == []
+    results["save"]["value"] *= 2
+    assert [name for name, _, _ in compare_benchmark_results(results, filename)] == ["save"]
+
+
+def main():
+    """Runs the benchmark suite, e.g. ``python tests/performance/core_performance.py --output results.json``
+
+    With ``--baseline``, the results are compared against a file of a previous run and the exit code is 1 if a
+    benchmark deteriorated by more than the tolerance.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the RAFCON core benchmark suite")
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare the results with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="accepted relative deterioration")
+    parser.add_argument("benchmarks", nargs="*", help="names of the benchmarks to run, all by default: " +
+                        ", ".join(name for name, _, _, _ in BENCHMARKS))
+    args = parser.parse_args()
+    results = run_benchmark_suite(args.benchmarks)
+    if args.output:
+        write_benchmark_results(results, args.output)
+    if args.baseline and compare_benchmark_results(results, args.baseline, args.tolerance):
+        return 1
+    return 0
+
+
 if __name__ == '__main__':
-    # test_hierarchy_state_execution(10)
-    test_hierarchy_state_execution(100)
-    # TODO: state creation takes too long (> 100 seconds) => investigate
-    # test_hierarchy_state_execution(1000)
-    # test_barrier_concurrency_state_execution(10, 10)
-    # test_barrier_concurrency_state_execution(100, 100)
-    # test_preemption_concurrency_state_execution(50, 20, 3)
+    sys.exit(main())
@@ -51,6 +51,58 @@ def test_gui(number_child_states=10, number_childs_per_child=10, barrier=False,
         destroy_gui(caplog)
 
 
+def measure_state_machine_model_creation(number_child_states=70, number_childs_per_child=70, lazy=True):
+    """Measures the time and memory for creating the model of a large state machine
+
+    The state machine consists of a barrier concurrency state with number_child_states hierarchy states with
+    number_childs_per_child execution states each. Afterwards, the models of one hierarchy level are accessed, as if
+    it was expanded in the state machine tree.
+
+    :return: the durations for creating the state machine model and for accessing the level in seconds and the memory
+        allocated by the model in bytes
+    """
+    import tracemalloc
+    from timeit import default_timer as timer
+    from rafcon.core.state_machine import StateMachine
+    from rafcon.gui.config import global_gui_config
+    from rafcon.gui.models.state_machine import StateMachineModel
+    from .core_performance import create_barrier_concurrency_state
+
+    global_gui_config.set_config_value('LAZY_STATE_MODEL_CREATION', lazy)
+    state_machine = StateMachine(create_barrier_concurrency_state(number_child_states, number_childs_per_child))
+    tracemalloc.start()
+    try:
+        start = timer()
+        state_machine_m = StateMachineModel(state_machine, load_meta_data=False)
+        creation_duration = timer() - start
+        allocated_memory = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    start = timer()
+    for child_state_m in state_machine_m.root_state.states.values():
+        if hasattr(child_state_m, 'states'):
+            child_state_m.states.get(None)
+    access_duration = timer() - start
+    state_machine_m.prepare_destruction()
+    global_gui_config.set_config_value('LAZY_STATE_MODEL_CREATION', True)
+    logger.info("State machine model with {0} states (lazy: {1}): created in {2:.3f}s using {3:.1f} MB, "
+                "first level accessed in {4:.3f}s".format(number_child_states * (number_childs_per_child + 1) + 1,
+                                                          lazy, creation_duration, allocated_memory / 1e6,
+                                                          access_duration))
+    return creation_duration, access_duration, allocated_memory
+
+
+def test_state_machine_model_creation(caplog):
+    testing_utils.dummy_gui(None)
+    testing_utils.initialize_environment(gui_already_started=False,
+                                         gui_config={'HISTORY_ENABLED': False, 'AUTO_BACKUP_ENABLED': False})
+    try:
+        measure_state_machine_model_creation(lazy=False)
+        measure_state_machine_model_creation(lazy=True)
+    finally:
+        testing_utils.shutdown_environment(caplog=caplog, unpatch_threading=False)
+
+
 if __name__ == '__main__':
 
     # global_profiling = True